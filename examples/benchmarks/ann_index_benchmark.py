@@ -0,0 +1,85 @@
+"""
+Recall-vs-latency report for the approximate FAISS indexes supported by ``BGERetriever`` and
+``APIEmbeddingRetriever`` (``index_spec=...``), measured against the exact flat index.
+
+Embeddings can come from a ``bge_embeddings.h5`` file, a ``.npy`` file, or be generated randomly.
+Queries are a held-out sample of corpus vectors with a little noise, which mimics in-domain queries.
+
+Usage:
+    python examples/benchmarks/ann_index_benchmark.py --embeddings /path/bge_embeddings.h5 \\
+        --specs "HNSW32" "IVF4096,PQ64" "OPQ+IVF" --nprobe 8 32 128 --ef-search 64 256
+"""
+import argparse
+import time
+
+import numpy as np
+
+from rankify.retrievers.faiss_index import build_faiss_index, resolve_index_spec, set_search_params
+
+
+def load_embeddings(path, n_random, dim):
+    if path is None:
+        rng = np.random.default_rng(0)
+        emb = rng.standard_normal((n_random, dim), dtype=np.float32)
+        return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    import h5py
+    return h5py.File(path, "r")["embeddings"]
+
+
+def timed_search(index, queries, k):
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    return ids, (time.perf_counter() - start) * 1000.0 / len(queries)
+
+
+def recall_at_k(approx_ids, exact_ids):
+    hits = [len(set(a.tolist()) & set(e.tolist())) for a, e in zip(approx_ids, exact_ids)]
+    return float(np.mean(hits)) / exact_ids.shape[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embeddings", default=None, help="Path to bge_embeddings.h5 or a .npy matrix.")
+    parser.add_argument("--n", type=int, default=200_000, help="Corpus size when generating random embeddings.")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--specs", nargs="+", default=["HNSW32", "IVF1024,PQ64", "OPQ+IVF"])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--train-size", type=int, default=None)
+    args = parser.parse_args()
+
+    embeddings = load_embeddings(args.embeddings, args.n, args.dim)
+    rng = np.random.default_rng(1)
+    rows = np.sort(rng.choice(embeddings.shape[0], size=args.queries, replace=False))
+    queries = np.asarray(embeddings[rows], dtype=np.float32)
+    queries += 0.05 * rng.standard_normal(queries.shape, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    flat = build_faiss_index(embeddings, "Flat")
+    exact_ids, flat_ms = timed_search(flat, queries, args.k)
+    print(f"{'index':<28} {'knob':<14} {'recall@' + str(args.k):>10} {'ms/query':>10} {'build (s)':>10}")
+    print(f"{'Flat':<28} {'-':<14} {1.0:>10.4f} {flat_ms:>10.3f} {'-':>10}")
+
+    for spec in args.specs:
+        start = time.perf_counter()
+        index = build_faiss_index(embeddings, spec, train_size=args.train_size)
+        build_s = time.perf_counter() - start
+        resolved = resolve_index_spec(spec)
+        if "HNSW" in resolved:
+            knobs = [("efSearch", v, {"ef_search": v}) for v in args.ef_search]
+        elif "IVF" in resolved:
+            knobs = [("nprobe", v, {"nprobe": v}) for v in args.nprobe]
+        else:
+            knobs = [("-", "", {})]
+        for name, value, kwargs in knobs:
+            set_search_params(index, **kwargs)
+            ids, ms = timed_search(index, queries, args.k)
+            print(f"{resolved:<28} {f'{name}={value}':<14} {recall_at_k(ids, exact_ids):>10.4f} {ms:>10.3f} {build_s:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
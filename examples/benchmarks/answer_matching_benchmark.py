@@ -0,0 +1,100 @@
+"""
+Seconds spent on ``Context.has_answer`` for a retrieval run: inline ``has_answers`` per hit (as the
+retrievers did) vs. the batched answer matching stage.
+
+With ``--dataset`` a retrieved dataset file (e.g. NQ-dev BM25 results with 1000 contexts per
+question, see ``Dataset.load_dataset``) is used; otherwise a synthetic run with ``--questions``
+questions and ``--contexts`` Wikipedia-like passages each, drawn from a shared pool so popular
+passages recur across questions like in real retrieval runs.
+
+Usage:
+    python examples/benchmarks/answer_matching_benchmark.py --questions 200 --contexts 1000
+    python examples/benchmarks/answer_matching_benchmark.py --dataset nq-dev-bm25.json --contexts 1000
+"""
+import argparse
+import random
+import time
+import unicodedata
+
+from rankify.dataset.dataset import Answer, Context, Dataset, Document, Question
+from rankify.utils.answer_matching import AnswerMatcher
+from rankify.utils.retrievers.colbert.utility.utils.dpr import SimpleTokenizer
+
+
+def inline_has_answers(text, answers, tokenizer):
+    """ pyserini.eval.evaluate_dpr_retrieval.has_answers, as called per hit by the retrievers"""
+    text = tokenizer.tokenize(unicodedata.normalize("NFD", text)).words(uncased=True)
+    for answer in answers:
+        answer = tokenizer.tokenize(unicodedata.normalize("NFD", answer)).words(uncased=True)
+        for i in range(0, len(text) - len(answer) + 1):
+            if answer == text[i: i + len(answer)]:
+                return True
+    return False
+
+
+def synthetic_run(questions, contexts, pool_size):
+    rng = random.Random(0)
+    words = [f"{rng.choice('bcdfghklmnprst')}{rng.choice('aeiou')}{rng.choice('nrstl')}{i}" for i in range(20000)]
+    pool = [" ".join(rng.choices(words, k=rng.randint(80, 120))).capitalize() + "." for _ in range(pool_size)]
+    documents = []
+    for _ in range(questions):
+        answers = [" ".join(rng.choices(words, k=rng.randint(1, 3))) for _ in range(rng.randint(1, 3))]
+        documents.append(Document(question=Question("q"), answers=Answer(answers),
+                                  contexts=[Context(id=str(i), text=pool[i], score=0.0)
+                                            for i in rng.sample(range(pool_size), contexts)]))
+    return documents
+
+
+def reset(documents):
+    for document in documents:
+        for context in document.contexts:
+            context.has_answer = None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", help="retrieved dataset file (Dataset.load_dataset format)")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--contexts", type=int, default=1000)
+    parser.add_argument("--pool", type=int, default=50000, help="distinct passages of the synthetic run")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.dataset:
+        documents = Dataset.load_dataset(args.dataset, n_docs=args.contexts)[:args.questions]
+    else:
+        documents = synthetic_run(args.questions, args.contexts, args.pool)
+    n = sum(len(d.contexts) for d in documents)
+    distinct = len({c.text for d in documents for c in d.contexts})
+    print(f"{len(documents)} questions, {n} contexts ({distinct} distinct passages)")
+    print(f"{'has_answer':>38} {'seconds':>8} {'contexts/sec':>13}")
+
+    def report(name, run):
+        reset(documents)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>38} {elapsed:>8.2f} {n / elapsed:>13.0f}")
+        return [c.has_answer for d in documents for c in d.contexts]
+
+    def inline(new_tokenizer_per_hit):
+        tokenizer = SimpleTokenizer()
+        for document in documents:
+            for context in document.contexts:
+                context.has_answer = inline_has_answers(
+                    context.text, document.answers.answers, SimpleTokenizer() if new_tokenizer_per_hit else tokenizer)
+
+    report("inline, new SimpleTokenizer per hit", lambda: inline(True))
+    expected = report("inline, shared SimpleTokenizer", lambda: inline(False))
+    matcher = AnswerMatcher()
+    assert report("batch stage, cold", lambda: matcher.annotate(documents)) == expected
+    assert report("batch stage, tokenized passages cached", lambda: matcher.annotate(documents)) == expected
+    assert report(f"batch stage, {args.workers} workers, cold",
+                  lambda: AnswerMatcher(num_workers=args.workers).annotate(documents)) == expected
+    for document in documents:
+        document.answers = Answer([])
+    report("batch stage, no gold answers", lambda: matcher.annotate(documents))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Queries/sec of ``APIRanker`` against a local mock rerank API: the former one blocking ``requests.post``
+per query vs. the shared async client layer (concurrent, rate-limited, retrying).
+
+The mock API answers after ``--latency`` seconds and allows ``--server-rate`` requests per second,
+answering 429 with ``Retry-After`` beyond that, like a hosted reranker. Sequential requests are bound by
+the round trip (``1 / latency`` queries/sec); concurrent ones by the provider's rate limit. The client is
+run once with its rate limit just under the server's and once without one, relying on 429 retries.
+
+Usage:
+    python examples/benchmarks/api_rerank_benchmark.py --queries 1000 --latency 0.1 --server-rate 100
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.models.apiranker import APIRanker
+from rankify.utils.api.async_client import configure_provider
+
+
+class MockRerankAPI(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, latency, rate):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.latency = latency
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.window = deque()
+        self.accepted = self.rejected = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def admit(self):
+        """ Sliding one-second window rate limit"""
+        with self.lock:
+            now = time.monotonic()
+            while self.window and now - self.window[0] >= 1.0:
+                self.window.popleft()
+            if len(self.window) >= self.rate:
+                self.rejected += 1
+                return False
+            self.window.append(now)
+            self.accepted += 1
+            return True
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.server.admit():
+            time.sleep(self.server.latency)
+            results = [{"index": i, "document": {"text": text}, "relevance_score": float(len(text))}
+                       for i, text in enumerate(body["documents"])]
+            status, payload = 200, {"results": sorted(results, key=lambda r: -r["relevance_score"])}
+        else:
+            status, payload = 429, {"error": "rate limited"}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def make_documents(n):
+    return [Document(question=Question(f"query {i}"), answers=Answer([]),
+                     contexts=[Context(id=str(j), title="", text=f"passage {j} " * (j + 1), score=0.0)
+                               for j in range(10)])
+            for i in range(n)]
+
+
+def sequential_rank(ranker, documents):
+    """ The previous APIRanker.rank: one blocking request per query"""
+    for document in documents:
+        payload = ranker._format_payload(document.question.question, document.contexts)
+        response = requests.post(ranker.url, headers=ranker.headers, data=payload)
+        ranker._parse_response(response.json(), document)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--sequential-queries", type=int, default=100,
+                        help="queries for the (slow) sequential baseline")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--server-rate", type=int, default=100)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"mock rerank API: {args.latency * 1000:.0f} ms per request, {args.server_rate} requests/sec allowed")
+    print(f"{'client':>34} {'queries':>8} {'seconds':>8} {'queries/sec':>12} {'429s':>6}")
+
+    def report(name, run, n):
+        server = MockRerankAPI(args.latency, args.server_rate)
+        url = f"http://127.0.0.1:{server.server_address[1]}/rerank"
+        ranker = APIRanker(method="apiranker", model_name="mock", api_key="key", endpoint=url,
+                           max_concurrency=args.max_concurrency)
+        documents = make_documents(n)
+        start = time.perf_counter()
+        run(ranker, url, documents)
+        elapsed = time.perf_counter() - start
+        assert all(d.reorder_contexts[0].id == "9" for d in documents)
+        print(f"{name:>34} {n:>8} {elapsed:>8.2f} {n / elapsed:>12.1f} {server.rejected:>6}")
+        server.shutdown()
+        server.server_close()
+
+    report("sequential requests.post", lambda ranker, url, docs: sequential_rank(ranker, docs),
+           args.sequential_queries)
+
+    def rate_limited(ranker, url, documents):
+        # A little under the server's limit, so its sliding window never overflows
+        configure_provider(url, requests_per_second=0.95 * args.server_rate, burst=1)
+        ranker.rank(documents)
+
+    def retries_only(ranker, url, documents):
+        configure_provider(url, requests_per_second=None, backoff_base=0.1)
+        ranker.rank(documents)
+
+    report("async layer, rate limited", rate_limited, args.queries)
+    report("async layer, 429 retries only", retries_only, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Queries/sec of ColBERT (PLAID) search: one ``Searcher.search`` call per query (as
+``ColBERTRetriever.retrieve`` used to search) vs. the retriever's batched ``search_all`` path, for
+each PLAID preset; the retriever prints the batched path's seconds per stage.
+
+With ``--index-folder`` an existing custom index built by ``ColBERTIndexer`` is searched with
+``--queries`` random passages' leading words as queries. Otherwise a synthetic corpus of ``--docs``
+topical passages is indexed on CPU with a randomly initialized BERT checkpoint (``--layers`` x
+``--hidden``) written to a temporary directory, so the benchmark runs offline; rankings of a random
+model are meaningless, only their agreement between the two paths is checked.
+
+Usage:
+    python examples/benchmarks/colbert_search_benchmark.py --docs 2000 --queries 500
+    python examples/benchmarks/colbert_search_benchmark.py --index-folder rankify_indices/colbert_index_wiki
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from rankify.dataset.dataset import Answer, Document, Question
+from rankify.indexing.colbert_indexer import ColBERTIndexer
+from rankify.retrievers.colbert_retriever import ColBERTRetriever
+from rankify.utils.retrievers.colbert.colbert.infra import Run, RunConfig
+
+
+def build_index(directory, docs, layers, hidden):
+    """Index a synthetic topical corpus with a random BERT checkpoint; returns the index folder."""
+    checkpoint = os.path.join(directory, "checkpoint")
+    os.makedirs(checkpoint)
+    words = [f"w{i}" for i in range(5000)]
+    with open(os.path.join(checkpoint, "vocab.txt"), "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "[unused0]", "[unused1]"] + words))
+    tokenizer = BertTokenizerFast(os.path.join(checkpoint, "vocab.txt"))
+    tokenizer.save_pretrained(checkpoint)
+    torch.manual_seed(0)
+    BertModel(BertConfig(vocab_size=len(tokenizer), hidden_size=hidden, num_hidden_layers=layers,
+                         num_attention_heads=hidden // 64, intermediate_size=4 * hidden)).save_pretrained(checkpoint)
+
+    rng = random.Random(0)
+    corpus = os.path.join(directory, "corpus.jsonl")
+    with open(corpus, "w") as f:
+        for i in range(docs):
+            topic = rng.randrange(100)
+            text = " ".join(rng.choice(words[topic * 50:(topic + 1) * 50]) if rng.random() < 0.7 else rng.choice(words)
+                            for _ in range(rng.randint(40, 80)))
+            f.write(json.dumps({"id": f"doc{i}", "contents": text, "title": f"passage {i}"}) + "\n")
+    with Run().context(RunConfig(nranks=1, avoid_fork_if_possible=True)):
+        indexer = ColBERTIndexer(corpus, encoder_name=checkpoint, output_dir=os.path.join(directory, "indices"),
+                                 index_type="benchmark", device="cpu")
+        indexer.build_index()
+    return str(indexer.index_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--index-folder", help="custom index built by ColBERTIndexer")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--hidden", type=int, default=768)
+    parser.add_argument("--presets", nargs="+", default=["fast", "balanced", "accurate"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_folder = args.index_folder or build_index(directory, args.docs, args.layers, args.hidden)
+        with open(os.path.join(index_folder, "collection.tsv"), encoding="utf-8") as f:
+            passages = [row[1] for row in csv.reader(f, delimiter="\t")][1:]
+        rng = random.Random(1)
+        queries = [" ".join(text.split()[:rng.randint(4, 10)]) for text in rng.choices(passages, k=args.queries)]
+
+        print(f"{len(passages)} passages, {args.queries} queries, k={args.k}")
+        print(f"{'preset':>10} {'search':>10} {'seconds':>8} {'queries/sec':>12} {'same top-k':>11}")
+        for preset in args.presets:
+            retriever = ColBERTRetriever(index_folder=index_folder, n_docs=args.k, preset=preset)
+
+            start = time.perf_counter()
+            expected = [retriever.searcher.search(query, k=args.k)[0] for query in queries]
+            elapsed = time.perf_counter() - start
+            print(f"{preset:>10} {'per query':>10} {elapsed:>8.2f} {args.queries / elapsed:>12.1f}")
+
+            documents = [Document(question=Question(query), answers=Answer([]), contexts=[]) for query in queries]
+            for document, query in zip(documents, queries):
+                document.question.question = query
+            start = time.perf_counter()
+            retriever.retrieve(documents)
+            elapsed = time.perf_counter() - start
+            same = sum([c.id for c in document.contexts] == [retriever._convert_result_id(pid) for pid in pids]
+                       for document, pids in zip(documents, expected))
+            print(f"{preset:>10} {'batched':>10} {elapsed:>8.2f} {args.queries / elapsed:>12.1f} "
+                  f"{same:>5}/{args.queries}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Latency of incremental ColBERT index updates (``ColBERTIndexer.update`` / ``compact`` and the live
+``ColBERTRetriever.add_passages`` / ``remove_passages``) vs. a full ``build_index`` of the updated
+corpus, and agreement of their search results.
+
+A synthetic corpus of ``--docs`` topical passages is indexed on CPU with a randomly initialized BERT
+checkpoint (``--layers`` x ``--hidden``) written to a temporary directory, so the benchmark runs
+offline. ``--delete`` passages are then removed, ``--replace`` rewritten and ``--add`` new ones added
+with ``update``, and the result is compared with an index built from scratch on the updated corpus:
+
+- recall@k against exhaustive MaxSim over full-precision embeddings of the updated corpus, for
+  ``--queries`` queries and the leading words of the added and rewritten passages (the rebuild
+  retrains the centroids, so the two indexes do not return identical rankings);
+- self-recall@k of the added and rewritten passages;
+- removed passages never being retrieved;
+- identical rankings and scores before and after ``compact``, and after a live add + remove.
+
+Usage:
+    python examples/benchmarks/colbert_update_benchmark.py --docs 5000 --add 500 --delete 500 --replace 100
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import torch
+from transformers import BertConfig, BertTokenizerFast
+
+from rankify.dataset.dataset import Answer, Document, Question
+from rankify.indexing.colbert_indexer import ColBERTIndexer
+from rankify.retrievers.colbert_retriever import ColBERTRetriever
+from rankify.utils.retrievers.colbert.colbert.infra import ColBERTConfig, Run, RunConfig
+from rankify.utils.retrievers.colbert.colbert.modeling.hf_colbert import class_factory
+
+WORDS = [f"w{i}" for i in range(5000)]
+
+
+def build_checkpoint(directory, layers, hidden):
+    """
+    Random ColBERT checkpoint over the synthetic vocabulary; returns its directory. The projection
+    layer is saved too: indexing, updates and queries load the checkpoint separately and must agree.
+    """
+    checkpoint = os.path.join(directory, "checkpoint")
+    os.makedirs(checkpoint)
+    with open(os.path.join(checkpoint, "vocab.txt"), "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "[unused0]", "[unused1]"] + WORDS))
+    tokenizer = BertTokenizerFast(os.path.join(checkpoint, "vocab.txt"))
+    tokenizer.save_pretrained(checkpoint)
+    config = BertConfig(vocab_size=len(tokenizer), hidden_size=hidden, num_hidden_layers=layers,
+                        num_attention_heads=hidden // 64, intermediate_size=4 * hidden)
+    config.save_pretrained(checkpoint)
+    torch.manual_seed(0)
+    class_factory(checkpoint)(config, ColBERTConfig()).save_pretrained(checkpoint)
+    return checkpoint
+
+
+def passage(rng, doc_id):
+    topic = rng.randrange(100)
+    text = " ".join(rng.choice(WORDS[topic * 50:(topic + 1) * 50]) if rng.random() < 0.7 else rng.choice(WORDS)
+                    for _ in range(rng.randint(40, 80)))
+    return {"id": doc_id, "contents": text, "title": f"passage {doc_id}"}
+
+
+def write_jsonl(path, docs):
+    with open(path, "w") as f:
+        for doc in docs:
+            f.write(json.dumps(doc) + "\n")
+    return path
+
+
+def build_index(directory, name, docs, checkpoint):
+    """Build a ColBERTIndexer index of ``docs``; returns the indexer and the seconds taken."""
+    corpus = write_jsonl(os.path.join(directory, f"{name}.jsonl"), docs)
+    start = time.perf_counter()
+    with Run().context(RunConfig(nranks=1, avoid_fork_if_possible=True)):
+        indexer = ColBERTIndexer(corpus, encoder_name=checkpoint, output_dir=os.path.join(directory, name),
+                                 index_type="benchmark", device="cpu")
+        indexer.build_index()
+    return indexer, time.perf_counter() - start
+
+
+def search(retriever, queries):
+    """``[[(id, score), ...], ...]`` top-k of every query."""
+    documents = [Document(question=Question(query), answers=Answer([]), contexts=[]) for query in queries]
+    for document, query in zip(documents, queries):
+        document.question.question = query
+    retriever.retrieve(documents)
+    return [[(c.id, c.score) for c in document.contexts] for document in documents]
+
+
+def ids(rankings):
+    return [[doc_id for doc_id, _ in ranking] for ranking in rankings]
+
+
+def exact_top_k(searcher, docs, queries, k):
+    """Top-k ids by exhaustive MaxSim over full-precision embeddings (no centroids, no compression)."""
+    texts = [f"{doc['title']} | {doc['contents']}" for doc in docs]  # as ColBERT's collection loader presents them
+    embeddings, doclens = searcher.checkpoint.docFromText(texts, bsize=64, keep_dims="flatten", to_cpu=True)
+    owners = torch.arange(len(docs)).repeat_interleave(torch.tensor(doclens))
+    top = []
+    for Q in searcher.encode(queries).split(16):
+        similarities = Q.float() @ embeddings.float().T
+        maxsim = torch.full((*similarities.shape[:2], len(docs)), -torch.inf)
+        maxsim = maxsim.scatter_reduce(2, owners.expand_as(similarities), similarities, "amax")
+        top += maxsim.sum(1).topk(k).indices.tolist()
+    return [[docs[i]["id"] for i in row] for row in top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--add", type=int, default=500)
+    parser.add_argument("--delete", type=int, default=500)
+    parser.add_argument("--replace", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--hidden", type=int, default=768)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    base = [passage(rng, f"doc{i}") for i in range(args.docs)]
+    changed = rng.sample([doc["id"] for doc in base], args.delete + args.replace)
+    deleted, replaced = changed[:args.delete], changed[args.delete:]
+    updates = [passage(rng, doc_id) for doc_id in replaced] + \
+              [passage(rng, f"doc{i}") for i in range(args.docs, args.docs + args.add)]
+    final = {doc["id"]: doc for doc in base}
+    for doc_id in deleted:
+        del final[doc_id]
+    final.update({doc["id"]: doc for doc in updates})
+    final = list(final.values())
+
+    queries = [" ".join(doc["contents"].split()[:rng.randint(4, 10)]) for doc in rng.choices(final, k=args.queries)]
+    update_queries = [" ".join(doc["contents"].split()[:10]) for doc in updates]
+    timings = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint = build_checkpoint(directory, args.layers, args.hidden)
+        indexer, seconds = build_index(directory, "updated", base, checkpoint)
+        timings.append((f"build_index ({len(base)} passages)", seconds))
+
+        start = time.perf_counter()
+        stats = indexer.update(add_jsonl=write_jsonl(os.path.join(directory, "updates.jsonl"), updates),
+                               delete_ids=deleted)
+        timings.append((f"update (+{args.add} ~{args.replace} -{args.delete})", time.perf_counter() - start))
+        timings += [(f"  {stage}", seconds) for stage, seconds in stats["timings"].items()]
+
+        updated = ColBERTRetriever(index_folder=str(indexer.index_dir), n_docs=args.k, load_index_with_mmap=False)
+        before_compaction = search(updated, queries + update_queries)
+        start = time.perf_counter()
+        updated.compact_index()
+        timings.append(("compact + reload", time.perf_counter() - start))
+        after_compaction = search(updated, queries + update_queries)
+
+        live = [passage(rng, f"live{i}") for i in range(args.add)]
+        start = time.perf_counter()
+        updated.add_passages(live, persist=False)
+        timings.append((f"live add_passages ({len(live)})", time.perf_counter() - start))
+        found_live = sum(f"live{i}" in [doc_id for doc_id, _ in ranking]
+                         for i, ranking in enumerate(search(updated, [" ".join(doc["contents"].split()[:10])
+                                                                      for doc in live])))
+        start = time.perf_counter()
+        updated.remove_passages([doc["id"] for doc in live], persist=False)
+        timings.append((f"live remove_passages ({len(live)})", time.perf_counter() - start))
+        start = time.perf_counter()
+        updated.persist_updates()
+        timings.append(("persist_updates", time.perf_counter() - start))
+        after_live = search(updated, queries + update_queries)
+        reloaded = search(ColBERTRetriever(index_folder=str(indexer.index_dir), n_docs=args.k,
+                                           load_index_with_mmap=False), queries + update_queries)
+
+        rebuilt_indexer, seconds = build_index(directory, "rebuilt", final, checkpoint)
+        timings.append((f"build_index ({len(final)} passages)", seconds))
+        rebuilt_retriever = ColBERTRetriever(index_folder=str(rebuilt_indexer.index_dir), n_docs=args.k)
+        rebuilt = search(rebuilt_retriever, queries + update_queries)
+        exact = exact_top_k(rebuilt_retriever.searcher, final, queries + update_queries, args.k)
+
+    print(f"\n{'operation':>36} {'seconds':>8}")
+    for operation, seconds in timings:
+        print(f"{operation:>36} {seconds:>8.2f}")
+
+    print(f"\n{'index':>10} {f'recall@{args.k} vs exact':>20} {f'self-recall@{args.k} of updates':>26}")
+    for name, rankings in (("updated", after_compaction), ("rebuilt", rebuilt)):
+        recall = sum(len(set(a) & set(b)) for a, b in zip(ids(rankings), exact)) / (len(exact) * args.k)
+        hits = sum(doc["id"] in ranking for doc, ranking in zip(updates, ids(rankings[args.queries:])))
+        print(f"{name:>10} {recall:>20.3f} {f'{hits}/{len(updates)}':>26}")
+    print(f"\nself-recall@{args.k} of live-added passages: {found_live}/{len(live)}")
+    retrieved_deleted = set(deleted) & {doc_id for ranking in ids(after_compaction) for doc_id in ranking}
+    print(f"removed passages retrieved: {len(retrieved_deleted)}")
+    print(f"rankings unchanged by compaction: {before_compaction == after_compaction}")
+    print(f"rankings unchanged by live add + remove: {after_live == after_compaction}, after reload: "
+          f"{reloaded == after_compaction}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Memory used per retrieved context by the different in-memory representations.
+
+Compares:
+
+* ``legacy``  – a ``__dict__``-based context class, equivalent to ``Context`` before it gained ``__slots__``,
+* ``slotted`` – the current ``rankify.dataset.dataset.Context``,
+* ``batch``   – the columnar ``rankify.dataset.document_batch.DocumentBatch`` (documents not materialized).
+
+Memory is measured with ``tracemalloc`` and includes the passage strings.
+
+Usage:
+    python examples/benchmarks/document_memory_benchmark.py --queries 200 --contexts 100
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.dataset.document_batch import DocumentBatch
+
+WORDS = (
+    "the capital of france is paris and berlin is the capital of germany deep learning models "
+    "learn hierarchical representations from data neural networks are trained with gradient "
+    "descent green tea contains antioxidants retrieval augmented generation combines search "
+    "with language models to answer questions about documents"
+).split()
+
+
+class LegacyContext:
+    def __init__(self, score=None, has_answer=None, id=None, title=None, text=None):
+        self.score = score
+        self.has_answer = has_answer
+        self.id = id
+        self.title = title
+        self.text = text
+
+
+def make_records(n_queries, n_contexts, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "question": " ".join(rng.choices(WORDS, k=8)) + "?",
+            "answers": ["paris"],
+            "query_id": i,
+            "ctxs": [
+                {"id": rng.randrange(21_000_000), "title": rng.choice(WORDS).title(),
+                 "text": " ".join(rng.choices(WORDS, k=100)), "score": rng.random(), "has_answer": False}
+                for _ in range(n_contexts)
+            ],
+        }
+        for i in range(n_queries)
+    ]
+
+
+def build_objects(records, context_cls):
+    return [
+        Document(Question(r["question"]), Answer(r["answers"]),
+                 [context_cls(ctx["score"], ctx["has_answer"], ctx["id"], ctx["title"], ctx["text"])
+                  for ctx in r["ctxs"]], id=r["query_id"])
+        for r in records
+    ]
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--contexts", type=int, default=100)
+    args = parser.parse_args()
+
+    n_contexts = args.queries * args.contexts
+    # Records are generated inside each measurement; only what the layout keeps alive is counted
+    representations = {
+        "legacy": lambda: build_objects(make_records(args.queries, args.contexts), LegacyContext),
+        "slotted": lambda: build_objects(make_records(args.queries, args.contexts), Context),
+        "batch": lambda: DocumentBatch.from_dicts(make_records(args.queries, args.contexts)),
+    }
+
+    print(f"{args.queries} queries x {args.contexts} contexts")
+    print(f"{'layout':>8} {'total (MB)':>11} {'bytes/context':>14}")
+    for name, build in representations.items():
+        total = measure(build)
+        print(f"{name:>8} {total / 2**20:>11.1f} {total / n_contexts:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
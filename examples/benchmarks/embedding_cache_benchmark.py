@@ -0,0 +1,83 @@
+"""
+Seconds to (re-)embed a corpus with and without the content-addressed embedding cache.
+
+Runs offline on a randomly initialized BERT (``--layers`` x ``--hidden``) as the encoder. The corpus
+is embedded once cold, then again after ``--edit-fraction`` of its passages were changed: the former
+whole-corpus ``.npy`` cache was keyed by the corpus file and had to re-embed everything, the cache
+only embeds the edited passages. Finally the unchanged corpus is loaded straight from the cache.
+
+Usage:
+    python examples/benchmarks/embedding_cache_benchmark.py --passages 20000 --edit-fraction 0.05
+"""
+import argparse
+import random
+import tempfile
+import time
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertModel
+
+from rankify.utils.embedding_cache import EmbeddingCache
+
+
+def make_encoder(layers, hidden, batch_size):
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=1000, hidden_size=hidden, num_hidden_layers=layers,
+                        num_attention_heads=hidden // 64, intermediate_size=4 * hidden)
+    model = BertModel(config).eval()
+
+    @torch.no_grad()
+    def encode(texts):
+        out = []
+        for i in range(0, len(texts), batch_size):
+            ids = [[hash(word) % 1000 for word in text.split()][:64] for text in texts[i:i + batch_size]]
+            width = max(len(x) for x in ids)
+            input_ids = torch.tensor([x + [0] * (width - len(x)) for x in ids])
+            mask = (input_ids != 0).long()
+            out.append(model(input_ids=input_ids, attention_mask=mask).last_hidden_state[:, 0].numpy())
+        return np.concatenate(out)
+
+    return encode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--passages", type=int, default=20000)
+    parser.add_argument("--edit-fraction", type=float, default=0.05)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--hidden", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=128)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(5000)]
+    corpus = [" ".join(rng.choices(words, k=rng.randint(20, 60))) for _ in range(args.passages)]
+    edited = list(corpus)
+    for i in rng.sample(range(len(corpus)), int(args.edit_fraction * len(corpus))):
+        edited[i] = corpus[i] + " edited"
+    encode = make_encoder(args.layers, args.hidden, args.batch_size)
+
+    print(f"{args.passages} passages, {args.edit_fraction:.0%} edited, {args.layers}x{args.hidden} BERT encoder")
+    print(f"{'run':>32} {'seconds':>8} {'encoded':>8}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def run(name, texts, use_cache):
+            cache = EmbeddingCache(cache_dir, model="random-bert") if use_cache else None
+            start = time.perf_counter()
+            if cache is None:
+                embeddings, encoded = encode(texts), len(texts)
+            else:
+                embeddings, encoded = cache.encode(texts, encode), cache.misses
+            assert len(embeddings) == len(texts)
+            print(f"{name:>32} {time.perf_counter() - start:>8.2f} {encoded:>8}")
+
+        run("cold, no cache", corpus, False)
+        run("cold, filling cache", corpus, True)
+        run("edited corpus, no cache", edited, False)
+        run("edited corpus, cache", edited, True)
+        run("unchanged corpus, cache", edited, True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+HyDE retrieval latency: one question at a time vs. batched (concurrent LLM calls, batched
+encoding, one ``search_knn`` per batch).
+
+Runs offline: the LLM is a stub that sleeps ``--llm-latency`` seconds per call and returns
+``--hypotheses`` passages, the encoder is a randomly initialized ``Contriever`` (the architecture,
+not the weights, drives the cost) and the index is a flat FAISS index over random vectors.
+
+Usage:
+    python examples/benchmarks/hyde_batch_benchmark.py --questions 64 --hypotheses 4 --llm-latency 0.3
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import torch
+from pyserini.eval.evaluate_dpr_retrieval import SimpleTokenizer
+from transformers import BertConfig, BertTokenizerFast
+
+from rankify.dataset.dataset import Answer, Document, Question
+from rankify.retrievers.contriever_retriever import ContrieverRetriever
+from rankify.retrievers.hyde_retriever import HydeRetriever
+from rankify.utils.retrievers.contriever.contriever import Contriever
+from rankify.utils.retrievers.contriever.index import Indexer
+from rankify.utils.retrievers.hyde import Promptor
+from rankify.utils.retrievers.hyde.generator import Generator
+
+WORDS = (
+    "the capital of france is paris and berlin is the capital of germany deep learning models "
+    "learn hierarchical representations from data neural networks are trained with gradient "
+    "descent green tea contains antioxidants retrieval augmented generation combines search"
+).split()
+
+
+class StubGenerator(Generator):
+    """ Stands in for an API model: fixed latency, random passages"""
+
+    def __init__(self, n, latency, seed=0):
+        super().__init__("stub", None)
+        self.n = n
+        self.latency = latency
+        self.seed = seed
+
+    def generate(self, prompt):
+        time.sleep(self.latency)
+        rng = random.Random(f"{self.seed}-{prompt}")
+        return [" ".join(rng.choices(WORDS, k=rng.randint(40, 120))) for _ in range(self.n)]
+
+
+def build_contriever(tmpdir, n_passages, hidden, layers, device):
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(WORDS)) + [":", "?", "."]
+    vocab_file = os.path.join(tmpdir, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(vocab))
+    config = BertConfig(vocab_size=len(vocab), hidden_size=hidden, num_hidden_layers=layers,
+                        num_attention_heads=hidden // 64, intermediate_size=hidden * 4)
+    torch.manual_seed(0)
+
+    contriever = ContrieverRetriever.__new__(ContrieverRetriever)
+    contriever.device = device
+    contriever.batch_size = 64
+    contriever.tokenizer = BertTokenizerFast(vocab_file=vocab_file)
+    contriever.model = Contriever(config).to(device).eval()
+    contriever.index = Indexer(hidden)
+    vectors = np.random.default_rng(0).standard_normal((n_passages, hidden)).astype(np.float32)
+    contriever.index.index_data(list(range(n_passages)), vectors)
+    contriever.passage_id_map = {i: {"title": f"t{i}", "text": f"passage {i}"} for i in range(n_passages)}
+    return contriever
+
+
+def build_hyde(contriever, generator, batched, max_workers, n_docs):
+    hyde = HydeRetriever.__new__(HydeRetriever)
+    hyde.n_docs = n_docs
+    hyde.batch_size = contriever.batch_size
+    hyde.contriever = contriever
+    hyde.generator = generator
+    hyde.promptor = Promptor("web search")
+    hyde.tokenizer = SimpleTokenizer()
+    hyde.batched = batched
+    hyde.max_workers = max_workers
+    hyde.questions_per_batch = 16
+    return hyde
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=64)
+    parser.add_argument("--hypotheses", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--max-workers", type=int, default=16)
+    parser.add_argument("--passages", type=int, default=100000)
+    parser.add_argument("--hidden", type=int, default=768)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--n-docs", type=int, default=10)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    questions = [" ".join(rng.choices(WORDS, k=rng.randint(5, 12))) + "?" for _ in range(args.questions)]
+    generator = StubGenerator(args.hypotheses, args.llm_latency)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        contriever = build_contriever(tmpdir, args.passages, args.hidden, args.layers, args.device)
+        print(f"{args.questions} questions, {args.hypotheses} hypotheses each, "
+              f"{args.llm_latency * 1000:.0f} ms per LLM call, {args.layers}x{args.hidden} encoder on {args.device}")
+        print(f"{'mode':>12} {'seconds':>8} {'questions/sec':>14}")
+        results = {}
+        for name, batched in (("sequential", False), ("batched", True)):
+            hyde = build_hyde(contriever, generator, batched, args.max_workers, args.n_docs)
+            documents = [Document(question=Question(q), answers=Answer(["paris"])) for q in questions]
+            start = time.perf_counter()
+            hyde.retrieve(documents)
+            elapsed = time.perf_counter() - start
+            results[name] = [[c.id for c in document.contexts] for document in documents]
+            print(f"{name:>12} {elapsed:>8.2f} {args.questions / elapsed:>14.1f}")
+
+    agree = sum(a == b for a, b in zip(results["sequential"], results["batched"]))
+    print(f"identical top-{args.n_docs}: {agree}/{args.questions} questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Queries/sec of SPLADE query encoding: one forward pass per query (pyserini's ``SpladeQueryEncoder``,
+as ``LuceneImpactSearcher.search`` runs it) vs. ``BatchedImpactQueryEncoder``'s padded,
+length-bucketed batches.
+
+Runs offline on a randomly initialized BERT masked LM (``--layers`` x ``--hidden``, full 30522-token
+vocabulary like the SPLADE checkpoints) with a synthetic word-level vocabulary; queries are 3-20
+words long. The Lucene impact search itself is unchanged (``batch_search`` with ``threads``) and
+needs a prebuilt index, so it is not part of this benchmark.
+
+Usage:
+    python examples/benchmarks/impact_query_encoding_benchmark.py --queries 1000 --batch-sizes 16 64
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertForMaskedLM, BertTokenizer
+
+from rankify.utils.retrievers.impact_query_encoder import BatchedImpactQueryEncoder
+
+
+class SpladeQueryEncoder:
+    """ pyserini.encode.SpladeQueryEncoder on a random model"""
+
+    def __init__(self, tokenizer, layers, hidden):
+        torch.manual_seed(0)
+        config = BertConfig(vocab_size=len(tokenizer.vocab), hidden_size=hidden, num_hidden_layers=layers,
+                            num_attention_heads=hidden // 64, intermediate_size=4 * hidden)
+        self.device = "cpu"
+        self.model = BertForMaskedLM(config).eval()
+        self.tokenizer = tokenizer
+        self.reverse_voc = {v: k for k, v in tokenizer.vocab.items()}
+        self.weight_range = 5
+        self.quant_range = 256
+
+    @torch.no_grad()
+    def encode(self, text, max_length=256, **kwargs):
+        inputs = self.tokenizer([text], max_length=max_length, padding="longest", truncation=True,
+                                add_special_tokens=True, return_tensors="pt")
+        logits = self.model(inputs["input_ids"])["logits"]
+        aggregated, _ = torch.max(torch.log(1 + torch.relu(logits)) * inputs["attention_mask"].unsqueeze(-1), dim=1)
+        return self._get_encoded_query_token_wight_dicts(self._output_to_weight_dicts(aggregated.numpy()))[0]
+
+    def _output_to_weight_dicts(self, batch_aggregated_logits):
+        to_return = []
+        for aggregated_logits in batch_aggregated_logits:
+            col = np.nonzero(aggregated_logits)[0]
+            to_return.append({self.reverse_voc[k]: float(v) for k, v in zip(col, aggregated_logits[col])})
+        return to_return
+
+    def _get_encoded_query_token_wight_dicts(self, tok_weights):
+        return [{token: round(weight / self.weight_range * self.quant_range) for token, weight in d.items()}
+                for d in tok_weights]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--hidden", type=int, default=768)
+    args = parser.parse_args()
+
+    words = [f"w{i}" for i in range(30522 - 5)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "vocab.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+        tokenizer = BertTokenizer(path)
+    rng = random.Random(0)
+    queries = [" ".join(rng.choices(words[:5000], k=rng.randint(3, 20))) for _ in range(args.queries)]
+    encoder = SpladeQueryEncoder(tokenizer, args.layers, args.hidden)
+
+    print(f"{args.queries} queries, {args.layers}x{args.hidden} BERT MLM, {torch.get_num_threads()} torch threads")
+    print(f"{'encoding':>24} {'seconds':>8} {'queries/sec':>12}")
+
+    start = time.perf_counter()
+    expected = [encoder.encode(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    print(f"{'one query per pass':>24} {elapsed:>8.2f} {args.queries / elapsed:>12.1f}")
+
+    for batch_size in args.batch_sizes:
+        batched = BatchedImpactQueryEncoder(encoder, batch_size=batch_size, cache_size=0)
+        start = time.perf_counter()
+        batched.prefetch(queries)
+        weights = [batched.encode(query) for query in queries]
+        elapsed = time.perf_counter() - start
+        assert all(w.keys() == e.keys() for w, e in zip(weights, expected))
+        print(f"{f'batch_size={batch_size}':>24} {elapsed:>8.2f} {args.queries / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Latency of ranking web chunks for OnlineRetriever: in-memory BM25 vs. a per-question Lucene index.
+
+The Lucene path is what ``OnlineRetriever`` did before: write the chunks to a temporary
+directory, run ``python -m pyserini.index.lucene`` (a JVM subprocess) and search with
+``LuceneSearcher``. The in-memory path scores the same chunks with ``InMemoryBM25``, per question
+and batched over all questions. When Pyserini is installed the benchmark also reports how often
+the top-k chunk ids agree.
+
+Usage:
+    python examples/benchmarks/online_bm25_benchmark.py --questions 20 --chunks 50 --k 5
+"""
+import argparse
+import random
+import time
+
+from rankify.utils.retrievers.in_memory_bm25 import InMemoryBM25
+
+WORDS = (
+    "the capital of france is paris and berlin is the capital of germany deep learning models "
+    "learn hierarchical representations from data neural networks are trained with gradient "
+    "descent green tea contains antioxidants retrieval augmented generation combines search "
+    "with language models to answer questions about documents running runners ran tokenization"
+).split()
+
+
+def make_collections(n_questions, n_chunks, seed=0):
+    rng = random.Random(seed)
+    questions = [" ".join(rng.choices(WORDS, k=rng.randint(4, 10))) for _ in range(n_questions)]
+    collections = [
+        [{"id": f"{s}_{p}", "contents": " ".join(rng.choices(WORDS, k=rng.randint(40, 110)))}
+         for s in range(5) for p in range(n_chunks // 5)]
+        for _ in range(n_questions)
+    ]
+    return questions, collections
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    questions, collections = make_collections(args.questions, args.chunks)
+    texts = [[chunk["contents"] for chunk in chunks] for chunks in collections]
+    bm25 = InMemoryBM25()
+
+    start = time.perf_counter()
+    single = [bm25.search(q, t, k=args.k) for q, t in zip(questions, texts)]
+    per_question = (time.perf_counter() - start) / len(questions)
+
+    start = time.perf_counter()
+    batched = bm25.search_batch(questions, texts, k=args.k)
+    batch = (time.perf_counter() - start) / len(questions)
+    assert [[i for i, _ in hits] for hits in single] == [[i for i, _ in hits] for hits in batched]
+
+    print(f"{args.questions} questions x {args.chunks} chunks, k={args.k}")
+    print(f"{'backend':>22} {'ms / question':>14}")
+    print(f"{'memory (per question)':>22} {per_question * 1000:>14.2f}")
+    print(f"{'memory (batched)':>22} {batch * 1000:>14.2f}")
+
+    try:
+        from rankify.retrievers.online_retriever import lucene_search
+    except ImportError:
+        print("pyserini is not installed; skipping the Lucene subprocess path")
+        return
+
+    start = time.perf_counter()
+    lucene = [lucene_search(q, chunks, args.k) for q, chunks in zip(questions, collections)]
+    lucene_time = (time.perf_counter() - start) / len(questions)
+    agree = sum(
+        [docid for docid, _, _ in hits] == [chunks[i]["id"] for i, _ in mine]
+        for hits, mine, chunks in zip(lucene, batched, collections)
+    )
+    print(f"{'lucene subprocess':>22} {lucene_time * 1000:>14.2f}")
+    print(f"identical top-{args.k}: {agree}/{len(questions)} questions; "
+          f"speed-up {lucene_time / batch:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
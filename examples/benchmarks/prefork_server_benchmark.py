@@ -0,0 +1,151 @@
+"""
+Pre-fork server: memory per worker and throughput for 1..N workers.
+
+The server process loads a stub retriever over a dense ``--passages x --dim`` float32 matrix (the
+stand-in for a FAISS flat index) and answers /retrieve with a brute-force top-k, so each request
+is CPU-bound. It runs in a separate process from the load generator. For each worker count the
+script reports QPS and latency under ``--concurrency`` clients, and the memory of the workers
+from ``/proc/<pid>/smaps_rollup``: RSS counts shared pages in every process, PSS splits them
+between the processes sharing them, and ``private`` is what each worker owns alone.
+
+Usage:
+    python examples/benchmarks/prefork_server_benchmark.py --workers 1 2 4 --passages 1000000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(args):
+    from rankify.dataset.dataset import Context
+    from rankify.server.server import RankifyServer
+
+    class MatrixRetriever:
+        def __init__(self, passages, dim):
+            rng = np.random.default_rng(0)
+            self.matrix = rng.standard_normal((passages, dim), dtype=np.float32)
+            self.rng = rng
+
+        def retrieve(self, documents):
+            queries = np.stack([np.random.default_rng(abs(hash(d.question.question)) % (1 << 32))
+                                .standard_normal(self.matrix.shape[1], dtype=np.float32) for d in documents])
+            scores = queries @ self.matrix.T
+            top = np.argpartition(-scores, 10, axis=1)[:, :10]
+            for document, ids, row in zip(documents, top, scores):
+                document.contexts = [Context(id=str(i), title="", text=f"passage {i}", score=float(row[i])) for i in ids]
+            return documents
+
+    class MatrixServer(RankifyServer):
+        def _initialize_components(self):
+            self._retriever = MatrixRetriever(args.passages, args.dim)
+
+    server = MatrixServer(max_batch_size=args.max_batch_size)
+    server.start(host="127.0.0.1", port=args.port, workers=args.serve_workers)
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return values["Rss"], values["Pss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+async def load(url, concurrency, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as client:
+        async def worker(w):
+            i = 0
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                async with client.post(url, json={"query": f"query {w} {i}", "n_docs": 10}) as response:
+                    response.raise_for_status()
+                    await response.read()
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(w) for w in range(concurrency)))
+        return np.asarray(latencies), time.perf_counter() - start
+
+
+async def wait_ready(base, workers, timeout=600):
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as client:
+        while time.time() < deadline:
+            try:
+                async with client.get(base + "/health") as response:
+                    health = await response.json()
+                    if len(health["workers"]) == workers:
+                        return health
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError("server did not start")
+
+
+async def health(base):
+    async with aiohttp.ClientSession() as client:
+        async with client.get(base + "/health") as response:
+            return await response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--passages", type=int, default=1000000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--serve-workers", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_workers:
+        return serve(args)
+
+    index_mb = args.passages * args.dim * 4 / 2 ** 20
+    print(f"{args.passages} x {args.dim} float32 index ({index_mb:.0f} MB), {args.concurrency} clients, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'QPS':>8} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11}")
+    for workers in args.workers:
+        port = free_port()
+        command = [sys.executable, __file__, "--serve-workers", str(workers), "--port", str(port),
+                   "--passages", str(args.passages), "--dim", str(args.dim),
+                   "--max-batch-size", str(args.max_batch_size)]
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            asyncio.run(wait_ready(base, workers))
+            latencies, elapsed = asyncio.run(load(base + "/retrieve", args.concurrency, args.duration))
+            rows = asyncio.run(health(base))["workers"]
+            pids = [process.pid] + [row["pid"] for row in rows]
+            rss, pss, private = (sum(values) / 1024 for values in zip(*(memory_kb(pid) for pid in pids)))
+            print(f"{workers:>8} {len(latencies) / elapsed:>8.1f} {np.percentile(latencies, 50) * 1000:>8.1f} "
+                  f"{np.percentile(latencies, 99) * 1000:>8.1f} {rss:>8.0f} {pss:>8.0f} {private:>11.0f}")
+            print(f"{'':>8} requests per worker: {[row['requests'] for row in rows]}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+BasicRAG questions/sec with one ``model.generate`` call per question vs. ``generate_batch``
+(left-padded, length-sorted batches).
+
+Runs offline on a randomly initialized GPT-2 (``--layers`` x ``--hidden``) with a small word-level
+vocabulary behind ``HuggingFaceModel``; each question gets ``--contexts`` retrieved passages of
+varying length. Greedy decoding, so the batched answers can be checked against the sequential ones.
+The sequential baseline is ``generate_batch`` with ``batch_size=1``, one ``model.generate`` per
+question like the old loop, taking answers from the generated tokens; ``generate`` slices the
+decoded text by the prompt's length, which the toy word-level tokenizer does not round-trip.
+
+Usage:
+    python examples/benchmarks/rag_generate_batch_benchmark.py --questions 64 --batch-sizes 8 32
+"""
+import argparse
+import random
+import time
+
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.generator.models.huggingface_model import HuggingFaceModel
+from rankify.generator.prompt_generator import PromptGenerator
+from rankify.generator.rag_methods.basic_rag import BasicRAG
+
+WORDS = (
+    "the capital of france is paris and berlin is the capital of germany deep learning models "
+    "learn hierarchical representations from data neural networks are trained with gradient "
+    "descent green tea contains antioxidants retrieval augmented generation combines search"
+).split()
+
+
+def build_model(layers, hidden, device):
+    vocab = ["<eos>", "<unk>"] + sorted(set(WORDS)) + [":", "?", ".", ","]
+    tokenizer = Tokenizer(models.WordLevel({word: i for i, word in enumerate(vocab)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token="<eos>", unk_token="<unk>")
+    torch.manual_seed(0)
+    config = GPT2Config(vocab_size=len(vocab), n_layer=layers, n_embd=hidden, n_head=hidden // 64, n_positions=1024)
+    model = GPT2LMHeadModel(config).eval().to(device)
+    return HuggingFaceModel("random-gpt2", tokenizer, model, PromptGenerator(method="basic-rag", model_type="gpt2"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=64)
+    parser.add_argument("--contexts", type=int, default=3)
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--hidden", type=int, default=512)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [
+        Document(question=Question(" ".join(rng.choices(WORDS, k=rng.randint(5, 12)))), answers=Answer([]),
+                 contexts=[Context(id=str(j), title="", text=" ".join(rng.choices(WORDS, k=rng.randint(20, 80))), score=1.0)
+                           for j in range(args.contexts)])
+        for _ in range(args.questions)
+    ]
+    model = build_model(args.layers, args.hidden, args.device)
+    rag = BasicRAG(model)
+    # Never stop early, so every answer costs max_new_tokens decoding steps
+    options = dict(do_sample=False, max_new_tokens=args.max_new_tokens, suppress_tokens=[0, 1])
+
+    print(f"{args.questions} questions, {args.contexts} contexts each, {args.max_new_tokens} new tokens, "
+          f"{args.layers}x{args.hidden} GPT-2 on {args.device}")
+    print(f"{'mode':>16} {'seconds':>8} {'questions/sec':>14} {'same answers':>13}")
+
+    prompts = [model.prompt_generator.generate_user_prompt(d.question.question, [c.text for c in d.contexts])
+               for d in documents]
+    start = time.perf_counter()
+    sequential = model.generate_batch(prompts, batch_size=1, **options)
+    elapsed = time.perf_counter() - start
+    print(f"{'one at a time':>16} {elapsed:>8.2f} {args.questions / elapsed:>14.1f} {'':>13}")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        answers = rag.answer_questions(documents, batch_size=batch_size, **options)
+        elapsed = time.perf_counter() - start
+        same = sum(a == b for a, b in zip(answers, sequential))
+        print(f"{f'batch_size={batch_size}':>16} {elapsed:>8.2f} {args.questions / elapsed:>14.1f} "
+              f"{f'{same}/{args.questions}':>13}")
+
+
+if __name__ == "__main__":
+    main()
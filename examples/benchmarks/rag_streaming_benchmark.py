@@ -0,0 +1,154 @@
+"""
+Time to first token of streamed /rag (Server-Sent Events) vs. latency of the buffered /rag.
+
+Runs offline: the generator is a randomly initialized GPT-2 (``--layers`` x ``--hidden``) with a
+small word-level vocabulary behind ``HuggingFaceModel``, and retrieval/reranking are stubs, so the
+numbers isolate generation. The client measures, per request, the time until the first ``token``
+event and until the answer is complete; the server's own ``ttft_ms`` and ``tokens_per_sec`` from
+the ``done`` event are reported as well.
+
+Usage:
+    python examples/benchmarks/rag_streaming_benchmark.py --max-new-tokens 64 --requests 10
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import aiohttp
+import numpy as np
+import torch
+import uvicorn
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+from rankify.dataset.dataset import Context
+from rankify.generator.models.huggingface_model import HuggingFaceModel
+from rankify.generator.prompt_generator import PromptGenerator
+from rankify.generator.rag_methods.basic_rag import BasicRAG
+from rankify.server.server import RankifyServer
+
+WORDS = (
+    "the capital of france is paris and berlin is the capital of germany deep learning models "
+    "learn hierarchical representations from data neural networks are trained with gradient "
+    "descent green tea contains antioxidants retrieval augmented generation combines search"
+).split()
+
+
+def build_model(layers, hidden):
+    vocab = ["<eos>", "<unk>"] + sorted(set(WORDS)) + [":", "?", ".", ","]
+    tokenizer = Tokenizer(models.WordLevel({word: i for i, word in enumerate(vocab)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token="<eos>", unk_token="<unk>")
+    torch.manual_seed(0)
+    config = GPT2Config(vocab_size=len(vocab), n_layer=layers, n_embd=hidden, n_head=hidden // 64, n_positions=1024)
+    model = GPT2LMHeadModel(config).eval()
+    return HuggingFaceModel("random-gpt2", tokenizer, model, PromptGenerator(method="basic-rag", model_type="gpt2"))
+
+
+class StubComponents:
+    def retrieve(self, documents):
+        for document in documents:
+            document.contexts = [Context(id=str(i), title="", text=" ".join(WORDS[i:i + 20]), score=1.0)
+                                 for i in range(10)]
+        return documents
+
+    def rank(self, documents):
+        return documents
+
+
+class StubGenerator:
+    def __init__(self, model, generation_kwargs):
+        self.rag_method = BasicRAG(model)
+        self.kwargs = generation_kwargs
+
+    def generate(self, documents):
+        return self.rag_method.answer_questions(documents, **self.kwargs)
+
+    def generate_stream(self, document):
+        return self.rag_method.answer_question_stream(document, **self.kwargs)
+
+
+class StubServer(RankifyServer):
+    def _initialize_components(self):
+        self._retriever = self._reranker = StubComponents()
+        self._generator = self.stub_generator
+
+
+async def buffered(client, url, query):
+    start = time.perf_counter()
+    async with client.post(url, json={"query": query, "n_contexts": 3}) as response:
+        response.raise_for_status()
+        await response.read()
+    return time.perf_counter() - start
+
+
+async def streamed(client, url, query):
+    start = time.perf_counter()
+    first, done = None, None
+    async with client.post(url, json={"query": query, "n_contexts": 3, "stream": True}) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.content:
+            line = line.decode().strip()
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event == "token" and first is None:
+                    first = time.perf_counter() - start
+                elif event == "done":
+                    done = json.loads(line[len("data: "):])
+    return first, time.perf_counter() - start, done
+
+
+async def run(base, queries):
+    async with aiohttp.ClientSession() as client:
+        full = [await buffered(client, base + "/rag", q) for q in queries]
+        streams = [await streamed(client, base + "/rag", q) for q in queries]
+    return np.asarray(full), streams
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--hidden", type=int, default=512)
+    args = parser.parse_args()
+
+    model = build_model(args.layers, args.hidden)
+    # Never end early, so buffered and streamed requests generate the same number of tokens
+    kwargs = dict(do_sample=False, max_new_tokens=args.max_new_tokens, suppress_tokens=[0, 1])
+    server = StubServer(generator="basic-rag")
+    server.stub_generator = StubGenerator(model, kwargs)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    uv = uvicorn.Server(uvicorn.Config(server.create_app(), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=uv.run, daemon=True)
+    thread.start()
+    while not uv.started:
+        time.sleep(0.05)
+
+    queries = [" ".join(WORDS[i:i + 6]) for i in range(args.requests)]
+    full, streams = asyncio.run(run(f"http://127.0.0.1:{port}", queries))
+    first = np.asarray([s[0] for s in streams])
+    complete = np.asarray([s[1] for s in streams])
+    tokens_per_sec = np.asarray([s[2]["tokens_per_sec"] for s in streams])
+
+    print(f"{args.requests} requests, {args.layers}x{args.hidden} GPT-2, {args.max_new_tokens} new tokens, CPU")
+    print(f"{'':>28} {'p50 ms':>8} {'max ms':>8}")
+    print(f"{'buffered /rag latency':>28} {np.median(full) * 1000:>8.1f} {full.max() * 1000:>8.1f}")
+    print(f"{'streamed /rag first token':>28} {np.median(first) * 1000:>8.1f} {first.max() * 1000:>8.1f}")
+    print(f"{'streamed /rag complete':>28} {np.median(complete) * 1000:>8.1f} {complete.max() * 1000:>8.1f}")
+    print(f"server-reported generation speed: {np.median(tokens_per_sec):.1f} tokens/sec")
+
+    uv.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
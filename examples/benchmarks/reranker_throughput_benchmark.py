@@ -0,0 +1,94 @@
+"""
+Throughput (query-passage pairs per second) of pointwise cross-encoder rerankers on CPU.
+
+Compares the previous per-query batching (each document's contexts scored on their own) with
+the cross-query scheduler in ``rankify.utils.pair_scheduler``, which flattens the pairs of all
+documents, sorts them by token length and packs them into token-budgeted batches.
+
+Passages have varying lengths and queries have a varying number of contexts, so per-query
+batching suffers from ragged last batches and padding to the longest passage of each query.
+
+Usage:
+    python examples/benchmarks/reranker_throughput_benchmark.py --queries 64 --max-contexts 40
+    python examples/benchmarks/reranker_throughput_benchmark.py --models minilm --max-batch-tokens 16384
+"""
+import argparse
+import random
+import time
+
+import torch
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.models.monot5 import MonoT5
+from rankify.models.transformer_ranker import TransformerRanker
+
+MODELS = {
+    "minilm": (TransformerRanker, "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+    "monot5-small": (MonoT5, "castorini/monot5-small-msmarco-10k"),
+}
+
+WORDS = (
+    "the capital of france is paris and berlin is the capital of germany deep learning models "
+    "learn hierarchical representations from data neural networks are trained with gradient "
+    "descent green tea contains antioxidants retrieval augmented generation combines search "
+    "with language models to answer questions about documents"
+).split()
+
+
+def make_documents(n_queries, min_contexts, max_contexts, seed=0):
+    rng = random.Random(seed)
+    documents = []
+    for i in range(n_queries):
+        question = Question(" ".join(rng.choices(WORDS, k=rng.randint(4, 12))) + "?")
+        contexts = [
+            Context(id=f"{i}-{j}", title="", text=" ".join(rng.choices(WORDS, k=rng.randint(20, 250))))
+            for j in range(rng.randint(min_contexts, max_contexts))
+        ]
+        documents.append(Document(question=question, answers=Answer([]), contexts=contexts, id=i))
+    return documents
+
+
+def run(model, documents, mode):
+    model.scheduler.show_progress = False
+    start = time.perf_counter()
+    if mode == "per-query":
+        for document in documents:
+            model.rank([document])
+    else:
+        model.rank(documents)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=list(MODELS), choices=list(MODELS))
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--min-contexts", type=int, default=5)
+    parser.add_argument("--max-contexts", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-batch-tokens", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    documents = make_documents(args.queries, args.min_contexts, args.max_contexts)
+    n_pairs = sum(len(document.contexts) for document in documents)
+    print(f"{args.queries} queries, {n_pairs} pairs, batch_size={args.batch_size}, "
+          f"max_batch_tokens={args.max_batch_tokens}")
+    print(f"{'model':>14} {'mode':>12} {'time (s)':>10} {'pairs/sec':>10}")
+
+    for name in args.models:
+        cls, checkpoint = MODELS[name]
+        model = cls(model_name=checkpoint, device="cpu", batch_size=args.batch_size,
+                    max_batch_tokens=args.max_batch_tokens)
+        # Warm-up so lazy initialisation does not count against the first mode
+        run(model, documents[:2], "cross-query")
+        for mode in ("per-query", "cross-query"):
+            elapsed = run(model, documents, mode)
+            print(f"{name:>14} {mode:>12} {elapsed:>10.2f} {n_pairs / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Load time of retrieval results: DPR JSON (``Dataset.load_dataset``) vs. the binary columnar
+results store (``rankify.dataset.results_store``).
+
+A synthetic NQ-like run (questions with ``--contexts`` retrieved passages each) is written in both
+formats; loading is timed for opening the store alone and for also walking every context, which
+is what top-k accuracy does.
+
+Usage:
+    python examples/benchmarks/results_format_benchmark.py --queries 3610 --contexts 100
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from rankify.dataset.dataset import Answer, Context, Dataset, Document, Question
+from rankify.dataset.results_store import load_results, save_results
+from rankify.metrics.metrics import Metrics
+
+
+def make_documents(n_queries, n_contexts, seed=0):
+    rng = random.Random(seed)
+    return [
+        Document(
+            Question(f"who wrote the novel number {i}"),
+            Answer([f"author {i}"]),
+            [Context(id=rng.randrange(21_000_000), score=100.0 - j + rng.random(), has_answer=rng.random() < 0.05,
+                     title="", text="") for j in range(n_contexts)],
+            id=i,
+        )
+        for i in range(n_queries)
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=3610)
+    parser.add_argument("--contexts", type=int, default=100)
+    args = parser.parse_args()
+
+    documents = make_documents(args.queries, args.contexts)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "run.json")
+        store_path = os.path.join(tmp, "run.results")
+        Dataset.save_documents(documents, json_path)
+        save_results(documents, store_path)
+        del documents
+
+        json_load, loaded = timed(lambda: Dataset.load_dataset(json_path, n_docs=args.contexts))
+        json_eval, _ = timed(lambda: Metrics(loaded).top_k_accuracy(20))
+        store_load, batch = timed(lambda: load_results(store_path))
+        store_eval, _ = timed(lambda: Metrics(batch).top_k_accuracy(20))
+
+        print(f"{args.queries} queries x {args.contexts} contexts")
+        print(f"JSON  size {os.path.getsize(json_path) / 2**20:8.1f} MB")
+        print(f"store size {sum(e.stat().st_size for e in os.scandir(store_path)) / 2**20:8.1f} MB")
+        print(f"{'format':>8} {'open (s)':>10} {'open+top20 (s)':>15}")
+        print(f"{'json':>8} {json_load:>10.3f} {json_load + json_eval:>15.3f}")
+        print(f"{'store':>8} {store_load:>10.3f} {store_load + store_eval:>15.3f}")
+        print(f"open speed-up: {json_load / store_load:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
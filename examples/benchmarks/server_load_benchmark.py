@@ -0,0 +1,137 @@
+"""
+Load test for the Rankify server: latency percentiles and throughput of /retrieve and /rerank
+under concurrent clients.
+
+The server runs in-process (uvicorn on a local port) with stub components whose calls cost a
+fixed overhead plus a per-document amount, the shape of a batched model call on an accelerator:
+``--overhead-ms + n * --per-doc-ms`` (spent in ``time.sleep``, which releases the GIL like a GPU
+kernel or an HTTP call would). Clients are ``--concurrency`` coroutines sending requests back to
+back for ``--duration`` seconds.
+
+Clients use aiohttp; httpx's connection pool becomes the bottleneck at this concurrency.
+
+Usage:
+    python examples/benchmarks/server_load_benchmark.py --concurrency 64 --max-batch-size 32 --max-wait-ms 5
+    python examples/benchmarks/server_load_benchmark.py --max-batch-size 1    # no coalescing
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+import aiohttp
+import numpy as np
+import uvicorn
+
+from rankify.dataset.dataset import Context
+from rankify.server.server import RankifyServer
+
+
+class StubRetriever:
+    def __init__(self, overhead, per_doc, n_docs=10):
+        self.overhead, self.per_doc, self.n_docs = overhead, per_doc, n_docs
+        self.calls = 0
+
+    def retrieve(self, documents):
+        self.calls += 1
+        time.sleep(self.overhead + self.per_doc * len(documents))
+        for document in documents:
+            document.contexts = [Context(id=str(i), title="", text=f"{document.question.question} {i}", score=1.0 / (i + 1))
+                                 for i in range(self.n_docs)]
+        return documents
+
+
+class StubReranker:
+    def __init__(self, overhead, per_doc):
+        self.overhead, self.per_doc = overhead, per_doc
+        self.calls = 0
+
+    def rank(self, documents):
+        self.calls += 1
+        time.sleep(self.overhead + self.per_doc * len(documents))
+        for document in documents:
+            document.reorder_contexts = list(reversed(document.contexts))
+        return documents
+
+
+class StubServer(RankifyServer):
+    def __init__(self, overhead, per_doc, **kwargs):
+        super().__init__(**kwargs)
+        self.stub_cost = (overhead, per_doc)
+
+    def _initialize_components(self):
+        self._retriever = StubRetriever(*self.stub_cost)
+        self._reranker = StubReranker(*self.stub_cost)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def load(url, payload, concurrency, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as client:
+        async def worker(w):
+            i = 0
+            while time.perf_counter() < deadline:
+                body = dict(payload, query=f"{payload['query']} {w} {i}")
+                start = time.perf_counter()
+                async with client.post(url, json=body) as response:
+                    response.raise_for_status()
+                    await response.read()
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(w) for w in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return np.asarray(latencies), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--overhead-ms", type=float, default=10.0)
+    parser.add_argument("--per-doc-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = StubServer(args.overhead_ms / 1000, args.per_doc_ms / 1000,
+                        max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    port = free_port()
+    uv = uvicorn.Server(uvicorn.Config(server.create_app(), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=uv.run, daemon=True)
+    thread.start()
+    while not uv.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    documents = [{"id": str(i), "text": f"passage {i}"} for i in range(10)]
+    print(f"{args.concurrency} clients, {args.duration:.0f}s per endpoint, model call "
+          f"{args.overhead_ms:g} ms + {args.per_doc_ms:g} ms/doc, max_batch_size={args.max_batch_size}, "
+          f"max_wait_ms={args.max_wait_ms:g}")
+    print(f"{'endpoint':>10} {'requests':>9} {'QPS':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    for endpoint, payload, component in (
+        ("/retrieve", {"query": "capital of france", "n_docs": 10}, lambda: server._retriever),
+        ("/rerank", {"query": "capital of france", "documents": documents, "top_k": 5}, lambda: server._reranker),
+    ):
+        calls_before = component().calls
+        latencies, elapsed = asyncio.run(load(base + endpoint, payload, args.concurrency, args.duration))
+        calls = component().calls - calls_before
+        print(f"{endpoint:>10} {len(latencies):>9} {len(latencies) / elapsed:>8.1f} "
+              f"{np.percentile(latencies, 50) * 1000:>8.1f} {np.percentile(latencies, 99) * 1000:>8.1f} "
+              f"{len(latencies) / max(calls, 1):>11.1f}")
+
+    uv.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
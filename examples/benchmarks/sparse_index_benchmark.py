@@ -0,0 +1,88 @@
+"""
+Queries/sec and recall of the native SPLADE index (``SparseIndex``): exhaustive scoring with one
+sparse matrix product per query batch vs. block-max pruned search at several ``alpha`` values.
+Recall@k is measured against the exhaustive top-k.
+
+Runs offline on synthetic SPLADE-like vectors: ``--docs`` documents of ~120 terms over a 30522-term
+vocabulary, drawn from topics (specific terms, high weights) plus Zipf-distributed common terms with
+low, IDF-like weights; queries mix a few topic terms with low-weight expansion terms. Documents are
+stored grouped by topic, as a clustering-based reordering would leave them; ``--shuffle`` stores them
+in random order, where block bounds are loose and pruning helps little. The Lucene path
+(``LuceneImpactSearcher``) needs a JVM and a prebuilt impact index and is not part of this benchmark.
+
+Usage:
+    python examples/benchmarks/sparse_index_benchmark.py --docs 500000 --queries 500
+    python examples/benchmarks/sparse_index_benchmark.py --docs 500000 --shuffle --index-dir /tmp/splade-index
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy import sparse
+
+from rankify.utils.retrievers.sparse_index import SparseIndex
+
+VOCAB_SIZE = 30522
+
+
+def synthetic_vectors(n, topic_of, topic_terms, n_topic, n_common, topic_weight, rng):
+    """``(n, VOCAB_SIZE)`` CSR matrix of ``n_topic`` topic terms and ``n_common`` Zipf terms per row."""
+    ranks = np.arange(1, VOCAB_SIZE + 1)
+    zipf = ranks ** -1.1
+    common = rng.choice(VOCAB_SIZE, size=(n, n_common), p=zipf / zipf.sum())
+    specific = topic_terms[topic_of[:, None], rng.integers(0, topic_terms.shape[1], size=(n, n_topic))]
+    cols = np.concatenate([specific, common], axis=1).ravel()
+    idf = np.log1p(ranks) / np.log(VOCAB_SIZE)  # term ids are Zipf ranks: frequent terms get low weights
+    scale = np.repeat([[topic_weight] * n_topic + [1.0] * n_common], n, axis=0).ravel()
+    values = (rng.lognormal(0, 0.5, size=len(cols)) * idf[cols] * scale).astype(np.float32)
+    rows = np.repeat(np.arange(n), n_topic + n_common)
+    vectors = sparse.csr_matrix((values, (rows, cols)), shape=(n, VOCAB_SIZE))
+    vectors.sum_duplicates()
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--block-size", type=int, default=64)
+    parser.add_argument("--alphas", type=float, nargs="+", default=[1.0, 0.9, 0.8])
+    parser.add_argument("--shuffle", action="store_true", help="store documents in random order")
+    parser.add_argument("--index-dir", help="save the index here and search it memory-mapped")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_topics = max(1, args.docs // 500)
+    topic_terms = rng.choice(np.arange(1000, VOCAB_SIZE), size=(n_topics, 400))
+    doc_topics = np.sort(rng.integers(0, n_topics, size=args.docs))
+    if args.shuffle:
+        rng.shuffle(doc_topics)
+    documents = synthetic_vectors(args.docs, doc_topics, topic_terms, 70, 50, 2.0, rng)
+    queries = synthetic_vectors(args.queries, rng.integers(0, n_topics, size=args.queries), topic_terms,
+                                8, 12, 3.0, rng)
+
+    start = time.perf_counter()
+    index = SparseIndex.build(documents, [str(i) for i in range(args.docs)], block_size=args.block_size)
+    print(f"{args.docs} docs ({documents.nnz / args.docs:.0f} terms/doc), {args.queries} queries "
+          f"({queries.nnz / args.queries:.0f} terms/query), built in {time.perf_counter() - start:.1f}s")
+    if args.index_dir:
+        index.save(args.index_dir)
+        index = SparseIndex.load(args.index_dir)
+    print(f"{'search':>24} {'seconds':>8} {'queries/sec':>12} {f'recall@{args.k}':>10}")
+
+    def report(name, **kwargs):
+        start = time.perf_counter()
+        hits = index.search(queries, k=args.k, **kwargs)
+        elapsed = time.perf_counter() - start
+        recall = np.mean([len({d for d, _ in h} & {d for d, _ in e}) / max(1, len(e)) for h, e in zip(hits, exact)])
+        print(f"{name:>24} {elapsed:>8.2f} {args.queries / elapsed:>12.1f} {recall:>10.3f}")
+
+    exact = index.search(queries, k=args.k, pruning=False)
+    report("exhaustive", pruning=False)
+    for alpha in args.alphas:
+        report(f"block-max, alpha={alpha}", alpha=alpha)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark the shared brute-force top-k engine (``dense_topk``) used by the DIVER / ReasonIR /
+ReasonEmbed / BGE-reasoner retrievers against the previous full-matrix ``.tolist()`` + dict sort.
+
+Each configuration runs in a fresh process so the reported peak RSS is not polluted by earlier runs.
+
+Usage:
+    python examples/benchmarks/topk_benchmark.py --sizes 10000 100000 1000000 --queries 64 --dim 768
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from rankify.retrievers.utils import dense_topk
+
+
+def legacy_topk(query_emb, doc_emb, k):
+    scores = F.normalize(torch.from_numpy(query_emb), dim=1) @ F.normalize(torch.from_numpy(doc_emb), dim=1).T
+    scores = scores.tolist()
+    results = []
+    for row in scores:
+        cur = {str(i): float(s) for i, s in enumerate(row)}
+        results.append(sorted(cur.items(), key=lambda x: x[1], reverse=True)[:k])
+    return results
+
+
+def _run(method, n_docs, n_queries, dim, k, queue):
+    rng = np.random.default_rng(0)
+    doc_emb = rng.standard_normal((n_docs, dim), dtype=np.float32)
+    query_emb = rng.standard_normal((n_queries, dim), dtype=np.float32)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if method == "legacy":
+        legacy_topk(query_emb, doc_emb, k)
+    else:
+        dense_topk(query_emb, doc_emb, k)
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, (peak_rss - base_rss) / 1024.0))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--skip-legacy-above", type=int, default=200_000,
+                        help="Skip the legacy path for corpora larger than this (it may exhaust RAM).")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    print(f"{'corpus':>10} {'method':>8} {'latency (s)':>12} {'peak extra RSS (MB)':>20}")
+    for n_docs in args.sizes:
+        for method in ("legacy", "topk"):
+            if method == "legacy" and n_docs > args.skip_legacy_above:
+                print(f"{n_docs:>10} {method:>8} {'skipped':>12} {'-':>20}")
+                continue
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_run, args=(method, n_docs, args.queries, args.dim, args.k, queue))
+            proc.start()
+            elapsed, peak_mb = queue.get()
+            proc.join()
+            print(f"{n_docs:>10} {method:>8} {elapsed:>12.3f} {peak_mb:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Scraping throughput (pages/sec) of the web search pipeline against a local fixture server.
+
+Serves generated HTML pages from a local ``http.server`` (optionally delaying every response to
+mimic remote sites) and scrapes ``--questions`` x ``--pages`` URLs three ways:
+
+* ``sequential``: one question after another, one page at a time, as ``OnlineRetriever`` did,
+* ``crawler per page``: questions one after another, pages of a question concurrent, but every
+  page opens its own crawler (the old ``WebScraper.extract``),
+* ``shared pool``: all pages of all questions streamed through one ``CrawlerPool``,
+* ``cached replay``: the shared pool again, served by a warm offline ``WebCache``.
+
+By default the crawler fetches over plain HTTP (``AsyncHTTPCrawlerStrategy``), so no browser is
+needed; ``--browser`` uses Crawl4AI's default Playwright browser, where the per-page launch cost
+dominates.
+
+Usage:
+    python examples/benchmarks/web_scraping_benchmark.py --questions 10 --pages 10 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from crawl4ai import BrowserConfig
+from loguru import logger
+
+from rankify.tools.websearch.cache import WebCache
+from rankify.tools.websearch.content_scraping.crawler import CrawlerPool, WebScraper
+
+SENTENCE = ("Paris is the capital and most populous city of France, and the page {page} paragraph "
+            "{paragraph} repeats it with enough words to survive content pruning. ")
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        page = self.path.strip("/").split(".")[0] or "0"
+        body = "".join(f"<p>{SENTENCE.format(page=page, paragraph=j) * 3}</p>" for j in range(30))
+        html = f"<html><head><title>Page {page}</title></head><body><article>{body}</article></body></html>"
+        data = html.encode("utf-8")
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_pool(args, max_concurrency):
+    strategy = None
+    if not args.browser:
+        from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
+        strategy = AsyncHTTPCrawlerStrategy(max_connections=max_concurrency)
+    return CrawlerPool(BrowserConfig(verbose=False), max_concurrency=max_concurrency, crawler_strategy=strategy)
+
+
+async def sequential(args, questions):
+    async with make_pool(args, 1) as pool:
+        scraper = WebScraper(crawler_pool=pool, filter_content=False)
+        for urls in questions:
+            for url in urls:
+                await scraper.scrape(url)
+
+
+async def crawler_per_page(args, questions):
+    async def scrape(url):
+        async with make_pool(args, 1) as pool:
+            await WebScraper(crawler_pool=pool, filter_content=False).scrape(url)
+
+    for urls in questions:
+        await asyncio.gather(*(scrape(url) for url in urls))
+
+
+async def shared_pool(args, questions, cache=None):
+    async with make_pool(args, args.concurrency) as pool:
+        scraper = WebScraper(crawler_pool=pool, filter_content=False, cache=cache)
+
+        async def question(urls):
+            async for _ in scraper.scrape_stream(urls):
+                pass
+
+        await asyncio.gather(*(question(urls) for urls in questions))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=10, help="pages per question")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the server waits per page")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--browser", action="store_true", help="crawl with a Playwright browser")
+    args = parser.parse_args()
+    logger.disable("rankify")
+
+    FixtureHandler.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    questions = [[f"{base}/{q * args.pages + p}.html" for p in range(args.pages)] for q in range(args.questions)]
+    n_pages = args.questions * args.pages
+
+    print(f"{args.questions} questions x {args.pages} pages, {args.latency * 1000:.0f} ms server latency, "
+          f"{'browser' if args.browser else 'http'} crawler")
+    print(f"{'pipeline':>18} {'seconds':>8} {'pages/sec':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = os.path.join(tmpdir, "cache.sqlite")
+        runs = (
+            ("sequential", sequential),
+            ("crawler per page", crawler_per_page),
+            ("shared pool", partial(shared_pool, cache=WebCache(cache_path))),
+            ("cached replay", partial(shared_pool, cache=WebCache(cache_path, offline=True))),
+        )
+        for name, run in runs:
+            start = time.perf_counter()
+            asyncio.run(run(args, questions))
+            elapsed = time.perf_counter() - start
+            print(f"{name:>18} {elapsed:>8.2f} {n_pages / elapsed:>10.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
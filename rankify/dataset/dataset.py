@@ -1,10 +1,12 @@
 from rankify.utils.dataset.utils import get_datasets_info
 from rankify.utils.dataset.download import DownloadManger
+from rankify.utils.passage_store import PassageStore
+import copy
 import json
 from typing import List,Optional,Dict
 import os, requests
+import numpy as np
 from tqdm import tqdm
-import csv
 
 class Question:
     """
@@ -13,6 +15,8 @@ class Question:
     Attributes:
         question (str): The text of the question.
     """
+    __slots__ = ("question",)
+
     def __init__(self, question: str ) -> None:
         """
         Initializes a Question instance.
@@ -44,8 +48,7 @@ class Question:
             # Output: 'What is the capital of France?'
             ```
         """
-        cls.question = question if question.endswith("?") else question +"?"
-        return cls.question
+        return question if question.endswith("?") else question +"?"
     
     def __str__(self) -> str:
         """
@@ -69,6 +72,8 @@ class Answer:
     Attributes:
         answers (list[str]): A list of possible answers.
     """
+    __slots__ = ("answers",)
+
     def __init__(self, answers:list=None) -> None:
         """
         Initializes an Answer instance.
@@ -124,7 +129,13 @@ class Context:
         id (int, optional): The identifier of the context.
         title (str, optional): The title of the context.
         text (str, optional): The text of the context.
+
+    Contexts use ``__slots__`` instead of a per-instance ``__dict__``: a retrieval file with
+    1000 contexts per question creates millions of them. For a columnar, lower-overhead
+    alternative see ``rankify.dataset.document_batch.DocumentBatch``.
     """
+    __slots__ = ("score", "has_answer", "id", "title", "text")
+
     def __init__(self, score: float=None, has_answer: bool=None, id: str=None, title: str=None, text: str=None)-> None:
         """
         Initializes a Context instance.
@@ -201,6 +212,11 @@ class Document:
         answers (Answer): The answers to the question.
         contexts (list[Context]): A list of related contexts.
         reorder_contexts (list[Context] or None): A reordered list of contexts based on relevance.
+
+    Rerankers record their result as a view over ``contexts`` (``set_reorder`` / ``rerank_by_scores``):
+    a permutation index array plus a score array. ``reorder_contexts`` is only materialized when it is
+    read, as shallow copies that share the passage strings with ``contexts``. Assigning a list to
+    ``reorder_contexts`` is still supported and replaces the view.
     """
     def __init__(self, question: Question, answers: Answer, contexts: list = None , id: int = None) -> None:
         """
@@ -227,13 +243,137 @@ class Document:
         self.reorder_contexts: List[Context] = None
         self.id = str(id) 
 
+    @property
+    def reorder_contexts(self) -> Optional[List[Context]]:
+        """
+        The reranked contexts, materialized from the reorder view on first access.
+        """
+        if self._reorder_contexts is None and self._reorder_indices is not None:
+            scores = self._reorder_scores
+            contexts = []
+            for rank, index in enumerate(self._reorder_indices.tolist()):
+                context = copy.copy(self.contexts[index])
+                if scores is not None:
+                    context.score = float(scores[rank])
+                contexts.append(context)
+            # The list becomes the source of truth so in-place edits by callers are kept
+            self._reorder_contexts = contexts
+            self._reorder_indices = None
+            self._reorder_scores = None
+        return self._reorder_contexts
+
+    @reorder_contexts.setter
+    def reorder_contexts(self, contexts: Optional[List[Context]]) -> None:
+        self._reorder_contexts = contexts
+        self._reorder_indices = None
+        self._reorder_scores = None
+
+    @property
+    def reorder_indices(self) -> Optional[np.ndarray]:
+        """
+        Positions in ``contexts`` of the reranked contexts, best first, or None if there is no view.
+        """
+        return self._reorder_indices
+
+    @property
+    def reorder_scores(self) -> Optional[np.ndarray]:
+        """
+        Reranker scores aligned with ``reorder_indices``, or None if the reranker only produced an order.
+        """
+        return self._reorder_scores
+
+    def set_reorder(self, indices, scores=None) -> None:
+        """
+        Records a reranking of ``contexts`` without copying them.
+
+        Args:
+            indices (array-like of int): Positions in ``contexts``, best first. May be a subset.
+            scores (array-like of float, optional): Reranker score for each entry of ``indices``.
+                If omitted, the retrieval scores are kept.
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if scores is not None:
+            scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+            if len(scores) != len(indices):
+                raise ValueError(f"Expected {len(indices)} scores, got {len(scores)}")
+        self._reorder_contexts = None
+        self._reorder_indices = indices
+        self._reorder_scores = scores
+
+    def rerank_by_scores(self, scores) -> None:
+        """
+        Sorts ``contexts`` by descending ``scores`` (one per context) and records the result as the
+        reorder view. Ties keep the retrieval order.
+
+        Args:
+            scores (array-like of float): Reranker score of every context, in ``contexts`` order.
+        """
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        n_contexts = len(self.contexts or [])
+        if len(scores) != n_contexts:
+            raise ValueError(f"Expected {n_contexts} scores, got {len(scores)}")
+        order = np.argsort(-scores, kind="stable")
+        self.set_reorder(order, scores[order])
+
+    def ranked_contexts(self, k: Optional[int] = None, use_reordered: bool = True) -> List[Context]:
+        """
+        Returns the top-``k`` contexts in reranked order without materializing ``reorder_contexts``.
+
+        The returned objects are the entries of ``contexts`` (their ``score`` is the retrieval score;
+        see ``ranked_scores``). Falls back to ``contexts`` when there is no non-empty reranking.
+
+        Args:
+            k (int, optional): Number of contexts to return. Defaults to all.
+            use_reordered (bool): Use the reranked order if available.
+        """
+        if use_reordered:
+            if self._reorder_indices is not None and len(self._reorder_indices):
+                return [self.contexts[i] for i in self._reorder_indices[:k].tolist()]
+            if self._reorder_contexts:
+                return self._reorder_contexts[:k]
+        return (self.contexts or [])[:k]
+
+    def ranked_scores(self, k: Optional[int] = None, use_reordered: bool = True) -> List[Optional[float]]:
+        """
+        Returns the scores aligned with ``ranked_contexts(k, use_reordered)``.
+        """
+        if use_reordered and self._reorder_indices is not None and len(self._reorder_indices):
+            if self._reorder_scores is not None:
+                return self._reorder_scores[:k].tolist()
+        return [context.score for context in self.ranked_contexts(k, use_reordered)]
+
+    def reorder_to_dicts(self, save_text: bool = False) -> List[Dict[str, Optional[object]]]:
+        """
+        Serializes the reranked contexts like ``Context.to_dict`` without materializing them.
+        Returns an empty list if the document has not been reranked.
+        """
+        if self._reorder_indices is None:
+            return [ctx.to_dict(save_text) for ctx in (self._reorder_contexts or [])]
+        entries = []
+        for rank, index in enumerate(self._reorder_indices.tolist()):
+            entry = self.contexts[index].to_dict(save_text)
+            if self._reorder_scores is not None:
+                entry["score"] = float(self._reorder_scores[rank])
+            entries.append(entry)
+        return entries
+
+    def __setstate__(self, state: dict) -> None:
+        # Documents pickled before the reorder view stored the list under its public name
+        if "reorder_contexts" in state:
+            state["_reorder_contexts"] = state.pop("reorder_contexts")
+        state.setdefault("_reorder_contexts", None)
+        state.setdefault("_reorder_indices", None)
+        state.setdefault("_reorder_scores", None)
+        self.__dict__.update(state)
+
     @classmethod
     def from_dict(cls, data: dict,n_docs:int=100) -> 'Document':
         """
         Creates a Document instance from a dictionary.
 
         Args:
-            data (dict): A dictionary containing the question, answers, and contexts.
+            data (dict): A dictionary containing the question, answers, and contexts, and optionally
+                the ``reranked_ctxs`` saved with ``save_reranked=True`` (restored as ``reorder_contexts``).
             n_docs (int, optional): The number of contexts to include. Defaults to 100.
 
         Returns:
@@ -264,7 +404,11 @@ class Document:
         else:
             id = None
         contexts = [Context(**ctx) for ctx in data["ctxs"][:n_docs]]
-        return cls(question, answers, contexts, id=id)
+        document = cls(question, answers, contexts, id=id)
+        # Files written with ``save_reranked=True`` keep the reranking next to the retrieval results
+        if data.get("reranked_ctxs"):
+            document.reorder_contexts = [Context(**ctx) for ctx in data["reranked_ctxs"][:n_docs]]
+        return document
 
     def to_dict(self) -> Dict[str, Optional[object]]:
         """
@@ -282,7 +426,7 @@ class Document:
         return {
             "question" : self.question.question,
             "answers" : self.answers.answers,
-            "contexts" : [ctx.to_dict() for ctx in self.reorder_contexts]
+            "contexts" : self.reorder_to_dicts()
         }
     def __str__(self) -> str:
         """
@@ -334,7 +478,7 @@ class Dataset:
         self.retriever: str  = retriever
         self.n_docs: int = n_docs
         self.documents: Optional[List[Document]]  = None
-        self.id_to_text_title: Optional[Dict] = None
+        self.id_to_text_title: Optional[PassageStore] = None
 
     def _ensure_passages_downloaded(self) -> None:
         """
@@ -351,25 +495,20 @@ class Dataset:
         else:
             print(f"Passages file already exists at {self.PASSAGES_FILE}")
             
-    def _load_passages_mapping(self) -> Dict:
+    def _load_passages_mapping(self) -> PassageStore:
         """
-        Loads the passages TSV file and creates a mapping of IDs to text and title.
+        Opens the passages TSV file as a memory-mapped store of IDs to text and title.
+
+        The store is built next to the TSV file on first use; later calls (and other
+        processes) open it in constant time and share its pages through the OS page cache.
         
         Returns
         -------
-        Dict
-            A dictionary mapping passage IDs to their text and title.
+        PassageStore
+            A read-only mapping of passage IDs to their text and title.
         """
         if self.id_to_text_title is None:
-            self.id_to_text_title = {}
-            with open(self.PASSAGES_FILE, "r", encoding="utf-8") as tsv_file:
-                reader = csv.DictReader(tsv_file, delimiter="\t")
-                for row in reader:
-                    ctx_id = int(row["id"])
-                    self.id_to_text_title[ctx_id] = {
-                        "text": row["text"],
-                        "title": row["title"]
-                    }
+            self.id_to_text_title = PassageStore.open_or_build(self.PASSAGES_FILE, fmt="tsv")
         return self.id_to_text_title
     def update_contexts_from_passages(self) -> None:
         """
@@ -397,22 +536,27 @@ class Dataset:
         
         # Update contexts in all documents
         for document in tqdm(self.documents, desc="Retreive Text and Title for documents", unit="doc"):
-            for context in document.contexts:
-                if context.id in id_to_text_title:
-                    context_data = id_to_text_title[context.id]
+            passages = id_to_text_title.get_many([context.id for context in document.contexts])
+            for context, context_data in zip(document.contexts, passages):
+                if context_data is not None:
                     context.text = context_data["text"]
                     context.title = context_data["title"]
                     
             
-    def download(self, force_download:bool =True)-> List[Document]:
+    def download(self, force_download:bool =True, streaming: bool = False, chunk_size: int = 1000):
         """
         Downloads the dataset and loads it into memory.
 
         Args:
             force_download (bool, optional): Whether to force downloading the dataset even if it already exists locally. Defaults to True.
+            streaming (bool, optional): Return a ``StreamingDataset`` that parses documents on demand
+                (and fills passage text lazily) instead of loading the whole file. Rerank it with
+                ``Reranking.rank(dataset, output_path=...)`` and evaluate it with ``Metrics(dataset)``,
+                which both process it chunk by chunk. Defaults to False.
+            chunk_size (int, optional): Documents per chunk when ``streaming`` is set. Defaults to 1000.
 
         Returns:
-            list[Document]: A list of Document instances loaded from the dataset.
+            list[Document] or StreamingDataset: The documents of the dataset.
 
         Example:
             ```python
@@ -422,6 +566,13 @@ class Dataset:
             ```
         """
         filepath= DownloadManger.download(self.retriever,self.dataset_name, force_download =force_download)
+        if streaming:
+            passages = None
+            if 'beir' not in self.dataset_name and 'dl' not in self.dataset_name:
+                self._ensure_passages_downloaded()
+                passages = self._load_passages_mapping()
+            self.documents = self.load_dataset_streaming(filepath, self.n_docs, chunk_size, passages)
+            return self.documents
         self.documents= self.load_dataset(filepath, self.n_docs)
         if 'beir' not in self.dataset_name and 'dl' not in self.dataset_name:
             self.update_contexts_from_passages()
@@ -451,6 +602,32 @@ class Dataset:
 
         
         return data
+
+    @classmethod
+    def load_dataset_streaming(cls, filepath: str, n_docs: int = 100, chunk_size: int = 1000,
+                               passages: Optional[PassageStore] = None):
+        """
+        Opens a JSON or JSONL dataset for streaming access without loading it into memory.
+
+        Args:
+            filepath (str): The path to the JSON or JSONL file containing the dataset.
+            n_docs (int, optional): The number of contexts to keep per question. Defaults to 100.
+            chunk_size (int, optional): Documents per chunk for ``iter_chunks``. Defaults to 1000.
+            passages (PassageStore, optional): Store used to fill context text and title on read.
+
+        Returns:
+            StreamingDataset: A lazily parsed dataset supporting ``len``, indexing and chunked iteration.
+
+        Example:
+            ```python
+            documents = Dataset.load_dataset_streaming("example_dataset.jsonl", n_docs=100)
+            for chunk in documents.iter_chunks(256):
+                reranker.rank(chunk)
+            ```
+        """
+        from rankify.dataset.streaming import StreamingDataset
+        return StreamingDataset(filepath, n_docs=n_docs, chunk_size=chunk_size, passages=passages)
+
     @classmethod
     def load_dataset_qa(cls, filepath: str) -> List[Document]:
         """
@@ -553,7 +730,7 @@ class Dataset:
                 "ctxs": [ctx.to_dict(save_text) for ctx in doc.contexts]
             }
             if save_reranked:
-                dpr_entry["reranked_ctxs"] = [ctx.to_dict(save_text) for ctx in doc.reorder_contexts]
+                dpr_entry["reranked_ctxs"] = doc.reorder_to_dicts(save_text)
 
             dpr_data.append(dpr_entry)
 
@@ -603,8 +780,8 @@ class Dataset:
                 "answers": doc.answers.answers,
                 "ctxs": [ctx.to_dict(save_text) for ctx in doc.contexts]
             }
-            if save_reranked and doc.reorder_contexts is not None:
-                dpr_entry["reranked_ctxs"] = [ctx.to_dict(save_text) for ctx in doc.reorder_contexts]
+            if save_reranked and (doc.reorder_indices is not None or doc.reorder_contexts is not None):
+                dpr_entry["reranked_ctxs"] = doc.reorder_to_dicts(save_text)
 
             dpr_data.append(dpr_entry)
         
@@ -621,6 +798,73 @@ class Dataset:
             raise ValueError("Unsupported file format. Please use a .json or .jsonl file.")
 
         print(f"Saved {len(documents)} documents to {output_path}.")
+
+    @staticmethod
+    def save_results(documents: List[Document], output_dir: str, save_reranked: bool = True, save_text: bool = False) -> None:
+        """
+        Saves documents in the binary columnar results format (see ``rankify.dataset.results_store``).
+
+        Much faster to reload than JSON: ``load_results`` memory-maps the columns instead of parsing them.
+
+        Args:
+            documents (List[Document]): The documents to save.
+            output_dir (str): The results store directory.
+            save_reranked (bool, optional): Whether to save the reranked order. Defaults to True.
+            save_text (bool, optional): Whether to save context titles and texts. Defaults to False.
+
+        Example:
+            ```python
+            Dataset.save_results(documents, "output/bm25-nq.results")
+            batch = Dataset.load_results("output/bm25-nq.results")
+            ```
+        """
+        from rankify.dataset.results_store import save_results
+        save_results(documents, output_dir, save_text=save_text, save_reranked=save_reranked)
+
+    @staticmethod
+    def load_results(output_dir: str):
+        """
+        Memory-maps a results store written by ``save_results``.
+
+        Returns:
+            DocumentBatch: A sequence of documents backed by the stored columns.
+        """
+        from rankify.dataset.results_store import load_results
+        return load_results(output_dir)
+
+    @staticmethod
+    def append_documents(documents: List[Document], output_path: str, save_reranked: bool = False, save_text: bool = False) -> None:
+        """
+        Appends Document objects in DPR format to a JSONL file, one line per document.
+
+        Used together with ``StreamingDataset.iter_chunks`` to write results chunk by chunk
+        without keeping every document in memory.
+
+        Args:
+            documents (List[Document]): The documents to append.
+            output_path (str): The path of the JSONL file; created if missing.
+            save_reranked (bool, optional): Whether to save re-ranked contexts. Defaults to False.
+            save_text (bool, optional): Whether to save the full text of the contexts. Defaults to False.
+
+        Raises:
+            ValueError: If ``output_path`` is not a ``.jsonl`` file.
+        """
+        if not output_path.endswith(".jsonl"):
+            raise ValueError("Appending is only supported for .jsonl files.")
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "a", encoding="utf-8") as file:
+            for doc in documents:
+                dpr_entry = {
+                    "question": doc.question.question,
+                    "answers": doc.answers.answers,
+                    "ctxs": [ctx.to_dict(save_text) for ctx in doc.contexts]
+                }
+                # Document stores ids as strings, so a missing id reads "None"
+                if doc.id not in (None, "None"):
+                    dpr_entry["query_id"] = doc.id
+                if save_reranked and (doc.reorder_indices is not None or doc.reorder_contexts is not None):
+                    dpr_entry["reranked_ctxs"] = doc.reorder_to_dicts(save_text)
+                file.write(json.dumps(dpr_entry) + "\n")
     def __len__(self) -> int:
         """
         Returns the number of documents in the dataset.
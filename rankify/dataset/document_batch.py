@@ -0,0 +1,437 @@
+"""
+Columnar storage for large retrieval result sets.
+
+``DocumentBatch`` keeps the contexts of many documents in flat columns instead of one Python
+object per context:
+
+* ``scores`` – float64 array (NaN for a missing score),
+* ``has_answer`` – int8 array (-1 for unknown, 0 / 1 otherwise),
+* ``ids`` – int64 array when every id is an integer, otherwise an offset-backed string column,
+* ``titles`` / ``texts`` – offset-backed UTF-8 string columns (one bytes buffer plus int64 offsets).
+
+Indexing a batch returns an ordinary ``Document`` whose contexts are ``ContextRef`` objects: small
+proxies that read and write the columns, so retrievers, rerankers and metrics keep using the
+regular ``Context`` attribute API.
+
+Example:
+    ```python
+    from rankify.dataset.document_batch import DocumentBatch
+
+    batch = DocumentBatch.load("nq-test-bm25.json", n_docs=1000)
+    reranker.rank(batch.documents)
+    print(batch[0].contexts[0].text)
+    ```
+"""
+
+import json
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+
+
+def reorder_positions(document: Document):
+    """
+    Returns ``(indices, scores)`` of a document's reranking, or ``None`` if it was not reranked.
+
+    ``indices`` are positions in ``document.contexts``; ``scores`` holds NaN where the reranker
+    kept the retrieval score.
+    """
+    if document.reorder_indices is not None:
+        scores = document.reorder_scores
+        if scores is None:
+            scores = np.full(len(document.reorder_indices), np.nan)
+        return document.reorder_indices, scores
+
+    reordered = document.reorder_contexts
+    if reordered is None:
+        return None
+    # A materialized list holds copies, so fall back from identity to context ids
+    by_identity = {id(context): i for i, context in enumerate(document.contexts)}
+    by_id = {}
+    for i, context in enumerate(document.contexts):
+        by_id.setdefault(context.id, i)
+    indices, scores = [], []
+    for context in reordered:
+        position = by_identity.get(id(context), by_id.get(context.id))
+        if position is None:
+            continue
+        indices.append(position)
+        scores.append(np.nan if context.score is None else float(context.score))
+    return np.asarray(indices, dtype=np.int64), np.asarray(scores, dtype=np.float64)
+
+
+class StringColumn:
+    """
+    An immutable sequence of strings stored in a single UTF-8 buffer.
+
+    Attributes:
+        buffer (bytes): Concatenated UTF-8 encoded values.
+        offsets (np.ndarray): int64 array of length ``n + 1``; value ``i`` is ``buffer[offsets[i]:offsets[i + 1]]``.
+        missing (np.ndarray or None): Boolean mask of values that were ``None``.
+    """
+
+    __slots__ = ("buffer", "offsets", "missing")
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        encoded = []
+        missing = []
+        for value in values:
+            missing.append(value is None)
+            encoded.append(b"" if value is None else str(value).encode("utf-8"))
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.buffer = b"".join(encoded)
+        self.missing = np.asarray(missing, dtype=bool) if any(missing) else None
+
+    @classmethod
+    def from_buffers(cls, buffer, offsets: np.ndarray, missing: Optional[np.ndarray] = None) -> "StringColumn":
+        """
+        Wraps existing buffers (e.g. memory-mapped files) without copying them.
+        """
+        column = cls.__new__(cls)
+        column.buffer = buffer
+        column.offsets = offsets
+        column.missing = missing
+        return column
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self.missing is not None and self.missing[index]:
+            return None
+        return bytes(self.buffer[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.offsets.nbytes + (self.missing.nbytes if self.missing is not None else 0)
+
+
+class ContextRef(Context):
+    """
+    A ``Context`` whose fields live in the columns of a ``DocumentBatch``.
+
+    Reading an attribute decodes it from the batch; assigning one writes it back, so updates made
+    by rerankers or answer checking are visible to every holder of the batch. Copies (including
+    the ones made when ``Document.reorder_contexts`` is materialized) are detached plain
+    ``Context`` objects.
+    """
+
+    __slots__ = ("_batch", "_row")
+
+    def __init__(self, batch: "DocumentBatch", row: int):
+        self._batch = batch
+        self._row = row
+
+    @property
+    def score(self) -> Optional[float]:
+        value = self._batch.scores[self._row]
+        return None if math.isnan(value) else float(value)
+
+    @score.setter
+    def score(self, value: Optional[float]) -> None:
+        self._batch.scores[self._row] = np.nan if value is None else value
+
+    @property
+    def has_answer(self) -> Optional[bool]:
+        value = self._batch.has_answer[self._row]
+        return None if value < 0 else bool(value)
+
+    @has_answer.setter
+    def has_answer(self, value: Optional[bool]) -> None:
+        self._batch.has_answer[self._row] = -1 if value is None else int(bool(value))
+
+    @property
+    def id(self):
+        return self._batch._get_string("id", self._row)
+
+    @id.setter
+    def id(self, value) -> None:
+        self._batch._set_string("id", self._row, value)
+
+    @property
+    def title(self) -> Optional[str]:
+        return self._batch._get_string("title", self._row)
+
+    @title.setter
+    def title(self, value: Optional[str]) -> None:
+        self._batch._set_string("title", self._row, value)
+
+    @property
+    def text(self) -> Optional[str]:
+        return self._batch._get_string("text", self._row)
+
+    @text.setter
+    def text(self, value: Optional[str]) -> None:
+        self._batch._set_string("text", self._row, value)
+
+    def detach(self) -> Context:
+        """
+        Returns a standalone ``Context`` holding the current values.
+        """
+        return Context(score=self.score, has_answer=self.has_answer, id=self.id, title=self.title, text=self.text)
+
+    def __copy__(self) -> Context:
+        return self.detach()
+
+    def __deepcopy__(self, memo) -> Context:
+        return self.detach()
+
+    def __reduce__(self):
+        return (Context, (self.score, self.has_answer, self.id, self.title, self.text))
+
+
+class DocumentBatch(Sequence):
+    """
+    A columnar, memory-compact collection of documents and their contexts.
+
+    Questions, answers and document ids are kept per document; all contexts are flattened into
+    columns, and the contexts of document ``i`` are rows ``offsets[i]:offsets[i + 1]``.
+
+    Attributes:
+        questions (List[str]): Question text per document.
+        answers (List[List[str]]): Answers per document.
+        doc_ids (List): Document (query) id per document.
+        offsets (np.ndarray): int64 row offsets, length ``len(batch) + 1``.
+        scores (np.ndarray): float64 retrieval score per context (NaN if missing).
+        has_answer (np.ndarray): int8 answer flag per context (-1 if unknown).
+        ids (np.ndarray or StringColumn): Context ids.
+        titles (StringColumn): Context titles.
+        texts (StringColumn): Context texts.
+        reranking (tuple, optional): ``(reranked, rerank_offsets, rerank_indices, rerank_scores)``;
+            when set, documents get the stored reorder view (see ``rankify.dataset.results_store``).
+    """
+
+    def __init__(self, questions: Sequence[str], answers: Sequence[List[str]], doc_ids: Sequence,
+                 offsets: np.ndarray, scores: np.ndarray, has_answer: np.ndarray,
+                 ids: Union[np.ndarray, StringColumn], titles: StringColumn, texts: StringColumn,
+                 reranking: Optional[tuple] = None):
+        self.questions = questions
+        self.answers = answers
+        self.doc_ids = doc_ids
+        self.offsets = offsets
+        self.scores = scores
+        self.has_answer = has_answer
+        self.ids = ids
+        self.titles = titles
+        self.texts = texts
+        self.reranking = reranking
+        # Values assigned to string fields after construction, keyed by (field, row)
+        self._overrides: Dict[tuple, object] = {}
+        self._documents: List[Optional[Document]] = [None] * len(questions)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[dict], n_docs: Optional[int] = None) -> "DocumentBatch":
+        """
+        Builds a batch from DPR-style records (``question``, ``answers``, ``ctxs``, optional ``query_id``),
+        the format read by ``Document.from_dict``.
+
+        Args:
+            records (Iterable[dict]): Records to load; consumed once.
+            n_docs (int, optional): Keep at most this many contexts per record.
+        """
+        questions, answers, doc_ids = [], [], []
+        offsets = [0]
+        scores, flags, ids, titles, texts = [], [], [], [], []
+        for record in records:
+            questions.append(Question.check_question(record["question"]))
+            answers.append(Answer(record.get("answers", "")).answers)
+            doc_ids.append(record.get("query_id"))
+            ctxs = record.get("ctxs", [])[:n_docs]
+            for ctx in ctxs:
+                score = ctx.get("score")
+                has_answer = ctx.get("has_answer")
+                scores.append(np.nan if score is None else float(score))
+                flags.append(-1 if has_answer is None else int(bool(has_answer)))
+                ids.append(ctx.get("id"))
+                titles.append(ctx.get("title"))
+                texts.append(ctx.get("text"))
+            offsets.append(offsets[-1] + len(ctxs))
+        return cls(
+            questions, answers, doc_ids,
+            offsets=np.asarray(offsets, dtype=np.int64),
+            scores=np.asarray(scores, dtype=np.float64),
+            has_answer=np.asarray(flags, dtype=np.int8),
+            ids=cls._id_column(ids),
+            titles=StringColumn(titles),
+            texts=StringColumn(texts),
+        )
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document]) -> "DocumentBatch":
+        """
+        Builds a batch from existing ``Document`` objects (their retrieved ``contexts``).
+        """
+        records = (
+            {
+                "question": document.question.question,
+                "answers": document.answers.answers,
+                "query_id": document.id,
+                "ctxs": [
+                    {"score": c.score, "has_answer": c.has_answer, "id": c.id, "title": c.title, "text": c.text}
+                    for c in (document.contexts or [])
+                ],
+            }
+            for document in documents
+        )
+        return cls.from_dicts(records)
+
+    @classmethod
+    def load(cls, filepath: str, n_docs: Optional[int] = None) -> "DocumentBatch":
+        """
+        Loads a DPR-style ``.json`` (list of records) or ``.jsonl`` (one record per line) file.
+
+        Args:
+            filepath (str): Path to the retrieval file.
+            n_docs (int, optional): Keep at most this many contexts per question.
+        """
+        with open(filepath, encoding="utf-8") as file:
+            if filepath.endswith(".jsonl"):
+                return cls.from_dicts((json.loads(line) for line in file if line.strip()), n_docs)
+            return cls.from_dicts(json.load(file), n_docs)
+
+    @staticmethod
+    def _id_column(ids: List) -> Union[np.ndarray, StringColumn]:
+        if ids and all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return np.asarray(ids, dtype=np.int64)
+        return StringColumn(ids)
+
+    # ------------------------------------------------------------------
+    # Column access used by ContextRef
+    # ------------------------------------------------------------------
+
+    def _get_string(self, field: str, row: int):
+        if self._overrides:
+            key = (field, row)
+            if key in self._overrides:
+                return self._overrides[key]
+        if field == "id":
+            if isinstance(self.ids, np.ndarray):
+                return int(self.ids[row])
+            return self.ids[row]
+        return (self.titles if field == "title" else self.texts)[row]
+
+    def _set_string(self, field: str, row: int, value) -> None:
+        self._overrides[(field, row)] = value
+
+    # ------------------------------------------------------------------
+    # Sequence API
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        document = self._documents[index]
+        if document is None:
+            start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+            document = Document(
+                Question(self.questions[index]),
+                Answer(self.answers[index]),
+                [ContextRef(self, row) for row in range(start, end)],
+                id=self.doc_ids[index],
+            )
+            if self.reranking is not None:
+                self._apply_reranking(document, index)
+            self._documents[index] = document
+        return document
+
+    def _apply_reranking(self, document: Document, index: int) -> None:
+        reranked, rerank_offsets, rerank_indices, rerank_scores = self.reranking
+        if not reranked[index]:
+            return
+        rows = slice(int(rerank_offsets[index]), int(rerank_offsets[index + 1]))
+        scores = rerank_scores[rows]
+        # NaN scores mark an order-only reranking that keeps the retrieval scores
+        document.set_reorder(rerank_indices[rows], None if np.isnan(scores).all() else scores)
+
+    def __iter__(self) -> Iterator[Document]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def documents(self) -> List[Document]:
+        """
+        All documents as a list, for APIs that expect ``List[Document]``.
+        """
+        return list(self)
+
+    def context_slice(self, index: int) -> slice:
+        """
+        Rows of the context columns that belong to document ``index``.
+        """
+        return slice(int(self.offsets[index]), int(self.offsets[index + 1]))
+
+    def to_documents(self) -> List[Document]:
+        """
+        Returns fully materialized, independent ``Document`` objects with plain ``Context`` instances.
+        """
+        return [
+            Document(Question(self.questions[i]), Answer(self.answers[i]),
+                     [ctx.detach() for ctx in document.contexts], id=self.doc_ids[i])
+            for i, document in enumerate(self)
+        ]
+
+    def _ranking(self, index: int, use_reordered: bool):
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        positions = None
+        if use_reordered:
+            document = self._documents[index]
+            if document is not None:
+                positions = reorder_positions(document)
+            elif self.reranking is not None and self.reranking[0][index]:
+                _, rerank_offsets, rerank_indices, rerank_scores = self.reranking
+                rows = slice(int(rerank_offsets[index]), int(rerank_offsets[index + 1]))
+                positions = (rerank_indices[rows], rerank_scores[rows])
+        if positions is None:
+            return np.arange(start, end), np.asarray(self.scores[start:end], dtype=np.float64)
+        rows = start + np.asarray(positions[0], dtype=np.int64)
+        scores = np.asarray(positions[1], dtype=np.float64)
+        return rows, np.where(np.isnan(scores), self.scores[rows], scores)
+
+    def to_trec(self, output_path: Optional[str] = None, use_reordered: bool = False,
+                run_name: Optional[str] = None) -> str:
+        """
+        Formats the ranking of every document as a TREC run (``qid Q0 docid rank score run``),
+        reading the columns directly instead of building ``Context`` objects.
+
+        Args:
+            output_path (str, optional): Also write the run to this file.
+            use_reordered (bool): Use the reranked order where a document has one.
+            run_name (str, optional): Run tag. Defaults to ``"rankify"`` / ``"bm25"`` like
+                ``Metrics.generate_trec_format``.
+
+        Returns:
+            str: The run, one line per ranked context.
+        """
+        run_name = run_name or ("rankify" if use_reordered else "bm25")
+        lines = []
+        for index in range(len(self)):
+            rows, scores = self._ranking(index, use_reordered)
+            qid = self.doc_ids[index]
+            for rank, (row, score) in enumerate(zip(rows.tolist(), scores.tolist()), start=1):
+                lines.append(f"{qid} Q0 {self._get_string('id', row)} {rank} {score} {run_name}")
+        run = "\n".join(lines)
+        if output_path is not None:
+            with open(output_path, "w", encoding="utf-8") as file:
+                file.write(run + "\n")
+        return run
+
+    def nbytes(self) -> int:
+        """
+        Approximate size of the context columns in bytes.
+        """
+        ids = self.ids.nbytes if isinstance(self.ids, np.ndarray) else self.ids.nbytes()
+        return (self.offsets.nbytes + self.scores.nbytes + self.has_answer.nbytes + ids
+                + self.titles.nbytes() + self.texts.nbytes())
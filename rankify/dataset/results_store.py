@@ -0,0 +1,219 @@
+"""
+Binary columnar on-disk format for retrieval and rerank results.
+
+``Dataset.save_documents`` writes pretty-printed JSON and reloading it means parsing the JSON
+and rebuilding every ``Context``. A results store is a directory of flat NumPy arrays instead::
+
+    run.results/
+        meta.json              # format version, counts, id mode, which optional columns exist
+        doc_offsets.npy        # int64, contexts of document i are rows doc_offsets[i]:doc_offsets[i + 1]
+        scores.npy             # float64 retrieval score per context (NaN = None)
+        has_answer.npy         # int8 per context (-1 = None)
+        ctx_ids.npy            # int64 context ids ...
+        ctx_ids.bin/.off.npy   # ... or UTF-8 string ids with offsets
+        questions.bin/.off.npy # question text per document
+        answers.bin/.off.npy   # JSON-encoded answer list per document
+        query_ids.bin/.off.npy # document (query) ids
+        titles.*, texts.*      # optional context title / text columns
+        reranked.npy           # int8 per document: 1 if a reorder view was saved
+        rerank_offsets.npy     # int64 per document into rerank_indices / rerank_scores
+        rerank_indices.npy     # int32 position in the document's contexts, best first
+        rerank_scores.npy      # float64 reranker score (NaN = order only)
+
+``load_results`` memory-maps every array and returns a ``DocumentBatch``: opening a store is
+constant time and documents are only built when accessed. Scores and answer flags are mapped
+copy-on-write, so rerankers can update them without touching the files.
+
+Example:
+    ```python
+    from rankify.dataset.results_store import save_results, load_results
+
+    save_results(documents, "bm25-nq.results", save_text=True)
+    batch = load_results("bm25-nq.results")
+    reranker.rank(batch.documents)
+    save_results(batch, "bm25-nq-reranked.results")
+    batch.to_trec("run.trec", use_reordered=True)
+    ```
+"""
+
+import json
+import os
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from rankify.dataset.dataset import Document
+from rankify.dataset.document_batch import DocumentBatch, StringColumn, reorder_positions
+
+RESULTS_VERSION = 1
+
+
+class _JsonColumn:
+    """
+    Read-only sequence that decodes JSON values from a ``StringColumn`` on access.
+    """
+
+    __slots__ = ("column",)
+
+    def __init__(self, column: StringColumn):
+        self.column = column
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def __getitem__(self, index: int):
+        return json.loads(self.column[index])
+
+
+def _write_strings(directory: str, name: str, values: List[Optional[str]]) -> None:
+    column = StringColumn(values)
+    with open(os.path.join(directory, name + ".bin"), "wb") as file:
+        file.write(column.buffer)
+    np.save(os.path.join(directory, name + ".off.npy"), column.offsets)
+    if column.missing is not None:
+        np.save(os.path.join(directory, name + ".missing.npy"), column.missing)
+
+
+def _read_strings(directory: str, name: str) -> StringColumn:
+    offsets = np.load(os.path.join(directory, name + ".off.npy"), mmap_mode="r")
+    path = os.path.join(directory, name + ".bin")
+    # np.memmap cannot map an empty file
+    buffer = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else b""
+    missing_path = os.path.join(directory, name + ".missing.npy")
+    missing = np.load(missing_path, mmap_mode="r") if os.path.exists(missing_path) else None
+    return StringColumn.from_buffers(buffer, offsets, missing)
+
+
+def save_results(documents: Iterable[Document], path: str, save_text: bool = False,
+                 save_reranked: bool = True) -> None:
+    """
+    Writes documents to a results store directory.
+
+    Args:
+        documents (Iterable[Document]): Documents to save; a ``DocumentBatch`` or
+            ``StreamingDataset`` works as well.
+        path (str): Output directory, created if missing. Existing column files are overwritten.
+        save_text (bool): Also store context titles and texts.
+        save_reranked (bool): Store each document's reorder view, if it has one.
+    """
+    questions, answers, query_ids = [], [], []
+    doc_offsets = [0]
+    scores, has_answer, ctx_ids, titles, texts = [], [], [], [], []
+    reranked, rerank_offsets = [], [0]
+    rerank_indices, rerank_scores = [], []
+
+    for document in documents:
+        questions.append(document.question.question)
+        answers.append(json.dumps(document.answers.answers))
+        query_ids.append(document.id)
+        contexts = document.contexts or []
+        for context in contexts:
+            scores.append(np.nan if context.score is None else float(context.score))
+            has_answer.append(-1 if context.has_answer is None else int(bool(context.has_answer)))
+            ctx_ids.append(context.id)
+            if save_text:
+                titles.append(context.title)
+                texts.append(context.text)
+        doc_offsets.append(doc_offsets[-1] + len(contexts))
+
+        positions = reorder_positions(document) if save_reranked else None
+        reranked.append(positions is not None)
+        if positions is not None:
+            rerank_indices.append(np.asarray(positions[0], dtype=np.int32))
+            rerank_scores.append(np.asarray(positions[1], dtype=np.float64))
+            rerank_offsets.append(rerank_offsets[-1] + len(positions[0]))
+        else:
+            rerank_offsets.append(rerank_offsets[-1])
+
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    int_ids = bool(ctx_ids) and all(isinstance(i, int) and not isinstance(i, bool) for i in ctx_ids)
+    has_reranked = any(reranked)
+
+    np.save(os.path.join(path, "doc_offsets.npy"), np.asarray(doc_offsets, dtype=np.int64))
+    np.save(os.path.join(path, "scores.npy"), np.asarray(scores, dtype=np.float64))
+    np.save(os.path.join(path, "has_answer.npy"), np.asarray(has_answer, dtype=np.int8))
+    if int_ids:
+        np.save(os.path.join(path, "ctx_ids.npy"), np.asarray(ctx_ids, dtype=np.int64))
+    else:
+        _write_strings(path, "ctx_ids", ctx_ids)
+    _write_strings(path, "questions", questions)
+    _write_strings(path, "answers", answers)
+    _write_strings(path, "query_ids", query_ids)
+    if save_text:
+        _write_strings(path, "titles", titles)
+        _write_strings(path, "texts", texts)
+    if has_reranked:
+        np.save(os.path.join(path, "reranked.npy"), np.asarray(reranked, dtype=np.int8))
+        np.save(os.path.join(path, "rerank_offsets.npy"), np.asarray(rerank_offsets, dtype=np.int64))
+        np.save(os.path.join(path, "rerank_indices.npy"),
+                np.concatenate(rerank_indices) if rerank_indices else np.zeros(0, dtype=np.int32))
+        np.save(os.path.join(path, "rerank_scores.npy"),
+                np.concatenate(rerank_scores) if rerank_scores else np.zeros(0, dtype=np.float64))
+
+    meta = {
+        "version": RESULTS_VERSION,
+        "num_documents": len(questions),
+        "num_contexts": len(scores),
+        "int_ids": int_ids,
+        "text": save_text,
+        "reranked": has_reranked,
+    }
+    # meta.json is written last, so a store interrupted mid-write is not mistaken for a valid one
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=2)
+
+
+def load_results(path: str) -> DocumentBatch:
+    """
+    Memory-maps a results store written by ``save_results``.
+
+    Args:
+        path (str): The results store directory.
+
+    Returns:
+        DocumentBatch: Documents backed by the mapped columns; reranked documents come with their
+        reorder view already set.
+
+    Raises:
+        FileNotFoundError: If ``path`` is not a results store.
+        ValueError: If the store was written by an incompatible version.
+    """
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"No results store found at {path}")
+    with open(meta_path, encoding="utf-8") as file:
+        meta = json.load(file)
+    if meta.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported results store version {meta.get('version')} (expected {RESULTS_VERSION})")
+
+    def array(name, mode="r"):
+        return np.load(os.path.join(path, name + ".npy"), mmap_mode=mode)
+
+    n_contexts = meta["num_contexts"]
+    if meta["text"]:
+        titles, texts = _read_strings(path, "titles"), _read_strings(path, "texts")
+    else:
+        empty = StringColumn.from_buffers(b"", np.zeros(n_contexts + 1, dtype=np.int64),
+                                          np.ones(n_contexts, dtype=bool))
+        titles = texts = empty
+
+    reranking = None
+    if meta["reranked"]:
+        reranking = (array("reranked"), array("rerank_offsets"), array("rerank_indices"), array("rerank_scores"))
+
+    return DocumentBatch(
+        questions=_read_strings(path, "questions"),
+        answers=_JsonColumn(_read_strings(path, "answers")),
+        doc_ids=_read_strings(path, "query_ids"),
+        offsets=array("doc_offsets"),
+        # Copy-on-write: rerankers may update scores and answer flags in memory
+        scores=array("scores", "c"),
+        has_answer=array("has_answer", "c"),
+        ids=array("ctx_ids") if meta["int_ids"] else _read_strings(path, "ctx_ids"),
+        titles=titles,
+        texts=texts,
+        reranking=reranking,
+    )
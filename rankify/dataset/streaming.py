@@ -0,0 +1,239 @@
+"""
+Streaming access to large DPR-style retrieval result files.
+
+``Dataset.load_dataset`` parses the whole file with ``json.load`` and builds every ``Document`` up
+front, which for MS MARCO-sized or 1000-context files needs tens of GB before the first query is
+processed. ``StreamingDataset`` instead scans the file once to build a side index with the byte
+range of every record, and parses records only when they are requested:
+
+* ``.jsonl`` files – one record per line.
+* ``.json`` files – a top-level array of records; the array is scanned incrementally in fixed-size
+  blocks, so the file is never loaded as a whole.
+
+The index is cached next to the file (``<file>.idx.npz``) and rebuilt when the file changes.
+``dataset[i]`` seeks to record ``i``; iteration and ``iter_chunks`` read sequentially and yield
+``Document`` objects in bounded-size chunks, so rerankers and metrics can process arbitrarily large
+files in constant memory.
+
+Example:
+    ```python
+    from rankify.dataset.streaming import StreamingDataset
+
+    dataset = StreamingDataset("nq-test-bm25.json", n_docs=100)
+    print(len(dataset), dataset[123].question)
+
+    # Reranks chunk by chunk into a JSONL file and returns it as a StreamingDataset
+    reranked = reranker.rank(dataset, output_path="reranked.jsonl")
+    Metrics(reranked).calculate_retrieval_metrics(ks=[1, 5, 10], use_reordered=True)
+    ```
+"""
+
+import json
+import os
+import re
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+
+from rankify.dataset.dataset import Document
+from rankify.utils.passage_store import PassageStore
+
+INDEX_SUFFIX = ".idx.npz"
+INDEX_VERSION = 1
+
+_BLOCK_SIZE = 1 << 24
+_JSON_TOKENS = re.compile(rb'[\[\]{}"\\]')
+
+
+def _scan_jsonl(path: str) -> np.ndarray:
+    spans = []
+    with open(path, "rb") as file:
+        position = 0
+        for line in file:
+            if line.strip():
+                spans.append((position, position + len(line)))
+            position += len(line)
+    return np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+
+
+def _scan_json_array(path: str) -> np.ndarray:
+    """
+    Finds the byte span of every element of a top-level JSON array of objects.
+
+    Only structural characters are visited (found with a regex per block), and string contents
+    are skipped, so the scan runs in a single pass with constant memory.
+    """
+    spans = []
+    depth = 0
+    in_string = False
+    skip_until = -1  # absolute position of a character escaped by a backslash
+    start = None
+    offset = 0
+    with open(path, "rb") as file:
+        while True:
+            block = file.read(_BLOCK_SIZE)
+            if not block:
+                break
+            for match in _JSON_TOKENS.finditer(block):
+                position = offset + match.start()
+                if position == skip_until:
+                    continue
+                token = match.group()
+                if in_string:
+                    if token == b"\\":
+                        skip_until = position + 1
+                    elif token == b'"':
+                        in_string = False
+                    continue
+                if token == b'"':
+                    in_string = True
+                elif token in (b"{", b"["):
+                    if depth == 1:
+                        start = position
+                    depth += 1
+                elif token in (b"}", b"]"):
+                    depth -= 1
+                    if depth == 1 and start is not None:
+                        spans.append((start, position + 1))
+                        start = None
+            offset += len(block)
+    if depth != 0:
+        raise ValueError(f"Unbalanced JSON array in {path}")
+    return np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+
+
+def build_offset_index(filepath: str, index_path: Optional[str] = None, rebuild: bool = False) -> np.ndarray:
+    """
+    Returns an ``(n, 2)`` int64 array with the ``[start, end)`` byte range of every record.
+
+    The index is cached at ``index_path`` (default ``<filepath>.idx.npz``) together with the size
+    and modification time of the source file, and rebuilt whenever those change.
+
+    Args:
+        filepath (str): A ``.json`` (array of records) or ``.jsonl`` file.
+        index_path (str, optional): Where to cache the index.
+        rebuild (bool): Ignore a cached index.
+
+    Raises:
+        ValueError: If the file is not ``.json`` or ``.jsonl``.
+    """
+    if not filepath.endswith((".json", ".jsonl")):
+        raise ValueError("Unsupported file format. Please use a JSON or JSONL file.")
+    index_path = index_path or filepath + INDEX_SUFFIX
+    stat = os.stat(filepath)
+
+    if not rebuild and os.path.exists(index_path):
+        with np.load(index_path) as cached:
+            meta = cached["meta"]
+            if meta.tolist() == [INDEX_VERSION, stat.st_size, stat.st_mtime_ns]:
+                return cached["spans"]
+
+    spans = _scan_jsonl(filepath) if filepath.endswith(".jsonl") else _scan_json_array(filepath)
+    meta = np.asarray([INDEX_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    try:
+        with open(index_path, "wb") as file:
+            np.savez(file, spans=spans, meta=meta)
+    except OSError as e:
+        print(f"Could not cache offset index at {index_path}: {e}")
+    return spans
+
+
+class StreamingDataset:
+    """
+    A lazily parsed, randomly accessible view of a DPR-style retrieval file.
+
+    Attributes:
+        filepath (str): Path to the ``.json`` or ``.jsonl`` file.
+        n_docs (int): Number of contexts kept per question.
+        chunk_size (int): Default number of documents per chunk for ``iter_chunks``.
+        passages (PassageStore, optional): If set, context text and title are filled from the
+            store as documents are read (what ``Dataset.update_contexts_from_passages`` does eagerly).
+        spans (np.ndarray): ``(n, 2)`` byte ranges of the records.
+    """
+
+    def __init__(self, filepath: str, n_docs: int = 100, chunk_size: int = 1000,
+                 passages: Optional[PassageStore] = None, index_path: Optional[str] = None) -> None:
+        self.filepath = filepath
+        self.n_docs = n_docs
+        self.chunk_size = chunk_size
+        self.passages = passages
+        self.spans = build_offset_index(filepath, index_path)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def _to_document(self, raw: bytes) -> Document:
+        return Document.from_dict(json.loads(raw), self.n_docs)
+
+    def _fill_passages(self, documents: List[Document]) -> List[Document]:
+        if self.passages is None:
+            return documents
+        # Reranked contexts read back from a ``save_reranked`` file are separate objects
+        contexts = [context for document in documents
+                    for context in document.contexts + (document.reorder_contexts or [])]
+        for context, passage in zip(contexts, self.passages.get_many([c.id for c in contexts])):
+            if passage is not None:
+                context.text = passage["text"]
+                context.title = passage["title"]
+        return documents
+
+    def _read(self, indices) -> List[Document]:
+        documents = []
+        with open(self.filepath, "rb") as file:
+            for index in indices:
+                start, end = self.spans[index]
+                file.seek(int(start))
+                documents.append(self._to_document(file.read(int(end - start))))
+        return self._fill_passages(documents)
+
+    def __getitem__(self, idx):
+        """
+        Parses and returns the document at ``idx``, or a list of documents for a slice.
+
+        Every access parses the record again, so changes made to a returned document are not
+        kept by the dataset.
+        """
+        if isinstance(idx, slice):
+            return self._read(range(*idx.indices(len(self))))
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("StreamingDataset index out of range")
+        return self._read([idx])[0]
+
+    def iter_chunks(self, chunk_size: Optional[int] = None, start: int = 0,
+                    stop: Optional[int] = None) -> Iterator[List[Document]]:
+        """
+        Yields lists of at most ``chunk_size`` documents, reading the file sequentially.
+
+        Args:
+            chunk_size (int, optional): Documents per chunk. Defaults to ``self.chunk_size``.
+            start (int): First record to read.
+            stop (int, optional): Stop before this record.
+        """
+        chunk_size = max(1, chunk_size or self.chunk_size)
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        with open(self.filepath, "rb") as file:
+            for chunk_start in range(start, stop, chunk_size):
+                spans = self.spans[chunk_start:min(chunk_start + chunk_size, stop)]
+                # Records of a chunk are contiguous apart from separators, so read them in one go
+                base = int(spans[0, 0])
+                file.seek(base)
+                buffer = file.read(int(spans[-1, 1]) - base)
+                documents = [self._to_document(buffer[s - base:e - base]) for s, e in spans.tolist()]
+                yield self._fill_passages(documents)
+
+    def __iter__(self) -> Iterator[Document]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def map_chunks(self, fn: Callable[[List[Document]], Optional[List[Document]]],
+                   chunk_size: Optional[int] = None) -> Iterator[List[Document]]:
+        """
+        Applies ``fn`` (e.g. ``reranker.rank``) to each chunk and yields the processed chunks.
+        """
+        for chunk in self.iter_chunks(chunk_size):
+            result = fn(chunk)
+            yield chunk if result is None else result
@@ -42,6 +42,7 @@ class Generator:
         - The generator puts together both the model endpoint (e.g., OpenAI, HuggingFace, FiD, vLLM) and the RAG method (e.g., basic, chain-of-thought, self-consistency).
         - All configuration (model, backend, method, and additional kwargs) is passed to the appropriate factory and method class.
         - Use `generate()` to obtain answers for a batch of documents, calling `answer_questions()` of the specified RAG method.
+        - Use `generate_stream()` to receive one document's answer in chunks while it is generated.
     """
 
     def __init__(self, method: str, model_name: str, backend:str = "huggingface", **kwargs):
@@ -84,3 +85,23 @@ class Generator:
 
         """
         return self.rag_method.answer_questions(documents, custom_prompt, **kwargs)
+
+    def generate_stream(self, document, custom_prompt=None, **kwargs):
+        """
+        Generates the answer for a single document, yielding it in text chunks as it is produced.
+
+        Args:
+            document (Document): A `Document` containing the query and retrieved contexts.
+            custom_prompt (str, optional): Custom prompt to override default prompt generation.
+            **kwargs: Additional parameters for the RAG method or model generation.
+
+        Returns:
+            Iterator[str]: Consecutive pieces of the answer.
+
+        Example:
+            ```python
+            for chunk in generator.generate_stream(document):
+                print(chunk, end="", flush=True)
+            ```
+        """
+        return self.rag_method.answer_question_stream(document, custom_prompt, **kwargs)
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 class BaseRAGModel(ABC):
     """
@@ -11,12 +11,20 @@ class BaseRAGModel(ABC):
     Methods:
         generate(prompt: str, **kwargs) -> str:
             Abstract method to generate a response based on the given prompt.
+        generate_batch(prompts: List[str], **kwargs) -> List[str]:
+            Generates one response per prompt, batching the work where the backend allows it.
+        generate_stream(prompt: str, **kwargs) -> Iterator[str]:
+            Yields the response in text chunks as they are generated.
         embed(text: str, **kwargs) -> List[float]:
             Optional method to generate embeddings for the given text.
 
     Notes:
         - This class serves as a blueprint for RAG models like `OpenAIModel` and `HuggingFaceModel`.
         - The `embed` method is optional and can be implemented if needed.
+        - `generate_batch` falls back to calling `generate` for each prompt; local backends override it
+          with batched inference and API backends with concurrent, rate-limited requests.
+        - `generate_stream` falls back to a single chunk holding the full `generate` output;
+          backends that can stream tokens override it.
         - This class needs to be extended to include new LLM endpoints in Rankify.
     """
     
@@ -25,6 +33,18 @@ class BaseRAGModel(ABC):
         """Generate a response based on the given prompt."""
         pass
 
+    def generate_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        """Generate one response per prompt, in prompt order."""
+        return [self.generate(prompt, **kwargs) for prompt in prompts]
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Generate a response as a stream of text chunks; joined, they form the answer.
+
+        Closing the iterator early stops generation where the backend allows it.
+        """
+        yield self.generate(prompt, **kwargs)
+
     def embed(self, text: str, **kwargs) -> List[float]:
         """Optional: Generate embeddings for the given text."""
         raise NotImplementedError("Embedding is not required for this implementation.")
\ No newline at end of file
@@ -1,6 +1,24 @@
+from threading import Event, Thread
+from typing import Iterator, List
+
+import torch
+from tqdm.auto import tqdm
+from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
 from rankify.generator.models.base_rag_model import BaseRAGModel
 from rankify.generator.prompt_generator import PromptGenerator
 
+
+class _StopWhenSet(StoppingCriteria):
+    """ Ends generation once ``event`` is set (the stream consumer went away or has its answer)"""
+
+    def __init__(self, event: Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
 class HuggingFaceModel(BaseRAGModel):
     """
     **Hugging Face Model** for Retrieval-Augmented Generation (RAG).
@@ -18,6 +36,8 @@ class HuggingFaceModel(BaseRAGModel):
     Notes:
         - This model uses Hugging Face's Transformers library for text generation.
         - Default generation parameters like `max_length` and `temperature` can be overridden.
+        - `generate_batch` runs left-padded, length-sorted batches through `model.generate`.
+        - `generate_stream` yields the answer while it is decoded (via `TextIteratorStreamer`).
     """
 
     def __init__(self, model_name: str, tokenizer, model, prompt_generator: PromptGenerator, stop_at_period: bool = False):
@@ -56,7 +76,77 @@ class HuggingFaceModel(BaseRAGModel):
             ```
         """
         inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        self._set_generation_defaults(kwargs)
+        
+        outputs = self.model.generate(**inputs, **kwargs)
+
+        def clean_answer(text):
+            return self._clean_answer(text[len(prompt):])
 
+        if kwargs.get("num_return_sequences", 1) > 1:
+            return [clean_answer(self.tokenizer.decode(output, skip_special_tokens=True)) for output in outputs]
+        else:
+            return clean_answer(self.tokenizer.decode(outputs[0], skip_special_tokens=True))
+
+    def _clean_answer(self, answer):
+        answer = answer.strip()
+        answer = answer.split("\n")[0].strip()
+        if self.stop_at_period:
+            idx = answer.find(".")
+            if idx != -1:
+                return answer[:idx+1].strip()
+        return answer
+
+    def generate_batch(self, prompts: List[str], batch_size: int = 8, **kwargs) -> List:
+        """
+        Generates answers for several prompts with batched `model.generate` calls.
+
+        Prompts are sorted by token length so that each batch holds prompts of similar length, and
+        padded on the left so that every sequence continues right after its own prompt. Answers are
+        cleaned like those of `generate` and returned in prompt order.
+
+        Args:
+            prompts (List[str]): The input prompts.
+            batch_size (int): Prompts per `model.generate` call (default: 8).
+            **kwargs: Generation parameters, with the same defaults as `generate`.
+
+        Returns:
+            List[str] or List[List[str]]: One answer per prompt, or a list of answers per prompt if
+            `num_return_sequences` > 1.
+
+        Example:
+            ```python
+            answers = model.generate_batch(["Who wrote Hamlet?", "What is the capital of France?"], batch_size=16)
+            ```
+        """
+        self._set_generation_defaults(kwargs)
+        n = kwargs["num_return_sequences"]
+        lengths = [len(ids) for ids in self.tokenizer(prompts)["input_ids"]]
+        # Longest first: a batch that does not fit in memory fails right away
+        order = sorted(range(len(prompts)), key=lambda i: -lengths[i])
+        answers = [None] * len(prompts)
+
+        padding_side, pad_token = self.tokenizer.padding_side, self.tokenizer.pad_token
+        self.tokenizer.padding_side = "left"
+        if pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        try:
+            for start in tqdm(range(0, len(order), batch_size), desc="Generating", unit="batch",
+                              disable=len(order) <= batch_size):
+                batch = order[start:start + batch_size]
+                inputs = self.tokenizer([prompts[i] for i in batch], return_tensors="pt", padding=True).to(self.model.device)
+                outputs = self.model.generate(**inputs, **kwargs)
+                texts = self.tokenizer.batch_decode(outputs[:, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+                for j, i in enumerate(batch):
+                    group = [self._clean_answer(text) for text in texts[j * n:(j + 1) * n]]
+                    answers[i] = group if n > 1 else group[0]
+        finally:
+            self.tokenizer.padding_side = padding_side
+            if pad_token is None:
+                self.tokenizer.pad_token = pad_token
+        return answers
+
+    def _set_generation_defaults(self, kwargs):
         kwargs.setdefault("max_new_tokens", 64)
         kwargs.setdefault("do_sample", True)
         kwargs.setdefault("num_return_sequences", 1)
@@ -64,19 +154,65 @@ class HuggingFaceModel(BaseRAGModel):
         kwargs.setdefault("pad_token_id", self.tokenizer.eos_token_id)
         kwargs.setdefault("temperature", 0.1)
         kwargs.setdefault("top_p", 1.0)
-        
-        outputs = self.model.generate(**inputs, **kwargs)
 
-        def clean_answer(text):
-            answer = text[len(prompt):].strip()
-            answer = answer.split("\n")[0].strip()
-            if self.stop_at_period:
-                idx = answer.find(".")
-                if idx != -1:
-                    return answer[:idx+1].strip()
-            return answer
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Generates a single answer and yields it in text chunks while tokens are decoded.
 
-        if kwargs.get("num_return_sequences", 1) > 1:
-            return [clean_answer(self.tokenizer.decode(output, skip_special_tokens=True)) for output in outputs]
-        else:
-            return clean_answer(self.tokenizer.decode(outputs[0], skip_special_tokens=True))
\ No newline at end of file
+        `model.generate` runs on a background thread feeding a `TextIteratorStreamer`. The chunks
+        are cleaned like `generate`'s answer (leading whitespace dropped, cut at the first newline
+        and, with `stop_at_period`, after the first period), and generation stops as soon as the
+        answer is complete or the iterator is closed.
+
+        Args:
+            prompt (str): The input prompt for generation.
+            **kwargs: Generation parameters, as for `generate` (`num_return_sequences` is forced to 1).
+
+        Yields:
+            str: Consecutive pieces of the answer.
+
+        Example:
+            ```python
+            for chunk in model.generate_stream("What is the capital of France?"):
+                print(chunk, end="", flush=True)
+            ```
+        """
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        self._set_generation_defaults(kwargs)
+        kwargs["num_return_sequences"] = 1
+
+        stop = Event()
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        stopping_criteria = StoppingCriteriaList(kwargs.pop("stopping_criteria", None) or [])
+        stopping_criteria.append(_StopWhenSet(stop))
+        errors = []
+
+        def run():
+            try:
+                self.model.generate(**inputs, **kwargs, streamer=streamer, stopping_criteria=stopping_criteria)
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            started = False
+            for text in streamer:
+                if not started:
+                    text = text.lstrip()
+                    started = bool(text)
+                cut = text.find("\n")
+                cut = len(text) if cut == -1 else cut
+                if self.stop_at_period:
+                    period = text.find(".", 0, cut)
+                    cut = cut if period == -1 else period + 1
+                if text[:cut]:
+                    yield text[:cut]
+                if cut < len(text):
+                    break
+        finally:
+            stop.set()
+            thread.join()
+        if errors:
+            raise errors[0]
\ No newline at end of file
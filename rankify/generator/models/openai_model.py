@@ -1,3 +1,5 @@
+from typing import Iterator, List
+
 from rankify.generator.models.base_rag_model import BaseRAGModel
 from rankify.generator.prompt_generator import PromptGenerator
 from rankify.utils.api.litellmclient import LitellmClient
@@ -63,4 +65,39 @@ class OpenAIModel(BaseRAGModel):
 
         # Call the OpenAI API using the OpenaiClient
         response = self.client.chat(messages=[{"role": "user", "content": prompt}], return_text=True, **kwargs)
-        return response
\ No newline at end of file
+        return response
+
+    def generate_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        """
+        Generate responses for several prompts with concurrent OpenAI API requests.
+
+        Requests go through the provider's shared client (`rankify.utils.api.async_client`), which
+        bounds the requests in flight, applies its rate limit and retries transient failures.
+
+        Args:
+            prompts (List[str]): The input prompts.
+            **kwargs: Additional parameters for each API call, as for `generate`.
+
+        Returns:
+            List[str]: One response per prompt, in prompt order.
+        """
+        kwargs.setdefault("model", self.model_name)
+        kwargs.setdefault("max_tokens", 128)
+        kwargs.setdefault("temperature", 0.7)
+        return self.client.chat_batch([[{"role": "user", "content": prompt}] for prompt in prompts], **kwargs)
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Stream a response from OpenAI's API, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The input prompt for the model.
+            **kwargs: Additional parameters for the API call, with the same defaults as `generate`.
+
+        Yields:
+            str: Consecutive pieces of the response.
+        """
+        kwargs.setdefault("model", self.model_name)
+        kwargs.setdefault("max_tokens", 128)
+        kwargs.setdefault("temperature", 0.7)
+        yield from self.client.chat_stream(messages=[{"role": "user", "content": prompt}], **kwargs)
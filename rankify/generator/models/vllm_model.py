@@ -1,6 +1,15 @@
+import itertools
+import threading
+from typing import Iterator, List
+
 from rankify.generator.models.base_rag_model import BaseRAGModel
 from rankify.generator.prompt_generator import PromptGenerator
-from vllm import LLM
+
+try:
+    from vllm import LLM, SamplingParams
+    VLLM_AVAILABLE = True
+except ImportError:
+    VLLM_AVAILABLE = False
 
 class VLLMModel(BaseRAGModel):
     """
@@ -19,6 +28,10 @@ class VLLMModel(BaseRAGModel):
         - It supports additional parameters like `max_tokens` and `temperature`.
         - **Specialty:** vLLM requires a `sampling_params` dictionary to control decoding and sampling behavior, 
           allowing fine-grained control over generation (e.g., `max_tokens`, `temperature`, `top_p`, etc.).
+        - `generate_batch` submits all prompts in one `llm.generate` call.
+        - `generate_stream` steps the in-process engine and yields text as it is decoded. Streams hold
+          the engine one at a time; for many concurrent streams, serve the model with vLLM's
+          OpenAI-compatible server and use `OpenAIModel` with its `base_url`.
     """
     def __init__(self, model_name: str, prompt_generator: PromptGenerator, **kwargs):
         """
@@ -28,9 +41,14 @@ class VLLMModel(BaseRAGModel):
         :param prompt_generator: Instance of PromptGenerator for generating prompts.
         :param device: Device to run the model on (default: "cuda").
         """
+        if not VLLM_AVAILABLE:
+            raise ImportError("vLLM is required for the vllm backend. Install with: pip install vllm")
         self.model_name = model_name
         self.prompt_generator = prompt_generator
         self.llm = LLM(model=model_name, **kwargs)
+        # The engine is not thread-safe: generate calls and streams take turns
+        self._engine_lock = threading.Lock()
+        self._request_ids = itertools.count()
         
     def generate(self, prompt: str, **kwargs) -> str:
         """
@@ -62,7 +80,8 @@ class VLLMModel(BaseRAGModel):
         ```
         """
         # Call the vLLM API using the LLM client
-        response = self.llm.generate(prompt, kwargs["sampling_params"])
+        with self._engine_lock:
+            response = self.llm.generate(prompt, kwargs["sampling_params"])
         
         if response and response[0].outputs:
             # Extract the generated text from the response
@@ -70,4 +89,59 @@ class VLLMModel(BaseRAGModel):
         else:
             generated_text = ""
 
-        return generated_text
\ No newline at end of file
+        return generated_text
+
+    def generate_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        """
+        Generate responses for all prompts with a single `llm.generate` call, letting vLLM schedule
+        them with continuous batching.
+
+        Args:
+            prompts (List[str]): The input prompts.
+            sampling_params (dict or SamplingParams, optional): Sampling parameters, as for `generate`.
+
+        Returns:
+            List[str]: One response per prompt, in prompt order.
+        """
+        with self._engine_lock:
+            responses = self.llm.generate(prompts, self._sampling_params(kwargs))
+        return [response.outputs[0].text.strip() if response.outputs else "" for response in responses]
+
+    @staticmethod
+    def _sampling_params(kwargs):
+        params = kwargs.get("sampling_params")
+        if params is None:
+            return SamplingParams()
+        if isinstance(params, dict):
+            return SamplingParams(**params)
+        return params
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Stream a response from the vLLM engine, yielding the new text after every engine step.
+
+        Args:
+            prompt (str): The input prompt for the model.
+            sampling_params (dict or SamplingParams, optional): Sampling parameters, as for `generate`.
+
+        Yields:
+            str: Consecutive pieces of the response.
+        """
+        engine = self.llm.llm_engine
+        request_id = f"rankify-stream-{next(self._request_ids)}"
+        with self._engine_lock:
+            engine.add_request(request_id, prompt, self._sampling_params(kwargs))
+            sent, finished = "", False
+            try:
+                while not finished and engine.has_unfinished_requests():
+                    for output in engine.step():
+                        if output.request_id != request_id:
+                            continue
+                        text = output.outputs[0].text if output.outputs else ""
+                        if len(text) > len(sent):
+                            yield text[len(sent):]
+                            sent = text
+                        finished = output.finished
+            finally:
+                if not finished:
+                    engine.abort_request([request_id])
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 from rankify.dataset.dataset import Document
 from rankify.generator.models.base_rag_model import BaseRAGModel
 
@@ -17,6 +17,8 @@ class BaseRAGMethod(ABC):
     Methods:
         answer_questions(documents: List[Document], custom_prompt=None, **kwargs) -> List[str]:
             Abstract method to answer questions based on a list of documents and optional custom prompt.
+        answer_question_stream(document: Document, custom_prompt=None, **kwargs) -> Iterator[str]:
+            Answers one question, yielding the answer in chunks as it is generated.
 
     Notes:
         - Extend this class to implement new RAG techniques or strategies.
@@ -50,4 +52,21 @@ class BaseRAGMethod(ABC):
             - Must be implemented by subclasses to define the RAG technique's answering logic.
             - Enables flexible integration of different prompting or generation strategies.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def answer_question_stream(self, document: Document, custom_prompt=None, **kwargs) -> Iterator[str]:
+        """
+        Answer a single question, yielding the answer in text chunks as it is generated.
+
+        Methods whose answer comes from one model call override this to stream the model's
+        output; the default yields the complete answer of `answer_questions` as one chunk.
+
+        Args:
+            document (Document): Document containing the question and contexts.
+            custom_prompt (str, optional): Custom prompt to override default prompt generation.
+            **kwargs: Additional parameters for the answering logic.
+
+        Yields:
+            str: Consecutive pieces of the answer.
+        """
+        yield self.answer_questions([document], custom_prompt, **kwargs)[0]
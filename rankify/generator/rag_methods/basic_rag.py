@@ -1,10 +1,9 @@
-from typing import List
+from typing import Iterator, List
 from rankify.generator.models.base_rag_model import BaseRAGModel
 
 from typing import List
 from rankify.dataset.dataset import Document
 from rankify.generator.rag_methods.base_rag_method import BaseRAGMethod
-from tqdm.auto import tqdm 
 
 class BasicRAG(BaseRAGMethod):
     """
@@ -72,19 +71,29 @@ class BasicRAG(BaseRAGMethod):
         Notes:
             - Concatenates all context passages and passes them with the question to the model.
             - Uses the model's prompt generator to construct prompts.
+            - All prompts are built up front and generated with one `generate_batch` call.
+        """
+        # Build every prompt first, then let the model batch the generation
+        prompts = [
+            self.model.prompt_generator.generate_user_prompt(
+                document.question.question, [context.text for context in document.contexts], custom_prompt)
+            for document in documents
+        ]
+        return self.model.generate_batch(prompts, **kwargs)
+
+    def answer_question_stream(self, document: Document, custom_prompt=None, **kwargs) -> Iterator[str]:
+        """
+        Answer a single question, streaming the model's output.
+
+        Args:
+            document (Document): Document containing the question and contexts.
+            custom_prompt (str, optional): Custom prompt to override default prompt generation.
+            **kwargs: Additional parameters for the model's generate_stream method.
+
+        Yields:
+            str: Consecutive pieces of the answer.
         """
-        answers = []
-
-        for document in tqdm(documents, desc="Answering questions", unit="q"):
-            # Extract question and contexts from the document
-            question = document.question.question
-            contexts = [context.text for context in document.contexts]
-
-            # Construct the prompt
-            prompt = self.model.prompt_generator.generate_user_prompt(question, contexts, custom_prompt)
-            # Generate the answer using the model
-            answer = self.model.generate(prompt=prompt, **kwargs)
-            
-            # Append the answer to the list
-            answers.append(answer)
-        return answers
\ No newline at end of file
+        question = document.question.question
+        contexts = [context.text for context in document.contexts]
+        prompt = self.model.prompt_generator.generate_user_prompt(question, contexts, custom_prompt)
+        yield from self.model.generate_stream(prompt, **kwargs)
@@ -1,9 +1,8 @@
-from typing import List
+from typing import Iterator, List
 from rankify.dataset.dataset import Document
 from rankify.generator.models.base_rag_model import BaseRAGModel
 from rankify.generator.rag_methods.base_rag_method import BaseRAGMethod
 
-from tqdm.auto import tqdm 
 
 class ChainOfThoughtRAG(BaseRAGMethod):
     """
@@ -70,20 +69,29 @@ class ChainOfThoughtRAG(BaseRAGMethod):
         Notes:
             - Uses the model's prompt generator to build chain-of-thought prompts from question and contexts.
             - Suitable for complex questions requiring multi-step inference.
+            - All prompts are built up front and generated with one `generate_batch` call.
         """
-        answers = []
+        # Build every prompt first, then let the model batch the generation
+        prompts = [
+            self.model.prompt_generator.generate_user_prompt(
+                document.question.question, [context.text for context in document.contexts], custom_prompt)
+            for document in documents
+        ]
+        return self.model.generate_batch(prompts, **kwargs)
 
-        for document in tqdm(documents, desc="Answering questions", unit="q"):
-            # Extract question and contexts from the document
-            question = document.question.question
-            contexts = [context.text for context in document.contexts]
+    def answer_question_stream(self, document: Document, custom_prompt=None, **kwargs) -> Iterator[str]:
+        """
+        Answer a single question, streaming the model's output.
 
-            # Construct the prompt
-            prompt = self.model.prompt_generator.generate_user_prompt(question, contexts, custom_prompt)
-            
-            # Generate the answer using the model
-            answer = self.model.generate(prompt=prompt, **kwargs)
-            
-            # Append the answer to the list
-            answers.append(answer)
-        return answers
\ No newline at end of file
+        Args:
+            document (Document): Document containing the question and contexts.
+            custom_prompt (str, optional): Custom prompt to override default prompt generation.
+            **kwargs: Additional parameters for the model's generate_stream method.
+
+        Yields:
+            str: Consecutive pieces of the answer.
+        """
+        question = document.question.question
+        contexts = [context.text for context in document.contexts]
+        prompt = self.model.prompt_generator.generate_user_prompt(question, contexts, custom_prompt)
+        yield from self.model.generate_stream(prompt, **kwargs)
@@ -1,8 +1,7 @@
-from typing import List
+from typing import Iterator, List
 from rankify.generator.models.base_rag_model import BaseRAGModel
 from rankify.dataset.dataset import Document
 from rankify.generator.rag_methods.base_rag_method import BaseRAGMethod
-from tqdm.auto import tqdm 
 
 class ZeroShotRAG(BaseRAGMethod):
     """
@@ -66,20 +65,28 @@ class ZeroShotRAG(BaseRAGMethod):
 
         Notes:
             - Constructs prompts using only the question.
+            - All prompts are built up front and generated with one `generate_batch` call.
         """
-        answers = []
+        # Build every prompt first, then let the model batch the generation
+        prompts = [
+            self.model.prompt_generator.generate_user_prompt(
+                document.question.question, None, custom_prompt)
+            for document in documents
+        ]
+        return self.model.generate_batch(prompts, **kwargs)
 
-        for document in tqdm(documents, desc="Answering questions", unit="q"):
-            # Extract question and contexts from the document
-            question = document.question.question
-            
-            # Construct the prompt
-            prompt = self.model.prompt_generator.generate_user_prompt(question, None, custom_prompt)
-            
-            # Generate the answer using the model
-            answer = self.model.generate(prompt, **kwargs)
+    def answer_question_stream(self, document: Document, custom_prompt=None, **kwargs) -> Iterator[str]:
+        """
+        Answer a single question, streaming the model's output.
 
-            # Append the answer to the list
-            answers.append(answer)
+        Args:
+            document (Document): Document containing the question.
+            custom_prompt (str, optional): Custom prompt to override default prompt generation.
+            **kwargs: Additional parameters for the model's generate_stream method.
 
-        return answers
\ No newline at end of file
+        Yields:
+            str: Consecutive pieces of the answer.
+        """
+        question = document.question.question
+        prompt = self.model.prompt_generator.generate_user_prompt(question, None, custom_prompt)
+        yield from self.model.generate_stream(prompt, **kwargs)
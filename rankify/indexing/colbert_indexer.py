@@ -2,14 +2,18 @@ import shutil
 import logging
 import json
 import csv
+import time
 from pathlib import Path
 
 from rankify.indexing.base_indexer import BaseIndexer
 from rankify.indexing.format_converters import to_tsv
-from rankify.utils.retrievers.colbert.colbert import Indexer
+from rankify.utils.retrievers.colbert.colbert import Indexer, Searcher
 from rankify.utils.retrievers.colbert.colbert.data import Collection
-from rankify.utils.retrievers.colbert.colbert.infra import ColBERTConfig
+from rankify.utils.retrievers.colbert.colbert.infra import ColBERTConfig, Run, RunConfig
 from rankify.utils.retrievers.colbert.colbert.search.index_loader import IndexLoader
+from rankify.utils.retrievers.colbert_index_updates import (
+    ColBERTIndexEditor, clean_tsv_field, compact_index, passage_record,
+)
 
 logging.basicConfig(level=logging.INFO)
 import os
@@ -25,6 +29,7 @@ class ColBERTIndexer(BaseIndexer):
     2. Maintains ID mappings for retrieval
     3. Creates proper TSV header format
     4. Generates all necessary files for the retriever
+    5. Updates a built index in place (``update``) and compacts it (``compact``)
     """
     
     def __init__(self,
@@ -61,8 +66,7 @@ class ColBERTIndexer(BaseIndexer):
         sequential_to_original = {}
         
         # Create both files simultaneously
-        with open(self.corpus_path, 'r', encoding='utf-8') as infile, \
-             open(colbert_tsv_path, 'w', encoding='utf-8', newline='') as collection_file, \
+        with open(colbert_tsv_path, 'w', encoding='utf-8', newline='') as collection_file, \
              open(passages_tsv_path, 'w', encoding='utf-8', newline='') as passages_file:
             
             collection_writer = csv.writer(collection_file, delimiter='\t')
@@ -75,70 +79,54 @@ class ColBERTIndexer(BaseIndexer):
             sequential_id = 1  # Start from 1 to match line indices
             processed_docs = 0
             
+            for original_id, text, title in self._iter_corpus_records(self.corpus_path):
+                # Create mappings
+                original_to_sequential[original_id] = sequential_id
+                sequential_to_original[sequential_id] = original_id
+                
+                # Write to both files
+                collection_writer.writerow([sequential_id, text, title])  # For ColBERT
+                passages_writer.writerow([original_id, text, title])      # For retriever (keeps original IDs)
+                
+                sequential_id += 1
+                processed_docs += 1
+                
+                if processed_docs % 10000 == 0:
+                    logging.info(f"Processed {processed_docs} documents...")
+        
+        logging.info(f"✅ Created ColBERT TSV with {processed_docs} documents")
+        logging.info(f"   Collection file: {colbert_tsv_path}")
+        logging.info(f"   Passages file: {passages_tsv_path}")
+        
+        return str(colbert_tsv_path), original_to_sequential, sequential_to_original
+
+    def _iter_corpus_records(self, corpus_path):
+        """Yield cleaned ``(original_id, text, title)`` from a JSONL corpus, skipping empty and malformed documents."""
+        with open(corpus_path, 'r', encoding='utf-8') as infile:
             for line_idx, line in enumerate(infile):
                 line = line.strip()
                 if not line:
                     continue
                 
                 try:
-                    doc = json.loads(line)
-                    
-                    # Extract fields with fallbacks
-                    original_id = doc.get("id", f"doc_{line_idx}")
-                    text = doc.get("contents", doc.get("text", doc.get("passage", ""))).strip()
-                    title = doc.get("title", "").strip()
-                    
-                    if not text:  # Skip empty documents
-                        logging.warning(f"Skipping document {original_id} with empty text")
-                        continue
-                    
-                    # Clean text and title for TSV (remove problematic characters)
-                    text = self._clean_tsv_field(text)
-                    title = self._clean_tsv_field(title)
-                    
-                    # Create mappings
-                    original_to_sequential[original_id] = sequential_id
-                    sequential_to_original[sequential_id] = original_id
-                    
-                    # Write to both files
-                    collection_writer.writerow([sequential_id, text, title])  # For ColBERT
-                    passages_writer.writerow([original_id, text, title])      # For retriever (keeps original IDs)
-                    
-                    sequential_id += 1
-                    processed_docs += 1
-                    
-                    if processed_docs % 10000 == 0:
-                        logging.info(f"Processed {processed_docs} documents...")
-                        
+                    # Extract fields with fallbacks, cleaned for TSV (problematic characters removed)
+                    original_id, text, title = passage_record(json.loads(line), f"doc_{line_idx}")
                 except json.JSONDecodeError as e:
                     logging.warning(f"Skipping malformed JSON at line {line_idx}: {e}")
                     continue
                 except Exception as e:
                     logging.warning(f"Error processing document at line {line_idx}: {e}")
                     continue
-        
-        logging.info(f"✅ Created ColBERT TSV with {processed_docs} documents")
-        logging.info(f"   Collection file: {colbert_tsv_path}")
-        logging.info(f"   Passages file: {passages_tsv_path}")
-        
-        return str(colbert_tsv_path), original_to_sequential, sequential_to_original
+                
+                if not text:  # Skip empty documents
+                    logging.warning(f"Skipping document {original_id} with empty text")
+                    continue
+                
+                yield original_id, text, title
 
     def _clean_tsv_field(self, field: str) -> str:
         """Clean field for TSV format by removing problematic characters."""
-        if not field:
-            return ""
-        
-        # Replace tabs, newlines, and carriage returns with spaces
-        field = field.replace('\t', ' ').replace('\n', ' ').replace('\r', ' ')
-        
-        # Remove multiple spaces
-        field = ' '.join(field.split())
-        
-        # Truncate if too long (prevent memory issues)
-        if len(field) > 10000:
-            field = field[:10000] + "..."
-            
-        return field
+        return clean_tsv_field(field)
 
     def _save_id_mappings(self, original_to_sequential: dict, sequential_to_original: dict):
         """Save ID mappings for retriever use."""
@@ -281,6 +269,61 @@ class ColBERTIndexer(BaseIndexer):
             self._debug_indexing_failure(collection_path)
             raise
 
+    def update(self, add_jsonl=None, delete_ids=None, compact=False):
+        """
+        Update the built index in place instead of rebuilding it.
+
+        Passages of ``add_jsonl`` (same JSONL format as the corpus) are encoded and added; an id that
+        is already indexed replaces the indexed passage. ``delete_ids`` (original ids) are removed.
+        The PLAID files, collection.tsv, passages.tsv and the ID mappings are updated together. New
+        passages are compressed with the existing centroids, so after large changes to the corpus a
+        full ``build_index`` gives better candidate generation.
+
+        Args:
+            add_jsonl (str, optional): JSONL file of passages to add or replace.
+            delete_ids (list, optional): Original ids of passages to remove.
+            compact (bool): Renumber the index afterwards, dropping removed passages (see ``compact``).
+
+        Returns:
+            dict: Numbers of added and removed passages and seconds per update stage.
+        """
+        if not self.id_mapping_file.exists() or not (self.index_dir / "metadata.json").exists():
+            raise FileNotFoundError(f"No ColBERT index to update in {self.index_dir}; run build_index first")
+        logging.info(f"Updating ColBERT index {self.index_dir}...")
+        
+        start = time.perf_counter()
+        with Run().context(RunConfig(nranks=1, avoid_fork_if_possible=True)):
+            config = ColBERTConfig(
+                root=str(self.index_dir),
+                collection=str(self.index_dir / "collection.tsv"),
+            )
+            searcher = Searcher(index=str(self.index_dir), config=config, verbose=1)
+        editor = ColBERTIndexEditor(searcher)
+        timings = {"load": time.perf_counter() - start}
+        
+        removed = editor.remove(delete_ids or [])
+        added = editor.add(self._iter_corpus_records(add_jsonl)) if add_jsonl else []
+        editor.persist()
+        timings.update(editor.timings)
+        if compact:
+            start = time.perf_counter()
+            compact_index(str(self.index_dir))
+            timings["compact"] = time.perf_counter() - start
+        
+        logging.info(f"✅ Added {len(added)} and removed {len(removed)} passages")
+        logging.info("   Seconds per stage: " + ", ".join(f"{stage} {seconds:.2f}" for stage, seconds in timings.items()))
+        return {"added": len(added), "removed": len(removed), "timings": timings}
+
+    def compact(self):
+        """
+        Drop the passages removed by ``update`` from the index and renumber the remaining ones.
+
+        Removed passages keep their (empty) slot in the index until compaction; retrievers loaded
+        before compacting must be reloaded.
+        """
+        logging.info(f"Compacting ColBERT index {self.index_dir}...")
+        return compact_index(str(self.index_dir))
+
     def _debug_indexing_failure(self, collection_path: str):
         """Debug helper for indexing failures."""
         logging.info("=== DEBUGGING INDEXING FAILURE ===")
@@ -4,9 +4,10 @@ import collections
 import math
 from functools import lru_cache
 from collections import Counter
-import tempfile
 import subprocess
 import os 
+from rankify.metrics.trec_eval import TrecEvaluator, load_qrels, resolve_qrels, run_from_documents
+from rankify.utils.answer_matching import annotate_answers
 def normalize_answer(s):
     """
     Normalizes an answer string by **removing punctuation, articles,** and **extra whitespace**.
@@ -444,10 +445,13 @@ class Metrics:
         Returns:
             float: **Top-K accuracy** (percentage).
         """
+        # Contexts retrieved with deferred answer matching get has_answer here
+        annotate_answers(self.documents)
         hits, total = 0, 0
         for document in self.documents:
-            contexts_to_use = document.reorder_contexts if (use_reordered and document.reorder_contexts) else document.contexts
-            if any(context.has_answer for context in contexts_to_use[:k]):
+            # Reads the reranker's index view directly instead of materializing reorder_contexts
+            contexts_to_use = document.ranked_contexts(k, use_reordered)
+            if any(context.has_answer for context in contexts_to_use):
                 hits += 1
             total += 1
         return (hits / total) * 100 if total > 0 else 0
@@ -502,68 +506,45 @@ class Metrics:
             name="bm25"
         for doc in self.documents:
             
-            contexts_to_use = doc.reorder_contexts if (use_reordered and doc.reorder_contexts) else doc.contexts
+            contexts_to_use = doc.ranked_contexts(use_reordered=use_reordered)
+            scores = doc.ranked_scores(use_reordered=use_reordered)
 
-            for rank, context in enumerate(contexts_to_use):
-                trec_results.append(f"{doc.id} Q0 {context.id} {rank + 1} {context.score} {name}")
+            for rank, (context, score) in enumerate(zip(contexts_to_use, scores)):
+                trec_results.append(f"{doc.id} Q0 {context.id} {rank + 1} {score} {name}")
         
         return "\n".join(trec_results)
 
-    def calculate_trec_metrics(self, ndcg_cuts=[10], map_cuts=[100], mrr_cuts=[10], qrel='dl19', use_reordered=False):
+    def calculate_trec_metrics(self, ndcg_cuts=[10], map_cuts=[100], mrr_cuts=[10], qrel='dl19', use_reordered=False,
+                               recall_cuts=[], precision_cuts=[], per_query=False):
         """
-        Computes **NDCG, MAP, and MRR** using Pyserini's `trec_eval` command-line tool.
+        Computes **NDCG, MAP, MRR, Recall and Precision** at the given cuts with the in-process
+        evaluator in `rankify.metrics.trec_eval` (same results as `trec_eval -c`, without a
+        subprocess per metric).
 
         Args:
             ndcg_cuts (list, optional): List of **NDCG@k** values (default: `[10]`).
             map_cuts (list, optional): List of **MAP@k** values (default: `[100]`).
-            mrr_cuts (list, optional): List of **MRR@k** values (default: `[10]`).
-            qrel (str, optional): The **dataset key** (default: `'dl19'`).
+            mrr_cuts (list, optional): List of **MRR@k** values (default: `[10]`); the reciprocal rank is
+                cut at k.
+            qrel (str, optional): The **dataset key** (default: `'dl19'`) or a path to a qrels file.
             use_reordered (bool, optional): Whether to use **reranked contexts**.
+            recall_cuts (list, optional): List of **Recall@k** values (default: none).
+            precision_cuts (list, optional): List of **P@k** values (default: none).
+            per_query (bool, optional): Also return the scores of every query under `"per_query"`.
 
         Returns:
-            dict: Dictionary containing **NDCG@k, MAP@k, and MRR@k** scores.
-        """
-        if os.path.exists(qrel):
-            qrel_path = qrel  # user gave a custom path like "./qrels.txt"
-        elif qrel in self.QREL_MAPPING:
-            qrel_path = self.QREL_MAPPING[qrel]
-        else:
-            raise ValueError(f"Invalid qrel: {qrel}. Must be a known key or a path to qrels.txt.")
-
-        results = {}
-
-        with tempfile.NamedTemporaryFile(delete=False, mode="w") as trec_file:
-            trec_file.write(self.generate_trec_format(use_reordered))
-            trec_file_path = trec_file.name
-
-        # Path to the TREC qrels file (ground-truth relevance file)
-        # Ensure `trec_eval` is installed and accessible
-        trec_eval_cmd = "python -m pyserini.eval.trec_eval"
-
-        for k in ndcg_cuts:
-            #cmd = f"{trec_eval_cmd} -c -m ndcg_cut.{k} {self.QREL_MAPPING[qrel]} {trec_file_path}"
-            cmd = f"{trec_eval_cmd} -c -m ndcg_cut.{k} {qrel_path} {trec_file_path}"
-
-            output = self.run_trec_eval(cmd)
-            results[f"ndcg@{k}"] = output
-
-        for k in map_cuts:
-            #cmd = f"{trec_eval_cmd} -c -m map_cut.{k} {self.QREL_MAPPING[qrel]} {trec_file_path}"
-            cmd = f"{trec_eval_cmd} -c -m map_cut.{k} {qrel_path} {trec_file_path}"
-
-            output = self.run_trec_eval(cmd)
-            results[f"map@{k}"] = output
-
-        for k in mrr_cuts:
-            #cmd = f"{trec_eval_cmd} -c -m recip_rank {self.QREL_MAPPING[qrel]} {trec_file_path}"
-            cmd = f"{trec_eval_cmd} -c -m recip_rank {qrel_path} {trec_file_path}"
-
-            output = self.run_trec_eval(cmd)
-            results[f"mrr@{k}"] = output
-
-        # Clean up temporary file
-        os.remove(trec_file_path)
-
+            dict: Dictionary containing **NDCG@k, MAP@k, MRR@k** (and any recall / precision cuts),
+            rounded to 4 decimals like `trec_eval`.
+        """
+        qrels = load_qrels(resolve_qrels(qrel, self.QREL_MAPPING))
+        evaluator = TrecEvaluator(qrels)
+        qids, docids, scores = run_from_documents(self.documents, use_reordered)
+        cuts = dict(ndcg_cuts=ndcg_cuts, map_cuts=map_cuts, mrr_cuts=mrr_cuts,
+                    recall_cuts=recall_cuts, precision_cuts=precision_cuts)
+
+        results = {name: round(value, 4) for name, value in evaluator.evaluate(qids, docids, scores, **cuts).items()}
+        if per_query:
+            results["per_query"] = evaluator.evaluate_per_query(qids, docids, scores, **cuts)
         return results
 
     def run_trec_eval(self, command):
@@ -2,11 +2,14 @@
 from typing import Dict, List, Optional
 import warnings
 
+from rankify.metrics.trec_eval import TrecEvaluator, load_qrels, resolve_qrels, run_from_documents
+from rankify.utils.answer_matching import annotate_answers
+
 class RetrieverMetrics:
     """
     Retrieval-side metrics:
       - Your Top@K accuracy (bm25 vs reranked)
-      - TREC (NDCG/MAP/MRR) via pyserini.trec_eval (kept)
+      - TREC (NDCG/MAP/MRR/Recall/P) via the in-process evaluator in rankify.metrics.trec_eval
       - RAGAS: Context Precision / Context Recall (+ Entities Recall optional)
     """
     QREL_MAPPING = {  # kept from your Metrics
@@ -23,10 +26,12 @@ class RetrieverMetrics:
 
     # ---------- Top-K ----------
     def top_k_accuracy(self, k: int, use_reordered: bool = False) -> float:
+        # Contexts retrieved with deferred answer matching get has_answer here
+        annotate_answers(self.documents)
         hits, total = 0, 0
         for document in self.documents:
-            contexts = document.reorder_contexts if (use_reordered and getattr(document, "reorder_contexts", None)) else document.contexts
-            if any(getattr(c, "has_answer", False) for c in (contexts or [])[:k]):
+            contexts = document.ranked_contexts(k, use_reordered)
+            if any(getattr(c, "has_answer", False) for c in contexts):
                 hits += 1
             total += 1
         return (hits / total) * 100 if total else 0.0
@@ -39,46 +44,21 @@ class RetrieverMetrics:
         name = "rankify" if use_reordered else "bm25"
         rows = []
         for doc in self.documents:
-            contexts = doc.reorder_contexts if (use_reordered and getattr(doc, "reorder_contexts", None)) else doc.contexts
-            for rank, ctx in enumerate(contexts or []):
-                rows.append(f"{doc.id} Q0 {ctx.id} {rank + 1} {getattr(ctx, 'score', 0.0)} {name}")
+            contexts = doc.ranked_contexts(use_reordered=use_reordered)
+            scores = doc.ranked_scores(use_reordered=use_reordered)
+            for rank, (ctx, score) in enumerate(zip(contexts, scores)):
+                rows.append(f"{doc.id} Q0 {ctx.id} {rank + 1} {score} {name}")
         return "\n".join(rows)
 
-    def trec_eval(self, ndcg_cuts=[10], map_cuts=[100], mrr_cuts=[10], qrel='dl19', use_reordered=False) -> Dict[str, float]:
-        import tempfile, subprocess, os
-        if os.path.exists(qrel):
-            qrel_path = qrel
-        elif qrel in self.QREL_MAPPING:
-            qrel_path = self.QREL_MAPPING[qrel]
-        else:
-            raise ValueError(f"Invalid qrel: {qrel}")
-
-        with tempfile.NamedTemporaryFile(delete=False, mode="w") as trec_file:
-            trec_file.write(self._generate_trec(use_reordered))
-            trec_file_path = trec_file.name
-
-        def run(cmd):
-            try:
-                out = subprocess.run(cmd.split(), capture_output=True, text=True, check=True)
-                lines = out.stdout.strip().splitlines()
-                if not lines: return 0.0
-                last = lines[-1].split()
-                return float(last[2]) if len(last) >= 3 else 0.0
-            except Exception as e:
-                warnings.warn(f"TREC eval failed: {e}")
-                return 0.0
-
-        base = "python -m pyserini.eval.trec_eval"
-        results = {}
-        for k in ndcg_cuts:
-            results[f"ndcg@{k}"] = run(f"{base} -c -m ndcg_cut.{k} {qrel_path} {trec_file_path}")
-        for k in map_cuts:
-            results[f"map@{k}"] = run(f"{base} -c -m map_cut.{k} {qrel_path} {trec_file_path}")
-        for k in mrr_cuts:
-            results[f"mrr@{k}"] = run(f"{base} -c -m recip_rank {qrel_path} {trec_file_path}")
-
-        os.remove(trec_file_path)
-        return results
+    def trec_eval(self, ndcg_cuts=[10], map_cuts=[100], mrr_cuts=[10], qrel='dl19', use_reordered=False,
+                  recall_cuts=[], precision_cuts=[]) -> Dict[str, float]:
+        # In-process evaluation (rankify.metrics.trec_eval); no trec_eval subprocess per cut
+        qrels = load_qrels(resolve_qrels(qrel, self.QREL_MAPPING))
+        qids, docids, scores = run_from_documents(self.documents, use_reordered)
+        results = TrecEvaluator(qrels).evaluate(qids, docids, scores, ndcg_cuts=ndcg_cuts, map_cuts=map_cuts,
+                                                mrr_cuts=mrr_cuts, recall_cuts=recall_cuts,
+                                                precision_cuts=precision_cuts)
+        return {name: round(value, 4) for name, value in results.items()}
 
     # ---------- RAGAS (retriever) ----------
     def ragas_retriever(self, predictions: List[str], judge_models, use_reordered_contexts: bool = True,
@@ -0,0 +1,279 @@
+"""
+In-process, vectorized TREC evaluation.
+
+Replaces the ``python -m pyserini.eval.trec_eval`` subprocess (one JVM per metric and cut) with a
+NumPy evaluator that follows ``trec_eval`` semantics:
+
+* the run is ordered by descending score, ties broken by descending document id,
+* a document is relevant when its judgment is ``>= relevance_level`` (default 1),
+* nDCG uses the judgment value as gain and ``log2(rank + 1)`` as discount,
+* queries that are judged but missing from the run count as 0 (``trec_eval -c``); run queries
+  without judgments are ignored.
+
+Qrels are loaded once into sorted key arrays; a run is turned into a ``queries x depth`` gain
+matrix with a single sort, and every metric at every cut is computed from that matrix.
+
+Example:
+    ```python
+    from rankify.metrics.trec_eval import TrecEvaluator, load_qrels, read_run
+
+    evaluator = TrecEvaluator(load_qrels("qrels.dl19-passage.txt"))
+    qids, docids, scores = read_run("run.trec")
+    evaluator.evaluate(qids, docids, scores, ndcg_cuts=[1, 5, 10], map_cuts=[100], mrr_cuts=[10])
+    # {'ndcg@1': ..., 'ndcg@5': ..., 'ndcg@10': ..., 'map@100': ..., 'mrr@10': ...}
+    ```
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_QRELS_CACHE: Dict[Tuple[str, int], "Qrels"] = {}
+
+
+class Qrels:
+    """
+    Relevance judgments indexed for vectorized lookup.
+
+    Attributes:
+        qids (np.ndarray): Sorted unique judged query ids (str).
+        keys (np.ndarray): Sorted ``"qid\\tdocid"`` keys of all judgments.
+        rels (np.ndarray): int64 judgment per key.
+    """
+
+    def __init__(self, qids: Sequence[str], docids: Sequence[str], rels: Sequence[int]):
+        qids = np.asarray(qids, dtype=str)
+        docids = np.asarray(docids, dtype=str)
+        keys = np.char.add(np.char.add(qids, "\t"), docids)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.rels = np.asarray(rels, dtype=np.int64)[order]
+        self._key_qids = qids[order]
+        self.qids = np.unique(qids)
+
+    @classmethod
+    def load(cls, path: str) -> "Qrels":
+        """
+        Parses a TREC qrels file (``qid iter docid rel`` per line).
+        """
+        qids, docids, rels = [], [], []
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) < 4:
+                    continue
+                qids.append(parts[0])
+                docids.append(parts[2])
+                rels.append(int(parts[3]))
+        return cls(qids, docids, rels)
+
+    @classmethod
+    def from_dict(cls, qrels: Dict[str, Dict[str, int]]) -> "Qrels":
+        """
+        Builds qrels from ``{qid: {docid: rel}}``.
+        """
+        triples = [(str(q), str(d), int(r)) for q, judged in qrels.items() for d, r in judged.items()]
+        if not triples:
+            return cls([], [], [])
+        qids, docids, rels = zip(*triples)
+        return cls(qids, docids, rels)
+
+    def lookup(self, qids: np.ndarray, docids: np.ndarray) -> np.ndarray:
+        """
+        Returns the judgment of every ``(qid, docid)`` pair, 0 for unjudged pairs.
+        """
+        if len(self.keys) == 0 or len(qids) == 0:
+            return np.zeros(len(qids), dtype=np.int64)
+        keys = np.char.add(np.char.add(np.asarray(qids, dtype=str), "\t"), np.asarray(docids, dtype=str))
+        position = np.searchsorted(self.keys, keys).clip(max=len(self.keys) - 1)
+        found = self.keys[position] == keys
+        return np.where(found, self.rels[position], 0)
+
+    def ideal_gains(self, depth: int) -> np.ndarray:
+        """
+        Returns a ``len(qids) x depth`` matrix of each query's positive judgments, sorted descending.
+        """
+        query = np.searchsorted(self.qids, self._key_qids)
+        gains = np.maximum(self.rels, 0)
+        order = np.lexsort((-gains, query))
+        query, gains = query[order], gains[order]
+        starts = np.searchsorted(query, np.arange(len(self.qids)))
+        position = np.arange(len(query)) - starts[query]
+        ideal = np.zeros((len(self.qids), depth), dtype=np.float64)
+        keep = position < depth
+        ideal[query[keep], position[keep]] = gains[keep]
+        return ideal
+
+    def num_relevant(self, relevance_level: int = 1) -> np.ndarray:
+        """
+        Returns the number of relevant judgments of every query in ``qids``.
+        """
+        query = np.searchsorted(self.qids, self._key_qids)
+        return np.bincount(query, weights=self.rels >= relevance_level, minlength=len(self.qids))
+
+
+def load_qrels(path: str) -> Qrels:
+    """
+    Loads a qrels file, reusing the parsed judgments while the file is unchanged.
+    """
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    if key not in _QRELS_CACHE:
+        _QRELS_CACHE[key] = Qrels.load(path)
+    return _QRELS_CACHE[key]
+
+
+def resolve_qrels(qrel: str, mapping: Optional[Dict[str, str]] = None) -> str:
+    """
+    Resolves a qrels path, a dataset key from ``mapping`` (e.g. ``'dl19'``) or a Pyserini qrels
+    name (e.g. ``'dl19-passage'``) to a local qrels file.
+
+    Raises:
+        ValueError: If the name cannot be resolved.
+    """
+    if os.path.exists(qrel):
+        return qrel
+    name = (mapping or {}).get(qrel, qrel)
+    try:
+        from pyserini.search import get_qrels_file
+    except ImportError:
+        raise ValueError(f"Invalid qrel: {qrel}. Pass a path to a qrels file, or install pyserini to use named qrels.")
+    try:
+        return get_qrels_file(name)
+    except Exception as e:
+        raise ValueError(f"Invalid qrel: {qrel}. Must be a known key or a path to qrels.txt.") from e
+
+
+def run_from_documents(documents: Iterable, use_reordered: bool = False) -> Tuple[List[str], List[str], List[float]]:
+    """
+    Flattens documents into ``(qids, docids, scores)`` run columns.
+
+    Documents with a missing score keep their listed order (scores ``0, -1, -2, ...``).
+    """
+    qids, docids, scores = [], [], []
+    for document in documents:
+        contexts = document.ranked_contexts(use_reordered=use_reordered)
+        ranked_scores = document.ranked_scores(use_reordered=use_reordered)
+        if any(score is None for score in ranked_scores):
+            ranked_scores = [-float(rank) for rank in range(len(contexts))]
+        qids.extend([str(document.id)] * len(contexts))
+        docids.extend(str(context.id) for context in contexts)
+        scores.extend(ranked_scores)
+    return qids, docids, scores
+
+
+def read_run(path: str) -> Tuple[List[str], List[str], List[float]]:
+    """
+    Parses a TREC run file (``qid Q0 docid rank score tag``) into run columns.
+    """
+    qids, docids, scores = [], [], []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            qids.append(parts[0])
+            docids.append(parts[2])
+            scores.append(float(parts[4]))
+    return qids, docids, scores
+
+
+class TrecEvaluator:
+    """
+    Computes nDCG@k, MAP@k, MRR@k, Recall@k and P@k for every cut in one pass over a run.
+
+    Attributes:
+        qrels (Qrels): The relevance judgments.
+        relevance_level (int): Minimum judgment counted as relevant (``trec_eval -l``).
+    """
+
+    def __init__(self, qrels: Qrels, relevance_level: int = 1):
+        self.qrels = qrels
+        self.relevance_level = relevance_level
+        self._num_rel = qrels.num_relevant(relevance_level)
+
+    def _gain_matrix(self, qids, docids, scores, depth: int) -> np.ndarray:
+        qids = np.asarray(qids, dtype=str)
+        docids = np.asarray(docids, dtype=str)
+        scores = np.asarray(scores, dtype=np.float64)
+        gains = np.zeros((len(self.qrels.qids), depth), dtype=np.float64)
+        if len(qids) == 0 or len(self.qrels.qids) == 0:
+            return gains
+
+        query = np.searchsorted(self.qrels.qids, qids).clip(max=len(self.qrels.qids) - 1)
+        judged = self.qrels.qids[query] == qids
+        qids, docids, scores, query = qids[judged], docids[judged], scores[judged], query[judged]
+
+        # trec_eval order: score descending, ties by document id descending
+        _, docid_rank = np.unique(docids, return_inverse=True)
+        order = np.lexsort((-docid_rank, -scores, query))
+        query = query[order]
+        starts = np.searchsorted(query, np.arange(len(self.qrels.qids)))
+        position = np.arange(len(query)) - starts[query]
+        keep = position < depth
+        rels = self.qrels.lookup(qids[order][keep], docids[order][keep])
+        gains[query[keep], position[keep]] = rels
+        return gains
+
+    def _evaluate(self, qids, docids, scores, ndcg_cuts, map_cuts, mrr_cuts,
+                  recall_cuts, precision_cuts) -> Dict[str, np.ndarray]:
+        cuts = [int(k) for k in (*ndcg_cuts, *map_cuts, *mrr_cuts, *recall_cuts, *precision_cuts)]
+        depth = max(cuts, default=1)
+        gains = self._gain_matrix(qids, docids, scores, depth)
+        relevant = gains >= self.relevance_level
+        # Negative judgments contribute no gain
+        gains = np.maximum(gains, 0)
+        num_rel = self._num_rel
+        safe_rel = np.where(num_rel > 0, num_rel, 1)
+        ranks = np.arange(1, depth + 1, dtype=np.float64)
+        hits = np.cumsum(relevant, axis=1)
+
+        results = {}
+        if ndcg_cuts:
+            discount = 1.0 / np.log2(ranks + 1)
+            dcg = np.cumsum(gains * discount, axis=1)
+            idcg = np.cumsum(self.qrels.ideal_gains(depth) * discount, axis=1)
+            for k in ndcg_cuts:
+                ideal = idcg[:, k - 1]
+                results[f"ndcg@{k}"] = np.where(ideal > 0, dcg[:, k - 1] / np.where(ideal > 0, ideal, 1), 0.0)
+        if map_cuts:
+            precision_sum = np.cumsum(relevant * hits / ranks, axis=1)
+            for k in map_cuts:
+                results[f"map@{k}"] = np.where(num_rel > 0, precision_sum[:, k - 1] / safe_rel, 0.0)
+        if mrr_cuts:
+            first = np.where(relevant.any(axis=1), relevant.argmax(axis=1) + 1, depth + 1)
+            for k in mrr_cuts:
+                results[f"mrr@{k}"] = np.where(first <= k, 1.0 / first, 0.0)
+        for k in recall_cuts:
+            results[f"recall@{k}"] = np.where(num_rel > 0, hits[:, k - 1] / safe_rel, 0.0)
+        for k in precision_cuts:
+            results[f"precision@{k}"] = hits[:, k - 1] / k
+        return results
+
+    def evaluate(self, qids, docids, scores, ndcg_cuts: Sequence[int] = (10,), map_cuts: Sequence[int] = (100,),
+                 mrr_cuts: Sequence[int] = (10,), recall_cuts: Sequence[int] = (),
+                 precision_cuts: Sequence[int] = ()) -> Dict[str, float]:
+        """
+        Averages every metric over all judged queries.
+
+        Args:
+            qids, docids, scores: Parallel run columns (one entry per retrieved document).
+            ndcg_cuts, map_cuts, mrr_cuts, recall_cuts, precision_cuts: Cut-offs per metric.
+
+        Returns:
+            dict: ``{"ndcg@10": ..., "map@100": ..., "mrr@10": ..., "recall@k": ..., "precision@k": ...}``.
+        """
+        per_query = self._evaluate(qids, docids, scores, ndcg_cuts, map_cuts, mrr_cuts, recall_cuts, precision_cuts)
+        return {name: float(values.mean()) if len(values) else 0.0 for name, values in per_query.items()}
+
+    def evaluate_per_query(self, qids, docids, scores, ndcg_cuts: Sequence[int] = (10,),
+                           map_cuts: Sequence[int] = (100,), mrr_cuts: Sequence[int] = (10,),
+                           recall_cuts: Sequence[int] = (), precision_cuts: Sequence[int] = ()) -> Dict[str, Dict[str, float]]:
+        """
+        Same as ``evaluate`` but returns ``{qid: {metric: value}}`` for every judged query.
+        """
+        per_query = self._evaluate(qids, docids, scores, ndcg_cuts, map_cuts, mrr_cuts, recall_cuts, precision_cuts)
+        return {
+            qid: {name: float(values[i]) for name, values in per_query.items()}
+            for i, qid in enumerate(self.qrels.qids.tolist())
+        }
@@ -8,10 +8,9 @@ from rankify.utils.pre_defind_models import (
     API_RESULTS_KEY_MAPPING,
     API_SCORE_KEY_MAPPING
 )
-import requests
+from rankify.utils.api.async_client import get_api_client
 import json
 import copy
-from tqdm import tqdm  # Import tqdm for progress tracking
 
 class APIRanker(BaseRanking):
     """
@@ -26,6 +25,8 @@ class APIRanker(BaseRanking):
         api_provider (str): The name of the API provider (e.g., `"cohere"`, `"jina"`, `"voyage"`).
         url (str): The API endpoint URL.
         headers (dict): The headers required for making API requests.
+        api (APIClient): The provider's shared client; documents are reranked concurrently through it,
+            within its rate limit and concurrency bound, with transient failures retried.
 
     Raises:
         ValueError: If the specified API provider is not supported.
@@ -42,6 +43,8 @@ class APIRanker(BaseRanking):
             method (str): The ranking method.
             model_name (str): The model name for the API provider.
             api_key (str): The API key for the service.
+            **kwargs: Optional ``endpoint`` for models not in the URL table, and the provider limits
+                ``requests_per_second``, ``max_concurrency`` and ``max_retries`` (see ``ProviderLimits``).
 
         Raises:
             ValueError: If the specified API provider is not supported.
@@ -79,6 +82,12 @@ class APIRanker(BaseRanking):
             "content-type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
         }
+        self.api = get_api_client(
+            self.url,
+            requests_per_second=kwargs.get("requests_per_second"),
+            max_concurrency=kwargs.get("max_concurrency"),
+            max_retries=kwargs.get("max_retries"),
+        )
 
     def rank(self, documents: List[Document]) -> List[Document]:
         """
@@ -104,15 +113,14 @@ class APIRanker(BaseRanking):
             ranked_docs = model.rank([document])
             ```
         """
-        for doc in tqdm(documents, desc="Reranking Documents"):
-            query = doc.question.question
-            payload = self._format_payload(query, doc.contexts)
-            response = requests.post(self.url, headers=self.headers, data=payload)
-            response_data = response.json()
-            self._parse_response(response_data, doc)
-        
+        self.api.map(self._rank_document, documents, desc="Reranking Documents")
         return documents
 
+    async def _rank_document(self, doc: Document) -> None:
+        payload = self._format_payload(doc.question.question, doc.contexts)
+        response = await self.api.request("POST", self.url, headers=self.headers, content=payload)
+        self._parse_response(response.json(), doc)
+
     def _format_payload(self, query: str, contexts: List[Context]) -> str:
         """
         Prepares the payload for the API request for a single document.
@@ -169,10 +177,13 @@ class APIRanker(BaseRanking):
         
         results = response.get(results_key, response)
 
-        # Create a list to hold the reordered contexts
-        reordered_contexts = []
+        # Positions of the original contexts by text (first occurrence wins)
+        text_to_index = {}
+        for index, context in enumerate(document.contexts):
+            text_to_index.setdefault(context.text, index)
 
         # Map each result to a context
+        indices, scores = [], []
         for result in results:
             # Extract text and score
             
@@ -184,11 +195,10 @@ class APIRanker(BaseRanking):
             score = result.get(score_key, 0.0)
 
             # Find the matching context in the original list
-            matching_context = next((context for context in document.contexts if context.text == text), None)
-            if matching_context:
-                # Update score and add to reordered list
-                matching_context.score = score
-                reordered_contexts.append(matching_context)
-
-        # Assign reordered contexts directly from the API response order
-        document.reorder_contexts = reordered_contexts
+            index = text_to_index.get(text)
+            if index is not None:
+                indices.append(index)
+                scores.append(score)
+
+        # Record the API response order as the document's reorder view
+        document.set_reorder(indices, scores)
@@ -6,7 +6,6 @@ from typing import List
 from tqdm import tqdm  # Import tqdm for progress tracking
 from llm_blender.pair_ranker.config import RankerConfig  # Adjust import path if needed
 
-import copy
 
 class BlenderReranker(BaseRanking):
     """
@@ -130,17 +129,8 @@ class BlenderReranker(BaseRanking):
         if ranks.size == 0 or len(ranks[0]) != len(candidate_texts):
             raise ValueError("Invalid ranks returned from LLM-Blender.")
 
-        # Map ranks to contexts
-        contexts = copy.deepcopy(document.contexts)
-        ranked_contexts = []
-        for score, idx in zip(scores[0], ranks[0]):
-            ctx= contexts[idx-1]
-            ctx.score= score
-            ranked_contexts.append(ctx)
-
-
-        # Update the document's reordered contexts
-        document.reorder_contexts = ranked_contexts
+        # Map ranks to contexts and record them as the document's reorder view
+        document.set_reorder([idx - 1 for idx in ranks[0]], scores[0])
         return document
     
 
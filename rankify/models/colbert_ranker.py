@@ -7,7 +7,6 @@ from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
 from rankify.utils.models.colbert import _insert_token, _colbert_score, ColBERTModel  # Assume you provide these helpers unchanged
 from tqdm import tqdm  # Import tqdm for progress tracking
-import copy
 
 class ColBERTReranker(BaseRanking):
     """
@@ -123,18 +122,13 @@ class ColBERTReranker(BaseRanking):
                 # Skip document if no valid contexts
                 print(f"[SKIP] Document skipped — no valid contexts. Query: '{query}'")
                 continue
-            contexts = [copy.deepcopy(ctx.text) for ctx in document.contexts]
+            contexts = [ctx.text for ctx in document.contexts]
 
             # Compute scores
             scores = self._colbert_rank(query, contexts)
 
             # Reorder contexts based on scores
-            document.reorder_contexts = []
-            ranked_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
-            for index in ranked_indices:
-                d =copy.deepcopy(document.contexts[index]) 
-                d.score= scores[index]
-                document.reorder_contexts.append(d)
+            document.rerank_by_scores(scores)
         return documents
     
     @torch.inference_mode()
@@ -1,4 +1,3 @@
-import copy
 from typing import List, Optional
 
 import torch
@@ -130,19 +129,14 @@ class DeARReranker(BaseRanking):
         """
         for document in tqdm(documents, desc="Reranking Documents"):
             query = document.question.question
-            contexts = copy.deepcopy(document.contexts)
+            contexts = document.contexts
 
             query_texts = [f"query: {query}"] * len(contexts)
             doc_texts = [f"document: {ctx.text}" for ctx in contexts]
 
             scores = self._score_batched(query_texts, doc_texts)
 
-            for ctx, score in zip(contexts, scores):
-                ctx.score = score
-
-            document.reorder_contexts = sorted(
-                contexts, key=lambda x: x.score, reverse=True
-            )
+            document.rerank_by_scores(scores)
 
         return documents
 
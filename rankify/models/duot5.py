@@ -2,7 +2,6 @@ import logging
 from math import ceil
 from typing import List, Optional
 
-import copy
 import torch
 from tqdm import tqdm
 from transformers import T5ForConditionalGeneration, T5Tokenizer
@@ -137,7 +136,7 @@ class DuoT5(BaseRanking):
             n = len(doc_texts)
 
             if n <= 1:
-                doc.reorder_contexts = copy.deepcopy(doc.contexts)
+                doc.set_reorder(range(n))
                 continue
 
             score_matrix = self._get_pairwise_scores(
@@ -150,11 +149,7 @@ class DuoT5(BaseRanking):
                 for i in range(n)
             ]
 
-            contexts = copy.deepcopy(doc.contexts)
-            for ctx, score in zip(contexts, agg_scores):
-                ctx.score = score
-
-            doc.reorder_contexts = sorted(contexts, key=lambda x: x.score, reverse=True)
+            doc.rerank_by_scores(agg_scores)
 
         return documents
 
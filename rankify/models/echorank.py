@@ -110,10 +110,12 @@ Output Passage A or Passage B."""
                         reranked_list[i], reranked_list[i + 1] = b, a
             #print("aaaaaaaaaaa")
             # Final Output
-            for idx, ctx in enumerate(reranked_list):
-                ctx.score = 1.0 - idx / len(reranked_list)  # higher score = more relevant
-            #print("aaaaaaaaaaa")
-            document.reorder_contexts = reranked_list
+            position = {id(ctx): i for i, ctx in enumerate(document.contexts)}
+            document.set_reorder(
+                [position[id(ctx)] for ctx in reranked_list],
+                # higher score = more relevant
+                [1.0 - idx / len(reranked_list) for idx in range(len(reranked_list))],
+            )
 
         return documents
 
@@ -182,9 +182,9 @@ class FirstModelReranker(BaseRanking):
         )
         #print(reranked_result)
         # Update `Document.reorder_contexts` based on reranked `hits`
-        context_dict = {ctx.id: ctx for ctx in document.contexts}
+        position = {ctx.id: i for i, ctx in enumerate(document.contexts)}
 
-        document.reorder_contexts = [
-            context_dict[hit["docid"]] for hit in reranked_result.hits if hit["docid"] in context_dict
-        ]
+        document.set_reorder([
+            position[hit["docid"]] for hit in reranked_result.hits if hit["docid"] in position
+        ])
 
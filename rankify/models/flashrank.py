@@ -3,7 +3,7 @@ from pathlib import Path
 from tokenizers import AddedToken, Tokenizer
 import onnxruntime as ort
 import numpy as np
-from rankify.dataset.dataset import Document
+from rankify.dataset.dataset import Document, Question, Answer
 
 import os
 import zipfile
@@ -14,9 +14,7 @@ import collections
 from typing import Optional, List, Dict, Any
 import logging
 from rankify.models.base import BaseRanking
-from tqdm import tqdm  # Import tqdm for progress tracking
-
-import copy
+from rankify.utils.pair_scheduler import PairScheduler
 
 class FlashRanker(BaseRanking):
     """
@@ -82,6 +80,8 @@ class FlashRanker(BaseRanking):
             model_name (str, optional): The name of the reranking model to be used.
             model_dir (str, optional): Path to a custom model directory if the user provides their own model.
             api_key (str, optional): API key for remote access (if applicable).
+            batch_size (int, optional): Query-passage pairs per ONNX call (default: 64).
+            max_batch_tokens (int, optional): Padded-token budget per ONNX call (default: no limit).
 
         Raises:
             ValueError: If an invalid model name is provided or model files are missing.
@@ -138,6 +138,7 @@ class FlashRanker(BaseRanking):
         else:
             self.session = ort.InferenceSession(str(self.model_dir / model_file))
             self.tokenizer: Tokenizer = self._get_tokenizer(max_length)
+            self.scheduler = PairScheduler(kwargs.get("batch_size", 64), kwargs.get("max_batch_tokens"))
 
     def _prepare_model_dir(self, model_name: str):
         """
@@ -279,16 +280,16 @@ class FlashRanker(BaseRanking):
         Returns:
             List[Document]: Documents with updated `reorder_contexts` after reranking.
         """
-        for document in tqdm(documents, desc="Reranking Documents"):
-            if len(document.contexts) == 0:
-                continue
-            query = document.question.question
-            passages = document.contexts
-            if self.llm_model is not None:
-                document.reorder_contexts=self._listwisellm(query,passages)
-            else:
-                document.reorder_contexts=self._pairwisecrossencoding(query,passages)
+        documents_to_rank = [document for document in documents if len(document.contexts) > 0]
+        if self.llm_model is None:
+            # Pairs from all documents are scored together in length-sorted batches
+            self.scheduler.rank(documents_to_rank, self._encode_pairs, self._score_encoded)
+            return documents
+
+        for document in tqdm(documents_to_rank, desc="Reranking Documents"):
+            document.reorder_contexts = self._listwisellm(document.question.question, document.contexts)
         return documents
+
     def _listwisellm(self,query,passages):
         """
         Performs listwise reranking using an LLM model.
@@ -333,31 +334,41 @@ class FlashRanker(BaseRanking):
             return results    
 
         # self.session will be instantiated for ONNX based pairwise CE models
-    def _pairwisecrossencoding(self,query,passages):
+    def _encode_pairs(self, queries, texts):
         """
-        Performs pairwise cross-encoding reranking using an ONNX-based model.
+        Tokenizes query-passage pairs once for `PairScheduler`.
 
-        Args:
-            query (str): The search query.
-            passages (List[Document]): The list of passages to be ranked.
+        The pairs are padded to the longest pair of the window here; each batch is trimmed
+        to its own longest pair in `_score_encoded`.
 
         Returns:
-            List[Document]: Passages sorted in descending order of relevance.
+            tuple: (dict of int64 arrays, per-pair token lengths)
         """
-        passages_copy = copy.deepcopy(passages)
-        self.logger.debug("Running pairwise ranking..")
-        query_passage_pairs = [[query, passage.text] for passage in passages_copy]
+        encoded = self.tokenizer.encode_batch(list(zip(queries, texts)))
+        features = {
+            "input_ids": np.array([e.ids for e in encoded], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encoded], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encoded], dtype=np.int64),
+        }
+        return features, features["attention_mask"].sum(axis=1)
 
-        input_text = self.tokenizer.encode_batch(query_passage_pairs)
-        input_ids = np.array([e.ids for e in input_text])
-        token_type_ids = np.array([e.type_ids for e in input_text])
-        attention_mask = np.array([e.attention_mask for e in input_text])
+    def _score_encoded(self, features, indices):
+        """
+        Runs the ONNX cross-encoder on the pre-tokenized pairs at `indices`.
+
+        Returns:
+            np.ndarray: Relevance probability for each pair.
+        """
+        max_len = int(features["attention_mask"][indices].sum(axis=1).max())
+        input_ids = features["input_ids"][indices, :max_len]
+        token_type_ids = features["token_type_ids"][indices, :max_len]
+        attention_mask = features["attention_mask"][indices, :max_len]
 
         use_token_type_ids = token_type_ids is not None and not np.all(token_type_ids == 0)
 
-        onnx_input = {"input_ids": input_ids.astype(np.int64), "attention_mask": attention_mask.astype(np.int64)}
+        onnx_input = {"input_ids": input_ids, "attention_mask": attention_mask}
         if use_token_type_ids:
-            onnx_input["token_type_ids"] = token_type_ids.astype(np.int64)
+            onnx_input["token_type_ids"] = token_type_ids
 
         outputs = self.session.run(None, onnx_input)
 
@@ -368,9 +379,20 @@ class FlashRanker(BaseRanking):
         else:
             exp_logits = np.exp(logits)
             scores = exp_logits[:, 1] / np.sum(exp_logits, axis=1)
+        return scores
+
+    def _pairwisecrossencoding(self, query, passages):
+        """
+        Performs pairwise cross-encoding reranking of a single query using an ONNX-based model.
 
-        for score, passage in zip(scores, passages_copy):
-            passage.score = score
+        Args:
+            query (str): The search query.
+            passages (List[Document]): The list of passages to be ranked.
 
-        passages_copy.sort(key=lambda x: x.score, reverse=True)
-        return passages_copy
\ No newline at end of file
+        Returns:
+            List[Document]: Passages sorted in descending order of relevance.
+        """
+        self.logger.debug("Running pairwise ranking..")
+        document = Document(question=Question(query), answers=Answer([]), contexts=passages)
+        self.scheduler.rank([document], self._encode_pairs, self._score_encoded)
+        return document.reorder_contexts
@@ -10,7 +10,6 @@ from transformers.models.mistral.modeling_mistral import repeat_kv
 from rankify.utils.models.incontext_reranker.custom_modeling_llama import LlamaForCausalLM
 import transformers
 import gc
-import copy
 from tqdm import tqdm  # Import tqdm for progress tracking
 
 class InContextReranker(BaseRanking):
@@ -247,12 +246,11 @@ class InContextReranker(BaseRanking):
             sorted_doc_ids, sorted_doc_scores = self.rerank(query, contexts, order="desc")[0]
             #print(sorted_doc_ids, sorted_doc_scores)
             # Assign scores and reorder contexts
-            copy_context = copy.deepcopy(document.contexts)
+            scores = [ctx.score for ctx in document.contexts]
             for idx, ctx_id in enumerate(sorted_doc_ids):
-                copy_context[ctx_id].score = sorted_doc_scores[idx]
+                scores[ctx_id] = sorted_doc_scores[idx]
 
-            ranked_contexts = sorted(copy_context, key=lambda x: x.score, reverse=True)
-            document.reorder_contexts = ranked_contexts
+            document.rerank_by_scores(scores)
 
             
         return documents
@@ -6,8 +6,7 @@ from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
 from rankify.dataset.dataset import Context
-import copy
-from tqdm import tqdm  # Import tqdm for progress tracking
+from rankify.utils.pair_scheduler import PairScheduler, hf_encode, hf_collate
 
 class InRanker(BaseRanking):
     """
@@ -82,6 +81,7 @@ class InRanker(BaseRanking):
                 - `device` (str): `"cuda"` or `"cpu"` (default: `"cuda"`).
                 - `batch_size` (int): Number of query-document pairs per batch (default: `32`).
                 - `max_length` (int): Maximum sequence length for tokenization (default: `512`).
+                - `max_batch_tokens` (int): Padded-token budget per batch (default: no limit).
 
         Example:
             ```python
@@ -95,6 +95,7 @@ class InRanker(BaseRanking):
         self.batch_size = kwargs.get("batch_size", 32)
         self.device = kwargs.get("device" , "cuda")
         self.max_length = kwargs.get("max_length",512)
+        self.scheduler = PairScheduler(self.batch_size, kwargs.get("max_batch_tokens"))
         if self.precision == "bf16":
             model_args["torch_dtype"] =  torch.bfloat16
         elif self.precision == "fp16":
@@ -129,53 +130,36 @@ class InRanker(BaseRanking):
             reranked_docs = model.rank(documents)
             ```
         """
-        
-
-        for document in tqdm(documents, desc="Reranking Documents"):
-            scores =[]
-            logits = []
-            context_copy= copy.deepcopy(document.contexts)
-            for batch in self._chunks(document.contexts,self.batch_size):
-                
-                
-                queries_documents = [ 
-                    f"Query: {document.question.question} Document: {context.text} Relevant:" for context in batch
-                ]
-                tokenized = self.tokenizer(queries_documents,
-                                           padding=True,
-                                           truncation="longest_first",
-                                           return_tensors="pt",
-                                           max_length=self.max_length).to(self.device)
-                
-                
-                input_ids = tokenized["input_ids"].to(self.device)
-                attention_mask = tokenized["attention_mask"].to(self.device)
-                _ , batch_scores = self._greedy_decode(
-                    model = self.model,
-                    input_ids = input_ids,
-                    length= 1,
-                    attention_mask= attention_mask,
-                    return_last_logits=True
-                )
-
-                batch_scores = batch_scores[:,[self.token_false_id, self.token_true_id]]
-                logits.extend(batch_scores.tolist())
-
-                batch_scores = torch.log_softmax(batch_scores,dim=-1)
-                batch_scores = torch.exp(batch_scores[:,1])
-                batch_scores = batch_scores.tolist()
-
-                scores.extend(batch_scores)
-            
-            for score, context in zip(scores, context_copy):
-                 context.score = score
-            
-            context_copy.sort(key=lambda x:x.score, reverse=True)
-            document.reorder_contexts = context_copy
-        
-        return documents
+        def encode(queries, texts):
+            queries_documents = [
+                f"Query: {query} Document: {text} Relevant:" for query, text in zip(queries, texts)
+            ]
+            return hf_encode(self.tokenizer, queries_documents,
+                             truncation="longest_first", max_length=self.max_length)
+
+        # Pairs from all documents are scored together in length-sorted batches
+        return self.scheduler.rank(documents, encode, self._score_encoded)
+
+    @torch.no_grad()
+    def _score_encoded(self, encoding, indices) -> List[float]:
+        """
+        Scores the pre-tokenized query-document pairs at `indices`.
+
+        Returns:
+            List[float]: Probability of the `"true"` token for each pair.
+        """
+        tokenized = hf_collate(self.tokenizer, encoding, indices, self.device)
+        _, batch_scores = self._greedy_decode(
+            model=self.model,
+            input_ids=tokenized["input_ids"],
+            length=1,
+            attention_mask=tokenized["attention_mask"],
+            return_last_logits=True
+        )
+        batch_scores = batch_scores[:, [self.token_false_id, self.token_true_id]]
+        batch_scores = torch.log_softmax(batch_scores.float(), dim=-1)
+        return torch.exp(batch_scores[:, 1]).tolist()
 
-    
     @torch.no_grad()
     def _greedy_decode(self,model,
         input_ids: torch.Tensor,
@@ -3,7 +3,6 @@ from transformers import T5Tokenizer
 from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
 from typing import List
-import copy
 
 from rankify.utils.models.fidt5 import FiDT5
 from tqdm import tqdm  # Import tqdm for progress tracking
@@ -132,8 +131,8 @@ class ListT5(BaseRanking):
             ```
         """
         for document in tqdm(documents, desc="Reranking Documents"):
-            reordered_contexts = self._run_tournament_sort(document)
-            document.reorder_contexts = reordered_contexts
+            reordered_indices, reordered_scores = self._run_tournament_sort(document)
+            document.set_reorder(reordered_indices, reordered_scores)
         return documents
 
     def _run_tournament_sort(self, document):
@@ -144,7 +143,7 @@ class ListT5(BaseRanking):
             document (Document): The document whose contexts will be reranked.
 
         Returns:
-            List[Context]: The reordered list of contexts.
+            Tuple[List[int], List[float]]: Context indices in reranked order and their scores.
         """
         question = document.question.question
         contexts = [ctx.text for ctx in document.contexts]
@@ -165,12 +164,8 @@ class ListT5(BaseRanking):
         if len(saved_top_indices) < len(full_list_idx):
             remaining_indices = [idx for idx in full_list_idx if idx not in saved_top_indices]
             saved_top_indices.extend(remaining_indices)
-        reranked_contexts= []
-        copy_document= copy.deepcopy(document)
-        for idx , score in zip(saved_top_indices,scores):
-            copy_document.contexts[idx].score= score 
-            reranked_contexts.append(copy_document.contexts[idx])
-        return reranked_contexts #[document.contexts[idx] for idx in saved_top_indices]
+        # Ranked positions keep the original (descending) score sequence
+        return saved_top_indices, scores[:len(saved_top_indices)]
 
     def _get_out_k(self, question, contexts, chunk):
         """
@@ -7,7 +7,6 @@ from typing import List
 from rankify.utils.models.rank_llm.rerank import Reranker
 from rankify.utils.models.rank_llm.data import Request
 from tqdm import tqdm  # Import tqdm for progress tracking
-import copy 
 
 class LiT5DistillReranker(BaseRanking):
     """
@@ -115,22 +114,14 @@ class LiT5DistillReranker(BaseRanking):
             shuffle_candidates=shuffle_candidates,
             #logging=logging,
         )
-            # Create a mapping from docid to the original context
-        
-        contexts = copy.deepcopy(document.contexts)
-        docid_to_context = {str(ctx.id): ctx for ctx in contexts}
-        #print("Hello")
-        #print(docid_to_context)
-        #print(reranked_result.candidates)
+        # Map docids back to positions in the original contexts
+        docid_to_index = {str(ctx.id): i for i, ctx in enumerate(document.contexts)}
+
         # Reorder contexts based on reranked_result
-        reorder_contexts = []
-        for candidate in reranked_result.candidates:
-            #print(candidate)
-            d = docid_to_context[str(candidate["docid"])]
-            #print(d)
-            d.score = candidate["score"]
-            reorder_contexts.append(d)
-        document.reorder_contexts = reorder_contexts
+        document.set_reorder(
+            [docid_to_index[str(candidate["docid"])] for candidate in reranked_result.candidates],
+            [candidate["score"] for candidate in reranked_result.candidates],
+        )
         
         #print(document.reorder_contexts)
         return document
@@ -220,15 +211,13 @@ class LiT5ScoreReranker(BaseRanking):
             logging=logging,
         )
 
-        # Create a mapping from docid to the original context
-        contexts = copy.deepcopy(document.contexts)
-        docid_to_context = {str(ctx.id): ctx for ctx in contexts}
+        # Map docids back to positions in the original contexts
+        docid_to_index = {str(ctx.id): i for i, ctx in enumerate(document.contexts)}
+
         # Reorder contexts based on reranked_result
-        reorder_contexts = []
-        for candidate in reranked_result.candidates:
-            d = docid_to_context[str(candidate["docid"])]
-            d.score = candidate["score"]
-            reorder_contexts.append(d)
-        document.reorder_contexts = reorder_contexts
+        document.set_reorder(
+            [docid_to_index[str(candidate["docid"])] for candidate in reranked_result.candidates],
+            [candidate["score"] for candidate in reranked_result.candidates],
+        )
         return document
 
@@ -3,7 +3,7 @@ from rankify.utils.models.llm2vec import LLM2Vec
 from typing import List
 from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document, Context 
-import copy
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache
 from tqdm import tqdm  # Import tqdm for progress tracking
 
 class LLM2VecReranker(BaseRanking):
@@ -26,6 +26,8 @@ class LLM2VecReranker(BaseRanking):
         peft_model_name_or_path (str): The **path or name of the PEFT-tuned model variant**.
         instruction (str): The **instruction prompt** used for encoding query-context pairs.
         model (LLM2Vec): The **LLM2Vec model** for generating embeddings.
+        embedding_cache (EmbeddingCache, optional): **Content-addressed cache** of query and context
+            embeddings, so passages shared across queries or runs are encoded once.
 
     Example:
         ```python
@@ -60,7 +62,8 @@ class LLM2VecReranker(BaseRanking):
             model_name (str, optional): The **name of the pre-trained LLM2Vec model** 
                 (default: `"McGill-NLP/LLM2Vec-Mistral-7B-Instruct-v2-mntp"`).
             api_key (str, optional): **Not used**, but included for framework consistency.
-            kwargs (dict): Additional parameters such as `batch_size` and `peft_model_name_or_path`.
+            kwargs (dict): Additional parameters such as `batch_size`, `peft_model_name_or_path`,
+                `embedding_cache` (default `True`) and `embedding_cache_dir`.
         """
         self.method = method
         self.model_name = model_name or "McGill-NLP/LLM2Vec-Mistral-7B-Instruct-v2-mntp"
@@ -69,6 +72,13 @@ class LLM2VecReranker(BaseRanking):
         self.peft_model_name_or_path = kwargs.get("peft_model_name_or_path", "McGill-NLP/LLM2Vec-Mistral-7B-Instruct-v2-mntp-supervised")
         self.instruction = kwargs.get("instruction", "Given a query, rank the relevant contexts:")
         self.model = self._load_model()
+        self.embedding_cache = EmbeddingCache(
+            kwargs.get("embedding_cache_dir"),
+            model=self.model_name,
+            instruction=self.instruction,
+            peft_model_name_or_path=self.peft_model_name_or_path,
+            torch_dtype="bfloat16" if self.device == "cuda" else "float32",
+        ) if kwargs.get("embedding_cache", True) else None
 
     def _load_model(self):
         """
@@ -94,28 +104,39 @@ class LLM2VecReranker(BaseRanking):
         Returns:
             List[Document]: The reranked list of **Document** instances with updated `reorder_contexts`.
         """
+        # Queries and contexts share the instruction, so all of them are encoded (and cached) in one call
+        texts = [text for document in documents
+                 for text in [document.question.question] + [ctx.text for ctx in document.contexts]]
+        if not texts:
+            return documents
+        embeddings = torch.tensor(encode_with_cache(self.embedding_cache, texts, self._encode_texts, report=True),
+                                  dtype=torch.float32)
+
+        offset = 0
         for document in tqdm(documents, desc="Reranking Documents"):
-            # Encode the query
-            query = document.question.question
-            query_embedding = self._encode_queries([query])
-
-            # Encode the contexts
-            contexts = document.contexts
-            context_embeddings = self._encode_contexts(contexts)
+            query_embedding = embeddings[offset:offset + 1]
+            context_embeddings = embeddings[offset + 1:offset + 1 + len(document.contexts)]
+            offset += 1 + len(document.contexts)
 
             # Compute cosine similarity scores
             scores = self._cosine_similarity(query_embedding, context_embeddings)
-            copy_context = copy.deepcopy(contexts)
-            # Assign scores to contexts and sort
-            for i, context in enumerate(copy_context):
-                context.score = scores[i].item()
+            # Record the contexts sorted by score as the document's reorder view
+            document.rerank_by_scores([score.item() for score in scores])
 
-            ranked_contexts = sorted(copy_context, key=lambda ctx: ctx.score, reverse=True)
+        return documents
 
-            # Update `reorder_contexts` in the document
-            document.reorder_contexts = ranked_contexts
+    def _encode_texts(self, texts: List[str]) -> torch.Tensor:
+        """
+        Encodes **texts** (queries or contexts) with the reranker's **instruction**.
 
-        return documents
+        Args:
+            texts (List[str]): Texts to encode.
+
+        Returns:
+            torch.Tensor: **Text embeddings**.
+        """
+        sentences = [[self.instruction, text, 0] for text in texts]
+        return self.model.encode(sentences, batch_size=self.batch_size, convert_to_tensor=True)
 
     def _encode_queries(self, queries: List[str]) -> torch.Tensor:
         """
@@ -127,8 +148,7 @@ class LLM2VecReranker(BaseRanking):
         Returns:
             torch.Tensor: **Query embeddings**.
         """
-        query_sentences = [[self.instruction, query, 0] for query in queries]
-        return self.model.encode(query_sentences, batch_size=self.batch_size, convert_to_tensor=True)
+        return self._encode_texts(queries)
 
     def _encode_contexts(self, contexts: List[Context]) -> torch.Tensor:
         """
@@ -140,11 +160,7 @@ class LLM2VecReranker(BaseRanking):
         Returns:
             torch.Tensor: **Context embeddings**.
         """
-        # Format each context as [instruction, context text, label (dummy)] for LLM2Vec
-        context_sentences = [[self.instruction, ctx.text, 0] for ctx in contexts]
-
-        # Pass the formatted sentences to the LLM2Vec model
-        return self.model.encode(context_sentences, batch_size=self.batch_size, convert_to_tensor=True)
+        return self._encode_texts([ctx.text for ctx in contexts])
 
     @staticmethod
     def _cosine_similarity(a: torch.Tensor, b: torch.Tensor) -> torch.Tensor:
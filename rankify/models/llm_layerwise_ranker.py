@@ -6,7 +6,6 @@ from transformers import AutoModelForCausalLM, AutoTokenizer
 from rankify.utils.helper import get_device,get_dtype
 import torch
 from tqdm import tqdm  # Import tqdm for progress tracking
-import copy
 from transformers import AutoConfig
 from transformers import AutoModel
 
@@ -222,11 +221,7 @@ class LLMLayerWiseRanker(BaseRanking):
                 scores.extend(batch_scores)
 
             # Assign scores and reorder
-            contexts = copy.deepcopy(doc.contexts)
-            for context, score in zip(contexts, scores):
-                context.score = score
-            
-            doc.reorder_contexts = sorted(contexts, key=lambda x: x.score, reverse=True)
+            doc.rerank_by_scores(scores)
 
         return documents
 
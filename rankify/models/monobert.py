@@ -2,10 +2,9 @@ import torch
 from torch.cuda.amp import autocast
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 from typing import List
-from copy import deepcopy
 from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
-from tqdm import tqdm  # Import tqdm for progress tracking
+from rankify.utils.pair_scheduler import PairScheduler, hf_encode, hf_collate
 
 
 class MonoBERT(BaseRanking):
@@ -61,12 +60,15 @@ class MonoBERT(BaseRanking):
             model_name (str, optional): The **name of the pretrained MonoBERT model** 
                 (default: `"castorini/monobert-large-msmarco"`).
             api_key (str, optional): **Not used**, but included for framework consistency.
-            kwargs (dict): Additional parameters such as `use_amp` for **mixed precision inference**.
+            kwargs (dict): Additional parameters such as `use_amp` for **mixed precision inference**,
+                `batch_size` (default: `32`) and `max_batch_tokens` (padded-token budget per batch).
         """
         self.method = method
         self.model_name = model_name or "castorini/monobert-large-msmarco"
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.use_amp = kwargs.get("use_amp", False)
+        self.batch_size = kwargs.get("batch_size", 32)
+        self.scheduler = PairScheduler(self.batch_size, kwargs.get("max_batch_tokens"))
         self.model = self.get_model(self.model_name)
         self.tokenizer = self.get_tokenizer()
 
@@ -109,36 +111,18 @@ class MonoBERT(BaseRanking):
         Returns:
             List[Document]: Documents with updated **`reorder_contexts`** after reranking.
         """
-        for document in tqdm(documents, desc="Reranking Documents"):
-            query = document.question.question
-            contexts = deepcopy(document.contexts)
-
-            # Rescore contexts using MonoBERT
-            for context in contexts:
-                inputs = self.tokenizer.encode_plus(
-                    query,
-                    context.text,
-                    max_length=512,
-                    truncation=True,
-                    return_token_type_ids=True,
-                    return_tensors="pt"
-                )
-                with autocast(enabled=self.use_amp):
-                    input_ids = inputs["input_ids"].to(self.device)
-                    token_type_ids = inputs["token_type_ids"].to(self.device)
-                    outputs = self.model(input_ids, token_type_ids=token_type_ids, return_dict=False)
-                    logits = outputs[0]
-
-                    # Handle binary and multi-class classification
-                    if logits.size(1) > 1:
-                        context.score = torch.nn.functional.log_softmax(logits, dim=1)[0, -1].item()
-                    else:
-                        context.score = logits.item()
-
-            # Sort contexts by score in descending order
-            ranked_contexts = sorted(contexts, key=lambda ctx: ctx.score, reverse=True)
-
-            # Update `reorder_contexts` in the document
-            document.reorder_contexts = ranked_contexts
-
-        return documents
+        def encode(queries, texts):
+            return hf_encode(self.tokenizer, queries, texts, max_length=512, return_token_type_ids=True)
+
+        def score_batch(encoding, indices):
+            batch = hf_collate(self.tokenizer, encoding, indices, self.device)
+            with autocast(enabled=self.use_amp):
+                logits = self.model(**batch, return_dict=False)[0].float()
+
+            # Handle binary and multi-class classification
+            if logits.size(1) > 1:
+                return torch.nn.functional.log_softmax(logits, dim=1)[:, -1].cpu().numpy()
+            return logits[:, 0].cpu().numpy()
+
+        # Pairs from all documents are scored together in length-sorted batches
+        return self.scheduler.rank(documents, encode, score_batch)
@@ -6,10 +6,10 @@ from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document, Context
 from rankify.utils.helper import get_device
 from rankify.utils.pre_defind_models import PREDICTION_TOKENS
+from rankify.utils.pair_scheduler import PairScheduler, hf_encode, hf_collate
 import torch
 from tqdm import tqdm
 from math import ceil
-import copy
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +19,7 @@ class MonoT5(BaseRanking):
         self._device = torch.device(device) if isinstance(device, str) else device
         self._context_size = kwargs.get("context_size", 512)
         self.batch_size = kwargs.get("batch_size", 32)
+        self.scheduler = PairScheduler(self.batch_size, kwargs.get("max_batch_tokens"))
         self.use_amp = kwargs.get("use_amp", torch.cuda.is_available())
         if "inputs_template" in kwargs:
             logger.warning("Custom inputs_template is ignored for MonoT5. Using default: 'Query: {query} Document: {text} Relevant:'")
@@ -87,15 +88,28 @@ class MonoT5(BaseRanking):
             return decode_ids, next_token_logits
         return decode_ids
 
+    @torch.inference_mode()
+    def _score_encoded(self, encoding, indices) -> List[float]:
+        tokenized = hf_collate(self.tokenizer, encoding, indices, self._device)
+        with torch.cuda.amp.autocast(enabled=self.use_amp):
+            _, batch_scores = self._greedy_decode(
+                model=self.model,
+                input_ids=tokenized["input_ids"],
+                length=1,
+                attention_mask=tokenized["attention_mask"],
+                return_last_logits=True,
+            )
+        batch_scores = batch_scores[:, [self.token_false_id, self.token_true_id]]
+        batch_scores = torch.log_softmax(batch_scores.float(), dim=-1)
+        return batch_scores[:, 1].tolist()
+
     def rank(self, documents: List[Document]) -> List[Document]:
-        for doc in tqdm(documents, desc="Reranking Documents"):
-            query = doc.question.question
-            scores = self._get_scores(query, [context.text for context in doc.contexts], max_length=self._context_size)
-            contexts = copy.deepcopy(doc.contexts)
-            for context, score in zip(contexts, scores):
-                context.score = score
-            doc.reorder_contexts = sorted(contexts, key=lambda x: x.score, reverse=True)
-        return documents
+        # Pairs from all documents are scored together in length-sorted batches
+        def encode(queries, texts):
+            inputs = [self.inputs_template.format(query=query, text=text) for query, text in zip(queries, texts)]
+            return hf_encode(self.tokenizer, inputs, max_length=self._context_size)
+
+        return self.scheduler.rank(documents, encode, self._score_encoded)
 
     def _chunks(self, texts: List[str], batch_size: int):
         for i in range(0, len(texts), batch_size):
@@ -11,7 +11,6 @@ logger = logging.getLogger(__name__)
 from tqdm import tqdm  # Import tqdm for progress tracking
 from math import ceil
 
-import copy
 
 
 class MonoT5(BaseRanking):
@@ -217,10 +216,7 @@ class MonoT5(BaseRanking):
             query = doc.question.question
             prompts = [self.inputs_template.format(query=query, text=context.text) for context in doc.contexts]
             scores = self._get_scores(query, [context.text for context in doc.contexts])
-            contexts = copy.deepcopy(doc.contexts)
-            for context, score in zip(contexts, scores):
-                context.score = score
-            doc.reorder_contexts = sorted(contexts, key=lambda x: x.score, reverse=True)
+            doc.rerank_by_scores(scores)
         return documents
     def _chunks(self, contexts: list[Context],batch_size: int):
         """
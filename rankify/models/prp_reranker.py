@@ -7,7 +7,6 @@ References:
       https://arxiv.org/abs/2306.17563
 """
 
-import copy
 from typing import List, Optional
 
 import torch
@@ -28,7 +27,8 @@ class PRPReranker(BaseRanking):
 
     Two comparison modes are available:
 
-    * ``'allpairs'`` – compare every ordered pair (O(N²) LLM calls).
+    * ``'allpairs'`` – compare every ordered pair (O(N²) LLM calls).  With an
+        API model the comparisons of a query are requested concurrently.
     * ``'bubblesort'`` – O(N²) comparisons in the worst case; faster for large
         sets when documents are partially ordered.
 
@@ -51,6 +51,8 @@ class PRPReranker(BaseRanking):
         api_endpoint (str, optional): OpenAI-compatible API base URL.
         device (str, optional): ``'cpu'`` or ``'cuda'``.  Auto-detected when
             not supplied.
+        requests_per_second, max_concurrency, max_retries (optional): Limits of
+            the API provider's shared client (see ``ProviderLimits``).
 
     Example:
         ```python
@@ -91,6 +93,10 @@ class PRPReranker(BaseRanking):
         self._tokenizer = None
         self._token_id_a: Optional[int] = None
         self._token_id_b: Optional[int] = None
+        self._client = None
+        self._limits = {
+            key: kwargs.get(key) for key in ("requests_per_second", "max_concurrency", "max_retries")
+        }
 
         if self.method == "prp":
             self._load_local_model()
@@ -138,25 +144,51 @@ class PRPReranker(BaseRanking):
         score_b = last_logits[self._token_id_b].item()
         return score_a >= score_b
 
+    def _api_client(self):
+        """OpenAI-compatible client, created once and shared by all comparisons."""
+        if self._client is None:
+            try:
+                from rankify.utils.api.async_client import get_api_client
+                from rankify.utils.api.openaiclient import OpenaiClient
+            except ImportError:
+                raise ImportError(
+                    "openai package is required for method='prp-api'. "
+                    "Install with: pip install openai"
+                )
+            self._client = OpenaiClient(keys=self.api_key, base_url=self.api_endpoint)
+            get_api_client(self.api_endpoint, **self._limits)
+        return self._client
+
+    def _api_messages(self, query: str, doc_a: str, doc_b: str) -> List[dict]:
+        prompt = self.PROMPT_TEMPLATE.format(query=query, doc_a=doc_a, doc_b=doc_b)
+        return [{"role": "user", "content": prompt}]
+
+    @staticmethod
+    def _prefers_a(answer: Optional[str]) -> bool:
+        return (answer or "").strip().upper().startswith("A")
+
     def _compare_api(self, query: str, doc_a: str, doc_b: str) -> bool:
         """Return True if doc_a is preferred over doc_b (API model)."""
-        try:
-            import openai as _openai
-        except ImportError:
-            raise ImportError(
-                "openai package is required for method='prp-api'. "
-                "Install with: pip install openai"
-            )
-        prompt = self.PROMPT_TEMPLATE.format(query=query, doc_a=doc_a, doc_b=doc_b)
-        client = _openai.OpenAI(api_key=self.api_key, base_url=self.api_endpoint)
-        response = client.chat.completions.create(
+        answer = self._api_client().chat(
+            model=self.model_name,
+            messages=self._api_messages(query, doc_a, doc_b),
+            max_tokens=1,
+            temperature=0.0,
+            return_text=True,
+        )
+        return self._prefers_a(answer)
+
+    def _compare_many(self, query: str, pairs: List[tuple]) -> List[bool]:
+        """Compare several (doc_a, doc_b) pairs; API comparisons are requested concurrently."""
+        if self.method != "prp-api":
+            return [self._compare_local(query, doc_a, doc_b) for doc_a, doc_b in pairs]
+        answers = self._api_client().chat_batch(
+            [self._api_messages(query, doc_a, doc_b) for doc_a, doc_b in pairs],
             model=self.model_name,
-            messages=[{"role": "user", "content": prompt}],
             max_tokens=1,
             temperature=0.0,
         )
-        answer = response.choices[0].message.content.strip().upper()
-        return answer.startswith("A")
+        return [self._prefers_a(answer) for answer in answers]
 
     def _compare(self, query: str, doc_a: str, doc_b: str) -> bool:
         """Dispatch to local or API comparison."""
@@ -177,8 +209,9 @@ class PRPReranker(BaseRanking):
         if self.max_pairs and len(pairs) > self.max_pairs:
             import random
             pairs = random.sample(pairs, self.max_pairs)
-        for i, j in pairs:
-            if self._compare(query, contexts[i].text, contexts[j].text):
+        outcomes = self._compare_many(query, [(contexts[i].text, contexts[j].text) for i, j in pairs])
+        for (i, _), won in zip(pairs, outcomes):
+            if won:
                 wins[i] += 1
         ranked = sorted(range(n), key=lambda k: wins[k], reverse=True)
         return [contexts[k] for k in ranked]
@@ -211,17 +244,18 @@ class PRPReranker(BaseRanking):
             if not document.contexts:
                 document.reorder_contexts = []
                 continue
-            ctx_copy = copy.deepcopy(document.contexts)
             query = document.question.question
 
             if self.mode == "bubblesort":
-                ranked = self._rank_bubblesort(query, ctx_copy)
+                ranked = self._rank_bubblesort(query, document.contexts)
             else:
-                ranked = self._rank_allpairs(query, ctx_copy)
-
-            # Assign synthetic scores based on rank position
-            for rank_pos, ctx in enumerate(ranked):
-                ctx.score = float(len(ranked) - rank_pos)
-
-            document.reorder_contexts = ranked
+                ranked = self._rank_allpairs(query, document.contexts)
+
+            # Record the order as positions in the original contexts, with
+            # synthetic scores based on rank position
+            position = {id(ctx): i for i, ctx in enumerate(document.contexts)}
+            document.set_reorder(
+                [position[id(ctx)] for ctx in ranked],
+                [float(len(ranked) - rank_pos) for rank_pos in range(len(ranked))],
+            )
         return documents
@@ -3,6 +3,8 @@ from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
 from typing import List
 from rankify.utils.pre_defind_models import HF_PRE_DEFIND_MODELS, URL
+from rankify.utils.api.async_client import get_api_client
+from concurrent.futures import ThreadPoolExecutor
 from transformers import AutoModelForCausalLM, AutoTokenizer
 import torch
 from tqdm import tqdm
@@ -23,6 +25,10 @@ class RankGPT(BaseRanking):
         self.window_size = kwargs.get("window_size", 20) 
         self.step = kwargs.get("step", 10)
         self.endpoint = kwargs.get("endpoint", "https://api.openai.com/v1")
+        # Limits of the API provider's shared client (see ProviderLimits)
+        self.api_limits = {
+            key: kwargs.get(key) for key in ("requests_per_second", "max_concurrency", "max_retries")
+        }
         self.api_key = api_key
         self.model = None
         self.tokenizer = None
@@ -54,6 +60,7 @@ class RankGPT(BaseRanking):
                 self.model = URL[model_name]['class'](self.api_key, self.url)
             else:
                 self.model = URL['default']['class'](self.api_key, self.url)
+            get_api_client(self.url, **self.api_limits)
         else:
             print(f"🚀 Loading {self.model_name} with GPU optimizations...")
             
@@ -131,34 +138,58 @@ class RankGPT(BaseRanking):
         
         start_total = time.time()
         
-        for doc_idx, document in enumerate(tqdm(documents, desc="Reranking Documents")):
-            #print(f"\n📄 Document {doc_idx+1}/{len(documents)} - {len(document.contexts)} contexts")
-            doc_start = time.time()
+        if self.method == 'rankgpt-api':
+            self._rank_api(documents)
+        else:
+            for doc_idx, document in enumerate(tqdm(documents, desc="Reranking Documents")):
+                #print(f"\n📄 Document {doc_idx+1}/{len(documents)} - {len(document.contexts)} contexts")
+                doc_start = time.time()
             
-            reorder_contexts = self.sliding_windows(
-                document, 
-                rank_start=0, 
-                rank_end=len(document.contexts), 
-                window_size=self.window_size, 
-                step=self.step
-            )
-            document.reorder_contexts = reorder_contexts
+                reorder_contexts = self.sliding_windows(
+                    document, 
+                    rank_start=0, 
+                    rank_end=len(document.contexts), 
+                    window_size=self.window_size, 
+                    step=self.step
+                )
+                document.reorder_contexts = reorder_contexts
             
-            doc_time = time.time() - doc_start
-            #print(f"   ⏱️  Document {doc_idx+1} completed in {doc_time:.2f}s")
+                doc_time = time.time() - doc_start
+                #print(f"   ⏱️  Document {doc_idx+1} completed in {doc_time:.2f}s")
             
-            # Memory cleanup and logging every document
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-                gc.collect()
-                self._log_gpu_memory(f"After Doc {doc_idx+1}")
-            #break
+                # Memory cleanup and logging every document
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                    gc.collect()
+                    self._log_gpu_memory(f"After Doc {doc_idx+1}")
+                #break
         total_time = time.time() - start_total
         print(f"\n✅ All documents ranked in {total_time:.2f}s")
         self._print_performance_summary()
         
         return documents
 
+    def _rank_api(self, documents: List[Document]) -> None:
+        """
+        Ranks documents concurrently with an API model. The windows of one document stay sequential;
+        every window request goes through the provider's shared client, which enforces its rate limit
+        and retries transient failures.
+        """
+        api = getattr(self.model, "api", None)
+        workers = api.limits.max_concurrency if api is not None else 1
+
+        def rank_document(document):
+            document.reorder_contexts = self.sliding_windows(
+                document,
+                rank_start=0,
+                rank_end=len(document.contexts),
+                window_size=self.window_size,
+                step=self.step
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(documents)))) as executor:
+            list(tqdm(executor.map(rank_document, documents), total=len(documents), desc="Reranking Documents"))
+
     def sliding_windows(self, item=None, rank_start=0, rank_end=100, window_size=20, step=10):
         """
         Applies sliding window ranking with detailed logging.
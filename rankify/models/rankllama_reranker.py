@@ -1,4 +1,3 @@
-import copy
 import warnings
 from typing import List, Optional, Tuple, Union
 
@@ -139,7 +138,7 @@ class RankLLaMAReranker(BaseRanking):
         """
         for document in tqdm(documents, desc="Reranking Documents"):
             query = document.question.question
-            contexts = copy.deepcopy(document.contexts)
+            contexts = document.contexts
 
             # Build query strings and document strings
             query_texts = [f"query: {query}"] * len(contexts)
@@ -150,12 +149,7 @@ class RankLLaMAReranker(BaseRanking):
 
             scores = self._score_batched(query_texts, doc_texts)
 
-            for ctx, score in zip(contexts, scores):
-                ctx.score = score
-
-            document.reorder_contexts = sorted(
-                contexts, key=lambda x: x.score, reverse=True
-            )
+            document.rerank_by_scores(scores)
 
         return documents
 
@@ -7,9 +7,7 @@ from transformers import T5ForConditionalGeneration, T5Tokenizer
 from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
 from typing import List
-import copy
 from tqdm import tqdm  # Import tqdm for progress tracking
-import copy
 
 class RankT5(BaseRanking):
     """
@@ -123,7 +121,7 @@ class RankT5(BaseRanking):
         """
         for document in tqdm(documents, desc="Reranking Documents"):
             query = document.question.question
-            passages = copy.deepcopy(document.contexts)
+            passages = document.contexts
 
             # Prepare input texts based on the selected mode
             if self.mode == 'monot5':
@@ -165,15 +163,8 @@ class RankT5(BaseRanking):
             all_scores_tensor = torch.tensor(scores_holder)
             rank = torch.argsort(all_scores_tensor, descending=True).tolist()
 
-            # Prepare the reordered list of contexts
-            #reranked_passages = [copy.deepcopy(passages[rank_id]) for rank_id in rank]
-            reranked_passages = []
-            for new_idx in rank:
-                context = copy.deepcopy(passages[new_idx])
-                context.score = scores_holder[new_idx]
-                reranked_passages.append(context)
-            # Assign the reranked passages to reorder_contexts
-            document.reorder_contexts = reranked_passages
+            # Record the reordered passages as the document's reorder view
+            document.set_reorder(rank, [scores_holder[new_idx] for new_idx in rank])
         return documents
     def group2chunks(self, lst, n=5):
         """
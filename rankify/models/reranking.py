@@ -1,4 +1,7 @@
-from rankify.dataset.dataset import Document
+import os
+
+from rankify.dataset.dataset import Dataset, Document
+from rankify.dataset.streaming import StreamingDataset
 
 from rankify.utils.pre_defind_models import HF_PRE_DEFIND_MODELS
 from rankify.utils.pre_defined_methods import METHOD_MAP
@@ -61,15 +64,27 @@ class Reranking:
         else:
             raise ValueError(f"Ranking method {self.method} is not supported or installed. please install the full version of Rankify")
 
-    def rank(self, documents: list[Document]):
+    def rank(self, documents: list[Document], output_path: str = None, chunk_size: int = None):
         """
         Reranks a list of documents using the specified ranking model.
 
+        A ``StreamingDataset`` parses its documents anew on every access, so reranking it in place
+        would lose the results. It is instead read, reranked and written out chunk by chunk to
+        ``output_path`` (a ``.jsonl`` file, overwritten), which is returned as a new ``StreamingDataset``
+        whose documents carry the reranking in ``reorder_contexts``.
+
         Args:
-            documents (list[Document]): A list of Document instances that need to be reranked.
+            documents (list[Document] or StreamingDataset): The documents that need to be reranked.
+            output_path (str, optional): Where to write the reranked documents. Required for a
+                ``StreamingDataset``, ignored otherwise.
+            chunk_size (int, optional): Documents reranked at a time for a ``StreamingDataset``.
+                Defaults to the dataset's ``chunk_size``.
 
         Returns:
-            list[Document]: The reranked list of Document instances.
+            list[Document] or StreamingDataset: The reranked documents.
+
+        Raises:
+            ValueError: If a ``StreamingDataset`` is given without ``output_path``.
 
         Example:
             ```python
@@ -84,4 +99,21 @@ class Reranking:
             model.rank([document])
             ```
         """
-        return self.ranker.rank(documents=documents)
\ No newline at end of file
+        if isinstance(documents, StreamingDataset):
+            return self._rank_streaming(documents, output_path, chunk_size)
+        return self.ranker.rank(documents=documents)
+
+    def _rank_streaming(self, dataset: StreamingDataset, output_path: str, chunk_size: int = None) -> StreamingDataset:
+        if output_path is None:
+            raise ValueError("Reranking a StreamingDataset requires an output_path (.jsonl) to write the results to.")
+        if not output_path.endswith(".jsonl"):
+            raise ValueError("output_path must be a .jsonl file.")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        # Without a passage store the text only lives in the file, so it has to be written out
+        save_text = dataset.passages is None
+        for chunk in dataset.iter_chunks(chunk_size):
+            self.ranker.rank(documents=chunk)
+            Dataset.append_documents(chunk, output_path, save_reranked=True, save_text=save_text)
+        return StreamingDataset(output_path, n_docs=dataset.n_docs, chunk_size=dataset.chunk_size,
+                                passages=dataset.passages)
\ No newline at end of file
@@ -4,7 +4,6 @@ from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
 from typing import List
 from tqdm import tqdm  # Import tqdm for progress tracking
-import copy
 
 class SentenceTransformerReranker(BaseRanking):
     """
@@ -114,7 +113,7 @@ class SentenceTransformerReranker(BaseRanking):
             Document: The reranked **Document** with updated `reorder_contexts`.
         """
         query = document.question.question  # Extract query text
-        contexts = copy.deepcopy(document.contexts)
+        contexts = document.contexts
 
         # Extract context texts
         context_texts = [ctx.text for ctx in contexts]
@@ -122,16 +121,8 @@ class SentenceTransformerReranker(BaseRanking):
         # Compute relevance scores
         scores = self._rerank(query, context_texts)
 
-        # Map scores back to contexts and update the scores
-        for ctx, score in zip(contexts, scores):
-            ctx.score = score
-
-        # Map scores back to contexts
-        scored_contexts = list(zip(contexts, scores))
-        scored_contexts.sort(key=lambda x: x[1], reverse=True)
-
-        # Reorder contexts in the document
-        document.reorder_contexts = [ctx for ctx, _ in scored_contexts]
+        # Reorder contexts in the document by descending score
+        document.rerank_by_scores(scores)
         return document
 
     def _rerank(self, query: str, documents: List[str]) -> List[float]:
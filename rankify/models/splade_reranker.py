@@ -6,7 +6,6 @@ from rankify.dataset.dataset import Document
 from typing import List
 from tqdm import tqdm  # Import tqdm for progress tracking
 
-import copy
 def splade_max_pooling(logits, attention_mask):
     """
     Perform Splade-style max pooling with log scaling.
@@ -124,7 +123,7 @@ class SpladeReranker(BaseRanking):
             Document: The reranked **Document** with updated `reorder_contexts`.
         """
         query = document.question.question  # Extract query text
-        contexts = copy.deepcopy(document.contexts)
+        contexts = document.contexts
 
         # Extract context texts
         context_texts = [ctx.text for ctx in contexts]
@@ -134,16 +133,9 @@ class SpladeReranker(BaseRanking):
 
         # Compute query and document scores
         scores = self._rerank(query, context_texts)
-        # Map scores back to contexts and update the scores
-        for ctx, score in zip(contexts, scores):
-            ctx.score = score
 
-        # Map scores back to contexts
-        scored_contexts = list(zip(contexts, scores))
-        scored_contexts.sort(key=lambda x: x[1], reverse=True)
-
-        # Reorder contexts in the document
-        document.reorder_contexts = [ctx for ctx, _ in scored_contexts]
+        # Reorder contexts in the document by descending score
+        document.rerank_by_scores(scores)
         return document
 
     def _compute_vector(self, texts: List[str], max_length: int) -> torch.Tensor:
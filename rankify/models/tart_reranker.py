@@ -7,7 +7,6 @@ References:
     - Model: facebook/tart-full-flan-t5-xl
 """
 
-import copy
 from typing import List, Optional
 
 import torch
@@ -114,9 +113,8 @@ class TARTReranker(BaseRanking):
                 document.reorder_contexts = []
                 continue
 
-            ctx_copy = copy.deepcopy(document.contexts)
             query_with_instruction = self._build_query(document.question.question)
-            doc_texts = [ctx.text for ctx in ctx_copy]
+            doc_texts = [ctx.text for ctx in document.contexts]
 
             all_scores: List[float] = []
             for i in range(0, len(doc_texts), self.batch_size):
@@ -137,10 +135,6 @@ class TARTReranker(BaseRanking):
                 batch_scores = probs[:, 1].cpu().tolist()
                 all_scores.extend(batch_scores)
 
-            for score, ctx in zip(all_scores, ctx_copy):
-                ctx.score = score
-
-            ctx_copy.sort(key=lambda x: x.score, reverse=True)
-            document.reorder_contexts = ctx_copy
+            document.rerank_by_scores(all_scores)
 
         return documents
@@ -2,14 +2,12 @@ from rankify.models.base import BaseRanking
 from typing import Union, List, Optional, Tuple
 from rankify.dataset.dataset import Document, Context
 import torch
-import copy
 from transformers import (
     AutoModelForSequenceClassification,
     AutoTokenizer
 )
-from tqdm import tqdm  # Import tqdm for progress tracking
-
 from rankify.utils.helper import get_device,get_dtype
+from rankify.utils.pair_scheduler import PairScheduler, hf_encode, hf_collate
 
 class TransformerRanker(BaseRanking):
     """
@@ -66,6 +64,7 @@ class TransformerRanker(BaseRanking):
             api_key (str, optional): API key if required (default: None).
             **kwargs: Additional parameters:
                 - batch_size (int, optional): Batch size for inference (default: `16`).
+                - max_batch_tokens (int, optional): Padded-token budget per batch (default: no limit).
                 - device (str, optional): Device (`"cpu"`, `"cuda"`, `"auto"`). Default is `"cuda"`.
                 - dtype (torch.dtype, optional): Data type for inference (`torch.float32` or `torch.bfloat16`).
         """
@@ -82,6 +81,7 @@ class TransformerRanker(BaseRanking):
 
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.batch_size = kwargs.get("batch_size", 16)
+        self.scheduler = PairScheduler(self.batch_size, kwargs.get("max_batch_tokens"))
 
     def tokenize(self, inputs: Union[str,List[str], List[Tuple[str, str]]]):
         """
@@ -101,37 +101,19 @@ class TransformerRanker(BaseRanking):
         """
         Reranks a list of **Document** instances using a **Transformer-based Reranker**.
 
+        Query-passage pairs from all documents are scored together in length-sorted batches.
+
         Args:
             documents (List[Document]): A list of **Document** instances to rerank.
 
         Returns:
             List[Document]: The reranked list of **Documents** with updated `reorder_contexts`.
         """
-        for document in tqdm(documents, desc="Reranking Documents"):
-            context_copy= copy.deepcopy(document.contexts)
-
-            inputs = [(document.question.question, context.text) for context in document.contexts]
-
-            batched_inputs = [
-                inputs[i:i+self.batch_size] for i in range(0,len(inputs),self.batch_size)
-            ]
-            
-            scores = []
-
-            for batch in batched_inputs:
-                tokenized_inputs = self.tokenize(batch)
-                batch_scores = self.model(**tokenized_inputs).logits.squeeze()
-                batch_scores = batch_scores.detach().cpu().numpy().tolist()
-
-                if isinstance(batch_scores, float):
-                    scores.append(batch_scores)
-                else:
-                    scores.extend(batch_scores)
-            for score, context in zip(scores,context_copy):
-                context.score = score
-            context_copy.sort(key=lambda x:x.score, reverse=True)
-            document.reorder_contexts = context_copy    
-        return documents
-                
-            
-    
\ No newline at end of file
+        def encode(queries, texts):
+            return hf_encode(self.tokenizer, queries, texts)
+
+        def score_batch(encoding, indices):
+            batch = hf_collate(self.tokenizer, encoding, indices, self.device)
+            return self.model(**batch).logits.view(len(indices), -1)[:, 0].float().cpu().numpy()
+
+        return self.scheduler.rank(documents, encode, score_batch)
@@ -4,7 +4,6 @@ from rankify.models.base import BaseRanking
 from rankify.dataset.dataset import Document
 from typing import List
 from rankify.utils.models.twolar_utils import Score
-import copy
 from tqdm import tqdm  # Import tqdm for progress tracking
 
 
@@ -104,14 +103,8 @@ class TWOLAR(BaseRanking):
             # Compute scores
             scores = self.get_score(logits).tolist()
 
-            # Assign scores to contexts and sort
-            copy_context = copy.deepcopy(document.contexts)
-            for i, context in enumerate(copy_context):
-                context.score = scores[i]
-            
-            ranked_contexts = sorted(copy_context, key=lambda ctx: ctx.score, reverse=True)
-
-            document.reorder_contexts = ranked_contexts
+            # Record the contexts sorted by score as the document's reorder view
+            document.rerank_by_scores(scores)
             #reranked_documents.append(document)
 
         return documents
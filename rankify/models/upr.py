@@ -15,7 +15,6 @@ from transformers import logging
 logging.set_verbosity_error()
 from rankify.models.base import BaseRanking
 from tqdm import tqdm  # Import tqdm for progress tracking
-import copy
 
 
 def set_random_seed(seed):
@@ -133,7 +132,7 @@ class UPR(BaseRanking):
             shard_size (int): Shard size for processing contexts in chunks.
 
         Returns:
-            List[Document]: The reordered list of contexts based on their relevance.
+            Tuple[List[int], List[float]]: Context indices ordered by relevance and their scores.
 
         Example:
             ```python
@@ -196,11 +195,7 @@ class UPR(BaseRanking):
             shared_nll_list.append(avg_null)
 
         topk_scores,indexes = torch.topk(-torch.cat(shared_nll_list),k=len(context_tensor))
-        reordered_context = [copy.deepcopy(document.contexts[i]) for i in indexes]
-
-        for i, ctx in enumerate(reordered_context):
-            ctx.score = topk_scores[i].item()
-        return reordered_context
+        return indexes.tolist(), topk_scores.tolist()
     
     @classmethod    
     def rank_gpt(cls, document , model, tokenizer, verbalizer_head, verbalizer, use_gpu, shard_size, include_eos_token):
@@ -218,7 +213,7 @@ class UPR(BaseRanking):
             include_eos_token (bool): Whether to include the end-of-sequence token during ranking.
 
         Returns:
-            List[Document]: The reordered list of contexts based on their relevance.
+            Tuple[List[int], List[float]]: Context indices ordered by relevance and their scores.
 
         Example:
             ```python
@@ -307,11 +302,7 @@ class UPR(BaseRanking):
             sharded_nll_list.append(avg_nll)
 
         topk_scores,indexes = torch.topk(-torch.cat(sharded_nll_list),k=len(context_tensor))
-        reordered_context = [copy.deepcopy(document.contexts[i]) for i in indexes]
-
-        for i, ctx in enumerate(reordered_context):
-            ctx.score = topk_scores[i].item()
-        return reordered_context
+        return indexes.tolist(), topk_scores.tolist()
 
 
     def rank(self, documents: List[Document]) -> List[Document]:
@@ -338,10 +329,10 @@ class UPR(BaseRanking):
             if len(document.contexts) == 0:
                 continue
             if 'gpt' in self.model_name:
-                reordered_context = self.rank_gpt(document,  self.model, self.tokenizer, self.verbalizer_head, self.verbalizer, self.use_gpu , self.shard_size, self.include_eos_token)
+                indexes, scores = self.rank_gpt(document,  self.model, self.tokenizer, self.verbalizer_head, self.verbalizer, self.use_gpu , self.shard_size, self.include_eos_token)
             else:
-                reordered_context = self.rank_t5(document,  self.model, self.tokenizer, self.verbalizer_head, self.verbalizer, self.use_gpu , self.shard_size)
-            document.reorder_contexts= reordered_context
+                indexes, scores = self.rank_t5(document,  self.model, self.tokenizer, self.verbalizer_head, self.verbalizer, self.use_gpu , self.shard_size)
+            document.set_reorder(indexes, scores)
         return documents
             
 
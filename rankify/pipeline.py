@@ -21,6 +21,7 @@ from typing import Any, Dict, List, Optional, Union
 from dataclasses import dataclass, field
 
 from rankify.dataset.dataset import Document, Question, Answer, Context
+from rankify.dataset.streaming import StreamingDataset
 
 
 @dataclass
@@ -205,7 +206,17 @@ class Pipeline:
             
         Returns:
             PipelineResult or list of PipelineResults
+
+        Raises:
+            TypeError: If ``documents`` is a ``StreamingDataset``.
         """
+        if isinstance(documents, StreamingDataset):
+            # Its documents are parsed anew on each access, so per-query results would be lost
+            raise TypeError(
+                "Pipelines run on in-memory documents. Rerank a StreamingDataset chunk by chunk with "
+                "Reranking.rank(dataset, output_path=...) and evaluate it with Metrics(dataset) instead."
+            )
+
         # Handle single query
         if isinstance(query, str):
             return self._run_single(query, documents, corpus)
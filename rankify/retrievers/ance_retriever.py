@@ -8,7 +8,6 @@ import faiss
 from typing import List, Optional
 from transformers import AutoTokenizer, AutoModel
 from tqdm import tqdm
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 from pyserini.search.faiss import FaissSearcher
 
 from .base_retriever import BaseRetriever
@@ -40,7 +39,6 @@ class ANCERetriever(BaseRetriever):
         self.index_type = index_type
         self.index_folder = index_folder
         self.device = device if torch.cuda.is_available() else "cpu"
-        self.tokenizer_simple = SimpleTokenizer()
         self.batch_size = 128
         
         # Initialize index manager (following DenseRetriever pattern exactly)
@@ -391,15 +389,11 @@ class ANCERetriever(BaseRetriever):
             text = f"Error: {str(e)}"
             title = f"Document {original_doc_id}"
         
-        # Check if document contains answer (following DenseRetriever pattern exactly)
-        has_answer = has_answers(text, document.answers.answers, self.tokenizer_simple)
-        
         return Context(
             id=original_doc_id,  # Return the original document ID
             title=title,
             text=text,
             score=hit.score,
-            has_answer=has_answer
         )
 
     def _preprocess_query(self, query: str) -> str:
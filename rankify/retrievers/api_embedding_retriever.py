@@ -5,15 +5,18 @@ These retrievers embed a JSONL corpus via an external embedding API, build a
 FAISS nearest-neighbour index, then answer queries by embedding the query text
 and returning the top-k most similar passages.
 
-Document embeddings are cached as ``.npy`` files so the corpus is only
-embedded once per (corpus, model) combination.
+Document and query embeddings are cached by content
+(``rankify.utils.embedding_cache``), so each text is only embedded once per
+model, also across edited corpora.  Embedding batches are
+requested concurrently through the provider's shared, rate-limited client
+(``rankify.utils.api.async_client``).
 """
 
 import json
 import os
+from contextlib import nullcontext
 from typing import List, Optional
 import numpy as np
-from tqdm import tqdm
 
 try:
     import faiss
@@ -40,6 +43,9 @@ except ImportError:
     VOYAGE_AVAILABLE = False
 
 from .base_retriever import BaseRetriever
+from rankify.utils.api.async_client import get_api_client
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache, texts_fingerprint
+from .faiss_index import build_faiss_index, load_or_build_faiss_index, resolve_index_spec
 from rankify.dataset.dataset import Document, Context
 
 # Default model names per provider
@@ -49,6 +55,13 @@ _DEFAULT_MODELS = {
     "voyage": "voyage-3",
 }
 
+# API hosts, the keys of the providers' shared clients
+_API_HOSTS = {
+    "openai": "api.openai.com",
+    "cohere": "api.cohere.com",
+    "voyage": "api.voyageai.com",
+}
+
 # Embedding batch sizes per provider (API rate-limit friendly)
 _BATCH_SIZES = {
     "openai": 128,
@@ -67,8 +80,8 @@ class APIEmbeddingRetriever(BaseRetriever):
     * ``'cohere'``  – uses ``cohere.Client``
     * ``'voyage'``  – uses ``voyageai.Client``
 
-    The corpus is embedded once and cached as a ``.npy`` file under
-    ``cache_dir``.  Subsequent runs load the cache automatically.
+    Document and query embeddings are cached by content under
+    ``cache_dir/embeddings``; later runs only embed texts that are new.
 
     Args:
         provider (str): One of ``'openai'``, ``'cohere'``, or ``'voyage'``.
@@ -80,6 +93,16 @@ class APIEmbeddingRetriever(BaseRetriever):
             (Cohere), and ``voyage-3`` (Voyage).
         cache_dir (str): Directory for cached embeddings.
         embed_batch_size (int, optional): Override the default API batch size.
+        index_spec (str): FAISS index type – ``"Flat"`` (exact, default),
+            ``"HNSW32"``, ``"IVF4096,PQ32"``, ``"OPQ+IVF"`` or any
+            ``faiss.index_factory`` string.  Approximate indexes are trained
+            once per corpus and cached under ``cache_dir``.
+        nprobe (int, optional): IVF lists visited per query.
+        ef_search (int, optional): HNSW search depth per query.
+        train_size (int, optional): Number of embeddings sampled for training.
+        embedding_cache (bool): Cache embeddings by content (default ``True``).
+        requests_per_second, max_concurrency, max_retries (optional): Limits
+            of the provider's shared client (see ``ProviderLimits``).
 
     Example:
         ```python
@@ -103,6 +126,11 @@ class APIEmbeddingRetriever(BaseRetriever):
         model_name: Optional[str] = None,
         cache_dir: str = "./cache",
         embed_batch_size: Optional[int] = None,
+        index_spec: str = "Flat",
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        train_size: Optional[int] = None,
+        embedding_cache: bool = True,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -118,13 +146,28 @@ class APIEmbeddingRetriever(BaseRetriever):
         self.model_name = model_name or _DEFAULT_MODELS.get(self.provider, "")
         self.cache_dir = cache_dir
         self.embed_batch_size = embed_batch_size or _BATCH_SIZES.get(self.provider, 128)
+        self.index_spec = index_spec
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.train_size = train_size
+        self.embedding_cache = embedding_cache
 
         self._validate_provider()
+        self._api = get_api_client(
+            _API_HOSTS[self.provider],
+            requests_per_second=kwargs.get("requests_per_second"),
+            max_concurrency=kwargs.get("max_concurrency"),
+            max_retries=kwargs.get("max_retries"),
+        )
+        self._openai_client = self._openai_http = None
 
         # Load corpus texts
         self.doc_ids, self.doc_texts, self.doc_titles = self._load_corpus()
         self._docid_to_idx = {did: i for i, did in enumerate(self.doc_ids)}
 
+        self._doc_cache = self._open_embedding_cache("document")
+        self._query_cache = self._open_embedding_cache("query")
+
         # Build or load FAISS index
         self.doc_emb = self._load_or_build_embeddings()
         self.index = self._build_faiss_index(self.doc_emb)
@@ -174,35 +217,50 @@ class APIEmbeddingRetriever(BaseRetriever):
     # Embedding helpers
     # ------------------------------------------------------------------
 
-    def _embed_openai(self, texts: List[str], input_type: str = "document") -> np.ndarray:
-        client = _openai_module.OpenAI(api_key=self.api_key)
-        all_emb = []
-        for i in tqdm(range(0, len(texts), self.embed_batch_size), desc="OpenAI embed"):
-            batch = texts[i : i + self.embed_batch_size]
-            response = client.embeddings.create(input=batch, model=self.model_name)
-            batch_emb = [item.embedding for item in response.data]
-            all_emb.extend(batch_emb)
+    def _embed_batches(self, texts: List[str], embed_batch, desc: str) -> np.ndarray:
+        """Embeds ``texts`` in batches of ``embed_batch_size``, requesting the batches concurrently."""
+        batches = [texts[i : i + self.embed_batch_size] for i in range(0, len(texts), self.embed_batch_size)]
+        all_emb = [emb for batch_emb in self._api.map(embed_batch, batches, desc=desc) for emb in batch_emb]
         return np.array(all_emb, dtype=np.float32)
 
+    def _openai(self):
+        """
+        The retriever's ``AsyncOpenAI`` client, created once over the provider's pooled HTTP connections.
+        Only usable on the client loop; it is recreated if that loop (and so the pool) changes.
+        """
+        http = self._api.http
+        if self._openai_client is None or self._openai_http is not http:
+            # Retries are left to the shared client
+            self._openai_client = _openai_module.AsyncOpenAI(api_key=self.api_key, max_retries=0, http_client=http)
+            self._openai_http = http
+        return self._openai_client
+
+    def _embed_openai(self, texts: List[str], input_type: str = "document") -> np.ndarray:
+        async def embed_batch(batch):
+            response = await self._api.call(self._openai().embeddings.create, input=batch, model=self.model_name)
+            return [item.embedding for item in response.data]
+
+        return self._embed_batches(texts, embed_batch, "OpenAI embed")
+
     def _embed_cohere(self, texts: List[str], input_type: str = "search_document") -> np.ndarray:
         client = _cohere_module.Client(self.api_key)
-        all_emb = []
-        for i in tqdm(range(0, len(texts), self.embed_batch_size), desc="Cohere embed"):
-            batch = texts[i : i + self.embed_batch_size]
-            response = client.embed(
-                texts=batch, model=self.model_name, input_type=input_type
+
+        async def embed_batch(batch):
+            response = await self._api.call_in_thread(
+                client.embed, texts=batch, model=self.model_name, input_type=input_type
             )
-            all_emb.extend(response.embeddings)
-        return np.array(all_emb, dtype=np.float32)
+            return response.embeddings
+
+        return self._embed_batches(texts, embed_batch, "Cohere embed")
 
     def _embed_voyage(self, texts: List[str], input_type: str = "document") -> np.ndarray:
         client = _voyage_module.Client(api_key=self.api_key)
-        all_emb = []
-        for i in tqdm(range(0, len(texts), self.embed_batch_size), desc="Voyage embed"):
-            batch = texts[i : i + self.embed_batch_size]
-            response = client.embed(batch, model=self.model_name, input_type=input_type)
-            all_emb.extend(response.embeddings)
-        return np.array(all_emb, dtype=np.float32)
+
+        async def embed_batch(batch):
+            response = await self._api.call_in_thread(client.embed, batch, model=self.model_name, input_type=input_type)
+            return response.embeddings
+
+        return self._embed_batches(texts, embed_batch, "Voyage embed")
 
     def _embed(self, texts: List[str], input_type: str = "document") -> np.ndarray:
         if self.provider == "openai":
@@ -218,38 +276,40 @@ class APIEmbeddingRetriever(BaseRetriever):
     # Cache management
     # ------------------------------------------------------------------
 
-    def _cache_path(self) -> str:
-        corpus_id = os.path.splitext(os.path.basename(self.corpus_path))[0]
-        folder = os.path.join(
-            self.cache_dir, "api_emb", self.provider, self.model_name.replace("/", "_"), corpus_id
+    def _open_embedding_cache(self, input_type: str) -> Optional[EmbeddingCache]:
+        if not self.embedding_cache:
+            return None
+        return EmbeddingCache(
+            os.path.join(self.cache_dir, "embeddings"),
+            model=f"{self.provider}/{self.model_name}",
+            instruction=input_type,
         )
-        os.makedirs(folder, exist_ok=True)
-        return os.path.join(folder, "doc_emb.npy")
 
     def _load_or_build_embeddings(self) -> np.ndarray:
-        cache = self._cache_path()
-        if os.path.isfile(cache):
-            print(f"Loading cached embeddings from {cache}")
-            return np.load(cache)
-        print(f"Embedding {len(self.doc_texts)} documents via {self.provider} ({self.model_name})…")
-        emb = self._embed(self.doc_texts, input_type="document")
-        np.save(cache, emb)
-        print(f"Saved embeddings to {cache}")
-        return emb
+        return encode_with_cache(
+            self._doc_cache, self.doc_texts, lambda texts: self._embed(texts, input_type="document"), report=True
+        )
 
     # ------------------------------------------------------------------
     # FAISS index
     # ------------------------------------------------------------------
 
     def _build_faiss_index(self, emb: np.ndarray) -> "faiss.Index":
-        dim = emb.shape[1]
         # L2-normalize for cosine similarity via inner product
-        norms = np.linalg.norm(emb, axis=1, keepdims=True)
-        norms = np.where(norms == 0, 1.0, norms)
-        emb_norm = (emb / norms).astype(np.float32)
-        index = faiss.IndexFlatIP(dim)
-        index.add(emb_norm)
-        return index
+        if resolve_index_spec(self.index_spec) == "Flat":
+            # Exact index is cheap to rebuild from the cached embeddings
+            return build_faiss_index(emb, "Flat", normalize=True)
+        return load_or_build_faiss_index(
+            # Keyed by the corpus content, so an edited corpus gets a fresh index
+            os.path.join(self.cache_dir, "api_index", self.provider, self.model_name.replace("/", "_"),
+                         texts_fingerprint(self.doc_texts)),
+            lambda: nullcontext(emb),
+            index_spec=self.index_spec,
+            normalize=True,
+            train_size=self.train_size,
+            nprobe=self.nprobe,
+            ef_search=self.ef_search,
+        )
 
     # ------------------------------------------------------------------
     # BaseRetriever interface
@@ -270,7 +330,9 @@ class APIEmbeddingRetriever(BaseRetriever):
             List[Document]: Documents with populated ``contexts``.
         """
         queries = [d.question.question for d in documents]
-        query_emb = self._embed(queries, input_type="query")
+        query_emb = encode_with_cache(
+            self._query_cache, queries, lambda texts: self._embed(texts, input_type="query")
+        )
 
         # L2-normalize for inner-product cosine search
         norms = np.linalg.norm(query_emb, axis=1, keepdims=True)
@@ -288,26 +350,12 @@ class APIEmbeddingRetriever(BaseRetriever):
                 text = self.doc_texts[idx]
                 title = self.doc_titles[idx]
 
-                has_ans = False
-                if document.answers and document.answers.answers:
-                    try:
-                        from pyserini.eval.evaluate_dpr_retrieval import (
-                            has_answers,
-                            SimpleTokenizer,
-                        )
-                        has_ans = has_answers(
-                            text, document.answers.answers, SimpleTokenizer()
-                        )
-                    except Exception:
-                        pass
-
                 contexts.append(
                     Context(
                         id=doc_id,
                         title=title,
                         text=text,
                         score=float(score),
-                        has_answer=has_ans,
                     )
                 )
             document.contexts = contexts
@@ -2,21 +2,23 @@ import os
 import requests
 import h5py
 import pickle
-import faiss
 import numpy as np
 import torch
 from tqdm import tqdm
 from transformers import AutoTokenizer, AutoModel
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 from typing import List
 import zipfile
 from urllib.parse import urlparse
 import shutil
 import gzip
+from contextlib import contextmanager
 
 from .base_retriever import BaseRetriever
 from .index_manager import IndexManager
+from .faiss_index import load_or_build_faiss_index
 from rankify.dataset.dataset import Document, Context
+from rankify.utils.passage_store import PassageStore
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache
 
 
 class BGERetriever(BaseRetriever):
@@ -28,13 +30,33 @@ class BGERetriever(BaseRetriever):
     """
     
     def __init__(self, model: str = "BAAI/bge-large-en-v1.5", index_type: str = "wiki", 
-                 index_folder: str = None, device: str = "cuda", **kwargs):
+                 index_folder: str = None, device: str = "cuda", index_spec: str = "Flat",
+                 nprobe: int = None, ef_search: int = None, train_size: int = None,
+                 embedding_cache: bool = True, **kwargs):
+        """
+        Args:
+            model (str): Hugging Face model used to encode queries.
+            index_type (str): Prebuilt index to download ('wiki', 'msmarco').
+            index_folder (str, optional): Local folder with ``bge_embeddings.h5`` and ``bge_doc_ids.pkl``.
+            device (str): Device for the query encoder.
+            index_spec (str): FAISS index type, e.g. ``"Flat"`` (exact), ``"HNSW32"``,
+                ``"IVF65536,PQ64"`` or ``"OPQ+IVF"``. Approximate indexes are trained once and cached
+                next to ``faiss_index.bin``.
+            nprobe (int, optional): IVF lists visited per query (higher = better recall, slower).
+            ef_search (int, optional): HNSW search depth (higher = better recall, slower).
+            train_size (int, optional): Number of embeddings sampled to train IVF/PQ/OPQ indexes.
+            embedding_cache (bool): Cache query embeddings by content under ``cache_dir/embeddings``,
+                so repeated queries (e.g. across evaluation runs) are encoded once.
+        """
         super().__init__(**kwargs)
         self.model_name = model
         self.index_type = index_type
         self.index_folder = index_folder
         self.device = device
-        self.tokenizer_simple = SimpleTokenizer()
+        self.index_spec = index_spec
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.train_size = train_size
         
         # Initialize index manager
         self.index_manager = IndexManager()
@@ -56,6 +78,10 @@ class BGERetriever(BaseRetriever):
         # Load model and tokenizer
         self.model_hf = AutoModel.from_pretrained(self.model_name).to(self.device).eval()
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.query_cache = EmbeddingCache(
+            os.path.join(self.index_manager.cache_dir, "embeddings"), model=self.model_name,
+            max_length=self.tokenizer.model_max_length, pooling="cls", normalize=True,
+        ) if embedding_cache else None
     
     def _initialize_searcher(self):
         """Initialize FAISS index for BGE retrieval."""
@@ -186,34 +212,25 @@ class BGERetriever(BaseRetriever):
                     os.remove(part_path)
     
     def _build_faiss_index(self):
-        """Build or load FAISS index."""
-        print("Handling FAISS index...")
-        
-        index_path = os.path.join(self.index_path, "faiss_index.bin")
+        """Build or load the FAISS index described by ``index_spec``."""
+        print(f"Handling FAISS index ({self.index_spec})...")
         embeddings_path = os.path.join(self.index_path, "bge_embeddings.h5")
-        
-        if os.path.exists(index_path):
-            print(f"Loading existing FAISS index from {index_path}...")
-            index = faiss.read_index(index_path)
-        else:
+
+        @contextmanager
+        def open_embeddings():
             print(f"Building FAISS index from embeddings at {embeddings_path}...")
             with h5py.File(embeddings_path, "r") as f:
-                embeddings = f["embeddings"][:].astype(np.float32)
-            
-            embedding_dim = embeddings.shape[1]
-            index = faiss.IndexFlatIP(embedding_dim)
-            
-            # Add embeddings in chunks
-            chunk_size = 50000
-            for start in tqdm(range(0, embeddings.shape[0], chunk_size), 
-                            desc="Adding embeddings to FAISS index"):
-                end = min(start + chunk_size, embeddings.shape[0])
-                chunk = embeddings[start:end]
-                index.add(chunk)
-            
-            print(f"Saving FAISS index to {index_path}...")
-            faiss.write_index(index, index_path)
-        
+                yield f["embeddings"]
+
+        index = load_or_build_faiss_index(
+            self.index_path,
+            open_embeddings,
+            index_spec=self.index_spec,
+            train_size=self.train_size,
+            nprobe=self.nprobe,
+            ef_search=self.ef_search,
+        )
+
         print(f"FAISS index loaded with {index.ntotal} embeddings.")
         return index
     
@@ -234,21 +251,12 @@ class BGERetriever(BaseRetriever):
         return doc_ids
     
     def _load_tsv(self):
-        """Load document texts from TSV file."""
+        """Open the memory-mapped passage store for the TSV file (built on first use)."""
         if not self.passage_path or not os.path.exists(self.passage_path):
             print("Warning: Passage file not found, using empty corpus")
             return {}
         
-        doc_texts = {}
-        with open(self.passage_path, "r", encoding="utf-8") as f:
-            next(f)  # Skip header
-            for line in f:
-                try:
-                    doc_id, passage, title = line.strip().split("\t")
-                    doc_texts[doc_id] = {"text": passage, "title": title}
-                except ValueError:
-                    continue  # Skip malformed lines
-        
+        doc_texts = PassageStore.open_or_build(self.passage_path)
         print(f"Loaded {len(doc_texts)} passages.")
         return doc_texts
     
@@ -273,7 +281,7 @@ class BGERetriever(BaseRetriever):
         print(f"Retrieving {len(documents)} documents with BGE...")
         
         # Encode queries
-        query_embeddings = self._encode_queries(queries)
+        query_embeddings = encode_with_cache(self.query_cache, queries, self._encode_queries, report=True)
         
         # Check dimension compatibility
         if query_embeddings.shape[1] != self.index.d:
@@ -325,5 +333,4 @@ class BGERetriever(BaseRetriever):
             title=doc_data["title"],
             text=doc_data["text"],
             score=float(score),
-            has_answer=has_answers(doc_data["text"], document.answers.answers, self.tokenizer_simple)
         )
\ No newline at end of file
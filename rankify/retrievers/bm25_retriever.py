@@ -2,7 +2,6 @@
 import json
 from typing import List
 from pyserini.search.lucene import LuceneSearcher
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 from tqdm import tqdm
 import os
 from .base_retriever import BaseRetriever
@@ -20,7 +19,6 @@ class BM25Retriever(BaseRetriever):
         super().__init__(**kwargs)
         self.index_type = index_type
         self.index_folder = index_folder
-        self.tokenizer = SimpleTokenizer()
         
         # Initialize index manager
         self.index_manager = IndexManager()
@@ -106,7 +104,6 @@ class BM25Retriever(BaseRetriever):
             title=title,
             text=text,
             score=hit.score,
-            has_answer=has_answers(text, document.answers.answers, self.tokenizer),
         )
     
     def _batch_search(self, queries: List[str], qids: List[str]) -> dict:
@@ -1,18 +1,20 @@
 import os
 import json
 import requests
+import torch
 import zipfile
 from tqdm import tqdm
-from typing import List
+from typing import List, Optional
 from urllib.parse import urlparse
 
 from rankify.utils.retrievers.colbert.colbert.infra import Run, RunConfig, ColBERTConfig
 from rankify.utils.retrievers.colbert.colbert import Searcher
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
+from rankify.utils.retrievers.colbert_index_updates import ColBERTIndexEditor, compact_index, passage_record
 
 from .base_retriever import BaseRetriever
 from .index_manager import IndexManager
 from rankify.dataset.dataset import Document, Context
+from rankify.utils.passage_store import PassageStore
 
 
 class ColBERTRetriever(BaseRetriever):
@@ -22,15 +24,57 @@ class ColBERTRetriever(BaseRetriever):
     Supports two modes:
     1. Prebuilt indices (wiki, msmarco) - Original format with passages.tsv
     2. Custom indices - New format with collection.tsv + ID mappings
+
+    Queries are searched in chunks of ``query_chunk_size`` with ``Searcher.search_all``: one batched
+    encoding pass and batched centroid scoring, then PLAID's per-query filtering, decompression and
+    scoring. Seconds per stage are kept in ``self.timings`` after ``retrieve``.
+
+    PLAID search settings:
+        preset (str, optional): ``'fast'``, ``'balanced'`` or ``'accurate'`` (see ``PLAID_PRESETS``).
+            By default the settings follow ``n_docs`` as in ColBERT (the three presets correspond to
+            its defaults for k <= 10, k <= 100 and larger k). A preset's ``ndocs`` is raised to
+            ``4 * n_docs`` when that is larger.
+        ncells (int, optional): Centroids probed per query token; overrides the preset.
+        centroid_score_threshold (float, optional): Centroid pruning threshold; overrides the preset.
+        ndocs (int, optional): Candidates kept after centroid interaction; overrides the preset.
+        load_index_with_mmap (bool, optional): Memory-map codes and residuals instead of loading them
+            into RAM (CPU only, single-chunk indexes). By default enabled on CPU for indexes of at
+            least ``MMAP_MIN_INDEX_GB``. Live updates need the index in RAM, so the first
+            ``add_passages`` / ``remove_passages`` reloads a memory-mapped index without mmap.
+
+    Custom indices can be updated live with ``add_passages`` / ``remove_passages``: changes are
+    searchable immediately and, with ``persist=True``, written to the index together with the ID
+    mappings and passage files. ``compact_index`` drops removed passages from the index for good.
     """
+
+    PLAID_PRESETS = {
+        "fast": {"ncells": 1, "centroid_score_threshold": 0.5, "ndocs": 256},
+        "balanced": {"ncells": 2, "centroid_score_threshold": 0.45, "ndocs": 1024},
+        "accurate": {"ncells": 4, "centroid_score_threshold": 0.4, "ndocs": 4096},
+    }
+    MMAP_MIN_INDEX_GB = 8
     
     def __init__(self, model: str = "colbert-ir/colbertv2.0", index_type: str = "wiki", 
-                 index_folder: str = None, **kwargs):
+                 index_folder: str = None, preset: Optional[str] = None, ncells: Optional[int] = None,
+                 centroid_score_threshold: Optional[float] = None, ndocs: Optional[int] = None,
+                 load_index_with_mmap: Optional[bool] = None, query_chunk_size: int = 1024, **kwargs):
         super().__init__(**kwargs)
         self.model = model
         self.index_type = index_type
         self.index_folder = index_folder
-        self.tokenizer = SimpleTokenizer()
+        if preset is not None and preset not in self.PLAID_PRESETS:
+            raise ValueError(f"Unknown ColBERT preset '{preset}'. Supported: {list(self.PLAID_PRESETS)}")
+        self.search_settings = dict(self.PLAID_PRESETS.get(preset, {}))
+        if preset is not None:
+            # As in Searcher.configure_for_k, keep at least 4 candidates per requested passage
+            self.search_settings["ndocs"] = max(self.search_settings["ndocs"], 4 * self.n_docs)
+        self.search_settings.update({name: value for name, value in (
+            ("ncells", ncells), ("centroid_score_threshold", centroid_score_threshold), ("ndocs", ndocs),
+        ) if value is not None})
+        self.load_index_with_mmap = load_index_with_mmap
+        self.query_chunk_size = query_chunk_size
+        self.timings = {}
+        self._index_editor = None
         
         # Initialize index manager
         self.index_manager = IndexManager()
@@ -151,11 +195,35 @@ class ColBERTRetriever(BaseRetriever):
             
             config = ColBERTConfig(
                 root=index_root,
-                collection=collection_path
+                collection=collection_path,
+                load_index_with_mmap=self._use_mmap(index_root),
+                **self.search_settings,
             )
             
             return Searcher(index=index_root, config=config)
     
+    def _use_mmap(self, index_root: str) -> bool:
+        """Whether to memory-map the index: as requested, else for large single-chunk indexes on CPU."""
+        if self.load_index_with_mmap is not None:
+            return self.load_index_with_mmap
+        metadata_file = os.path.join(index_root, "metadata.json")
+        if torch.cuda.is_available() or not os.path.exists(metadata_file):
+            return False
+        with open(metadata_file, "r", encoding="utf-8") as f:
+            num_chunks = json.load(f).get("num_chunks", 1)
+        size_gb = sum(
+            os.path.getsize(os.path.join(index_root, name)) for name in os.listdir(index_root)
+            if name.endswith((".codes.pt", ".residuals.pt"))
+        ) / 1024 ** 3
+        if size_gb < self.MMAP_MIN_INDEX_GB:
+            return False
+        if num_chunks != 1:
+            print(f"Index is {size_gb:.1f} GB in {num_chunks} chunks; coalesce it into one chunk "
+                  "(colbert/utils/coalesce.py) to load it with memory mapping.")
+            return False
+        print(f"Loading the {size_gb:.1f} GB index with memory mapping.")
+        return True
+
     def _ensure_index_and_passages_downloaded(self):
         """Download and extract ColBERT index and passages if needed (prebuilt indices only)."""
         if self.is_custom_index or self.index_folder:
@@ -293,46 +361,13 @@ class ColBERTRetriever(BaseRetriever):
                     os.remove(part_path)
     
     def _load_passages(self):
-        """Load passages with format detection."""
+        """Open the passages file as a memory-mapped passage store (built on first use)."""
         if not self.passages_file or not os.path.exists(self.passages_file):
             print("Warning: Passages file not found, using empty passages dict")
             return {}
         
-        passages = {}
         print(f"Loading passages from {self.passages_file}...")
-        
-        # Detect if the first line has integer or string IDs
-        with open(self.passages_file, "r", encoding="utf-8") as f:
-            first_line = f.readline().strip()
-            f.seek(0)  # Reset to beginning
-            
-            # Check if header exists
-            has_header = first_line.startswith('id\t') or first_line.lower().startswith('id\t')
-            
-            if has_header:
-                next(f)  # Skip header
-            
-            # Process lines
-            for line_num, line in enumerate(f, 1):
-                try:
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    parts = line.split("\t")
-                    if len(parts) >= 2:
-                        pid = parts[0]  # Keep as string (works for both int and string IDs)
-                        text = parts[1] if len(parts) > 1 else ""
-                        title = parts[2] if len(parts) > 2 else ""
-                        
-                        passages[pid] = {"text": text, "title": title}
-                    else:
-                        print(f"Warning: Malformed line {line_num} in passages file")
-                        
-                except Exception as e:
-                    print(f"Error processing line {line_num}: {e}")
-                    continue
-        
+        passages = PassageStore.open_or_build(self.passages_file, fmt="tsv")
         print(f"✅ Loaded {len(passages)} passages")
         return passages
     
@@ -350,16 +385,27 @@ class ColBERTRetriever(BaseRetriever):
         print(f"Retrieving {len(documents)} documents with ColBERT...")
         print(f"Mode: {'Custom index' if self.is_custom_index else f'Prebuilt index ({self.index_type})'}")
         
-        for i, document in enumerate(tqdm(documents, desc="Processing documents")):
-            query = document.question.question
+        self.timings = {}
+        for start in tqdm(range(0, len(documents), self.query_chunk_size), desc="Processing documents"):
+            chunk = documents[start:start + self.query_chunk_size]
+            queries = {i: document.question.question for i, document in enumerate(chunk)}
             
             try:
-                # ColBERT search returns (document_ids, ranks, scores)
-                results = self.searcher.search(query, k=self.n_docs)
-                document_ids, ranks, scores = results
-                
+                # ColBERT search_all returns a Ranking of (document_id, rank, score) per query
+                results = self.searcher.search_all(queries, k=self.n_docs, timings=self.timings).data
+            except Exception as e:
+                # Search the chunk query by query so only the failing queries lose their contexts
+                print(f"Error searching documents {start}-{start + len(chunk) - 1}: {e}; retrying one by one")
+                results = {}
+                for i, query in queries.items():
+                    try:
+                        results[i] = list(zip(*self.searcher.search(query, k=self.n_docs)))
+                    except Exception as e:
+                        print(f"Error searching for document {start + i}: {e}")
+            
+            for i, document in enumerate(chunk):
                 contexts = []
-                for result_id, rank, score in zip(document_ids, ranks, scores):
+                for result_id, rank, score in results.get(i, []):
                     try:
                         context = self._create_context_from_result(result_id, score, document)
                         if context:
@@ -368,27 +414,94 @@ class ColBERTRetriever(BaseRetriever):
                         print(f"Error processing result {result_id}: {e}")
                 
                 document.contexts = contexts
-                
-            except Exception as e:
-                print(f"Error searching for document {i}: {e}")
-                document.contexts = []
         
+        if self.timings:
+            print("ColBERT search time per stage: " + ", ".join(
+                f"{stage} {seconds:.2f}s" for stage, seconds in self.timings.items()))
         return documents
     
+    def _editor(self) -> ColBERTIndexEditor:
+        """Index editor for live updates (custom indices only)."""
+        if not self.is_custom_index or self.id_mappings is None:
+            raise ValueError("Live updates need a custom ColBERT index built by ColBERTIndexer.")
+        if self._index_editor is None:
+            if self.searcher.ranker.load_index_with_mmap:
+                # The updater rewrites codes and residuals in place, which a memory-mapped index cannot take
+                print("Reloading the memory-mapped ColBERT index into memory for live updates...")
+                self.load_index_with_mmap = False
+                self.searcher = self._initialize_searcher()
+            self._index_editor = ColBERTIndexEditor(self.searcher, self.id_mappings)
+        return self._index_editor
+
+    def add_passages(self, passages: List[dict], persist: bool = True) -> List[int]:
+        """
+        Add passages to the index; they are searchable as soon as this returns.
+
+        Args:
+            passages (List[dict]): Documents as in the indexed corpus JSONL (``id``, ``contents`` or
+                ``text``, ``title``). An id that is already indexed replaces the indexed passage.
+            persist (bool): Write the change to disk now (else call ``persist_updates`` later).
+
+        Returns:
+            List[int]: ColBERT passage ids of the added passages.
+        """
+        records = [passage_record(passage, f"doc_{i}") for i, passage in enumerate(passages)]
+        records = [record for record in records if record[1]]
+        pids = self._editor().add(records)
+        if persist:
+            self.persist_updates()
+        print(f"Added {len(pids)} passages to the ColBERT index")
+        return pids
+
+    def remove_passages(self, ids: List[str], persist: bool = True) -> List[str]:
+        """
+        Remove passages by original id; they are no longer retrieved as soon as this returns.
+
+        Args:
+            ids (List[str]): Original passage ids (ids not in the index are skipped).
+            persist (bool): Write the change to disk now (else call ``persist_updates`` later).
+
+        Returns:
+            List[str]: The ids that were removed.
+        """
+        removed = self._editor().remove(ids)
+        if persist:
+            self.persist_updates()
+        print(f"Removed {len(removed)} passages from the ColBERT index")
+        return removed
+
+    def persist_updates(self):
+        """Write pending live updates to the index, passages and ID mapping files."""
+        if self._index_editor is not None:
+            self._index_editor.persist()
+
+    def compact_index(self):
+        """Persist pending updates, drop removed passages from the index and reload it."""
+        self.persist_updates()
+        stats = compact_index(self.index_path)
+        self._index_editor = None
+        self.id_mappings = self._load_id_mappings()
+        self.searcher = self._initialize_searcher()
+        self.passages = self._load_passages()
+        return stats
+    
     def _create_context_from_result(self, result_id: int, score: float, document: Document) -> Context:
         """Create Context object from ColBERT search result."""
         # Convert result ID to appropriate format
         passage_id = self._convert_result_id(result_id)
         
-        # Find passage by ID
-        if passage_id in self.passages:
-            passage = self.passages[passage_id]
+        # Find passage by ID (passages added live are not in the passage store until it is rebuilt)
+        passage = None
+        if self._index_editor is not None:
+            passage = self._index_editor.passages.get(str(passage_id))
+        if passage is None:
+            passage = self.passages.get(passage_id)
+        if passage is not None:
             return Context(
                 id=passage_id,
                 title=passage["title"],
                 text=passage["text"],
                 score=float(score),
-                has_answer=has_answers(passage["text"], document.answers.answers, self.tokenizer)
             )
         else:
             print(f"Warning: Passage {passage_id} (result_id: {result_id}) not found in passages dict")
@@ -9,16 +9,17 @@ import glob
 import tarfile
 import zipfile
 from urllib.parse import urlparse
+from itertools import islice
 
 from rankify.utils.retrievers.contriever.index import Indexer
 from rankify.utils.retrievers.contriever.normalize_text import normalize
-from rankify.utils.retrievers.contriever.data import load_passages
 from rankify.utils.retrievers.contriever.contriever import load_retriever
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 
 from .base_retriever import BaseRetriever
 from .index_manager import IndexManager
 from rankify.dataset.dataset import Document, Context
+from rankify.utils.passage_store import PassageStore
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache
 
 # Set tokenizers parallelism
 os.environ["TOKENIZERS_PARALLELISM"] = "true"
@@ -35,13 +36,12 @@ class ContrieverRetriever(BaseRetriever):
     """
     
     def __init__(self, model: str = "facebook/contriever-msmarco", index_type: str = "wiki", 
-                 index_folder: str = None, device: str = "cuda", **kwargs):
+                 index_folder: str = None, device: str = "cuda", embedding_cache: bool = True, **kwargs):
         super().__init__(**kwargs)
         self.model_path = model
         self.index_type = index_type
         self.index_folder = index_folder
         self.device = device
-        self.tokenizer_simple = SimpleTokenizer()
         
         # Initialize index manager
         self.index_manager = IndexManager()
@@ -59,57 +59,24 @@ class ContrieverRetriever(BaseRetriever):
         # Load components
         self.index = self._load_index()
         print(f"Loading passages from: {self.passage_path}")
-        self.passages = load_passages(self.passage_path)
-        
-        # FIXED: Handle both string and integer IDs properly
-        self.passage_id_map = self._create_passage_id_map(self.passages)
+        # Memory-mapped store; lookups accept both string and integer IDs
+        self.passages = PassageStore.open_or_build(self.passage_path)
+        self.passage_id_map = self.passages
         
         # Debug: Print some sample IDs to understand the format
-        sample_ids = list(self.passage_id_map.keys())[:5]
+        sample_ids = list(islice(self.passage_id_map, 5))
         print(f"Sample passage IDs: {sample_ids}")
         print(f"Total passages loaded: {len(self.passage_id_map)}")
         
         # Load model
         self.model, self.tokenizer, _ = load_retriever(self.model_path)
         self.model = self.model.to(self.device).eval()
-    
-    def _create_passage_id_map(self, passages: List[Dict]) -> Dict[Union[str, int], Dict]:
-        """
-        FIXED: Create passage ID mapping that handles both string and integer IDs.
-        
-        Args:
-            passages: List of passage dictionaries
-            
-        Returns:
-            Dictionary mapping IDs (strings or integers) to passage data
-        """
-        passage_map = {}
-        
-        for passage in passages:
-            original_id = passage["id"]
-            
-            # Try to convert to int, but keep as string if it fails
-            try:
-                # First try direct integer conversion
-                int_id = int(original_id)
-                passage_map[int_id] = passage
-            except (ValueError, TypeError):
-                # If that fails, keep as string
-                passage_map[str(original_id)] = passage
-                
-                # Also try extracting numbers from string IDs for compatibility
-                try:
-                    # Extract numeric part if it's a string like "doc123" or similar
-                    numeric_part = ''.join(filter(str.isdigit, str(original_id)))
-                    if numeric_part:
-                        int_id = int(numeric_part)
-                        # Store both string and integer versions for flexibility
-                        if int_id not in passage_map:
-                            passage_map[int_id] = passage
-                except:
-                    pass  # If extraction fails, just use string
-        
-        return passage_map
+
+        # Query embeddings by content; queries are lower-cased and normalized before encoding
+        self.query_cache = EmbeddingCache(
+            os.path.join(self.index_manager.cache_dir, "embeddings"), model=self.model_path,
+            max_length=512, preprocessing="lower+normalize",
+        ) if embedding_cache else None
     
     def _initialize_searcher(self):
         """Initialize searcher - not needed for Contriever as it uses direct FAISS."""
@@ -340,7 +307,7 @@ class ContrieverRetriever(BaseRetriever):
         queries = [doc.question.question.replace("?", "") for doc in documents]
         
         # Embed queries
-        query_embeddings = self._embed_queries(queries)
+        query_embeddings = encode_with_cache(self.query_cache, queries, self._embed_queries, report=True)
         
         # Search using FAISS index
         top_ids_and_scores = self.index.search_knn(
@@ -416,7 +383,7 @@ class ContrieverRetriever(BaseRetriever):
         
         if passage is None:
             print(f"Warning: Document {original_doc_id} not found in passage map")
-            print(f"Available ID types: {type(list(self.passage_id_map.keys())[0]) if self.passage_id_map else 'None'}")
+            print(f"Available ID types: {type(next(iter(self.passage_id_map))) if self.passage_id_map else 'None'}")
             return None
         
         # Get text content (handle different field names)
@@ -427,10 +394,4 @@ class ContrieverRetriever(BaseRetriever):
             title=passage.get("title", ""),
             text=text_content,
             score=float(score),
-            has_answer=has_answers(
-                text_content, 
-                document.answers.answers, 
-                self.tokenizer_simple, 
-                regex=False
-            )
         )
\ No newline at end of file
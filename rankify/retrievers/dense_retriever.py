@@ -4,13 +4,13 @@ import os
 import requests
 from typing import List
 from pyserini.search.faiss import FaissSearcher
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 from transformers import AutoTokenizer
 from tqdm import tqdm
 
 from .base_retriever import BaseRetriever
 from .index_manager import IndexManager
 from rankify.dataset.dataset import Document, Context
+from rankify.utils.passage_store import PassageStore
 
 class DenseRetriever(BaseRetriever):
     """
@@ -27,7 +27,6 @@ class DenseRetriever(BaseRetriever):
         self.method = method
         self.index_type = index_type
         self.index_folder = index_folder
-        self.tokenizer = SimpleTokenizer()
         
         # Initialize index manager
         self.index_manager = IndexManager()
@@ -133,7 +132,7 @@ class DenseRetriever(BaseRetriever):
             return None
     
     def _load_msmarco_corpus(self):
-        """Load MSMARCO corpus into memory."""
+        """Open the MSMARCO corpus as a memory-mapped passage store."""
         corpus_file = os.path.join(self.index_manager.cache_dir, "msmarco-passage-corpus.tsv")
         
         if not os.path.exists(corpus_file):
@@ -141,14 +140,7 @@ class DenseRetriever(BaseRetriever):
             self._download_file(self.MSMARCO_CORPUS_URL, corpus_file)
         
         print("Loading MSMARCO corpus...")
-        self.corpus = {}
-        with open(corpus_file, "r", encoding="utf-8") as f:
-            next(f)  # Skip header
-            for line in f:
-                parts = line.strip().split("\t")
-                if len(parts) >= 3:
-                    doc_id, text, title = parts[0], parts[1], parts[2]
-                    self.corpus[doc_id] = {"text": text, "title": title}
+        self.corpus = PassageStore.open_or_build(corpus_file)
     
     def _download_file(self, url: str, save_path: str):
         """Download a file from URL."""
@@ -257,7 +249,6 @@ class DenseRetriever(BaseRetriever):
             title=title,
             text=text,
             score=hit.score,
-            has_answer=has_answers(text, document.answers.answers, self.tokenizer)
         )
     
     def _batch_search(self, queries: List[str], qids: List[str]) -> dict:
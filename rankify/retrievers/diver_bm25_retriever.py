@@ -13,37 +13,21 @@ from gensim.corpora import Dictionary
 from gensim.models import LuceneBM25Model
 from gensim.similarities import SparseMatrixSimilarity
 from pyserini import analysis
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 
 from .base_retriever import BaseRetriever
+from .utils import topk_from_scores
 from rankify.dataset.dataset import Document, Context
 
-# Helper function from diver's original code
-def get_scores(
-        query_ids: List[str], 
-        doc_ids: List[str], 
-        scores: List[List[float]],
-        num_hits: int = 1000):
-
-    assert len(scores) == len(query_ids)
-    
-    emb_scores = {}
-    for query_id, row in zip(query_ids, scores):
-        cur = {str(doc_id): float(s) for doc_id, s in zip(doc_ids, row)}
-        ranked = sorted(cur.items(), key=lambda x: x[1], reverse=True)[:num_hits]
-        emb_scores[str(query_id)] = {doc_id: sc for doc_id, sc in ranked}
-
-    return emb_scores
-
 # To normalize BM25's similarity scoring
 
-def minmax_normalize(scores, eps=1e-8):
+def minmax_normalize(scores, eps=1e-8, min_s=None, max_s=None):
+    # min_s / max_s let callers normalize a top-k slice by the full row's range
     scores = np.asarray(scores, dtype=np.float32)
-    min_s = float(scores.min())
-    max_s = float(scores.max())
+    min_s = float(scores.min()) if min_s is None else min_s
+    max_s = float(scores.max()) if max_s is None else max_s
     if max_s - min_s < eps:
-        return [0.0] * len(scores)
-    return ((scores - min_s) / (max_s - min_s + eps)).tolist()
+        return np.zeros_like(scores)
+    return (scores - min_s) / (max_s - min_s + eps)
 
 
 
@@ -78,7 +62,6 @@ class DiverBM25Retriever(BaseRetriever):
         self.k1 = k1
         self.b = b
 
-        self.tokenizer_simple = SimpleTokenizer()
         self.analyzer = analysis.Analyzer(analysis.get_lucene_analyzer())
 
         self.dictionary = None
@@ -123,31 +106,23 @@ class DiverBM25Retriever(BaseRetriever):
 
     def retrieve(self, documents: List[Document]) -> List[Document]:
         queries = [d.question.question for d in documents]
-        query_ids = [str(d.id) if d.id is not None else str(i) for i, d in enumerate(documents)]
 
-        all_scores_list = []
+        top_scores, top_indices = [], []
         for query in tqdm(queries, desc="BM25 retrieval"):
             query_analyzed = self.analyzer.analyze(query)
             bm25_query = self.model[self.dictionary.doc2bow(query_analyzed)]
-            scores = self.bm25_index[bm25_query].tolist()
+            scores = np.asarray(self.bm25_index[bm25_query], dtype=np.float32)
+            row_scores, row_indices = topk_from_scores(scores, self.n_docs)
             if self.normalize_scores:
-                scores = minmax_normalize(scores)
-            all_scores_list.append(scores)
+                row_scores = minmax_normalize(row_scores, min_s=float(scores.min()), max_s=float(scores.max()))
+            top_scores.append(row_scores)
+            top_indices.append(row_indices)
 
-        results = get_scores(
-            query_ids=query_ids,
-            doc_ids=self.doc_ids,
-            scores=all_scores_list,
-            num_hits=self.n_docs,
-        )
-
-        for d, query_id in zip(documents, query_ids):
+        # Fill contexts
+        for d, row_scores, row_indices in zip(documents, top_scores, top_indices):
             ctxs: List[Context] = []
-            for doc_id, score in results[query_id].items():
-                idx = self._docid_to_idx.get(str(doc_id))
-                if idx is None:
-                    continue
-
+            for idx, score in zip(row_indices.tolist(), row_scores.tolist()):
+                doc_id = self.doc_ids[idx]
                 text = self.doc_texts[idx]
                 title = self.doc_titles[idx] if idx < len(self.doc_titles) else ""
 
@@ -157,7 +132,6 @@ class DiverBM25Retriever(BaseRetriever):
                         title=title,
                         text=text,
                         score=float(score),
-                        has_answer=has_answers(text, d.answers.answers, self.tokenizer_simple),
                     )
                 )
             d.contexts = ctxs
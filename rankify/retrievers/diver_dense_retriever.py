@@ -18,11 +18,11 @@ from tqdm import tqdm
 
 from transformers import AutoTokenizer, AutoModel, AutoModelForSequenceClassification
 from sentence_transformers import SentenceTransformer
-from torchmetrics.functional.pairwise import pairwise_cosine_similarity
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 
 from .base_retriever import BaseRetriever
+from .utils import dense_topk
 from rankify.dataset.dataset import Document, Context
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache
 
 # Optional imports for specific models
 try:
@@ -54,22 +54,6 @@ def mean_pooling(token_embeddings, mask):
     sentence_embeddings = token_embeddings.sum(dim=1) / mask.sum(dim=1)[..., None]
     return sentence_embeddings
 
-def get_scores(
-        query_ids: List[str], 
-        doc_ids: List[str], 
-        scores: List[List[float]],
-        num_hits: int = 1000):
-
-    assert len(scores) == len(query_ids)
-    
-    emb_scores = {}
-    for query_id, row in zip(query_ids, scores):
-        cur = {str(doc_id): float(s) for doc_id, s in zip(doc_ids, row)}
-        ranked = sorted(cur.items(), key=lambda x: x[1], reverse=True)[:num_hits]
-        emb_scores[str(query_id)] = {doc_id: sc for doc_id, sc in ranked}
-
-    return emb_scores
-
 
 # Main DiverDenseRetriever Class
 class DiverDenseRetriever(BaseRetriever):
@@ -78,6 +62,10 @@ class DiverDenseRetriever(BaseRetriever):
     - SentenceTransformers (bge, sbert, nomic, instructor)
     - HF AutoModels (sf, qwen, e5, rader, contriever, m2)
     - GritLM (grit)
+
+    Document and query embeddings are kept in a content-addressed ``EmbeddingCache`` under
+    ``cache_dir/embeddings`` (``embedding_cache=False`` disables it), so a changed corpus only
+    re-encodes its new or edited passages and repeated queries are encoded once.
     """
 
     def __init__(
@@ -101,6 +89,7 @@ class DiverDenseRetriever(BaseRetriever):
         
         checkpoint: Optional[str] = None,
         device: Optional[str] = None,
+        embedding_cache: bool = True,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -133,8 +122,6 @@ class DiverDenseRetriever(BaseRetriever):
         
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
 
-        self.tokenizer_simple = SimpleTokenizer()
-
         # Load corpus
         self.doc_ids, self.doc_texts, self.doc_titles = self._load_corpus()
         self._docid_to_idx = {str(did): i for i, did in enumerate(self.doc_ids)}
@@ -144,6 +131,9 @@ class DiverDenseRetriever(BaseRetriever):
         self.tokenizer = None
         self._load_model()
 
+        self.embedding_cache = embedding_cache
+        self._doc_cache = self._open_embedding_cache("document")
+        self._query_cache = self._open_embedding_cache("query")
         self.doc_emb = self._load_or_build_doc_embeddings()
 
     def _load_model(self):
@@ -235,16 +225,18 @@ class DiverDenseRetriever(BaseRetriever):
 
         return doc_ids, doc_texts, doc_titles
 
-    def _corpus_id(self):
-        return os.path.basename(os.path.dirname(self.corpus_path))
-
-    def _cache_file(self):
-        # match Diver folder naming so you can reuse caches
-        batch_size = self.encode_batch_size
-        corpus_id = self._corpus_id()
-        folder = os.path.join(self.cache_dir, "doc_emb", corpus_id, self.model_id, self.task, f"long_{self.long_context}_{batch_size}")
-        os.makedirs(folder, exist_ok=True)
-        return os.path.join(folder, "0.npy")
+    def _open_embedding_cache(self, role: str) -> Optional[EmbeddingCache]:
+        if not self.embedding_cache:
+            return None
+        return EmbeddingCache(
+            os.path.join(self.cache_dir, "embeddings"),
+            model=f"diver/{self.model_id}/{self.checkpoint or ''}",
+            instruction=self.instruction_document if role == "document" else self.instruction_query,
+            max_length=self.doc_max_length if role == "document" else self.query_max_length,
+            role=role,
+            task=self.task,
+            long_context=self.long_context,
+        )
 
     def _encode_hf_auto_model(self, texts, max_length, instruction=None):
         # For sf, qwen, e5, rader
@@ -332,13 +324,15 @@ class DiverDenseRetriever(BaseRetriever):
         return np.vstack(all_embeddings)
     
     def _load_or_build_doc_embeddings(self):
-        cache_file = self._cache_file()
-        if os.path.isfile(cache_file):
-            doc_emb = np.load(cache_file, allow_pickle=True)
-            return doc_emb
+        doc_emb = encode_with_cache(self._doc_cache, self.doc_texts, self._encode_documents, report=True)
 
-        docs = self.doc_texts
-        
+        assert len(self.doc_ids) == doc_emb.shape[0], (
+            f"Embedding mismatch: {len(self.doc_ids)} docs vs {doc_emb.shape[0]} embeddings"
+        )
+
+        return doc_emb
+
+    def _encode_documents(self, docs: List[str]):
         # Encoding logic based on model_id
         if self.model_id in ["bge", "sbert", "contriever_st", "nomic", "diver"]:
             doc_emb = self.model.encode(docs, show_progress_bar=True, batch_size=self.encode_batch_size, normalize_embeddings=True)
@@ -371,12 +365,6 @@ class DiverDenseRetriever(BaseRetriever):
         else:
             raise ValueError(f"Encoding not implemented for {self.model_id}")
 
-        np.save(cache_file, doc_emb)
-
-        assert len(self.doc_ids) == doc_emb.shape[0], (
-            f"Embedding mismatch: {len(self.doc_ids)} docs vs {doc_emb.shape[0]} embeddings"
-        )
-
         return doc_emb
     
     def _initialize_searcher(self):
@@ -418,32 +406,21 @@ class DiverDenseRetriever(BaseRetriever):
 
     def retrieve(self, documents: List[Document]):
         queries = [d.question.question for d in documents]
-        query_ids = [str(d.id) if d.id is not None else str(i) for i, d in enumerate(documents)]
 
-        query_emb = self._encode_queries(queries)
+        query_emb = encode_with_cache(self._query_cache, queries, self._encode_queries, report=True)
         
         # Ensure doc_emb is loaded
         if self.doc_emb is None:
             self.doc_emb = self._load_or_build_doc_embeddings()
                 
-        # Use torchmetrics for cosine similarity
-        scores = pairwise_cosine_similarity(torch.from_numpy(query_emb), torch.from_numpy(self.doc_emb)).tolist()
-
-        results = get_scores(
-            query_ids=query_ids,
-            doc_ids=self.doc_ids,
-            scores=scores,
-            num_hits=self.n_docs,
-        )
+        # Cosine similarity + top-k over corpus shards, without materializing the full score matrix
+        top_scores, top_indices = dense_topk(query_emb, self.doc_emb, k=self.n_docs)
 
         # Fill contexts
-        for d, query_id in zip(documents, query_ids):
+        for d, row_scores, row_indices in zip(documents, top_scores, top_indices):
             ctxs: List[Context] = []
-            for doc_id, score in results[query_id].items():
-                idx = self._docid_to_idx.get(str(doc_id))
-                if idx is None:
-                    continue
-
+            for idx, score in zip(row_indices.tolist(), row_scores.tolist()):
+                doc_id = self.doc_ids[idx]
                 text = self.doc_texts[idx]
                 title = self.doc_titles[idx] if idx < len(self.doc_titles) else ""
 
@@ -453,7 +430,6 @@ class DiverDenseRetriever(BaseRetriever):
                         title=title,
                         text=text,
                         score=float(score),
-                        has_answer=has_answers(text, d.answers.answers, self.tokenizer_simple),
                     )
                 )
             d.contexts = ctxs
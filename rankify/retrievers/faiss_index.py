@@ -0,0 +1,245 @@
+"""
+Configurable FAISS index construction shared by the dense retrievers.
+
+``build_faiss_index`` turns an ``index_spec`` into a FAISS index, trains it on a random
+sample of the corpus when the index type needs training, and adds the embeddings in chunks
+so that h5py datasets and ``np.memmap`` arrays are never loaded into RAM in full.
+
+Supported ``index_spec`` values:
+
+* ``"Flat"`` (default) – exact inner-product search (``IndexFlatIP``).
+* ``"HNSW32"`` – graph-based search, tuned at query time with ``ef_search``.
+* ``"IVF65536,PQ64"`` – inverted lists with product quantization, tuned with ``nprobe``.
+* ``"OPQ+IVF"`` – alias for ``"OPQ64,IVF65536,SQ8"`` (rotation + IVF + 8-bit scalar quantization).
+* Any other string accepted by ``faiss.index_factory``.
+"""
+
+import os
+import re
+from typing import Optional
+
+import numpy as np
+from tqdm import tqdm
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+
+# Short names for common speed / memory trade-offs
+INDEX_SPEC_ALIASES = {
+    "flat": "Flat",
+    "hnsw": "HNSW32",
+    "ivfpq": "IVF65536,PQ64",
+    "ivf+pq": "IVF65536,PQ64",
+    "opq+ivf": "OPQ64,IVF65536,SQ8",
+    "ivfsq": "IVF65536,SQ8",
+}
+
+# FAISS recommends between 30 and 256 training points per IVF centroid
+_TRAIN_POINTS_PER_CENTROID = 64
+_MIN_TRAIN_SIZE = 100_000
+
+
+def resolve_index_spec(index_spec: Optional[str]) -> str:
+    """
+    Normalizes an index spec, expanding aliases such as ``"OPQ+IVF"``.
+
+    Args:
+        index_spec (str, optional): Index spec or alias. ``None`` means ``"Flat"``.
+
+    Returns:
+        str: A string understood by ``faiss.index_factory``.
+    """
+    if not index_spec:
+        return "Flat"
+    return INDEX_SPEC_ALIASES.get(index_spec.strip().lower(), index_spec.strip())
+
+
+def index_cache_path(index_dir: str, index_spec: Optional[str], base_name: str = "faiss_index.bin",
+                     train_size: Optional[int] = None) -> str:
+    """
+    Returns the on-disk location of the index for ``index_spec``.
+
+    The flat index keeps the historical ``faiss_index.bin`` name so existing caches are reused;
+    other specs are stored next to it as ``faiss_index.<spec>.bin``, or
+    ``faiss_index.<spec>.train<train_size>.bin`` when an explicit training sample size is given,
+    so changing ``train_size`` builds a new index instead of reusing one trained differently.
+    """
+    spec = resolve_index_spec(index_spec)
+    if spec == "Flat":
+        return os.path.join(index_dir, base_name)
+    stem, ext = os.path.splitext(base_name)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", spec).strip("_")
+    if train_size is not None:
+        slug += f".train{int(train_size)}"
+    return os.path.join(index_dir, f"{stem}.{slug}{ext}")
+
+
+def _default_train_size(spec: str, n_total: int) -> int:
+    match = re.search(r"IVF(\d+)", spec)
+    if not match:
+        return min(n_total, _MIN_TRAIN_SIZE)
+    nlist = int(match.group(1))
+    return min(n_total, max(_MIN_TRAIN_SIZE, nlist * _TRAIN_POINTS_PER_CENTROID))
+
+
+def _normalized(chunk, normalize: bool) -> np.ndarray:
+    chunk = np.ascontiguousarray(chunk, dtype=np.float32)
+    if normalize:
+        norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+        chunk = chunk / np.where(norms == 0, 1.0, norms)
+    return chunk
+
+
+def sample_training_vectors(embeddings, train_size: int, normalize: bool = False,
+                            seed: int = 1234, chunk_size: int = 50000) -> np.ndarray:
+    """
+    Draws a uniform random sample of rows to train quantizers on.
+
+    Rows are read in increasing order and in chunks, which is what h5py datasets require
+    and keeps memory bounded by ``train_size`` rows.
+
+    Args:
+        embeddings: Array-like of shape ``(n, dim)`` supporting slicing (NumPy, memmap or h5py).
+        train_size (int): Number of rows to sample.
+        normalize (bool): L2-normalize the sampled rows.
+        seed (int): Random seed, so repeated builds train on the same sample.
+        chunk_size (int): Number of sampled rows fetched per read.
+
+    Returns:
+        np.ndarray: Float32 array of shape ``(min(train_size, n), dim)``.
+    """
+    n_total = embeddings.shape[0]
+    if train_size >= n_total:
+        return _normalized(embeddings[:], normalize)
+
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(n_total, size=train_size, replace=False))
+    parts = [
+        _normalized(embeddings[rows[start:start + chunk_size]], normalize)
+        for start in range(0, len(rows), chunk_size)
+    ]
+    return np.vstack(parts)
+
+
+def set_search_params(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """
+    Applies the query-time speed/recall knobs to an index.
+
+    Works through pre-transforms (OPQ) and ID maps by going through ``faiss.ParameterSpace``.
+    Parameters that do not apply to the index type are ignored.
+
+    Args:
+        index (faiss.Index): The index to configure.
+        nprobe (int, optional): Number of inverted lists visited by IVF indexes.
+        ef_search (int, optional): Candidate list size for HNSW indexes.
+    """
+    params = faiss.ParameterSpace()
+    if nprobe is not None and _is_ivf(index):
+        params.set_index_parameter(index, "nprobe", int(nprobe))
+    if ef_search is not None and _is_hnsw(index):
+        params.set_index_parameter(index, "efSearch", int(ef_search))
+    return index
+
+
+def _is_ivf(index) -> bool:
+    try:
+        faiss.extract_index_ivf(index)
+        return True
+    except RuntimeError:
+        return False
+
+
+def _is_hnsw(index) -> bool:
+    inner = faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexPreTransform):
+        inner = faiss.downcast_index(inner.index)
+    return isinstance(inner, faiss.IndexHNSW)
+
+
+def build_faiss_index(embeddings, index_spec: Optional[str] = "Flat", normalize: bool = False,
+                      train_size: Optional[int] = None, chunk_size: int = 50000, seed: int = 1234):
+    """
+    Builds an inner-product FAISS index from an embedding matrix.
+
+    Args:
+        embeddings: Array-like of shape ``(n, dim)`` supporting slicing (NumPy, memmap or h5py dataset).
+        index_spec (str): Index spec or alias, see module docstring. Defaults to ``"Flat"``.
+        normalize (bool): L2-normalize embeddings before indexing (cosine similarity).
+        train_size (int, optional): Number of vectors used to train IVF/PQ/OPQ indexes.
+            Defaults to ``max(100k, 64 * nlist)`` capped by the corpus size.
+        chunk_size (int): Number of vectors added per ``index.add`` call.
+        seed (int): Seed for training-sample selection.
+
+    Returns:
+        faiss.Index: The trained and populated index.
+
+    Raises:
+        ImportError: If faiss is not installed.
+        ValueError: If the corpus is too small to train the requested index.
+    """
+    if not FAISS_AVAILABLE:
+        raise ImportError("faiss is required. Install with: pip install faiss-cpu  (or faiss-gpu)")
+
+    spec = resolve_index_spec(index_spec)
+    n_total, dim = embeddings.shape
+    index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+
+    if not index.is_trained:
+        n_train = min(train_size or _default_train_size(spec, n_total), n_total)
+        match = re.search(r"IVF(\d+)", spec)
+        if match and n_train < int(match.group(1)):
+            raise ValueError(
+                f"Index spec '{spec}' needs at least {match.group(1)} training vectors, "
+                f"but only {n_train} are available. Use a smaller IVF size."
+            )
+        print(f"Training FAISS index '{spec}' on {n_train} vectors...")
+        index.train(sample_training_vectors(embeddings, n_train, normalize=normalize, seed=seed))
+
+    for start in tqdm(range(0, n_total, chunk_size), desc=f"Adding embeddings to FAISS index ({spec})"):
+        index.add(_normalized(embeddings[start:start + chunk_size], normalize))
+
+    return index
+
+
+def load_or_build_faiss_index(index_dir: str, open_embeddings, index_spec: Optional[str] = "Flat",
+                              normalize: bool = False, train_size: Optional[int] = None,
+                              nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                              base_name: str = "faiss_index.bin", mmap: bool = False):
+    """
+    Loads the index for ``index_spec`` from ``index_dir`` or builds and caches it there.
+
+    Args:
+        index_dir (str): Directory holding the cached index files.
+        open_embeddings (callable): Zero-argument callable returning a context manager that
+            yields the embedding array-like. Only called when the index has to be built.
+        index_spec (str): Index spec or alias.
+        normalize (bool): L2-normalize embeddings before indexing.
+        train_size (int, optional): Training sample size for IVF/PQ/OPQ indexes.
+        nprobe (int, optional): IVF lists probed at query time.
+        ef_search (int, optional): HNSW candidate list size at query time.
+        base_name (str): File name of the flat index; other specs derive their name from it.
+        mmap (bool): Memory-map the cached index instead of reading it into RAM.
+
+    Returns:
+        faiss.Index: The ready-to-search index.
+    """
+    if not FAISS_AVAILABLE:
+        raise ImportError("faiss is required. Install with: pip install faiss-cpu  (or faiss-gpu)")
+
+    path = index_cache_path(index_dir, index_spec, base_name, train_size=train_size)
+    if os.path.exists(path):
+        print(f"Loading existing FAISS index from {path}...")
+        flags = (faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY) if mmap else 0
+        index = faiss.read_index(path, flags)
+    else:
+        with open_embeddings() as embeddings:
+            index = build_faiss_index(embeddings, index_spec, normalize=normalize, train_size=train_size)
+        os.makedirs(index_dir, exist_ok=True)
+        print(f"Saving FAISS index to {path}...")
+        faiss.write_index(index, path)
+
+    return set_search_params(index, nprobe=nprobe, ef_search=ef_search)
@@ -22,7 +22,9 @@ Example:
 
 from typing import List, Optional, Dict, Any, Tuple, Union
 from dataclasses import dataclass
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 from rankify.dataset.dataset import Document, Context
 
@@ -78,6 +80,7 @@ class HybridRetriever:
         index_type: str = "wiki",
         sparse_index_folder: Optional[str] = None,
         dense_index_folder: Optional[str] = None,
+        max_workers: Optional[int] = None,
         **kwargs,
     ):
         """
@@ -93,6 +96,8 @@ class HybridRetriever:
             index_type: Index type (wiki, custom, etc.)
             sparse_index_folder: Path to sparse index
             dense_index_folder: Path to dense index
+            max_workers: Threads used to run the sub-retrievers concurrently
+                (default: one per retriever, 1 runs them sequentially)
             **kwargs: Additional configuration
         """
         self.sparse_method = sparse
@@ -103,6 +108,7 @@ class HybridRetriever:
         self.index_type = index_type
         self.sparse_index_folder = sparse_index_folder
         self.dense_index_folder = dense_index_folder
+        self.max_workers = max_workers
         self.kwargs = kwargs
         
         # Calculate number of retrievers
@@ -158,60 +164,91 @@ class HybridRetriever:
     def retrieve(self, documents: List[Document]) -> List[Document]:
         """
         Retrieve documents using hybrid strategy.
-        
+
+        The whole query batch is sent to every sub-retriever, and the sub-retrievers run
+        concurrently in a thread pool (Lucene and FAISS release the GIL while searching).
+        Fusion is then applied to all queries at once.
+
         Args:
             documents: List of Document objects with questions
-            
+
         Returns:
             Documents with fused contexts
         """
         self._initialize()
-        
-        results = []
-        for doc in documents:
-            fused_contexts = self._retrieve_single(doc)
-            new_doc = Document(
+        if not documents:
+            return []
+
+        retrievers = [(self.sparse_method, self._sparse_retriever)]
+        retrievers += list(zip(self.dense_methods, self._dense_retrievers))
+
+        per_retriever = self._run_retrievers(retrievers, documents)
+
+        # batch_results[q][r] is the result of retriever r for query q
+        batch_results: List[List[RetrievalResult]] = [
+            [
+                RetrievalResult(
+                    retriever_name=name,
+                    contexts=contexts_per_query[q],
+                    scores=self._extract_scores(contexts_per_query[q]),
+                )
+                for name, contexts_per_query in per_retriever
+            ]
+            for q in range(len(documents))
+        ]
+
+        if self.fusion == "rrf":
+            fused_batch = self._rrf_fusion(batch_results)
+        elif self.fusion == "weighted":
+            fused_batch = self._weighted_fusion(batch_results)
+        elif self.fusion == "interleave":
+            fused_batch = [self._interleave_fusion(results) for results in batch_results]
+        else:
+            raise ValueError(f"Unknown fusion method: {self.fusion}")
+
+        return [
+            Document(
                 question=doc.question,
                 answers=doc.answers,
                 contexts=fused_contexts,
+                id=doc.id,
             )
-            results.append(new_doc)
-        
-        return results
-    
+            for doc, fused_contexts in zip(documents, fused_batch)
+        ]
+
+    def _run_retrievers(self, retrievers, documents: List[Document]) -> List[Tuple[str, List[List[Context]]]]:
+        """
+        Run every sub-retriever on the full batch, concurrently.
+
+        Retrievers write ``contexts`` onto the documents they receive, so each one gets its
+        own shallow copies to avoid racing on the caller's objects.
+
+        Returns:
+            One ``(name, contexts_per_query)`` pair per retriever, in input order.
+        """
+        def run(retriever):
+            copies = [
+                Document(question=doc.question, answers=doc.answers, contexts=[], id=doc.id)
+                for doc in documents
+            ]
+            retrieved = retriever.retrieve(copies) or []
+            contexts = [doc.contexts or [] for doc in retrieved]
+            # Guard against retrievers returning fewer documents than requested
+            contexts += [[] for _ in range(len(documents) - len(contexts))]
+            return contexts
+
+        max_workers = self.max_workers or len(retrievers)
+        if max_workers <= 1 or len(retrievers) == 1:
+            return [(name, run(retriever)) for name, retriever in retrievers]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run, retriever) for _, retriever in retrievers]
+            return [(name, future.result()) for (name, _), future in zip(retrievers, futures)]
+
     def _retrieve_single(self, document: Document) -> List[Context]:
         """Retrieve for a single document/query."""
-        all_results: List[RetrievalResult] = []
-        
-        # Get sparse results
-        sparse_docs = self._sparse_retriever.retrieve([document])
-        sparse_contexts = sparse_docs[0].contexts if sparse_docs else []
-        all_results.append(RetrievalResult(
-            retriever_name=self.sparse_method,
-            contexts=sparse_contexts,
-            scores=self._extract_scores(sparse_contexts),
-        ))
-        
-        # Get dense results
-        for i, dense_retriever in enumerate(self._dense_retrievers):
-            dense_docs = dense_retriever.retrieve([document])
-            dense_contexts = dense_docs[0].contexts if dense_docs else []
-            all_results.append(RetrievalResult(
-                retriever_name=self.dense_methods[i],
-                contexts=dense_contexts,
-                scores=self._extract_scores(dense_contexts),
-            ))
-        
-        # Apply fusion
-        if self.fusion == "rrf":
-            return self._rrf_fusion(all_results)
-        elif self.fusion == "weighted":
-            return self._weighted_fusion(all_results)
-        elif self.fusion == "interleave":
-            return self._interleave_fusion(all_results)
-        else:
-            raise ValueError(f"Unknown fusion method: {self.fusion}")
-    
+        return self.retrieve([document])[0].contexts
+
     def _extract_scores(self, contexts: List[Context]) -> List[float]:
         """Extract scores from contexts, using rank if no score available."""
         scores = []
@@ -222,89 +259,110 @@ class HybridRetriever:
                 # Use inverse rank as score
                 scores.append(1.0 / (i + 1))
         return scores
-    
-    def _rrf_fusion(self, results: List[RetrievalResult]) -> List[Context]:
+
+    @staticmethod
+    def _context_key(ctx: Context) -> str:
+        return ctx.id if ctx.id else ctx.text[:100]  # Use text prefix if no ID
+
+    def _fuse(self, batch_results: List[List[RetrievalResult]], contributions) -> List[List[Context]]:
         """
-        Reciprocal Rank Fusion.
-        
+        Sum per-retriever contributions for every (query, document) pair across the batch.
+
+        ``contributions(r, result)`` returns a NumPy array with one value per context of
+        ``result``, the output of retriever ``r``. All pairs are factorized into integer codes
+        so accumulation, sorting and top-k selection are single NumPy operations over the batch.
+        """
+        codes: Dict[Tuple[int, str], int] = {}
+        context_map: List[Context] = []
+        pair_codes, pair_values = [], []
+
+        for q, results in enumerate(batch_results):
+            for r, result in enumerate(results):
+                if not result.contexts:
+                    continue
+                for ctx in result.contexts:
+                    pair = (q, self._context_key(ctx))
+                    code = codes.get(pair)
+                    if code is None:
+                        code = codes[pair] = len(context_map)
+                        context_map.append(ctx)
+                    else:
+                        # Last retriever to return a document provides its text
+                        context_map[code] = ctx
+                    pair_codes.append(code)
+                pair_values.append(np.asarray(contributions(r, result), dtype=np.float64))
+
+        fused: List[List[Context]] = [[] for _ in batch_results]
+        if not context_map:
+            return fused
+
+        totals = np.bincount(
+            np.asarray(pair_codes, dtype=np.int64),
+            weights=np.concatenate(pair_values),
+            minlength=len(context_map),
+        )
+        query_of = np.fromiter((q for q, _ in codes), dtype=np.int64, count=len(codes))
+
+        # Sort by query, then score descending; ties keep first-seen order
+        order = np.lexsort((np.arange(len(totals)), -totals, query_of))
+        sorted_queries = query_of[order]
+        bounds = np.searchsorted(sorted_queries, np.arange(len(batch_results) + 1))
+
+        for q in range(len(batch_results)):
+            for code in order[bounds[q]:bounds[q + 1]][:self.n_docs].tolist():
+                ctx = context_map[code]
+                fused[q].append(Context(
+                    text=ctx.text,
+                    id=ctx.id,
+                    title=ctx.title if hasattr(ctx, 'title') else "",
+                    score=float(totals[code]),
+                ))
+        return fused
+
+    def _rrf_fusion(self, batch_results: List[List[RetrievalResult]]) -> List[List[Context]]:
+        """
+        Reciprocal Rank Fusion over a batch of queries.
+
         RRF score = sum(1 / (k + rank_i)) for each retriever
         Higher k values give more weight to top-ranked results.
+
+        Args:
+            batch_results: For each query, the list of per-retriever results.
+
+        Returns:
+            For each query, the fused contexts.
         """
-        # Track RRF scores by document ID
-        rrf_scores: Dict[str, float] = defaultdict(float)
-        context_map: Dict[str, Context] = {}
-        
-        for result in results:
-            for rank, ctx in enumerate(result.contexts):
-                doc_id = ctx.id if ctx.id else ctx.text[:100]  # Use text prefix if no ID
-                rrf_score = 1.0 / (self.rrf_k + rank + 1)
-                rrf_scores[doc_id] += rrf_score
-                context_map[doc_id] = ctx
-        
-        # Sort by RRF score
-        sorted_ids = sorted(rrf_scores.keys(), key=lambda x: rrf_scores[x], reverse=True)
-        
-        # Build result list
-        fused = []
-        for doc_id in sorted_ids[:self.n_docs]:
-            ctx = context_map[doc_id]
-            # Update context with fused score
-            new_ctx = Context(
-                text=ctx.text,
-                id=ctx.id,
-                title=ctx.title if hasattr(ctx, 'title') else "",
-                score=rrf_scores[doc_id],
-            )
-            fused.append(new_ctx)
-        
-        return fused
-    
-    def _weighted_fusion(self, results: List[RetrievalResult]) -> List[Context]:
+        def contributions(_, result):
+            return 1.0 / (self.rrf_k + np.arange(1, len(result.contexts) + 1))
+
+        return self._fuse(batch_results, contributions)
+
+    def _weighted_fusion(self, batch_results: List[List[RetrievalResult]]) -> List[List[Context]]:
         """
-        Weighted score combination.
-        
-        Final score = sum(weight_i * normalized_score_i) for each retriever
+        Weighted score combination over a batch of queries.
+
+        Final score = sum(weight_i * normalized_score_i) for each retriever,
+        where scores are min-max normalized per query and retriever.
+
+        Args:
+            batch_results: For each query, the list of per-retriever results.
+
+        Returns:
+            For each query, the fused contexts.
         """
-        # Track weighted scores by document ID
-        weighted_scores: Dict[str, float] = defaultdict(float)
-        context_map: Dict[str, Context] = {}
-        
-        for i, result in enumerate(results):
-            # Normalize scores to [0, 1]
-            if result.scores:
-                max_score = max(result.scores) if result.scores else 1.0
-                min_score = min(result.scores) if result.scores else 0.0
-                score_range = max_score - min_score if max_score != min_score else 1.0
-            
-            for j, ctx in enumerate(result.contexts):
-                doc_id = ctx.id if ctx.id else ctx.text[:100]
-                
-                # Normalize and weight the score
-                if result.scores and j < len(result.scores):
-                    normalized = (result.scores[j] - min_score) / score_range
-                else:
-                    normalized = 1.0 / (j + 1)
-                
-                weighted_scores[doc_id] += self.weights[i] * normalized
-                context_map[doc_id] = ctx
-        
-        # Sort by weighted score
-        sorted_ids = sorted(weighted_scores.keys(), key=lambda x: weighted_scores[x], reverse=True)
-        
-        # Build result list
-        fused = []
-        for doc_id in sorted_ids[:self.n_docs]:
-            ctx = context_map[doc_id]
-            new_ctx = Context(
-                text=ctx.text,
-                id=ctx.id,
-                title=ctx.title if hasattr(ctx, 'title') else "",
-                score=weighted_scores[doc_id],
-            )
-            fused.append(new_ctx)
-        
-        return fused
-    
+        def contributions(r, result):
+            n = len(result.contexts)
+            scores = np.asarray(result.scores[:n], dtype=np.float64)
+            normalized = 1.0 / np.arange(1, n + 1)
+            if len(scores):
+                score_range = scores.max() - scores.min()
+                if score_range == 0:
+                    score_range = 1.0
+                normalized[:len(scores)] = (scores - scores.min()) / score_range
+            return self.weights[r] * normalized
+
+        return self._fuse(batch_results, contributions)
+
     def _interleave_fusion(self, results: List[RetrievalResult]) -> List[Context]:
         """
         Round-robin interleaving of results.
@@ -1,12 +1,12 @@
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from tqdm import tqdm
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 
 from .base_retriever import BaseRetriever
 from .index_manager import IndexManager
 from .contriever_retriever import ContrieverRetriever
-from rankify.utils.retrievers.hyde import Promptor, OpenAIGenerator
+from rankify.utils.retrievers.hyde import Promptor, OpenAIGenerator, hyde_query_vectors
 from rankify.dataset.dataset import Document, Context
 
 
@@ -23,6 +23,12 @@ class HydeRetriever(BaseRetriever):
     3. Average the embeddings to obtain a refined query representation
     4. Retrieve top documents using the averaged embedding
     
+    By default questions are processed in batches of ``questions_per_batch``: the LLM calls of a
+    batch run concurrently (``max_workers`` at a time) while the previous batch is encoded, all
+    prompts and hypothetical documents of a batch are embedded together and a single
+    ``search_knn`` call serves the whole batch. Pass ``batched=False`` to handle one question at
+    a time.
+
     References:
         - Luyu Gao, Xueguang Ma, Jimmy Lin, and Jamie Callan. (2022): 
           Precise Zero-Shot Dense Retrieval without Relevance Labels.
@@ -51,12 +57,16 @@ class HydeRetriever(BaseRetriever):
         self.max_token_generated_docs = kwargs.get("max_token_generated_docs", config.get("max_token_generated_docs", 512))
         self.temperature = kwargs.get("temperature", config.get("temperature", 0.7))
         
+        # Batched mode: concurrent LLM calls per batch of questions
+        self.batched = kwargs.get("batched", True)
+        self.max_workers = kwargs.get("max_workers", 8)
+        self.questions_per_batch = kwargs.get("questions_per_batch", 64)
+        
         # Validate API key if required
         if config.get("requires_api_key", True) and not self.api_key:
             raise ValueError("API key is required for HyDE retriever with LLM generation")
         
         # Initialize components
-        self.tokenizer = SimpleTokenizer()
         self.promptor = Promptor(self.task)
         self.generator = OpenAIGenerator(
             model_name=self.llm_model,
@@ -119,9 +129,43 @@ class HydeRetriever(BaseRetriever):
         Returns:
             List of Document objects with retrieved contexts
         """
+        if not self.batched:
+            return self._retrieve_sequential(documents)
+
+        batches = [documents[start:start + self.questions_per_batch]
+                   for start in range(0, len(documents), self.questions_per_batch)]
+        with tqdm(total=len(documents), desc="Processing documents", unit="docs") as progress, \
+                ThreadPoolExecutor(max_workers=1) as prefetch:
+            pending = prefetch.submit(self._generate, batches[0]) if batches else None
+            for i, batch in enumerate(batches):
+                prompts, hypothesis_documents = pending.result()
+                # The LLM calls of the next batch overlap with encoding and searching this one
+                if i + 1 < len(batches):
+                    pending = prefetch.submit(self._generate, batches[i + 1])
+
+                # Embed all prompts and hypotheses together, average per question
+                hyde_vectors = hyde_query_vectors(self.contriever._embed_queries, prompts, hypothesis_documents)
+
+                top_ids_and_scores = self.contriever.index.search_knn(
+                    hyde_vectors,
+                    self.n_docs,
+                    index_batch_size=self.batch_size
+                )
+                for document, (doc_ids, scores) in zip(batch, top_ids_and_scores):
+                    document.contexts = self._build_contexts(document, doc_ids, scores)
+                progress.update(len(batch))
+
+        return documents
+
+    def _generate(self, documents: List[Document]):
+        """Build the prompts of a batch and generate their hypothetical documents concurrently."""
+        prompts = [self.promptor.build_prompt(document.question.question.replace("?", ""))
+                   for document in documents]
+        return prompts, self.generator.generate_batch(prompts, max_workers=self.max_workers)
+
+    def _retrieve_sequential(self, documents: List[Document]) -> List[Document]:
+        """One question at a time: generate, embed each string, search with a single vector."""
         for i, document in enumerate(tqdm(documents, desc="Processing documents", unit="docs")):
-            contexts = []
-            
             # Build prompt and generate hypothetical documents
             prompt = self.promptor.build_prompt(document.question.question.replace("?", ""))
             hypothesis_documents = self.generator.generate(prompt)
@@ -144,28 +188,24 @@ class HydeRetriever(BaseRetriever):
                 index_batch_size=self.batch_size
             )
             doc_ids, scores = top_ids_and_scores[0]
+            document.contexts = self._build_contexts(document, doc_ids, scores)
             
-            # Create contexts from results
-            for doc_id, score in zip(doc_ids, scores):
-                try:
-                    passage = self.contriever.passage_id_map[int(doc_id)]
-                    context = Context(
-                        id=int(doc_id),
-                        title=passage["title"],
-                        text=passage.get("text", passage.get("contents", "")),
-                        score=score,
-                        has_answer=has_answers(
-                            passage.get("text", passage.get("contents", "")), 
-                            document.answers.answers, 
-                            self.tokenizer, 
-                            regex=False
-                        )
-                    )
-                    contexts.append(context)
-                except (IndexError, KeyError):
-                    # Log or handle the error, and continue with the next passage
-                    continue
-            
-            document.contexts = contexts
-            
-        return documents
\ No newline at end of file
+        return documents
+
+    def _build_contexts(self, document: Document, doc_ids, scores) -> List[Context]:
+        """Create contexts from search results, skipping ids missing from the passage store."""
+        contexts = []
+        for doc_id, score in zip(doc_ids, scores):
+            try:
+                passage = self.contriever.passage_id_map[int(doc_id)]
+                context = Context(
+                    id=int(doc_id),
+                    title=passage["title"],
+                    text=passage.get("text", passage.get("contents", "")),
+                    score=score,
+                )
+                contexts.append(context)
+            except (IndexError, KeyError):
+                # Log or handle the error, and continue with the next passage
+                continue
+        return contexts
@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import Dict, Optional
 from tqdm import tqdm
 
+from rankify.utils.passage_store import PassageStore
+
 class IndexManager:
     """
     Manages downloading, caching, and loading of retrieval indexes.
@@ -250,7 +252,17 @@ class IndexManager:
         
     #     return corpus
     def load_corpus(self, index_path: str) -> Dict:
-        """Load corpus data from index path (supports multiple formats)."""
+        """
+        Load corpus data from index path (supports multiple formats).
+
+        Returns a read-only ``{doc_id: {"text", "title"}}`` mapping backed by a
+        memory-mapped :class:`PassageStore`, or an empty dict if no corpus file exists.
+
+        Note:
+            The passage body is stored under ``"text"``, like every other passage mapping in
+            Rankify. Earlier versions returned it under ``"contents"``; callers that read the
+            corpus directly should use ``doc.get("text")`` (``DenseRetriever`` accepts both).
+        """
         # Try different corpus file formats in order of preference
         corpus_files = [
             "corpus_metadata.json",  # Your custom format
@@ -262,57 +274,12 @@ class IndexManager:
             corpus_file = os.path.join(index_path, corpus_filename)
             if os.path.exists(corpus_file):
                 print(f"📚 Loading corpus from {corpus_filename}")
-                
-                if corpus_filename.endswith('.jsonl'):
-                    # JSONL format (one JSON object per line)
-                    return self._load_corpus_jsonl(corpus_file)
-                else:
-                    # JSON format (single JSON object)
-                    return self._load_corpus_json(corpus_file)
+                # Parsed once into a memory-mapped store shared by all processes
+                return PassageStore.open_or_build(corpus_file)
         
         print(f"❌ No corpus file found in {index_path}")
         return {}
 
-    def _load_corpus_jsonl(self, corpus_file: str) -> Dict:
-        """Load corpus from JSONL format (one JSON object per line)."""
-        corpus = {}
-        with open(corpus_file, "r", encoding="utf-8") as f:
-            for line in f:
-                doc = json.loads(line.strip())
-                doc_id = doc.get("docid") or doc.get("id")
-                contents = doc.get("contents", "")
-                title = doc.get("title", contents[:100] if contents else "No Title")
-                corpus[str(doc_id)] = {"contents": contents, "title": title}
-        return corpus
-
-    def _load_corpus_json(self, corpus_file: str) -> Dict:
-        """Load corpus from JSON format (single JSON object)."""
-        corpus = {}
-        with open(corpus_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        # Handle different JSON structures
-        if isinstance(data, dict):
-            # If it's a dict, iterate through it
-            for doc_id, doc_data in data.items():
-                if isinstance(doc_data, dict):
-                    contents = doc_data.get("contents") or doc_data.get("text") or ""
-                    title = doc_data.get("title", contents[:100] if contents else "No Title")
-                else:
-                    # If doc_data is a string, use it as contents
-                    contents = str(doc_data)
-                    title = contents[:100] if contents else "No Title"
-                corpus[str(doc_id)] = {"contents": contents, "title": title}
-        
-        elif isinstance(data, list):
-            # If it's a list, iterate through documents
-            for doc in data:
-                doc_id = doc.get("docid") or doc.get("id")
-                contents = doc.get("contents", "")
-                title = doc.get("title", contents[:100] if contents else "No Title")
-                corpus[str(doc_id)] = {"contents": contents, "title": title}
-        
-        return corpus
     def download_and_extract_index(self, url: str) -> str:
         """Download and extract index from URL, return local path."""
         # This is used by DenseRetriever pattern
@@ -1,97 +1,177 @@
+import asyncio
 import os
 import subprocess
 import tempfile
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from loguru import logger
 from tqdm import tqdm
 
-# DPR evaluation
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
-# Lucene search
-from pyserini.search.lucene import LuceneSearcher
-
 # Dataset & tools
 from rankify.dataset.dataset import Document, Context
-from rankify.tools.Tools import WebSearchTool
+from rankify.tools.Tools import WebSearchTool, run_coroutine
+from rankify.tools.websearch.cache import WebCache
+from rankify.tools.websearch.content_scraping.crawler import CrawlerPool, WebScraper
+from rankify.tools.websearch.context.build_search_context import stream_search_context
 from rankify.tools.websearch.context.chunker import Chunker
+from rankify.utils.retrievers.in_memory_bm25 import InMemoryBM25
+
+def lucene_search(question: str, processed: List[Dict[str, str]], k: int) -> List[Tuple[str, str, float]]:
+    """
+    Ranks chunks by building a temporary Lucene index with Pyserini (one JVM subprocess per call).
+    Returns ``(chunk id, text, score)`` hits, best first.
+    """
+    from pyserini.search.lucene import LuceneSearcher
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json.dump(processed, open(os.path.join(tmpdir,'docs.json'),'w'))
+        subprocess.run([
+            'python','-m','pyserini.index.lucene',
+            '-collection','JsonCollection','-generator','DefaultLuceneDocumentGenerator',
+            '-input',tmpdir,'-index',tmpdir,
+            '-storePositions','-storeDocvectors','-storeRaw'
+        ], check=True)
+
+        searcher = LuceneSearcher(tmpdir)
+        hits = searcher.search(question, k=k)
+        return [
+            (hit.docid, json.loads(searcher.doc(hit.docid).raw()).get('contents',''), hit.score)
+            for hit in hits
+        ]
 
 class OnlineRetriever:
+    """
+    Retrieves web passages for each question: searches the web, chunks the fetched pages and
+    ranks the chunks with BM25.
+
+    Questions are processed concurrently: all SERP calls are issued at once, every page is
+    crawled on one shared browser (``CrawlerPool``) with at most ``max_concurrency`` pages in
+    flight, each page is chunked as soon as it arrives and a question is ranked as soon as its
+    last page is in.
+
+    Args:
+        n_docs (int): Number of web results to fetch and of chunks to keep per question.
+        api_key (str): Search provider API key.
+        chunk_size (int): Chunk size passed to ``Chunker``.
+        chunk_overlap (int): Chunk overlap passed to ``Chunker``.
+        bm25_backend (str): ``"memory"`` (default) scores chunks in process with ``InMemoryBM25``,
+            which matches Pyserini's analyzer and BM25 parameters; ``"lucene"`` builds a temporary
+            Lucene index per question with Pyserini (the previous behaviour).
+        max_concurrency (int): Maximum number of pages crawled at the same time.
+        browser_config (BrowserConfig, optional): Crawl4AI browser configuration for the crawler pool.
+        cache (WebCache, optional): Persistent cache of SERP responses and scraped pages. Use
+            ``WebCache(path, offline=True)`` to replay a previous run without network access.
+    """
     def __init__(
         self,
         n_docs: int = 5,
         api_key: str = None,
         chunk_size: int = 500,
         chunk_overlap: int = 50,
+        bm25_backend: str = "memory",
+        max_concurrency: int = 8,
+        browser_config=None,
+        cache: Optional[WebCache] = None,
         **kwags
     ) -> None:
+        if bm25_backend not in ("memory", "lucene"):
+            raise ValueError(f"Unknown bm25_backend '{bm25_backend}'. Use 'memory' or 'lucene'.")
         self.n_docs = n_docs
-        self.searcher = WebSearchTool(search_provider_api_key=api_key)
-        self.tokenizer = SimpleTokenizer()
+        self.cache = cache
+        self.searcher = WebSearchTool(search_provider_api_key=api_key, cache=cache)
         self.chunker = Chunker(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
         )
+        self.bm25_backend = bm25_backend
+        self.bm25 = InMemoryBM25()
+        self.max_concurrency = max_concurrency
+        self.browser_config = browser_config
 
     def _search_web(self, query: str) -> List[Any]:
         if not self.searcher.is_initialized:
             self.searcher.setup()
         return self.searcher.forward(query, num_result=self.n_docs)
 
+    def _chunk_source(self, s_idx: int, source: Dict[str, Any]) -> List[Dict[str, str]]:
+        text = source.get('fit_markdown', '')
+        if text:
+            passages = self.chunker.split_text(text)
+            return [{'id': f'{s_idx}_{p_idx}', 'contents': p} for p_idx, p in enumerate(passages)]
+        snippet = source.get('snippet','')
+        if len(snippet.split()) > 20:
+            return [{'id': f's{ s_idx }_snip', 'contents': snippet}]
+        return []
 
-    def retrieve(self, documents: List[Document]) -> List[Document]:
-        for idx, doc in enumerate(tqdm(documents, desc="Fetching docs...")):
-            question = doc.question.question
-            logger.info(f"Fetching contexts for Q{idx}: {question}")
-
-            sources = self._search_web(question)
-            processed = []
-            for s_idx, source in enumerate(sources):
-                text = source.get('fit_markdown', '')
-                # with open("log.txt", "a",  encoding="utf-8") as f:
-                #     f.writelines(html)
-                if text:
-                    passages = self.chunker.split_text(text)
-                    #print(len(passages), "passages found")
-                    for p_idx, p in enumerate(passages):
-                        #print(p)
-                        
-                        #print(f"Processing snippet {s_idx} passage {p_idx}: {p['contents'][:50]}...")
-                        processed.append({'id': f'{s_idx}_{p_idx}', 'contents': p})
-                else:
-                    snippet = source.get('snippet','')
-                    if len(snippet.split()) > 20:
-                        processed.append({'id': f's{ s_idx }_snip', 'contents': snippet})
-
-            # Indexing
-            with tempfile.TemporaryDirectory() as tmpdir:
-                json.dump(processed, open(os.path.join(tmpdir,'docs.json'),'w'))
-                subprocess.run([
-                    'python','-m','pyserini.index.lucene',
-                    '-collection','JsonCollection','-generator','DefaultLuceneDocumentGenerator',
-                    '-input',tmpdir,'-index',tmpdir,
-                    '-storePositions','-storeDocvectors','-storeRaw'
-                ], check=True)
-
-                searcher = LuceneSearcher(tmpdir)
-                hits = searcher.search(question, k=self.n_docs)
-                contexts: List[Context] = []
-                for h_idx, hit in enumerate(hits):
-                    raw = searcher.doc(hit.docid).raw()
-                    data = json.loads(raw)
-                    text = data.get('contents','')
-                    title = "" #text.split("\n")[0]
-                    try:
-                        cid = int(hit.docid)
-                    except ValueError:
-                        cid = h_idx
-                    contexts.append(Context(
-                        id=cid,
-                        title=title,
-                        text=text,
-                        score=hit.score,
-                        has_answer=has_answers(text, doc.answers.answers, self.tokenizer)
-                    ))
-                doc.contexts = contexts
+    def _chunk_sources(self, sources: List[Any]) -> List[Dict[str, str]]:
+        processed = []
+        for s_idx, source in enumerate(sources):
+            processed.extend(self._chunk_source(s_idx, source))
+        return processed
+
+    def rank_chunks(self, questions: List[str], processed: List[List[Dict[str, str]]]) -> List[List[Tuple[str, str, float]]]:
+        """
+        Ranks each question's chunks and returns ``(chunk id, text, score)`` hits, best first.
+        With the in-memory backend all questions are scored in one batch.
+        """
+        if self.bm25_backend == "lucene":
+            return [lucene_search(question, chunks, self.n_docs) for question, chunks in zip(questions, processed)]
+        texts = [[chunk['contents'] for chunk in chunks] for chunks in processed]
+        batch_hits = self.bm25.search_batch(questions, texts, k=self.n_docs)
+        return [
+            [(chunks[i]['id'], chunks[i]['contents'], score) for i, score in hits]
+            for chunks, hits in zip(processed, batch_hits)
+        ]
+
+    async def _fetch_and_rank(self, question: str, scraper: WebScraper) -> List[Tuple[str, str, float]]:
+        sources = await self.searcher.search_async(question, num_result=self.n_docs)
+        chunks_by_source = {}
+        async for s_idx, source in stream_search_context(sources, scraper):
+            chunks_by_source[s_idx] = self._chunk_source(s_idx, source)
+        # Keep SERP order, so that BM25 ties are broken as in the sequential pipeline
+        processed = [chunk for s_idx in sorted(chunks_by_source) for chunk in chunks_by_source[s_idx]]
+        if self.bm25_backend == "lucene":
+            # Indexing spawns a JVM: keep it off the event loop
+            return await asyncio.to_thread(lucene_search, question, processed, self.n_docs)
+        return self.rank_chunks([question], [processed])[0]
+
+    def _set_contexts(self, doc: Document, hits: List[Tuple[str, str, float]]) -> None:
+        contexts: List[Context] = []
+        for h_idx, (docid, text, score) in enumerate(hits):
+            title = "" #text.split("\n")[0]
+            try:
+                cid = int(docid)
+            except ValueError:
+                cid = h_idx
+            contexts.append(Context(
+                id=cid,
+                title=title,
+                text=text,
+                score=score,
+            ))
+        doc.contexts = contexts
+
+    async def retrieve_async(self, documents: List[Document]) -> List[Document]:
+        """
+        Async ``retrieve``: fans out all questions at once and fills in each document as soon as
+        its question is ranked.
+        """
+        async with CrawlerPool(browser_config=self.browser_config, max_concurrency=self.max_concurrency) as pool:
+            scraper = self.searcher.create_scraper(crawler_pool=pool)
+
+            async def run(idx: int, doc: Document):
+                question = doc.question.question
+                logger.info(f"Fetching contexts for Q{idx}: {question}")
+                return idx, await self._fetch_and_rank(question, scraper)
+
+            tasks = [run(idx, doc) for idx, doc in enumerate(documents)]
+            with tqdm(total=len(tasks), desc="Fetching docs...") as progress:
+                for finished in asyncio.as_completed(tasks):
+                    idx, hits = await finished
+                    self._set_contexts(documents[idx], hits)
+                    progress.update()
         return documents
+
+    def retrieve(self, documents: List[Document]) -> List[Document]:
+        return run_coroutine(self.retrieve_async(documents))
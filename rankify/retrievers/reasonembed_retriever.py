@@ -15,29 +15,13 @@ import torch
 from typing import List, Optional
 
 from sentence_transformers import SentenceTransformer
-from torchmetrics.functional.pairwise import pairwise_cosine_similarity
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 
 from .base_retriever import BaseRetriever
+from .utils import dense_topk
 from rankify.dataset.dataset import Document, Context
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache
 
 
-def get_scores(
-        query_ids: List[str], 
-        doc_ids: List[str], 
-        scores: List[List[float]],
-        num_hits: int = 1000):
-
-    assert len(scores) == len(query_ids)
-    
-    emb_scores = {}
-    for query_id, row in zip(query_ids, scores):
-        cur = {str(doc_id): float(s) for doc_id, s in zip(doc_ids, row)}
-        ranked = sorted(cur.items(), key=lambda x: x[1], reverse=True)[:num_hits]
-        emb_scores[str(query_id)] = {doc_id: sc for doc_id, sc in ranked}
-
-    return emb_scores
-
 
 # ReasonEmbedRetriever Class
 class ReasonEmbedRetriever(BaseRetriever):
@@ -63,6 +47,7 @@ class ReasonEmbedRetriever(BaseRetriever):
         
         checkpoint: Optional[str] = None,
         device: Optional[str] = None,
+        embedding_cache: bool = True,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -78,7 +63,6 @@ class ReasonEmbedRetriever(BaseRetriever):
         self.text_field = text_field
         self.title_field = title_field
         self.id_field = id_field
-        self.tokenizer_simple = SimpleTokenizer()
 
         self.model_id = model_id
         self.checkpoint = checkpoint
@@ -97,6 +81,9 @@ class ReasonEmbedRetriever(BaseRetriever):
         self.tokenizer = None
         self._load_model()
 
+        self.embedding_cache = embedding_cache
+        self._doc_cache = self._open_embedding_cache("document")
+        self._query_cache = self._open_embedding_cache("query")
         self.doc_emb = self._load_or_build_doc_embeddings()
 
     def _load_model(self):
@@ -138,35 +125,32 @@ class ReasonEmbedRetriever(BaseRetriever):
 
         return doc_ids, doc_texts, doc_titles
 
-    def _corpus_id(self):
-        return os.path.basename(os.path.dirname(self.corpus_path))
+    def _open_embedding_cache(self, role: str) -> Optional[EmbeddingCache]:
+        # Content-addressed cache under cache_dir/embeddings: only new or changed texts are encoded
+        if not self.embedding_cache:
+            return None
+        return EmbeddingCache(
+            os.path.join(self.cache_dir, "embeddings"),
+            model=f"reasonembed/{self.model_id}/{self.checkpoint or ''}",
+            role=role,
+        )
 
-    def _cache_file(self):
-        corpus_id = self._corpus_id()
-        folder = os.path.join(self.cache_dir, "doc_emb", corpus_id, self.model_id)
-        os.makedirs(folder, exist_ok=True)
-        return os.path.join(folder, "0.npy")
-    
     def _load_or_build_doc_embeddings(self):
-        cache_file = self._cache_file()
-        if os.path.isfile(cache_file):
-            doc_emb = np.load(cache_file, allow_pickle=True)
-            return doc_emb
+        doc_emb = encode_with_cache(self._doc_cache, self.doc_texts, self._encode_documents, report=True)
 
-        docs = self.doc_texts
-        
+        assert len(self.doc_ids) == doc_emb.shape[0], (
+            f"Embedding mismatch: {len(self.doc_ids)} docs vs {doc_emb.shape[0]} embeddings"
+        )
+
+        return doc_emb
+
+    def _encode_documents(self, docs: List[str]):
         # Encoding logic based on model_id
         if self.model_id in ["qwen3-4b", "qwen3-8b", "llama-8b"]:
             doc_emb = self.model.encode(docs, show_progress_bar=True, batch_size=self.encode_batch_size, normalize_embeddings=True)
         else:
             raise ValueError(f"Encoding not implemented for {self.model_id}")
 
-        np.save(cache_file, doc_emb)
-
-        assert len(self.doc_ids) == doc_emb.shape[0], (
-            f"Embedding mismatch: {len(self.doc_ids)} docs vs {doc_emb.shape[0]} embeddings"
-        )
-
         return doc_emb
     
     def _initialize_searcher(self):
@@ -183,32 +167,21 @@ class ReasonEmbedRetriever(BaseRetriever):
 
     def retrieve(self, documents: List[Document]):
         queries = [d.question.question for d in documents]
-        query_ids = [str(d.id) if d.id is not None else str(i) for i, d in enumerate(documents)]
 
-        query_emb = self._encode_queries(queries)
+        query_emb = encode_with_cache(self._query_cache, queries, self._encode_queries, report=True)
         
         # Ensure doc_emb is loaded
         if self.doc_emb is None:
             self.doc_emb = self._load_or_build_doc_embeddings()
                 
-        # Use torchmetrics for cosine similarity
-        scores = pairwise_cosine_similarity(torch.from_numpy(query_emb), torch.from_numpy(self.doc_emb)).tolist()
-
-        results = get_scores(
-            query_ids=query_ids,
-            doc_ids=self.doc_ids,
-            scores=scores,
-            num_hits=self.n_docs,
-        )
+        # Cosine similarity + top-k over corpus shards, without materializing the full score matrix
+        top_scores, top_indices = dense_topk(query_emb, self.doc_emb, k=self.n_docs)
 
         # Fill contexts
-        for d, query_id in zip(documents, query_ids):
+        for d, row_scores, row_indices in zip(documents, top_scores, top_indices):
             ctxs: List[Context] = []
-            for doc_id, score in results[query_id].items():
-                idx = self._docid_to_idx.get(str(doc_id))
-                if idx is None:
-                    continue
-
+            for idx, score in zip(row_indices.tolist(), row_scores.tolist()):
+                doc_id = self.doc_ids[idx]
                 text = self.doc_texts[idx]
                 title = self.doc_titles[idx] if idx < len(self.doc_titles) else ""
 
@@ -218,7 +191,6 @@ class ReasonEmbedRetriever(BaseRetriever):
                         title=title,
                         text=text,
                         score=float(score),
-                        has_answer=has_answers(text, d.answers.answers, self.tokenizer_simple),
                     )
                 )
             d.contexts = ctxs
@@ -12,34 +12,18 @@ from typing import List, Optional
 import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer
-from torchmetrics.functional.pairwise import pairwise_cosine_similarity
 
-from pyserini.eval.evaluate_dpr_retrieval import has_answers, SimpleTokenizer
 
 from .base_retriever import BaseRetriever
+from .utils import dense_topk
 from rankify.dataset.dataset import Document, Context
-
-def get_scores(
-        query_ids: List[str], 
-        doc_ids: List[str], 
-        scores: List[List[float]],
-        num_hits: int = 1000):
-
-    assert len(scores) == len(query_ids)
-    
-    emb_scores = {}
-    for query_id, row in zip(query_ids, scores):
-        cur = {str(doc_id): float(s) for doc_id, s in zip(doc_ids, row)}
-        ranked = sorted(cur.items(), key=lambda x: x[1], reverse=True)[:num_hits]
-        emb_scores[str(query_id)] = {doc_id: sc for doc_id, sc in ranked}
-
-    return emb_scores
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache
 
 # ReasonIRRetriever Class
 class ReasonIRRetriever(BaseRetriever):
     """
     Rankify retriever wrapper for ReasonIR (uses model.encode with instructions)
-    - caches doc embeddings in cache_dir/doc_emb/corpus_id/reasonir/0.npy
+    - caches doc and query embeddings by content in cache_dir/embeddings (only new texts are encoded)
     - encodes queries
     - cosine similarity + top-k
     """
@@ -60,6 +44,7 @@ class ReasonIRRetriever(BaseRetriever):
         text_field: str = "text",
         device: Optional[str] = None,
         normalize: bool = True,
+        embedding_cache: bool = True,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -85,7 +70,6 @@ class ReasonIRRetriever(BaseRetriever):
         self.text_field = text_field
 
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self.simple_tokenizer = SimpleTokenizer()
 
         # Load corpus
         self.doc_ids, self.doc_texts, self.doc_titles = self._load_corpus()
@@ -96,6 +80,9 @@ class ReasonIRRetriever(BaseRetriever):
         self.tokenizer = None
 
         # Cache / load doc embeddings
+        self.embedding_cache = embedding_cache
+        self._doc_cache = self._open_embedding_cache(self._instruction(self.doc_instruction), self.doc_max_length)
+        self._query_cache = self._open_embedding_cache(self._instruction(self.query_instruction), self.query_max_length)
         self.doc_emb = self._load_or_build_doc_embeddings()
 
     def _load_corpus(self):
@@ -124,20 +111,19 @@ class ReasonIRRetriever(BaseRetriever):
         return doc_ids, doc_texts, doc_titles
 
 
-    def _corpus_id(self):
-        return os.path.basename(os.path.dirname(self.corpus_path))
-
-    def _cache_file(self):
-        corpus_id = self._corpus_id()
+    def _instruction(self, instruction: str) -> str:
+        return instruction.format(task=self.task) if "{task}" in instruction else instruction
 
-        folder = os.path.join(
-            self.cache_dir,
-            "doc_emb",
-            corpus_id,
-            "reasonir",
+    def _open_embedding_cache(self, instruction: str, max_length: int) -> Optional[EmbeddingCache]:
+        if not self.embedding_cache:
+            return None
+        return EmbeddingCache(
+            os.path.join(self.cache_dir, "embeddings"),
+            model=self.checkpoint,
+            instruction=instruction,
+            max_length=max_length,
+            normalize=self.normalize,
         )
-        os.makedirs(folder, exist_ok=True)
-        return os.path.join(folder, "0.npy")
 
     @torch.no_grad()
     def _encode(self, texts: List[str], instruction: str, max_length: int):
@@ -153,14 +139,13 @@ class ReasonIRRetriever(BaseRetriever):
         return emb
 
     def _load_or_build_doc_embeddings(self):
-        cache_file = self._cache_file()
-        if os.path.isfile(cache_file):
-            return np.load(cache_file, allow_pickle=True)
-
-        doc_instr = self.doc_instruction.format(task=self.task) if "{task}" in self.doc_instruction else self.doc_instruction
-        doc_emb = self._encode(self.doc_texts, instruction=doc_instr, max_length=self.doc_max_length)
-        np.save(cache_file, doc_emb)
-        return doc_emb
+        doc_instr = self._instruction(self.doc_instruction)
+        return encode_with_cache(
+            self._doc_cache,
+            self.doc_texts,
+            lambda texts: self._encode(texts, instruction=doc_instr, max_length=self.doc_max_length),
+            report=True,
+        )
     
     def _initialize_searcher(self):
     # Retrievers don't use an external searcher
@@ -169,29 +154,23 @@ class ReasonIRRetriever(BaseRetriever):
     def retrieve(self, documents: List[Document]):
         # Queries + ids
         queries = [d.question.question for d in documents]
-        query_ids = [str(d.id) if d.id is not None else str(i) for i, d in enumerate(documents)]
-
-        q_instr = self.query_instruction.format(task=self.task) if "{task}" in self.query_instruction else self.query_instruction
-        query_emb = self._encode(queries, instruction=q_instr, max_length=self.query_max_length)
 
-        # Similarity
-        scores = pairwise_cosine_similarity(torch.from_numpy(query_emb), torch.from_numpy(self.doc_emb)).tolist()
-
-        results = get_scores(
-            query_ids=query_ids,
-            doc_ids=self.doc_ids,
-            scores=scores,
-            num_hits=self.n_docs,
+        q_instr = self._instruction(self.query_instruction)
+        query_emb = encode_with_cache(
+            self._query_cache,
+            queries,
+            lambda texts: self._encode(texts, instruction=q_instr, max_length=self.query_max_length),
+            report=True,
         )
 
+        # Cosine similarity + top-k over corpus shards, without materializing the full score matrix
+        top_scores, top_indices = dense_topk(query_emb, self.doc_emb, k=self.n_docs)
+
         # Fill contexts
-        for d, query_id in zip(documents, query_ids):
+        for d, row_scores, row_indices in zip(documents, top_scores, top_indices):
             ctxs: List[Context] = []
-            for doc_id, score in results[query_id].items():
-                idx = self._docid_to_idx.get(str(doc_id))
-                if idx is None:
-                    continue
-
+            for idx, score in zip(row_indices.tolist(), row_scores.tolist()):
+                doc_id = self.doc_ids[idx]
                 text = self.doc_texts[idx]
                 title = self.doc_titles[idx] if idx < len(self.doc_titles) else ""
 
@@ -201,7 +180,6 @@ class ReasonIRRetriever(BaseRetriever):
                         title=title,
                         text=text,
                         score=float(score),
-                        has_answer=has_answers(text, d.answers.answers, self.simple_tokenizer),
                     )
                 )
 
@@ -1,6 +1,7 @@
 # rankify/retrievers/retriever.py - UPDATED VERSION
 from typing import List, Dict, Type
 from rankify.dataset.dataset import Document
+from rankify.utils.answer_matching import AnswerMatcher
 from .base_retriever import BaseRetriever
 from .bm25_retriever import BM25Retriever
 from .dense_retriever import DenseRetriever
@@ -74,7 +75,8 @@ class Retriever:
     """
     
     def __init__(self, method: str, n_docs: int = 10, index_type: str = "wiki", 
-                 index_folder: str = None, encoder_name: str = None, **kwargs):
+                 index_folder: str = None, encoder_name: str = None,
+                 answer_matching: str = "batch", answer_workers: int = 0, **kwargs):
         """
         Initialize the retriever.
         
@@ -84,6 +86,11 @@ class Retriever:
             index_type (str): Index type ('wiki', 'msmarco') - ignored if index_folder is provided
             index_folder (str): Path to custom index folder (optional)
             encoder_name (str): Model name for encoding (method-specific)
+            answer_matching (str): When ``Context.has_answer`` is computed: ``"batch"`` (default) matches
+                the gold answers against all retrieved contexts in one pass after retrieval;
+                ``"deferred"`` leaves it ``None`` until the metrics need it (e.g. serving, where there
+                are no gold answers).
+            answer_workers (int): Processes tokenizing passages for answer matching.
             **kwargs: Additional parameters passed to the specific retriever
         """
         self.method = method.lower()
@@ -92,6 +99,10 @@ class Retriever:
         self.index_folder = index_folder
         self.encoder_name = encoder_name
         self.kwargs = kwargs
+        if answer_matching not in ("batch", "deferred"):
+            raise ValueError(f"answer_matching must be 'batch' or 'deferred', got '{answer_matching}'")
+        self.answer_matching = answer_matching
+        self.answer_matcher = AnswerMatcher(num_workers=answer_workers)
         
         # Initialize the specific retriever
         self.retriever = self._initialize_retriever()
@@ -166,7 +177,10 @@ class Retriever:
         Returns:
             List[Document]: Documents updated with retrieved contexts
         """
-        return self.retriever.retrieve(documents)
+        documents = self.retriever.retrieve(documents)
+        if self.answer_matching == "batch" and documents:
+            self.answer_matcher.annotate(documents)
+        return documents
     
     @classmethod
     def supported_methods(cls) -> List[str]:
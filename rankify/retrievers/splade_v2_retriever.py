@@ -1,5 +1,6 @@
 """
-SPLADE-v2 learned sparse retriever using Pyserini's LuceneImpactSearcher.
+SPLADE-v2 learned sparse retriever using Pyserini's LuceneImpactSearcher, or a native
+NumPy/SciPy inverted index over a custom corpus (``backend="native"``, no JVM).
 
 References:
     - Formal et al. (2022): "From Distillation to Hard Negative Sampling:
@@ -10,6 +11,7 @@ References:
 """
 
 import json
+import os
 from typing import List, Optional
 from tqdm import tqdm
 
@@ -21,6 +23,9 @@ except ImportError:
     PYSERINI_AVAILABLE = False
 
 from .base_retriever import BaseRetriever
+from rankify.utils.embedding_cache import texts_fingerprint
+from rankify.utils.retrievers.impact_query_encoder import BatchedImpactQueryEncoder
+from rankify.utils.retrievers.sparse_index import SparseIndex, encode_sparse, load_splade
 from rankify.dataset.dataset import Document, Context
 
 
@@ -49,6 +54,19 @@ class SpladeV2Retriever(BaseRetriever):
             (fields: ``id``, ``text``, ``title``).
         model_name (str): SPLADE query encoder checkpoint.
         device (str): ``'cpu'`` or ``'cuda'``.
+        query_cache_size (int): Encoded queries kept in memory across ``retrieve`` calls.
+        backend (str): ``'lucene'`` (default) or ``'native'``. The native backend encodes the
+            ``corpus_path`` passages with the SPLADE model into a ``SparseIndex`` (built once, then
+            memory-mapped from ``index_folder`` or ``cache_dir/splade_native``) and needs neither
+            Pyserini nor a JVM.
+        cache_dir (str): Cache root of native indexes built without ``index_folder``.
+        block_size (int): Documents per block of a newly built native index.
+        alpha (float): Block-max pruning of the native backend; ``1.0`` is exact top-k, lower
+            values stop earlier at some loss of recall. ``None`` scores every posting.
+
+    Queries are encoded in padded, length-bucketed batches of ``batch_size`` and searched with
+    ``LuceneImpactSearcher.batch_search`` on ``threads`` threads, or with batched
+    ``SparseIndex.search`` on the native backend.
 
     Example:
         ```python
@@ -60,6 +78,14 @@ class SpladeV2Retriever(BaseRetriever):
             index_type="splade-pp-ed",
             corpus_path="msmarco_passages.jsonl",
         )
+
+        # JVM-free search over a custom corpus
+        retriever = Retriever(
+            method="splade-v2",
+            n_docs=10,
+            backend="native",
+            corpus_path="my_passages.jsonl",
+        )
         ```
     """
 
@@ -87,10 +113,19 @@ class SpladeV2Retriever(BaseRetriever):
         corpus_path: Optional[str] = None,
         model_name: Optional[str] = None,
         device: str = "cpu",
+        query_cache_size: int = 100_000,
+        backend: str = "lucene",
+        cache_dir: str = "./cache",
+        block_size: int = 64,
+        alpha: Optional[float] = 1.0,
         **kwargs,
     ):
         super().__init__(**kwargs)
-        if not PYSERINI_AVAILABLE:
+        if backend not in ("lucene", "native"):
+            raise ValueError(f"backend must be 'lucene' or 'native', got '{backend}'")
+        if backend == "native" and not corpus_path:
+            raise ValueError("The native SPLADE backend builds its index from corpus_path; pass corpus_path.")
+        if backend == "lucene" and not PYSERINI_AVAILABLE:
             raise ImportError(
                 "Pyserini is required for SpladeV2Retriever. "
                 "Install with: pip install pyserini"
@@ -99,6 +134,11 @@ class SpladeV2Retriever(BaseRetriever):
         self.index_folder = index_folder
         self.corpus_path = corpus_path
         self.device = device
+        self.query_cache_size = query_cache_size
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.block_size = block_size
+        self.alpha = alpha
         # Choose a sensible default model for the requested index variant
         self.model_name = model_name or self.DEFAULT_MODEL_MAP.get(
             index_type, "naver/splade-cocondenser-ensembledistil"
@@ -125,9 +165,16 @@ class SpladeV2Retriever(BaseRetriever):
                 }
         print(f"Loaded {len(self.passage_store)} passages.")
 
-    def _initialize_searcher(self) -> "LuceneImpactSearcher":
-        """Build and return a LuceneImpactSearcher with a SPLADE query encoder."""
-        query_encoder = SpladeQueryEncoder(self.model_name, device=self.device)
+    def _initialize_searcher(self):
+        """Build and return a LuceneImpactSearcher with a SPLADE query encoder, or the native index."""
+        if self.backend == "native":
+            return self._initialize_native_index()
+        self.query_encoder = BatchedImpactQueryEncoder(
+            SpladeQueryEncoder(self.model_name, device=self.device),
+            batch_size=self.batch_size,
+            cache_size=self.query_cache_size,
+        )
+        query_encoder = self.query_encoder
         if self.index_folder:
             return LuceneImpactSearcher(self.index_folder, query_encoder)
         prebuilt = self.PREBUILT_INDEX_MAP.get(self.index_type)
@@ -139,11 +186,32 @@ class SpladeV2Retriever(BaseRetriever):
             )
         return LuceneImpactSearcher.from_prebuilt_index(prebuilt, query_encoder)
 
+    def _initialize_native_index(self) -> SparseIndex:
+        """Load the native index of the corpus, encoding and indexing the passages on first use."""
+        self.model = load_splade(self.model_name, device=self.device, fp16=self.device.startswith("cuda"))
+        doc_ids = list(self.passage_store)
+        doc_texts = [f"{p['title']} {p['text']}".strip() for p in self.passage_store.values()]
+        index_dir = self.index_folder or os.path.join(
+            self.cache_dir, "splade_native", self.model_name.replace("/", "--"),
+            texts_fingerprint([f"{pid}\t{text}" for pid, text in zip(doc_ids, doc_texts)]),
+        )
+        if os.path.exists(os.path.join(index_dir, "meta.json")):
+            print(f"Loading native SPLADE index from {index_dir}...")
+            return SparseIndex.load(index_dir)
+        print(f"Encoding {len(doc_texts)} passages for the native SPLADE index...")
+        doc_vectors = encode_sparse(self.model, doc_texts, batch_size=self.batch_size)
+        index = SparseIndex.build(doc_vectors, doc_ids, block_size=self.block_size)
+        index.save(index_dir)
+        print(f"Native SPLADE index saved to {index_dir}.")
+        return SparseIndex.load(index_dir)
+
     def _get_passage(self, docid: str):
         """Return (text, title) for *docid*, falling back to Lucene stored field."""
         passage = self.passage_store.get(docid)
         if passage is not None:
             return passage["text"], passage["title"]
+        if self.backend == "native":
+            return "Text not available", ""
         try:
             raw = self.searcher.doc(docid)
             if raw:
@@ -166,36 +234,43 @@ class SpladeV2Retriever(BaseRetriever):
         Returns:
             List[Document]: Documents with populated ``contexts``.
         """
-        for document in tqdm(documents, desc="SPLADE-v2 retrieving"):
-            query = document.question.question
-            hits = self.searcher.search(query, k=self.n_docs)
+        queries = [document.question.question for document in documents]
+        qids = [str(i) for i in range(len(queries))]
+        batch_results = self._batch_search(queries, qids)
+
+        for i, document in enumerate(documents):
             contexts: List[Context] = []
-            for hit in hits:
-                docid = str(hit.docid)
-                score = float(hit.score)
+            for docid, score in batch_results.get(str(i), []):
                 text, title = self._get_passage(docid)
 
-                has_ans = False
-                if document.answers and document.answers.answers:
-                    try:
-                        from pyserini.eval.evaluate_dpr_retrieval import (
-                            has_answers,
-                            SimpleTokenizer,
-                        )
-                        has_ans = has_answers(
-                            text, document.answers.answers, SimpleTokenizer()
-                        )
-                    except Exception:
-                        pass
-
                 contexts.append(
                     Context(
                         id=docid,
                         title=title,
                         text=text,
                         score=score,
-                        has_answer=has_ans,
                     )
                 )
             document.contexts = contexts
         return documents
+
+    def _batch_search(self, queries: List[str], qids: List[str], chunk_size: int = 1024) -> dict:
+        """
+        Encode the queries in batches, then search them with Lucene's multi-threaded batch search
+        (or the native index); returns ``{qid: [(docid, score), ...]}``.
+        """
+        batch_results = {}
+        for start in tqdm(range(0, len(queries), chunk_size), desc="SPLADE-v2 retrieving"):
+            chunk_queries = queries[start:start + chunk_size]
+            chunk_qids = qids[start:start + chunk_size]
+            if self.backend == "native":
+                query_vectors = encode_sparse(self.model, chunk_queries, is_q=True, batch_size=self.batch_size)
+                hits = self.searcher.search(query_vectors, k=self.n_docs, pruning=self.alpha is not None,
+                                            alpha=1.0 if self.alpha is None else self.alpha)
+                batch_results.update(zip(chunk_qids, hits))
+                continue
+            self.query_encoder.prefetch(chunk_queries)
+            lucene_results = self.searcher.batch_search(chunk_queries, chunk_qids, k=self.n_docs, threads=self.threads)
+            batch_results.update({qid: [(str(hit.docid), float(hit.score)) for hit in hits]
+                                  for qid, hits in lucene_results.items()})
+        return batch_results
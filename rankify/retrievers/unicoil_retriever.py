@@ -19,6 +19,7 @@ except ImportError:
     PYSERINI_AVAILABLE = False
 
 from .base_retriever import BaseRetriever
+from rankify.utils.retrievers.impact_query_encoder import BatchedImpactQueryEncoder
 from rankify.dataset.dataset import Document, Context
 
 
@@ -46,6 +47,10 @@ class UniCOILRetriever(BaseRetriever):
             ``index_folder`` because the Lucene index may not store raw text.
         model_name (str): UniCOIL query encoder checkpoint.
         device (str): ``'cpu'`` or ``'cuda'``.
+        query_cache_size (int): Encoded queries kept in memory across ``retrieve`` calls.
+
+    Queries are encoded in padded, length-bucketed batches of ``batch_size`` and searched with
+    ``LuceneImpactSearcher.batch_search`` on ``threads`` threads.
 
     Example:
         ```python
@@ -72,6 +77,7 @@ class UniCOILRetriever(BaseRetriever):
         corpus_path: Optional[str] = None,
         model_name: str = "castorini/unicoil-msmarco-passage",
         device: str = "cpu",
+        query_cache_size: int = 100_000,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -85,6 +91,7 @@ class UniCOILRetriever(BaseRetriever):
         self.corpus_path = corpus_path
         self.model_name = model_name
         self.device = device
+        self.query_cache_size = query_cache_size
 
         self.passage_store: dict = {}
         if corpus_path:
@@ -109,7 +116,12 @@ class UniCOILRetriever(BaseRetriever):
 
     def _initialize_searcher(self) -> "LuceneImpactSearcher":
         """Build and return a LuceneImpactSearcher with a UniCOIL query encoder."""
-        query_encoder = UniCoilQueryEncoder(self.model_name, device=self.device)
+        self.query_encoder = BatchedImpactQueryEncoder(
+            UniCoilQueryEncoder(self.model_name, device=self.device),
+            batch_size=self.batch_size,
+            cache_size=self.query_cache_size,
+        )
+        query_encoder = self.query_encoder
         if self.index_folder:
             return LuceneImpactSearcher(self.index_folder, query_encoder)
         prebuilt = self.PREBUILT_INDEX_MAP.get(self.index_type)
@@ -148,36 +160,37 @@ class UniCOILRetriever(BaseRetriever):
         Returns:
             List[Document]: Documents with populated ``contexts``.
         """
-        for document in tqdm(documents, desc="UniCOIL retrieving"):
-            query = document.question.question
-            hits = self.searcher.search(query, k=self.n_docs)
+        queries = [document.question.question for document in documents]
+        qids = [str(i) for i in range(len(queries))]
+        batch_results = self._batch_search(queries, qids)
+
+        for i, document in enumerate(documents):
             contexts: List[Context] = []
-            for hit in hits:
+            for hit in batch_results.get(str(i), []):
                 docid = str(hit.docid)
                 score = float(hit.score)
                 text, title = self._get_passage(docid)
 
-                has_ans = False
-                if document.answers and document.answers.answers:
-                    try:
-                        from pyserini.eval.evaluate_dpr_retrieval import (
-                            has_answers,
-                            SimpleTokenizer,
-                        )
-                        has_ans = has_answers(
-                            text, document.answers.answers, SimpleTokenizer()
-                        )
-                    except Exception:
-                        pass
-
                 contexts.append(
                     Context(
                         id=docid,
                         title=title,
                         text=text,
                         score=score,
-                        has_answer=has_ans,
                     )
                 )
             document.contexts = contexts
         return documents
+
+    def _batch_search(self, queries: List[str], qids: List[str], chunk_size: int = 1024) -> dict:
+        """Encode the queries in batches, then search them with Lucene's multi-threaded batch search."""
+        batch_results = {}
+        for start in tqdm(range(0, len(queries), chunk_size), desc="UniCOIL retrieving"):
+            chunk_queries = queries[start:start + chunk_size]
+            self.query_encoder.prefetch(chunk_queries)
+            batch_results.update(
+                self.searcher.batch_search(
+                    chunk_queries, qids[start:start + chunk_size], k=self.n_docs, threads=self.threads
+                )
+            )
+        return batch_results
@@ -1,7 +1,9 @@
 #utils.py
 import json
 import logging
+import numpy as np
 import torch
+import torch.nn.functional as F
 
 def count_file_lines(path) -> int:
     """
@@ -156,3 +158,112 @@ def generate_chunks(file_obj, chunk_size=512):
             start_idx += chunk_size
     if buffer:
         yield buffer, start_idx
+
+
+def topk_from_scores(scores, k: int):
+    """
+    Select the top-k entries of a score vector or matrix without a full sort.
+
+    Uses ``np.argpartition`` so only the selected ``k`` entries are sorted. Ties
+    are broken by corpus position, matching a stable descending sort.
+
+    Args:
+        scores (np.ndarray): Scores of shape ``(n_docs,)`` or ``(n_queries, n_docs)``.
+        k (int): Number of entries to keep per row.
+
+    Returns:
+        tuple: ``(top_scores, top_indices)`` with the same leading shape as ``scores``
+        and last dimension ``min(k, n_docs)``, ordered by descending score.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        empty = scores[..., :0]
+        return empty, np.zeros(empty.shape, dtype=np.int64)
+
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+        candidates.sort(axis=-1)
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+
+    selected = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-selected, axis=-1, kind="stable")
+    return (
+        np.take_along_axis(selected, order, axis=-1),
+        np.take_along_axis(candidates, order, axis=-1).astype(np.int64),
+    )
+
+
+def dense_topk(
+    query_emb,
+    doc_emb,
+    k: int,
+    normalize: bool = True,
+    query_batch_size: int = 256,
+    corpus_chunk_size: int = 65536,
+    device: str = "cpu",
+):
+    """
+    Brute-force top-k search of query embeddings against a corpus embedding matrix.
+
+    Queries are processed in batches and scored against the corpus one shard at a time;
+    each shard contributes its ``torch.topk`` candidates to a running top-k per query, so
+    the full ``n_queries x n_docs`` score matrix is never materialized. Peak extra memory
+    is ``query_batch_size x corpus_chunk_size`` floats.
+
+    Args:
+        query_emb (np.ndarray | torch.Tensor): Query embeddings ``(n_queries, dim)``.
+        doc_emb (np.ndarray | torch.Tensor): Corpus embeddings ``(n_docs, dim)``. May be a ``np.memmap``.
+        k (int): Number of documents to keep per query.
+        normalize (bool): L2-normalize both sides, i.e. score by cosine similarity. Defaults to True.
+        query_batch_size (int): Number of queries scored together. Defaults to 256.
+        corpus_chunk_size (int): Number of corpus rows per shard. Defaults to 65536.
+        device (str): Torch device used for scoring. Defaults to ``"cpu"``.
+
+    Returns:
+        tuple: ``(top_scores, top_indices)`` as NumPy arrays of shape ``(n_queries, min(k, n_docs))``,
+        ordered by descending score.
+    """
+    queries = torch.as_tensor(np.asarray(query_emb) if not torch.is_tensor(query_emb) else query_emb)
+    queries = queries.float()
+    n_queries = queries.shape[0]
+    n_docs = doc_emb.shape[0]
+    k = min(k, n_docs)
+
+    top_scores = np.zeros((n_queries, k), dtype=np.float32)
+    top_indices = np.zeros((n_queries, k), dtype=np.int64)
+    if n_queries == 0 or k <= 0:
+        return top_scores, top_indices
+
+    with torch.no_grad():
+        for q_start in range(0, n_queries, query_batch_size):
+            q_batch = queries[q_start:q_start + query_batch_size].to(device)
+            if normalize:
+                q_batch = F.normalize(q_batch, p=2, dim=1)
+
+            best_scores, best_indices = None, None
+            for c_start in range(0, n_docs, corpus_chunk_size):
+                shard = doc_emb[c_start:c_start + corpus_chunk_size]
+                shard = torch.as_tensor(shard if torch.is_tensor(shard) else np.asarray(shard))
+                shard = shard.to(device=device, dtype=torch.float32)
+                if normalize:
+                    shard = F.normalize(shard, p=2, dim=1)
+
+                sim = q_batch @ shard.T
+                shard_scores, shard_indices = torch.topk(sim, min(k, sim.shape[1]), dim=1)
+                shard_indices += c_start
+
+                if best_scores is not None:
+                    shard_scores = torch.cat([best_scores, shard_scores], dim=1)
+                    shard_indices = torch.cat([best_indices, shard_indices], dim=1)
+                    shard_scores, pos = torch.topk(shard_scores, min(k, shard_scores.shape[1]), dim=1)
+                    shard_indices = torch.gather(shard_indices, 1, pos)
+                best_scores, best_indices = shard_scores, shard_indices
+
+            q_end = q_start + q_batch.shape[0]
+            top_scores[q_start:q_end] = best_scores.cpu().numpy()
+            top_indices[q_start:q_end] = best_indices.cpu().numpy()
+
+    return top_scores, top_indices
@@ -16,8 +16,10 @@ from rankify.server.server import (
     RankifyServer,
     create_server,
 )
+from rankify.server.batching import MicroBatcher
 
 __all__ = [
     "RankifyServer",
     "create_server",
+    "MicroBatcher",
 ]
@@ -0,0 +1,155 @@
+"""
+Micro-batching scheduler for the Rankify server.
+
+Model calls (``retrieve``, ``rank``, ``generate``) block, and calling them from ``async``
+endpoints stalls the event loop: requests are served one at a time with a batch size of 1.
+A ``MicroBatcher`` queues concurrent requests, waits at most ``max_wait_ms`` for more to arrive
+(or until ``max_batch_size`` are queued), runs the batch on an executor thread and hands every
+caller its own result. While a batch is running, new requests queue up and form the next one,
+so batches grow with load.
+
+Example:
+    ```python
+    batcher = MicroBatcher(retriever.retrieve, max_batch_size=32, max_wait_ms=5)
+    document = await batcher.submit(document)   # from many concurrent requests
+    await batcher.close()
+    ```
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent ``submit`` calls into batched calls of ``fn``.
+
+    Args:
+        fn (Callable[[List[Any]], Sequence[Any]]): Batch function; returns one result per item, in order.
+        max_batch_size (int): Largest batch passed to ``fn``. ``1`` disables coalescing (calls are
+            still moved off the event loop).
+        max_wait_ms (float): How long the first request of a batch waits for company.
+        max_concurrent_batches (int): Batches allowed to run at the same time. Keep 1 for models that
+            are not thread-safe or that already saturate the device.
+        executor (Executor, optional): Where ``fn`` runs. Defaults to a private thread pool with
+            ``max_concurrent_batches`` threads.
+        name (str): Used in error messages.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], Sequence[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, max_concurrent_batches: int = 1,
+                 executor: Optional[Executor] = None, name: str = "batch"):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        if max_concurrent_batches < 1:
+            raise ValueError(f"max_concurrent_batches must be at least 1, got {max_concurrent_batches}")
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_concurrent_batches = max_concurrent_batches
+        self.name = name
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_concurrent_batches,
+                                                        thread_name_prefix=f"rankify-{name}")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running = set()
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_started(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.get_running_loop().create_task(self._collect())
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queues ``item`` and returns its result once its batch has run. Exceptions raised by ``fn``
+        are re-raised in every caller of the failed batch.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def submit_many(self, items: Sequence[Any]) -> List[Any]:
+        """ Queues several items at once; they may be spread over consecutive batches"""
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free slot first: requests arriving meanwhile all join the next batch
+            await self._slots.acquire()
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        # Take whatever is already queued without waiting any longer
+                        while len(batch) < self.max_batch_size and not self._queue.empty():
+                            batch.append(self._queue.get_nowait())
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError(f"{self.name} batcher was closed"))
+                self._slots.release()
+                raise
+            task = loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, self.fn, items)
+            results = list(results)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: expected {len(items)} results, got {len(results)}")
+        except Exception as e:
+            self._fail(batch, e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.batches += 1
+            self.items += len(batch)
+            self._slots.release()
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    async def close(self) -> None:
+        """ Stops collecting, waits for running batches and shuts down the private executor"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._fail(pending, RuntimeError(f"{self.name} batcher was closed"))
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
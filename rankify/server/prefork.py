@@ -0,0 +1,222 @@
+"""
+Pre-fork serving for the Rankify server.
+
+The parent process loads the retriever, reranker and generator once, binds the listening socket
+and forks ``workers`` children that each run their own uvicorn event loop on the shared socket.
+Read-only state is inherited copy-on-write instead of being loaded again per worker: memory-mapped
+FAISS indexes and ``PassageStore`` files share the page cache, and model weights and in-memory
+index arrays stay shared as long as nothing writes to them. ``gc.freeze()`` is called before
+forking so that garbage collection in the workers does not touch (and copy) the parent's objects.
+
+Each worker records its load (in-flight and total requests) in a small shared-memory table that
+every worker can read, so ``/health`` reports all workers whichever one answers it.
+
+Requires ``os.fork`` (Linux/macOS), and is CPU-only: a CUDA context does not survive ``fork``, so
+forking is refused once CUDA has been initialized (run GPU models with a single worker).
+
+Example:
+    ```python
+    server = RankifyServer(retriever="bge", reranker="flashrank")
+    server.start(port=8000, workers=8)
+    ```
+"""
+
+import ctypes
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerStats:
+    """
+    Per-worker request counters in anonymous shared memory, created before forking.
+
+    Each worker writes only its own row (from its event loop thread), so no lock is needed;
+    readers may see counters that are a few requests out of date.
+
+    Args:
+        n_workers (int): Number of worker rows.
+    """
+
+    FIELDS = ("pid", "in_flight", "requests", "errors", "started")
+
+    def __init__(self, n_workers: int):
+        self.n_workers = n_workers
+        self._data = multiprocessing.RawArray(ctypes.c_int64, n_workers * len(self.FIELDS))
+        self.index = 0
+
+    def _offset(self, index: int, field: str) -> int:
+        return index * len(self.FIELDS) + self.FIELDS.index(field)
+
+    def attach(self, index: int) -> None:
+        """ Claims row ``index`` for the calling process and resets its counters"""
+        self.index = index
+        for field in self.FIELDS:
+            self._data[self._offset(index, field)] = 0
+        self._data[self._offset(index, "pid")] = os.getpid()
+        self._data[self._offset(index, "started")] = int(time.time())
+
+    def request_started(self) -> None:
+        self._data[self._offset(self.index, "in_flight")] += 1
+        self._data[self._offset(self.index, "requests")] += 1
+
+    def request_finished(self, error: bool = False) -> None:
+        self._data[self._offset(self.index, "in_flight")] -= 1
+        if error:
+            self._data[self._offset(self.index, "errors")] += 1
+
+    def snapshot(self) -> List[Dict[str, int]]:
+        """ Returns one ``{"worker", "pid", "in_flight", "requests", "errors", "started"}`` dict per live row"""
+        rows = []
+        for index in range(self.n_workers):
+            row = {field: self._data[self._offset(index, field)] for field in self.FIELDS}
+            if row["pid"]:
+                rows.append({"worker": index, **row})
+        return rows
+
+
+class LoadTrackingMiddleware:
+    """ ASGI middleware counting HTTP requests into a :class:`WorkerStats` row"""
+
+    def __init__(self, app, stats: WorkerStats):
+        self.app = app
+        self.stats = stats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        self.stats.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.stats.request_finished(error=status["code"] >= 500)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """ Binds the listening socket shared by all workers"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def check_fork_safe() -> None:
+    """
+    Raises if the process cannot be forked into working model servers.
+
+    Raises:
+        RuntimeError: If ``os.fork`` is unavailable, or if CUDA is initialized (forked children
+            cannot use the parent's CUDA context).
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Pre-fork serving requires os.fork (Linux or macOS)")
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_initialized():
+        raise RuntimeError(
+            "Pre-fork serving is CPU-only: CUDA was initialized while loading the components, and forked "
+            "workers cannot use it. Load the models on CPU or start the server with workers=1."
+        )
+
+
+def serve_prefork(build_app: Callable[[], Any], sock: socket.socket, workers: int, stats: WorkerStats,
+                  on_worker_start: Optional[Callable[[int], None]] = None, log_level: str = "info",
+                  min_uptime: float = 5.0) -> None:
+    """
+    Forks ``workers`` uvicorn workers serving ``sock`` and supervises them until SIGINT/SIGTERM.
+
+    Workers that die are replaced, unless they exit within ``min_uptime`` seconds of starting
+    (a crash on startup would only crash again).
+
+    Args:
+        build_app (Callable[[], Any]): Builds the ASGI app inside each worker.
+        sock (socket.socket): Bound, listening socket (see :func:`bind_socket`).
+        workers (int): Number of worker processes.
+        stats (WorkerStats): Shared load table with at least ``workers`` rows.
+        on_worker_start (Callable[[int], None], optional): Called in each worker before serving.
+        log_level (str): uvicorn log level.
+        min_uptime (float): Seconds a worker must live to be restarted after it exits.
+    """
+    import uvicorn
+
+    check_fork_safe()
+
+    # Move everything loaded so far out of the collector's reach: a GC pass in a worker would
+    # otherwise write to every tracked object and un-share its page.
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, tuple] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                stats.attach(index)
+                if on_worker_start is not None:
+                    on_worker_start(index)
+                config = uvicorn.Config(build_app(), log_level=log_level)
+                uvicorn.Server(config).run(sockets=[sock])
+            except BaseException:
+                logger.exception(f"Worker {index} failed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (index, time.monotonic())
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        for index in range(workers):
+            spawn(index)
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            if pid not in children:
+                continue
+            index, started = children.pop(pid)
+            if stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if time.monotonic() - started < min_uptime:
+                logger.error(f"Worker {index} (pid {pid}) exited with {code} right after starting; not restarting it")
+            else:
+                logger.warning(f"Worker {index} (pid {pid}) exited with {code}; restarting it")
+                spawn(index)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        gc.unfreeze()
+        sock.close()
@@ -4,7 +4,7 @@ Rankify Server - REST API for Production Deployments
 Provides a FastAPI-based server with endpoints for:
 - /retrieve - Document retrieval
 - /rerank - Rerank existing documents
-- /rag - Full RAG pipeline
+- /rag - Full RAG pipeline (``"stream": true`` streams contexts and answer tokens as Server-Sent Events)
 
 Start server:
     >>> rankify serve --port 8000
@@ -13,16 +13,27 @@ Or in Python:
     >>> from rankify.server import RankifyServer
     >>> server = RankifyServer(retriever="bge", reranker="flashrank")
     >>> server.start(port=8000)
+
+Model calls run on executor threads, and concurrent /retrieve, /rerank and /rag requests are
+coalesced into batches (see ``rankify.server.batching.MicroBatcher``). Each model is guarded by a
+lock, so the batchers never call the same model from two threads at once. With ``workers > 1`` the
+components are loaded once and shared by pre-forked worker processes (see ``rankify.server.prefork``).
 """
 
 import os
+import sys
 import json
 import time
+import asyncio
+import threading
 from typing import List, Optional, Dict, Any, Union
 from dataclasses import dataclass, asdict
 from contextlib import asynccontextmanager
 import logging
 
+from rankify.server.batching import MicroBatcher
+from rankify.server.prefork import LoadTrackingMiddleware, WorkerStats, bind_socket, check_fork_safe, serve_prefork
+
 # Try to import FastAPI
 try:
     from fastapi import FastAPI, HTTPException, BackgroundTasks
@@ -37,6 +48,59 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _locked(lock, iterator):
+    """Yield from ``iterator`` while holding ``lock`` (released when the iterator is closed)."""
+    with lock:
+        yield from iterator
+
+
+async def _iterate_in_thread(iterator):
+    """Run a blocking iterator on an executor thread and yield its items on the event loop."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def put(item, error=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:  # event loop already closed
+            pass
+
+    def produce():
+        try:
+            for item in iterator:
+                put(item)
+                if stop.is_set():
+                    break
+        except Exception as e:
+            put(end, e)
+            return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        put(end)
+
+    loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # The client went away or the stream ended: let the producer stop the model early
+        stop.set()
+
+
 # =============================================================================
 # Request/Response Models
 # =============================================================================
@@ -92,6 +156,8 @@ if FASTAPI_AVAILABLE:
         retriever: Optional[str] = None
         reranker: Optional[str] = None
         generator: Optional[str] = None
+        worker: Optional[int] = None
+        workers: Optional[List[Dict[str, Any]]] = None
 
 
 class RankifyServer:
@@ -125,6 +191,9 @@ class RankifyServer:
         generator_backend: str = "openai",
         index_type: str = "wiki",
         n_docs: int = 100,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        threads_per_worker: Optional[int] = None,
         **kwargs,
     ):
         """
@@ -140,6 +209,10 @@ class RankifyServer:
             generator_backend: LLM backend
             index_type: Index type
             n_docs: Default documents to retrieve
+            max_batch_size: Most concurrent requests coalesced into one model call (1 disables batching)
+            max_wait_ms: How long a request waits for others to batch with
+            threads_per_worker: Torch threads per worker process in pre-fork mode
+                (default: CPU count divided by the number of workers)
         """
         if not FASTAPI_AVAILABLE:
             raise ImportError(
@@ -157,6 +230,9 @@ class RankifyServer:
             "generator_backend": generator_backend,
             "index_type": index_type,
             "n_docs": n_docs,
+            "max_batch_size": max_batch_size,
+            "max_wait_ms": max_wait_ms,
+            "threads_per_worker": threads_per_worker,
             **kwargs,
         }
         
@@ -164,7 +240,22 @@ class RankifyServer:
         self._retriever = None
         self._reranker = None
         self._generator = None
+        self._components_loaded = False
         self._app = None
+        
+        # Per-worker load table (one row, or one per pre-forked worker)
+        self._worker_stats = None
+        
+        # Request schedulers (created on startup)
+        self._retrieve_batcher = None
+        self._rerank_batcher = None
+        self._rag_batcher = None
+        
+        # The batchers run on separate threads but share the models, which are not thread-safe:
+        # each model is used by one thread at a time, while different models can run concurrently
+        self._retriever_lock = threading.Lock()
+        self._reranker_lock = threading.Lock()
+        self._generator_lock = threading.Lock()
     
     def _initialize_components(self):
         """Initialize ML components."""
@@ -193,6 +284,116 @@ class RankifyServer:
                 backend=self.config["generator_backend"],
             )
     
+    def _load_components(self):
+        """Initialize ML components once (before forking in pre-fork mode)."""
+        if not self._components_loaded:
+            self._initialize_components()
+            self._components_loaded = True
+    
+    def _create_batchers(self):
+        """Create the micro-batching schedulers that run model calls off the event loop."""
+        options = {
+            "max_batch_size": self.config["max_batch_size"],
+            "max_wait_ms": self.config["max_wait_ms"],
+        }
+        self._retrieve_batcher = MicroBatcher(self._retrieve_batch, name="retrieve", **options)
+        self._rerank_batcher = MicroBatcher(self._rerank_batch, name="rerank", **options)
+        if self._generator:
+            self._rag_batcher = MicroBatcher(self._rag_batch, name="rag", **options)
+    
+    async def _close_batchers(self):
+        for batcher in (self._retrieve_batcher, self._rerank_batcher, self._rag_batcher):
+            if batcher is not None:
+                await batcher.close()
+    
+    def _retrieve_batch(self, docs):
+        with self._retriever_lock:
+            return self._retriever.retrieve(docs)
+    
+    def _rerank_batch(self, docs):
+        with self._reranker_lock:
+            return self._reranker.rank(docs)
+    
+    def _rag_batch(self, items):
+        """Retrieve, rerank and generate for a batch of ``(document, n_contexts)`` requests."""
+        docs = self._retrieve_batch([doc for doc, _ in items])
+        docs = self._rerank_batch(docs)
+        for doc, (_, n_contexts) in zip(docs, items):
+            doc.contexts = (doc.reorder_contexts or doc.contexts)[:n_contexts]
+        with self._generator_lock:
+            answers = self._generator.generate(docs) or []
+        return [(doc, answers[i] if i < len(answers) else "") for i, doc in enumerate(docs)]
+    
+    def _count_tokens(self, answer: str, chunks: int) -> int:
+        """Token count of a streamed answer: exact with a local tokenizer, else one per streamed delta."""
+        tokenizer = getattr(getattr(self._generator.rag_method, "model", None), "tokenizer", None)
+        if tokenizer is not None:
+            return len(tokenizer.encode(answer, add_special_tokens=False))
+        return chunks
+    
+    async def _rag_events(self, request):
+        """
+        Server-Sent Events for a streamed /rag request: ``contexts`` once retrieval and reranking
+        are done, one ``token`` event per generated chunk, then ``done`` with the answer and timings
+        (``ttft_ms`` from request arrival to the first chunk, ``tokens_per_sec`` over generation).
+        Failures are reported as an ``error`` event.
+        """
+        from rankify.dataset.dataset import Document, Question, Answer
+        
+        start = time.perf_counter()
+        try:
+            doc = Document(question=Question(request.query), answers=Answer([]), contexts=[])
+            doc = await self._retrieve_batcher.submit(doc)
+            doc = await self._rerank_batcher.submit(doc)
+            doc.contexts = (doc.reorder_contexts or doc.contexts)[:request.n_contexts]
+        except Exception as e:
+            logger.exception("Retrieval for a streamed /rag request failed")
+            yield _sse("error", {"detail": str(e)})
+            return
+        
+        yield _sse("contexts", {
+            "query": request.query,
+            "contexts": [
+                {
+                    "id": ctx.id or str(i),
+                    "text": ctx.text[:500],
+                    "title": getattr(ctx, "title", None),
+                    "score": getattr(ctx, "score", None),
+                }
+                for i, ctx in enumerate(doc.contexts)
+            ],
+            "retrieval_ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+        
+        generation_start = time.perf_counter()
+        first_chunk = None
+        chunks = []
+        try:
+            stream = _locked(self._generator_lock, self._generator.generate_stream(doc))
+            async for chunk in _iterate_in_thread(stream):
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                chunks.append(chunk)
+                yield _sse("token", {"text": chunk})
+        except Exception as e:
+            logger.exception("Generation for a streamed /rag request failed")
+            yield _sse("error", {"detail": str(e)})
+            return
+        end = time.perf_counter()
+        
+        answer = "".join(chunks)
+        tokens = self._count_tokens(answer, len(chunks))
+        ttft = ((first_chunk or end) - start) * 1000
+        tokens_per_sec = tokens / (end - generation_start) if end > generation_start else 0.0
+        logger.info(f"Streamed /rag: ttft {ttft:.1f} ms, {tokens} tokens at {tokens_per_sec:.1f} tokens/s")
+        yield _sse("done", {
+            "answer": answer,
+            "tokens": tokens,
+            "ttft_ms": round(ttft, 2),
+            "tokens_per_sec": round(tokens_per_sec, 2),
+            "latency_ms": round((end - start) * 1000, 2),
+        })
+    
     def create_app(self) -> "FastAPI":
         """Create FastAPI application."""
         
@@ -200,11 +401,13 @@ class RankifyServer:
         async def lifespan(app: FastAPI):
             # Startup
             logger.info("Initializing Rankify components...")
-            self._initialize_components()
+            self._load_components()
+            self._create_batchers()
             logger.info("Rankify server ready!")
             yield
             # Shutdown
             logger.info("Shutting down Rankify server...")
+            await self._close_batchers()
         
         app = FastAPI(
             title="Rankify API",
@@ -213,6 +416,11 @@ class RankifyServer:
             lifespan=lifespan,
         )
         
+        if self._worker_stats is None:
+            self._worker_stats = WorkerStats(1)
+            self._worker_stats.attach(0)
+        app.add_middleware(LoadTrackingMiddleware, stats=self._worker_stats)
+        
         # Add CORS middleware
         app.add_middleware(
             CORSMiddleware,
@@ -232,6 +440,8 @@ class RankifyServer:
                 retriever=self.config["retriever"],
                 reranker=self.config["reranker"],
                 generator=self.config["generator"],
+                worker=self._worker_stats.index,
+                workers=self._worker_stats.snapshot(),
             )
         
         # Retrieve endpoint
@@ -248,8 +458,8 @@ class RankifyServer:
                 contexts=[],
             )
             
-            results = self._retriever.retrieve([doc])
-            contexts = results[0].contexts[:request.n_docs]
+            result = await self._retrieve_batcher.submit(doc)
+            contexts = result.contexts[:request.n_docs]
             
             latency = (time.time() - start) * 1000
             
@@ -291,8 +501,8 @@ class RankifyServer:
                 contexts=contexts,
             )
             
-            results = self._reranker.rank([doc])
-            reranked = results[0].reorder_contexts or results[0].contexts
+            result = await self._rerank_batcher.submit(doc)
+            reranked = result.reorder_contexts or result.contexts
             top_k = reranked[:request.top_k]
             
             latency = (time.time() - start) * 1000
@@ -331,21 +541,12 @@ class RankifyServer:
                 contexts=[],
             )
             
-            # Retrieve
-            results = self._retriever.retrieve([doc])
-            doc = results[0]
-            
-            # Rerank
-            results = self._reranker.rank([doc])
-            doc = results[0]
-            
-            # Get top contexts
-            contexts = (doc.reorder_contexts or doc.contexts)[:request.n_contexts]
-            doc.contexts = contexts
+            if request.stream:
+                return StreamingResponse(self._rag_events(request), media_type="text/event-stream")
             
-            # Generate
-            answers = self._generator.generate([doc])
-            answer = answers[0] if answers else ""
+            # Retrieve, rerank, keep the top contexts and generate (batched with concurrent requests)
+            doc, answer = await self._rag_batcher.submit((doc, request.n_contexts))
+            contexts = doc.contexts
             
             latency = (time.time() - start) * 1000
             
@@ -375,7 +576,7 @@ class RankifyServer:
                 for q in queries
             ]
             
-            results = self._retriever.retrieve(docs)
+            results = await self._retrieve_batcher.submit_many(docs)
             
             return {
                 "results": [
@@ -407,8 +608,13 @@ class RankifyServer:
             host: Host to bind to
             port: Port to bind to
             reload: Enable auto-reload for development
-            workers: Number of worker processes
+            workers: Number of worker processes. Above 1, components are loaded once in this
+                process and shared copy-on-write by forked workers (CPU models only).
         """
+        if workers > 1 and not reload:
+            self._start_prefork(host, port, workers)
+            return
+        
         app = self.create_app()
         
         logger.info(f"Starting Rankify server at http://{host}:{port}")
@@ -419,8 +625,30 @@ class RankifyServer:
             host=host,
             port=port,
             reload=reload,
-            workers=workers,
         )
+    
+    def _start_prefork(self, host: str, port: int, workers: int):
+        """
+        Load components, then fork ``workers`` processes serving one shared socket.
+
+        CPU-only: raises ``RuntimeError`` if loading the components initialized CUDA.
+        """
+        # Tokenizer thread pools do not survive fork
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        self._load_components()
+        check_fork_safe()
+        self._worker_stats = WorkerStats(workers)
+        sock = bind_socket(host, port)
+        
+        logger.info(f"Starting Rankify server at http://{host}:{port} with {workers} workers")
+        serve_prefork(self.create_app, sock, workers, self._worker_stats,
+                      on_worker_start=lambda index: self._on_worker_start(workers))
+    
+    def _on_worker_start(self, workers: int):
+        # Split the cores between workers instead of every worker using all of them
+        if "torch" in sys.modules:
+            threads = self.config["threads_per_worker"] or max(1, (os.cpu_count() or 1) // workers)
+            sys.modules["torch"].set_num_threads(threads)
 
 
 def create_server(
@@ -460,6 +688,7 @@ def main():
     parser.add_argument("--reranker", default="flashrank", help="Reranker method")
     parser.add_argument("--generator", default=None, help="Generator method")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes sharing the loaded models")
     
     args = parser.parse_args()
     
@@ -468,7 +697,7 @@ def main():
         reranker=args.reranker,
         generator=args.generator,
     )
-    server.start(host=args.host, port=args.port, reload=args.reload)
+    server.start(host=args.host, port=args.port, reload=args.reload, workers=args.workers)
 
 
 if __name__ == "__main__":
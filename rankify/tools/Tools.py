@@ -3,12 +3,30 @@ from typing import Optional
 
 import nest_asyncio
 
+from rankify.tools.websearch.cache import WebCache
+from rankify.tools.websearch.content_scraping.crawler import WebScraper
 from rankify.tools.websearch.context.build_search_context import build_search_context
 from rankify.tools.websearch.serp.SearchAPIClient import SearchAPIClient
 from rankify.tools.websearch.serp.SerperApiClient import SerperApiClient
 # noinspection PyTypeHints
 
 
+def run_coroutine(coroutine):
+    """
+    Runs a coroutine to completion from synchronous code, also inside an already running loop
+    (e.g. Jupyter) via ``nest_asyncio``.
+    """
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_running():
+            nest_asyncio.apply()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    return loop.run_until_complete(coroutine)
+
+
 class Tool:
     """
         A base class for the functions used by the agent. Subclass this and implement the `forward` method as well as the
@@ -72,27 +90,31 @@ class WebSearchTool(Tool):
     output_type = "string"
 
     def __init__(self, model: Optional[str]=None, search_provider: str = 'serper',
-                 search_provider_api_key: Optional[str] = None):
+                 search_provider_api_key: Optional[str] = None, cache: Optional[WebCache] = None):
         super().__init__()
         self.search_client = None
         self.model = model
         self.search_provider = search_provider
         self.search_provider_api_key = search_provider_api_key
+        # Persistent SERP / page cache shared by the search client and the scraper
+        self.cache = cache
 #        self.validate_arguments()
 
     @staticmethod
-    def create_search_api(search_provider: str = 'SERPER', api_key: Optional[str] = None) -> SearchAPIClient:
+    def create_search_api(search_provider: str = 'SERPER', api_key: Optional[str] = None,
+                          cache: Optional[WebCache] = None) -> SearchAPIClient:
         """
         Instantiate a search API client to fetch SERP results from a SERP provider e.g., SERPER.dev.
         Args:
             search_provider (str): The name of the search provider.
             Api_key (str): The API key for the search provider. Can be stored and loaded from env vars.
+            cache (WebCache): Optional persistent cache for SERP responses.
         Returns:
             SearchAPIClient: An instance of the search API client. E.g., SerpAPIClient.
         """
         if search_provider.lower() == 'serper':
             #print(api_key)
-            return SerperApiClient(api_key=api_key)
+            return SerperApiClient(api_key=api_key, cache=cache)
         else:
             raise ValueError(f'Invalid search provider{search_provider}')
 
@@ -102,21 +124,35 @@ class WebSearchTool(Tool):
 
         
         #asdadsasdad
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                nest_asyncio.apply()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        return run_coroutine(build_search_context(sources, self.create_scraper()))
+
+    def create_scraper(self, crawler_pool=None) -> WebScraper:
+        """
+        Returns the scraper used for search results, backed by the tool's cache.
+        """
+        return WebScraper(strategies=['no_extraction'], crawler_pool=crawler_pool, cache=self.cache)
 
-        return loop.run_until_complete(build_search_context(sources))
+    async def search_async(self, query: str, num_result: int = 10):
+        """
+        Fetches the SERP for ``query`` without blocking the event loop; the pages are not scraped.
+        """
+        if not self.is_initialized:
+            self.setup()
+        return await self.search_client.search_web_async(query, num_results=num_result)
 
+    async def forward_async(self, query: str, num_result: int = 10, scraper: Optional[WebScraper] = None):
+        """
+        Async ``forward``: searches and scrapes the results, with ``scraper`` (e.g. one built on a
+        shared ``CrawlerPool``) if given.
+        """
+        sources = await self.search_async(query, num_result=num_result)
+        return await build_search_context(sources, scraper or self.create_scraper())
 
 
     def setup(self):
         """
         Performs time-consuming setup operations here e.g., model loading.
         """
-        self.search_client = self.create_search_api(api_key=self.search_provider_api_key)
+        self.search_client = self.create_search_api(self.search_provider, api_key=self.search_provider_api_key,
+                                                    cache=self.cache)
         self.is_initialized = True
@@ -0,0 +1,194 @@
+"""
+Persistent cache for web search results and scraped pages.
+
+Repeated questions and benchmark reruns used to hit the SERP API and crawl the same pages again.
+``WebCache`` keeps both in one SQLite file:
+
+* SERP responses, keyed on the normalized query, search location and number of results,
+* scraped pages, keyed on URL and extraction strategy.
+
+Keys are SHA-256 digests of the normalized fields (content addressed), entries expire after a
+per-kind TTL and the file is kept under ``max_bytes`` by evicting the least recently used
+entries. Only successful responses are stored.
+
+With ``offline=True`` nothing is fetched: cache misses come back as failed results, so
+benchmarks can replay a previous run without network access (and without launching a browser).
+
+Example:
+    ```python
+    from rankify.tools.websearch.cache import WebCache
+    from rankify.retrievers.online_retriever import OnlineRetriever
+
+    retriever = OnlineRetriever(n_docs=5, api_key="...", cache=WebCache("web.sqlite"))
+    retriever.retrieve(documents)                      # fills the cache
+    replay = OnlineRetriever(n_docs=5, cache=WebCache("web.sqlite", offline=True))
+    replay.retrieve(documents)                         # no network
+    print(replay.cache.stats())
+    ```
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+SERP = "serp"
+PAGE = "page"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """ Lower-cases a query and collapses whitespace, so trivially different spellings share an entry"""
+    return " ".join(query.lower().split())
+
+
+def _digest(*fields: Any) -> str:
+    return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class WebCache:
+    """
+    SQLite-backed cache of SERP responses and scraped pages with TTL, LRU eviction and hit / miss
+    counters. Safe to share between threads (SERP calls run in worker threads).
+
+    Args:
+        path (str, optional): SQLite file. Defaults to ``$RERANKING_CACHE_DIR/websearch/cache.sqlite``.
+        serp_ttl (float, optional): Seconds a SERP response stays valid (``None``: forever).
+        page_ttl (float, optional): Seconds a scraped page stays valid (``None``: forever).
+        max_bytes (int, optional): Upper bound on the stored values; least recently used entries are
+            evicted beyond it (``None``: unbounded).
+        offline (bool): Replay mode. Misses are not fetched and surface as failed results, and
+            the TTLs are ignored so stored entries are replayed however old they are.
+    """
+
+    def __init__(self, path: Optional[str] = None, serp_ttl: Optional[float] = 24 * 3600,
+                 page_ttl: Optional[float] = 7 * 24 * 3600, max_bytes: Optional[int] = 1 << 30,
+                 offline: bool = False):
+        if path is None:
+            path = os.path.join(os.environ.get("RERANKING_CACHE_DIR", "./cache"), "websearch", "cache.sqlite")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = {SERP: serp_ttl, PAGE: page_ttl}
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    @staticmethod
+    def serp_key(query: str, location: Optional[str], num_results: int) -> str:
+        return _digest(normalize_query(query), (location or "").lower(), int(num_results))
+
+    @staticmethod
+    def page_key(url: str, strategy: str) -> str:
+        return _digest(url.strip(), strategy)
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """
+        Returns the cached value, or ``None`` on a miss (absent or expired entry).
+
+        In offline mode entries never expire: a replay must see what the recorded run stored,
+        however long ago that was, and must not delete it.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            ttl = None if self.offline else self.ttl.get(kind)
+            if row is not None and ttl is not None and now - row[1] > ttl:
+                self._connection.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                row = None
+            if row is None:
+                self.misses[kind] += 1
+                return None
+            self._connection.execute(
+                "UPDATE entries SET accessed = ? WHERE kind = ? AND key = ?", (now, kind, key))
+            self.hits[kind] += 1
+        return json.loads(row[0])
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """
+        Stores a JSON-serializable value and evicts least recently used entries beyond ``max_bytes``.
+        """
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, data, size, now, now))
+            if self.max_bytes is not None:
+                self._evict(self.max_bytes)
+
+    def _evict(self, max_bytes: int) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= max_bytes:
+            return
+        freed = 0
+        victims = []
+        for kind, key, size in self._connection.execute("SELECT kind, key, size FROM entries ORDER BY accessed"):
+            victims.append((kind, key))
+            freed += size
+            if total - freed <= max_bytes:
+                break
+        self._connection.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", victims)
+
+    def get_serp(self, query: str, location: Optional[str], num_results: int) -> Optional[Dict[str, Any]]:
+        return self.get(SERP, self.serp_key(query, location, num_results))
+
+    def put_serp(self, query: str, location: Optional[str], num_results: int, data: Dict[str, Any]) -> None:
+        self.put(SERP, self.serp_key(query, location, num_results), data)
+
+    def get_page(self, url: str, strategy: str) -> Optional[Dict[str, Any]]:
+        return self.get(PAGE, self.page_key(url, strategy))
+
+    def put_page(self, url: str, strategy: str, result: Dict[str, Any]) -> None:
+        self.put(PAGE, self.page_key(url, strategy), result)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit / miss counters per kind along with the number and total size of stored entries.
+        """
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM entries")
+        self.hits.clear()
+        self.misses.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
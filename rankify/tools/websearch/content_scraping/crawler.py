@@ -2,23 +2,92 @@
     Web scraper implementation using Crawl4AI
 """
 import asyncio
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from loguru import logger
 from crawl4ai import BrowserConfig , CrawlerRunConfig , CacheMode , AsyncWebCrawler
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 from crawl4ai.content_filter_strategy import PruningContentFilter
+try:
+    # lxml implementation with identical output, ~10x faster (crawl4ai >= 0.9)
+    from crawl4ai.content_filter_strategy import PruningContentFilterLXML
+except ImportError:
+    PruningContentFilterLXML = PruningContentFilter
 
 from rankify.tools.websearch.content_scraping.scrapedResult import ScrapedResult, print_extracted_result
 from rankify.tools.websearch.content_scraping.strategyFactory import StrategyFactory
 from rankify.tools.websearch.content_scraping.config import ExtractionConfig
+from rankify.tools.websearch.cache import WebCache
+
+
+class CrawlerPool:
+    """
+    One long-lived ``AsyncWebCrawler`` (a single browser with its own page pool) shared by every
+    scrape, with at most ``max_concurrency`` pages in flight.
+
+    Opening an ``AsyncWebCrawler`` launches a browser, which costs far more than loading a page;
+    the pool starts it once and closes it when the batch is done.
+
+    Example:
+        ```python
+        async with CrawlerPool(max_concurrency=8) as pool:
+            scraper = WebScraper(crawler_pool=pool)
+            results = await scraper.scrape_many(urls)
+        ```
+    """
+
+    def __init__(self, browser_config: Optional[BrowserConfig] = None, max_concurrency: int = 8,
+                 crawler_strategy=None):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.browser_config = browser_config
+        self.max_concurrency = max_concurrency
+        self.crawler_strategy = crawler_strategy
+        self._crawler: Optional[AsyncWebCrawler] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> "CrawlerPool":
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._crawler is None:
+                crawler = AsyncWebCrawler(config=self.browser_config, crawler_strategy=self.crawler_strategy)
+                await crawler.start()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._crawler = crawler
+        return self
+
+    async def close(self) -> None:
+        if self._crawler is not None:
+            crawler, self._crawler = self._crawler, None
+            await crawler.close()
+
+    async def arun(self, url: str, config: CrawlerRunConfig):
+        """ Crawls one URL on the shared crawler, waiting for a free slot first"""
+        if self._crawler is None:
+            await self.start()
+        async with self._semaphore:
+            return await self._crawler.arun(url=url, config=config)
+
+    async def __aenter__(self) -> "CrawlerPool":
+        # The browser is launched by the first crawl, so runs served from a cache never start one
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
 
 
 class WebScraper:
     #'markdown_llm', 'html_llm','fit_markdown_llm','css', 'xpath','cosine'
     def __init__(self,browser_config:Optional[BrowserConfig]=None,strategies : List[str]= [   'no_extraction', ],llm_instruction:str="Extract relevant content from the provided text, only return the text, no markdown formatting, remove all footnotes, citations, and other metadata and only keep the main content",
-                 query:Optional[str]=None,filter_content:bool=True):
+                 query:Optional[str]=None,filter_content:bool=True, crawler_pool:Optional[CrawlerPool]=None,
+                 cache:Optional[WebCache]=None):
         self.browser_config = browser_config
+        # Without a pool every extraction opens (and closes) its own crawler
+        self.crawler_pool = crawler_pool
+        self._run_configs: Dict[str, CrawlerRunConfig] = {}
+        self.cache = cache
         self.strategies = strategies
         self.llm_instruction = llm_instruction
         self.query = query
@@ -42,7 +111,7 @@ class WebScraper:
         filter_content = PruningContentFilter(user_query=self.query) if self.query else PruningContentFilter()
         return CrawlerRunConfig(cache_mode=CacheMode.BYPASS,markdown_generator=DefaultMarkdownGenerator(content_filter=filter_content))
     def _create_crawler_config(self):
-        prune_filter = PruningContentFilter(
+        prune_filter = PruningContentFilterLXML(
             # Lower → more content retained, higher → more content pruned
             threshold=0.45,           
             # "fixed" or "dynamic"
@@ -59,18 +128,33 @@ class WebScraper:
         )
         return config
 
+    def _run_config(self, extraction_config: ExtractionConfig) -> CrawlerRunConfig:
+        # Building a CrawlerRunConfig costs ~0.1s (it introspects signatures on every attribute):
+        # build one per strategy and share it between pages, as crawl4ai's arun_many does
+        config = self._run_configs.get(extraction_config.name)
+        if config is None:
+            config = self._create_crawler_config()
+            config.extraction_strategy = extraction_config.strategy
+            browser_config = self.browser_config or (self.crawler_pool.browser_config if self.crawler_pool else None)
+            if browser_config is not None:
+                config.verbose = browser_config.verbose
+            self._run_configs[extraction_config.name] = config
+        return config
+
     async def extract(self, extraction_config: ExtractionConfig, url: str) -> ScrapedResult:
             """ Method to perform extraction using a strategy(e.g., markdown strategy)"""
             logger.info("Extracting...")
             try:
-                config = self._create_crawler_config()
-                config.extraction_strategy = extraction_config.strategy
+                config = self._run_config(extraction_config)
                 #config=self.browser_config
-                async with AsyncWebCrawler() as crawler:
-                    if isinstance(url, list):
-                        results = await crawler.arun_many(urls=url, config=config)
-                    else:
-                        results = await crawler.arun(url=url, config=config)
+                if self.crawler_pool is not None and not isinstance(url, list):
+                    results = await self.crawler_pool.arun(url, config)
+                else:
+                    async with AsyncWebCrawler() as crawler:
+                        if isinstance(url, list):
+                            results = await crawler.arun_many(urls=url, config=config)
+                        else:
+                            results = await crawler.arun(url=url, config=config)
                     # print(results.success)
                     # print(results.markdown.fit_markdown)
                     # print("*" * 80)
@@ -137,14 +221,40 @@ class WebScraper:
         #     except Exception as e:
         #         raise ValueError(f"Debug: Wikipedia extraction failed {str(e)}")
         
+        pending = []
         for strategy_name in self.strategies:
-            config = ExtractionConfig(
-                name=strategy_name, strategy=self.strategy_map[strategy_name]()
-            )
-            result = await self.extract(config, url=url)
+            cached = self._cached(url, strategy_name)
+            if cached is not None:
+                results[strategy_name] = cached
+            else:
+                pending.append(strategy_name)
+
+        # Strategies are independent crawls of the same page: run them concurrently
+        configs = [
+            ExtractionConfig(name=strategy_name, strategy=self.strategy_map[strategy_name]())
+            for strategy_name in pending
+        ]
+        extracted = await asyncio.gather(*(self.extract(config, url=url) for config in configs))
+        for strategy_name, result in zip(pending, extracted):
             results[strategy_name] = result
+            if self.cache is not None and result.success:
+                self.cache.put_page(url, self._cache_strategy(strategy_name), result.to_dict())
 
-        return results
+        return {strategy_name: results[strategy_name] for strategy_name in self.strategies}
+
+    def _cache_strategy(self, strategy_name: str) -> str:
+        # Filtered and unfiltered content of the same page are different entries
+        return strategy_name if self.filter_content else f"{strategy_name}:unfiltered"
+
+    def _cached(self, url: str, strategy_name: str) -> Optional[ScrapedResult]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get_page(url, self._cache_strategy(strategy_name))
+        if cached is not None:
+            return ScrapedResult.from_dict(cached)
+        if self.cache.offline:
+            return ScrapedResult(name=strategy_name, success=False, error=f"{url} is not cached (offline)")
+        return None
 
     async def scrape_many(self, urls: List[str], pro_mode:Optional[bool]=True) -> Dict[str, Dict[str, ScrapedResult]]:
         """ Extracted multiple URLs concurrently using chosen strategies """
@@ -158,14 +268,24 @@ class WebScraper:
             #print(f"Scraped {url} with results: {result}")
         return results
 
+    async def scrape_stream(self, urls: List[str]) -> AsyncIterator[Tuple[int, Dict[str, ScrapedResult]]]:
+        """ Scrapes URLs concurrently and yields ``(position in urls, results)`` as each page finishes"""
+
+        async def scrape_at(position: int, url: str):
+            return position, await self.scrape(url)
+
+        for finished in asyncio.as_completed([scrape_at(i, url) for i, url in enumerate(urls)]):
+            yield await finished
+
 async def main():
     urls = [
         "https://en.wikipedia.org/wiki/Apple_Inc.",
         "https://python.org",
         "https://github.com"
     ]
-    scraper = WebScraper(strategies=['no_extraction'])
-    multi_results = await scraper.scrape_many(urls)
+    async with CrawlerPool(max_concurrency=4) as pool:
+        scraper = WebScraper(strategies=['no_extraction'], crawler_pool=pool)
+        multi_results = await scraper.scrape_many(urls)
 
     # Print multiple URL results
     for url, url_results in multi_results.items():
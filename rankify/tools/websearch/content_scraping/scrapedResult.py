@@ -7,7 +7,6 @@ from typing import Optional
 @dataclass
 class ScrapedResult:
     def __init__(self, name:str,success:bool, content:Optional[str]=None,error:Optional[str]=None , fit_markdown:Optional[str]=None):
-        print(f"results:{content}")
         self.name = name
         self.success = success
         self.content = content
@@ -16,6 +15,25 @@ class ScrapedResult:
         self.citations_markdown_len = 0
         self.fit_markdown =fit_markdown
 
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'success': self.success,
+            'content': self.content,
+            'error': self.error,
+            'fit_markdown': self.fit_markdown,
+            'raw_markdown_len': self.raw_markdown_len,
+            'citations_markdown_len': self.citations_markdown_len,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ScrapedResult':
+        result = cls(name=data['name'], success=data['success'], content=data.get('content'),
+                     error=data.get('error'), fit_markdown=data.get('fit_markdown'))
+        result.raw_markdown_len = data.get('raw_markdown_len', 0)
+        result.citations_markdown_len = data.get('citations_markdown_len', 0)
+        return result
+
 
 def print_extracted_result(result: ScrapedResult):
     """ Method to print out the extracted results"""
@@ -1,43 +1,40 @@
+from typing import AsyncIterator, List, Optional, Tuple, TypeVar
 
-import os
-import json
-import subprocess
-
-from pyserini.search.lucene import LuceneSearcher
+from loguru import logger
 
 from rankify.tools.websearch.content_scraping.crawler import WebScraper
-from rankify.tools.websearch.content_scraping.scrapedResult import print_extracted_result
-from typing import List, TypeVar
-import tempfile
 T = TypeVar('T')
 
 
-async def build_search_context(sources: T) -> T:
+def _organic_sources(sources: T) -> List[dict]:
     if sources is None:
         return []
-    stra= ['no_extraction'] #, 'cosine'
-    # Filter only Wikipedia sources
-    filtered_sources = [
-        (i, source)
-        for i, source in enumerate(sources.data['organic'])
-        #if 'wikipedia.org' in source.get('link', '')
-    ]
-
-    urls = [source[1]['link'] for source in filtered_sources] 
-    print(f"Filtered Wikipedia URLs: {urls}")
-
-    scraper = WebScraper(strategies=stra) #strategies=['no_extraction']
-    multi_results = await scraper.scrape_many(urls)
-
-    sources_with_html: List[T] = []
-    for _, source in filtered_sources:
-        url = source['link']
-        if url in multi_results:
-            source['html'] = multi_results[url]['no_extraction'].content
-            source['fit_markdown'] = multi_results[url]['no_extraction'].fit_markdown
-            #print(multi_results[url]['no_extraction'] , source['fit_markdown'])
-            sources_with_html.append(source)
-
-    return sources_with_html
-
-
+    if not getattr(sources, 'success', True) or not sources.data:
+        logger.warning(f"Search failed: {getattr(sources, 'error', None)}")
+        return []
+    return sources.data.get('organic', [])
+
+
+async def stream_search_context(sources: T, scraper: Optional[WebScraper] = None) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Scrapes the organic results of a SERP concurrently and yields ``(result position, source)`` as
+    soon as each page is done, with the page content in ``source['html']`` / ``source['fit_markdown']``.
+    Pass a scraper built on a shared ``CrawlerPool`` to reuse one browser across questions.
+    """
+    organic = _organic_sources(sources)
+    urls = [source['link'] for source in organic]
+    scraper = scraper or WebScraper(strategies=['no_extraction'])
+    async for position, results in scraper.scrape_stream(urls):
+        source = organic[position]
+        result = results.get('no_extraction')
+        source['html'] = result.content if result else None
+        source['fit_markdown'] = result.fit_markdown if result else None
+        yield position, source
+
+
+async def build_search_context(sources: T, scraper: Optional[WebScraper] = None) -> T:
+    if sources is None:
+        return []
+    # Scraped concurrently, returned in SERP order
+    finished = {position: source async for position, source in stream_search_context(sources, scraper)}
+    return [finished[position] for position in sorted(finished)]
@@ -15,4 +15,10 @@ class SearchAPIClient(ABC):
         """
         pass
 
+    async def search_web_async(self, query: str, num_results: int = 10, **kwargs) -> SerpResult[Dict[str, Any]]:
+        """
+        Runs ``search_web`` in a worker thread, so that the SERP calls of many queries overlap.
+        """
+        return await asyncio.to_thread(self.search_web, query, num_results, **kwargs)
+
 
@@ -3,17 +3,22 @@ from rankify.tools.websearch.models.SerpResults import SerpResult
 from rankify.tools.websearch.serp.SearchAPIClient import SearchAPIClient
 from typing import Optional, Dict, Any, List
 
+from rankify.tools.websearch.cache import WebCache
 from rankify.tools.websearch.serp.config import SerpConfig
 from rankify.tools.websearch.serp.errors import SerperAPIException
 
 
 class SerperApiClient(SearchAPIClient):
 
-    def __init__(self, api_key:Optional[str]=None,config:Optional[SerpConfig]=None):
+    def __init__(self, api_key:Optional[str]=None,config:Optional[SerpConfig]=None, cache:Optional[WebCache]=None):
+        self.cache = cache
         if api_key:
             self.config = SerpConfig(api_key=api_key)
         elif config:
             self.config = config
+        elif cache is not None and cache.offline:
+            # Replaying from the cache: no request is ever sent
+            self.config = SerpConfig(api_key="")
         else:
             self.config = SerpConfig.load_env_vars()
         self.header = {
@@ -27,11 +32,18 @@ class SerperApiClient(SearchAPIClient):
         
         if not query.strip():
             return SerperAPIException(error=f"query is required")
+        location = search_location or self.config.default_location
+        if self.cache is not None:
+            cached = self.cache.get_serp(query, location, num_results)
+            if cached is not None:
+                return SerpResult(data=cached)
+            if self.cache.offline:
+                return SerpResult(error=f"No cached search results for '{query}' (offline)")
         try:
             payload = {
                 'q': query,
                 'numResults': num_results,
-                'gl': search_location or self.config.default_location
+                'gl': location
             }
             response = requests.post(
                 url=self.config.api_url,
@@ -52,6 +64,8 @@ class SerperApiClient(SearchAPIClient):
                 'relatedSearches':data.get('relatedSearches')
             }
 
+            if self.cache is not None:
+                self.cache.put_serp(query, location, num_results, results)
             return SerpResult(data=results)
 
         except requests.RequestException as e:
@@ -0,0 +1,170 @@
+"""
+Batched, cached answer matching for ``Context.has_answer``.
+
+Computes the same flag as ``pyserini``'s ``has_answers(text, answers, SimpleTokenizer())`` (DPR
+answer matching: NFD-normalize, tokenize with DPR's ``SimpleTokenizer`` regex, lower-case, look for
+an answer's tokens as a contiguous run of the passage's tokens), but as a separate stage over a
+whole retrieval run instead of inline for every hit:
+
+* each distinct passage is tokenized once and its tokens kept (as one ``\\x00``-joined string, so
+  a token-run match is a plain substring search) in a bounded cache shared across calls,
+* every question's answers are tokenized and compiled once, not once per context,
+* tokenization of new passages can run in a ``multiprocessing`` pool,
+* documents without gold answers (production traffic) are skipped entirely.
+
+Example:
+    ```python
+    from rankify.utils.answer_matching import annotate_answers
+
+    documents = retriever.retrieve(documents)   # contexts with has_answer=None
+    annotate_answers(documents, num_workers=8)
+    ```
+"""
+
+import multiprocessing
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import regex
+
+from rankify.dataset.dataset import Document
+
+# DPR's SimpleTokenizer (as used by pyserini's has_answers)
+_TOKEN_RE = regex.compile(r"([\p{L}\p{N}\p{M}]+)|([^\p{Z}\p{C}])",
+                          flags=regex.IGNORECASE | regex.UNICODE | regex.MULTILINE)
+# Control characters never occur inside a token, so this separator keeps token boundaries
+_SEP = "\x00"
+
+
+def tokenize(text: str) -> str:
+    """DPR tokens of ``text``, lower-cased and joined as ``"\\x00tok1\\x00tok2\\x00"``."""
+    tokens = _TOKEN_RE.findall(unicodedata.normalize("NFD", text))
+    return _SEP + "".join((word or other).lower() + _SEP for word, other in tokens)
+
+
+def _tokenize_many(texts: List[str]) -> List[str]:
+    return [tokenize(text) for text in texts]
+
+
+class CompiledAnswers:
+    """The answers of one question, tokenized once and matched against tokenized passages."""
+
+    __slots__ = ("always", "_patterns", "_regex")
+
+    def __init__(self, answers: Iterable):
+        patterns = []
+        self.always = False
+        for answer in answers:
+            tokens = tokenize(str(answer))
+            if tokens == _SEP:
+                self.always = True  # an answer without tokens matches any passage, as in pyserini
+            patterns.append(tokens)
+        self._patterns = sorted(set(patterns))
+        self._regex = re.compile("|".join(map(re.escape, self._patterns))) if len(self._patterns) > 1 else None
+
+    def match(self, tokenized_text: str) -> bool:
+        """Whether a passage tokenized with :func:`tokenize` contains one of the answers."""
+        if self.always:
+            return True
+        if self._regex is not None:
+            return self._regex.search(tokenized_text) is not None
+        return bool(self._patterns) and self._patterns[0] in tokenized_text
+
+
+class AnswerMatcher:
+    """
+    Sets ``has_answer`` on retrieved contexts in one batched pass.
+
+    Attributes:
+        num_workers (int): Processes tokenizing new passages (0 or 1: in this process).
+        cache_size (int): Tokenized passages kept across calls.
+    """
+
+    def __init__(self, num_workers: int = 0, cache_size: int = 200_000, min_parallel: int = 5_000):
+        """
+        Args:
+            num_workers (int): Processes used to tokenize new passages.
+            cache_size (int): Maximum number of tokenized passages kept between calls.
+            min_parallel (int): Fewest new passages worth starting a process pool for.
+        """
+        self.num_workers = num_workers
+        self.cache_size = cache_size
+        self.min_parallel = min_parallel
+        self._tokens: Dict[str, str] = {}
+
+    def tokenize(self, texts: Sequence[str]) -> List[str]:
+        """Tokenized ``texts``; each distinct text not cached yet is tokenized once."""
+        new = list(dict.fromkeys(text for text in texts if text not in self._tokens))
+        fresh = {}
+        if new:
+            if self.num_workers > 1 and len(new) >= self.min_parallel:
+                chunk = -(-len(new) // (self.num_workers * 4))
+                with multiprocessing.Pool(self.num_workers) as pool:
+                    parts = pool.map(_tokenize_many, [new[i:i + chunk] for i in range(0, len(new), chunk)])
+                tokenized = [tokens for part in parts for tokens in part]
+            else:
+                tokenized = _tokenize_many(new)
+            if len(self._tokens) + len(new) > self.cache_size:
+                self._tokens.clear()
+            fresh = dict(zip(new, tokenized))
+            if len(fresh) <= self.cache_size:
+                self._tokens.update(fresh)
+        return [fresh[text] if text in fresh else self._tokens[text] for text in texts]
+
+    def has_answers(self, text: str, answers: Iterable) -> bool:
+        """Drop-in for ``pyserini``'s ``has_answers`` for a single passage."""
+        return CompiledAnswers(answers).match(self.tokenize([text])[0])
+
+    def annotate(self, documents: List[Document], overwrite: bool = False) -> List[Document]:
+        """
+        Sets ``has_answer`` on the contexts of every document with gold answers.
+
+        Args:
+            documents (List[Document]): Retrieved documents.
+            overwrite (bool): Recompute flags that are already set; by default only contexts with
+                ``has_answer=None`` are matched.
+
+        Returns:
+            List[Document]: The same documents.
+        """
+        jobs = []
+        for document in documents:
+            answers = document.answers.answers if document.answers is not None else None
+            if not answers:
+                continue
+            contexts = list(document.contexts or [])
+            if document.reorder_indices is None and document.reorder_contexts:
+                contexts += document.reorder_contexts  # materialized copies; a view shares ``contexts``
+            contexts = [c for c in contexts if overwrite or c.has_answer is None]
+            if contexts:
+                jobs.append((CompiledAnswers(answers), contexts))
+
+        texts = [context.text or "" for _, contexts in jobs for context in contexts]
+        tokenized = iter(self.tokenize(texts))
+        for answers, contexts in jobs:
+            for context in contexts:
+                context.has_answer = answers.match(next(tokenized))
+        return documents
+
+
+_default_matcher: Optional[AnswerMatcher] = None
+
+
+def annotate_answers(documents: List[Document], num_workers: int = 0, overwrite: bool = False) -> List[Document]:
+    """
+    Sets ``has_answer`` on the retrieved contexts of ``documents`` with a shared :class:`AnswerMatcher`.
+
+    Args:
+        documents (List[Document]): Retrieved documents; those without gold answers are left as they are.
+        num_workers (int): Processes tokenizing new passages.
+        overwrite (bool): Recompute flags that are already set.
+
+    Returns:
+        List[Document]: The same documents.
+    """
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = AnswerMatcher()
+    _default_matcher.num_workers = num_workers
+    return _default_matcher.annotate(documents, overwrite=overwrite)
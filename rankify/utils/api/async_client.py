@@ -0,0 +1,328 @@
+"""
+Shared asynchronous client layer for the API-backed components (rerankers, generators, embedders).
+
+Every provider gets one :class:`APIClient` from :func:`get_api_client`, shared by all components talking
+to it, so they draw from one request budget instead of each assuming it owns the whole quota. A client
+bounds the requests in flight, spaces them with a token bucket, retries transient failures (HTTP 408,
+409, 429 and 5xx, connection errors, timeouts) with jittered exponential backoff that honours
+``Retry-After``, and pools connections for raw HTTP calls in one ``httpx.AsyncClient``.
+
+All clients run on one background event loop thread, so synchronous code can use them from any thread:
+:meth:`APIClient.run` waits for one coroutine, and :meth:`APIClient.map` runs a coroutine per item
+concurrently, which is how the components issue their requests.
+
+Example:
+    ```python
+    from rankify.utils.api.async_client import configure_provider
+
+    # Shared by RankGPT, PRP, OpenAIModel, HyDE and the OpenAI embedding retriever
+    configure_provider("api.openai.com", requests_per_second=50, max_concurrency=32)
+    ```
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+from tqdm import tqdm
+
+RETRY_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+@dataclass
+class ProviderLimits:
+    """
+    Request budget of one API provider.
+
+    Attributes:
+        requests_per_second (float, optional): Sustained request rate; ``None`` for no rate limit.
+        burst (int, optional): Requests that may start back to back after an idle period
+            (default: one second's worth).
+        max_concurrency (int): Requests in flight at once.
+        max_retries (int): Retries of a request that failed transiently.
+        backoff_base (float): Backoff before the first retry in seconds, doubled for every further
+            retry; the actual wait is drawn uniformly below it (full jitter).
+        backoff_max (float): Upper bound of a single backoff in seconds.
+        timeout (float): Timeout of a raw HTTP request in seconds.
+    """
+    requests_per_second: Optional[float] = None
+    burst: Optional[int] = None
+    max_concurrency: int = 16
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    timeout: float = 60.0
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens per second up to ``burst`` tokens.
+
+    Waiters are served in arrival order, so a backlog of requests leaves at exactly ``rate``.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed request is worth retrying: rate limits, server errors, timeouts, dropped connections."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRY_STATUS_CODES
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError, TimeoutError)):
+        return True
+    # SDK errors without a status code (openai.APIConnectionError, APITimeoutError, ...)
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class APIClient:
+    """
+    Rate-limited, retrying gateway to one API provider; obtain it with :func:`get_api_client`.
+
+    Attributes:
+        provider (str): Registry key, the provider's host name (e.g. ``"api.openai.com"``).
+        limits (ProviderLimits): Current request budget.
+        retries (int): Retries issued so far.
+    """
+
+    def __init__(self, provider: str, limits: ProviderLimits):
+        self.provider = provider
+        self.limits = limits
+        self.retries = 0
+        self._loop = None
+        self._http = None
+        self._semaphore = None
+        self._bucket = None
+
+    def _set_limits(self, limits: ProviderLimits) -> None:
+        self.limits = limits
+        self._semaphore = None
+
+    def _bind(self) -> None:
+        """Creates the loop-bound state, again in a forked child whose background loop is new."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._http = None
+            self._semaphore = None
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limits.max_concurrency)
+            rate = self.limits.requests_per_second
+            self._bucket = TokenBucket(rate, self.limits.burst) if rate else None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client; only usable from coroutines running on the client loop."""
+        self._bind()
+        if self._http is None:
+            size = self.limits.max_concurrency
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+                timeout=self.limits.timeout,
+            )
+        return self._http
+
+    async def _attempts(self, send: Callable[[], Awaitable[Any]]) -> Any:
+        self._bind()
+        for attempt in range(self.limits.max_retries + 1):
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    return await send()
+            except Exception as error:
+                if attempt == self.limits.max_retries or not is_retryable(error):
+                    raise
+                delay = random.uniform(0, min(self.limits.backoff_max, self.limits.backoff_base * 2 ** attempt))
+                retry_after = _retry_after(error)
+                if retry_after is not None:
+                    delay = max(delay, min(retry_after, self.limits.backoff_max))
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Awaits ``fn(*args, **kwargs)`` (e.g. an ``AsyncOpenAI`` method) within the provider's limits."""
+        return await self._attempts(lambda: fn(*args, **kwargs))
+
+    async def call_in_thread(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Like :meth:`call` for a blocking function (SDKs without an async client), run in a worker thread."""
+        return await self._attempts(lambda: asyncio.to_thread(fn, *args, **kwargs))
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends an HTTP request through the pooled client within the provider's limits.
+
+        Raises:
+            httpx.HTTPStatusError: The response status is an error that is not retried, or the
+                retries ran out.
+        """
+        async def send():
+            response = await self.http.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        return await self._attempts(send)
+
+    def run(self, coroutine: Awaitable[Any]) -> Any:
+        """Runs a coroutine on the client loop and blocks the calling thread until it is done."""
+        loop = _background_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coroutine.close()
+            raise RuntimeError("APIClient.run() would block the client loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    def map(self, fn: Callable[[Any], Awaitable[Any]], items: Iterable[Any], desc: Optional[str] = None) -> List[Any]:
+        """
+        Runs ``fn(item)`` for every item concurrently on the client loop, within the provider's limits.
+
+        Args:
+            fn: Coroutine function making the item's requests through this client.
+            items: Inputs, one call each.
+            desc (str, optional): Shows a progress bar with this description.
+
+        Returns:
+            List: The results in item order. The first failure cancels the remaining calls and is raised.
+        """
+        items = list(items)
+
+        async def run_all():
+            progress = tqdm(total=len(items), desc=desc, disable=desc is None)
+
+            async def one(item):
+                result = await fn(item)
+                progress.update()
+                return result
+
+            tasks = [asyncio.ensure_future(one(item)) for item in items]
+            try:
+                return await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+            finally:
+                progress.close()
+
+        return self.run(run_all())
+
+
+class _LoopThread:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="rankify-api-client", daemon=True)
+        self.thread.start()
+
+
+_lock = threading.RLock()
+_loop_thread: Optional[_LoopThread] = None
+_clients = {}
+_limits = {}
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop_thread
+    with _lock:
+        if _loop_thread is None:
+            _loop_thread = _LoopThread()
+        return _loop_thread.loop
+
+
+def _reset_after_fork() -> None:
+    # The loop thread does not survive fork; clients rebind to a fresh loop on their next call
+    global _lock, _loop_thread
+    _lock = threading.RLock()
+    _loop_thread = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def provider_name(provider: str) -> str:
+    """Registry key of a provider name or URL: the host of a URL, the lower-cased name otherwise."""
+    if "://" in provider:
+        return urlparse(provider).netloc.lower()
+    return provider.lower()
+
+
+def configure_provider(provider: str, **limits) -> ProviderLimits:
+    """
+    Updates the request budget of a provider, for its shared client and clients created later.
+
+    Args:
+        provider (str): Provider name or any URL of its API.
+        **limits: Fields of :class:`ProviderLimits` to change.
+
+    Returns:
+        ProviderLimits: The provider's new limits.
+    """
+    name = provider_name(provider)
+    with _lock:
+        client = _clients.get(name)
+        current = client.limits if client is not None else _limits.get(name, ProviderLimits())
+        updated = _limits[name] = replace(current, **limits)
+        if client is not None:
+            client._set_limits(updated)
+    return updated
+
+
+def get_api_client(provider: str, **limits) -> APIClient:
+    """
+    Returns the shared client of a provider, creating it on first use.
+
+    Args:
+        provider (str): Provider name or any URL of its API; URLs on the same host share a client.
+        **limits: Optional :class:`ProviderLimits` overrides; ``None`` values are ignored.
+
+    Returns:
+        APIClient: The provider's client.
+    """
+    name = provider_name(provider)
+    overrides = {key: value for key, value in limits.items() if value is not None}
+    with _lock:
+        if overrides:
+            configure_provider(name, **overrides)
+        if name not in _clients:
+            _clients[name] = APIClient(name, _limits.get(name, ProviderLimits()))
+        return _clients[name]
@@ -1,13 +1,29 @@
+from litellm import acompletion, completion
 
-from litellm import completion
+from rankify.utils.api.async_client import get_api_client
 
 class LitellmClient:
     #  https://github.com/BerriAI/litellm
     def __init__(self, keys=None):
         self.api_key = keys
+        # Requests share the rate limit, concurrency bound and retries of the "litellm" provider
+        self.api = get_api_client("litellm")
 
     def chat(self, return_text=True, *args, **kwargs):
-        response = completion(api_key=self.api_key, *args, **kwargs)
+        return self.api.run(self.achat(*args, return_text=return_text, **kwargs))
+
+    async def achat(self, *args, return_text=True, **kwargs):
+        response = await self.api.call(acompletion, *args, api_key=self.api_key, **kwargs)
         if return_text:
             response = response.choices[0].message.content
-        return response
\ No newline at end of file
+        return response
+
+    def chat_batch(self, messages, return_text=True, **kwargs):
+        """One chat completion per message list, requested concurrently; results in input order."""
+        return self.api.map(lambda turns: self.achat(messages=turns, return_text=return_text, **kwargs), messages)
+
+    def chat_stream(self, *args, **kwargs):
+        """Yields the text deltas of a streamed chat completion."""
+        for chunk in completion(api_key=self.api_key, *args, stream=True, **kwargs):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
@@ -1,8 +1,10 @@
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import openai
 import time
 
+from rankify.utils.api.async_client import get_api_client
+
 class OpenaiClient:
     def __init__(self, keys=None, base_url=None, start_id=None, proxy=None, api_version=None):
 
@@ -33,44 +35,79 @@ class OpenaiClient:
                     api_key=self.api_key,
                     api_version=_api_version,
                 )
+                # Retries are left to the shared client layer
+                self.async_client = openai.AsyncAzureOpenAI(
+                    azure_endpoint=_endpoint,
+                    api_key=self.api_key,
+                    api_version=_api_version,
+                    max_retries=0,
+                )
                 # Store deployment name from the base_url path for chat calls
                 self._azure_deployment = base_url.split("/deployments/")[-1].split("/")[0] if "/deployments/" in base_url else None
             except ImportError:
                 self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+                self.async_client = AsyncOpenAI(api_key=self.api_key, base_url=base_url, max_retries=0)
                 self._azure_deployment = None
         else:
             self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+            self.async_client = AsyncOpenAI(api_key=self.api_key, base_url=base_url, max_retries=0)
             self._azure_deployment = None
 
+        # Requests share the provider's rate limit, concurrency bound and retries
+        self.api = get_api_client(str(self.async_client.base_url))
+
 
     def chat(self, *args, return_text=False, reduce_length=False, **kwargs):
-        while True:
-            try:
-                completion = self.client.chat.completions.create(*args, **kwargs, timeout=30)
-                break
-            except Exception as e:
-                print(str(e))
-                if "This model's maximum context length is" in str(e):
-                    print('reduce_length')
-                    return 'ERROR::reduce_length'
-                time.sleep(0.1)
+        return self.api.run(self.achat(*args, return_text=return_text, **kwargs))
+
+    async def achat(self, *args, return_text=False, **kwargs):
+        """Chat completion through the provider's shared client; transient failures are retried there."""
+        try:
+            completion = await self.api.call(self.async_client.chat.completions.create, *args, **kwargs, timeout=30)
+        except Exception as e:
+            if "This model's maximum context length is" in str(e):
+                print('reduce_length')
+                return 'ERROR::reduce_length'
+            raise
         if return_text:
             completion = completion.choices[0].message.content
         return completion
 
-    def text(self, *args, return_text=False, reduce_length=False, **kwargs):
+    def chat_batch(self, messages, return_text=True, **kwargs):
+        """One chat completion per message list, requested concurrently; results in input order."""
+        return self.api.map(lambda turns: self.achat(messages=turns, return_text=return_text, **kwargs), messages)
+
+    def chat_stream(self, *args, **kwargs):
+        """Yields the text deltas of a streamed chat completion."""
         while True:
             try:
-                completion = self.client.completions.create(
-                    *args, **kwargs
-                )
+                stream = self.client.chat.completions.create(*args, **kwargs, stream=True, timeout=30)
                 break
             except Exception as e:
-                print(e)
+                print(str(e))
                 if "This model's maximum context length is" in str(e):
                     print('reduce_length')
-                    return 'ERROR::reduce_length'
+                    yield 'ERROR::reduce_length'
+                    return
                 time.sleep(0.1)
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    def text(self, *args, return_text=False, reduce_length=False, **kwargs):
+        return self.api.run(self._text(*args, return_text=return_text, **kwargs))
+
+    async def _text(self, *args, return_text=False, **kwargs):
+        try:
+            completion = await self.api.call(self.async_client.completions.create, *args, **kwargs)
+        except Exception as e:
+            if "This model's maximum context length is" in str(e):
+                print('reduce_length')
+                return 'ERROR::reduce_length'
+            raise
         if return_text:
             completion = completion.choices[0].text
         return completion
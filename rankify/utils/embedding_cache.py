@@ -0,0 +1,257 @@
+"""
+Persistent, content-addressed embedding cache shared by query and passage encoders.
+
+Embeddings are keyed by ``(model, instruction, max_length, sha1(text))``: the first three select a
+namespace directory, the text hash a row inside it. Only texts that are not cached yet are encoded,
+so an edited corpus re-encodes just its new or changed passages, and queries are encoded once across
+evaluation runs::
+
+    embeddings/<namespace>/
+        meta.json                    # format version and the namespace fields
+        keys-<stamp>.npy             # (n, 20) uint8 SHA-1 digests of the texts of a chunk ...
+        emb-<stamp>.npy              # ... and their (n, dim) embeddings, row for row
+
+New embeddings are appended as a new chunk (written to a temporary file and renamed into place, the
+keys file last, so readers never see half a chunk; concurrent writers each add their own chunks).
+Chunks are opened with ``mmap``; lookups sort the key hashes per chunk in RAM. When a namespace
+collects more than ``max_chunks`` chunks, all but the largest are merged into one.
+
+Example:
+    ```python
+    from rankify.utils.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache("./cache/embeddings", model="BAAI/bge-large-en-v1.5", instruction="", max_length=512)
+    emb = cache.encode(passages, lambda texts: model.encode(texts, normalize_embeddings=True))
+    cache.stats()   # {'hits': ..., 'misses': ..., 'hit_rate': ..., 'size': ...}
+    ```
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CACHE_VERSION = 1
+
+
+def default_cache_dir() -> str:
+    """``$RERANKING_CACHE_DIR/embeddings``."""
+    return os.path.join(os.environ.get("RERANKING_CACHE_DIR", "./cache"), "embeddings")
+
+
+def text_digests(texts: Sequence[str]) -> np.ndarray:
+    """``(len(texts), 20)`` uint8 array of the SHA-1 digests of the UTF-8 texts."""
+    digests = b"".join(hashlib.sha1(text.encode("utf-8")).digest() for text in texts)
+    return np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 20)
+
+
+def texts_fingerprint(texts: Sequence[str]) -> str:
+    """Short hex digest of a list of texts, e.g. to key artifacts derived from a corpus's embeddings."""
+    return hashlib.sha1(text_digests(texts).tobytes()).hexdigest()[:16]
+
+
+def encode_with_cache(cache: Optional["EmbeddingCache"], texts: Sequence[str],
+                      encode_fn: Callable[[List[str]], np.ndarray], report: bool = False) -> np.ndarray:
+    """``cache.encode(...)``, or ``encode_fn(texts)`` as a NumPy array when caching is disabled (``cache=None``)."""
+    if cache is None:
+        return _to_numpy(encode_fn(list(texts)))
+    return cache.encode(texts, encode_fn, report=report)
+
+
+def _prefixes(keys: np.ndarray) -> np.ndarray:
+    # First 8 digest bytes as integers, for sorted lookups
+    return np.ascontiguousarray(keys[:, :8]).view(">u8")[:, 0].astype(np.uint64)
+
+
+def _to_numpy(embeddings) -> np.ndarray:
+    if hasattr(embeddings, "detach"):
+        embeddings = embeddings.detach().float().cpu().numpy()
+    return np.asarray(embeddings)
+
+
+class _Chunk:
+    def __init__(self, directory: str, stamp: str):
+        self.stamp = stamp
+        self.keys = np.load(os.path.join(directory, f"keys-{stamp}.npy"), mmap_mode="r")
+        self.embeddings = np.load(os.path.join(directory, f"emb-{stamp}.npy"), mmap_mode="r")
+        prefixes = _prefixes(self.keys)
+        self.order = np.argsort(prefixes, kind="stable")
+        self.sorted_prefixes = prefixes[self.order]
+
+    def __len__(self):
+        return len(self.order)
+
+    def find(self, keys: np.ndarray, prefixes: np.ndarray) -> np.ndarray:
+        """Row of every key in this chunk, -1 where it is absent."""
+        if not len(self) or not len(keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        position = np.minimum(np.searchsorted(self.sorted_prefixes, prefixes), len(self) - 1)
+        rows = self.order[position].astype(np.int64)
+        found = (self.sorted_prefixes[position] == prefixes) & np.all(self.keys[rows] == keys, axis=1)
+        return np.where(found, rows, -1)
+
+
+class EmbeddingCache:
+    """
+    Cache of text embeddings for one encoder configuration.
+
+    Attributes:
+        directory (str): Namespace directory holding the chunks.
+        hits (int): Texts served from the cache so far.
+        misses (int): Texts not found in the cache so far (encoded once per distinct text).
+    """
+
+    def __init__(self, cache_dir: Optional[str], model: str, instruction: Optional[str] = "",
+                 max_length: Optional[int] = None, dtype=np.float32, max_chunks: int = 16, **namespace):
+        """
+        Opens (or creates) the namespace of an encoder configuration.
+
+        Args:
+            cache_dir (str, optional): Root directory; defaults to ``$RERANKING_CACHE_DIR/embeddings``.
+            model (str): Encoder identity, e.g. a checkpoint name.
+            instruction (str, optional): Instruction or prefix the encoder adds to every text.
+            max_length (int, optional): Truncation length of the encoder.
+            dtype: Storage dtype of the embeddings.
+            max_chunks (int): Chunk count above which small chunks are merged.
+            **namespace: Any further settings that change the embeddings (pooling, normalization, ...).
+        """
+        self.meta = {"version": CACHE_VERSION, "model": model, "instruction": instruction or "",
+                     "max_length": max_length, **namespace}
+        name = hashlib.sha1(json.dumps(self.meta, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        self.directory = os.path.join(cache_dir or default_cache_dir(), name)
+        self.dtype = np.dtype(dtype)
+        self.max_chunks = max_chunks
+        self.hits = 0
+        self.misses = 0
+        self._chunks: List[_Chunk] = []
+
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(meta_path):
+            tmp_path = f"{meta_path}.tmp-{os.getpid()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.meta, f, indent=2, default=str)
+            os.replace(tmp_path, meta_path)
+        self._refresh()
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Hits, misses and hit rate since the cache was opened, and the number of cached embeddings."""
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "size": len(self)}
+
+    def _refresh(self) -> None:
+        """Picks up chunks written since the last call, also by other processes."""
+        known = {chunk.stamp for chunk in self._chunks}
+        stamps = sorted(name[len("keys-"):-len(".npy")] for name in os.listdir(self.directory)
+                        if name.startswith("keys-") and name.endswith(".npy"))
+        for stamp in stamps:
+            if stamp not in known:
+                try:
+                    self._chunks.append(_Chunk(self.directory, stamp))
+                except FileNotFoundError:
+                    pass  # removed by a concurrent merge
+
+    def _find(self, keys: np.ndarray):
+        """(chunk, row) of every key; chunk is -1 for keys that are not cached."""
+        chunk_of = np.full(len(keys), -1, dtype=np.int64)
+        row_of = np.full(len(keys), -1, dtype=np.int64)
+        prefixes = _prefixes(keys)
+        for index, chunk in enumerate(self._chunks):
+            todo = np.flatnonzero(chunk_of < 0)
+            if not len(todo):
+                break
+            rows = chunk.find(keys[todo], prefixes[todo])
+            hit = rows >= 0
+            chunk_of[todo[hit]] = index
+            row_of[todo[hit]] = rows[hit]
+        return chunk_of, row_of
+
+    def _write_chunk(self, keys: np.ndarray, embeddings: np.ndarray) -> str:
+        stamp = f"{time.time_ns():020d}-{os.getpid()}"
+        for prefix, array in (("emb", embeddings), ("keys", keys)):  # keys last: they publish the chunk
+            tmp_path = os.path.join(self.directory, f".{prefix}-{stamp}.tmp.npy")
+            np.save(tmp_path, array)
+            os.replace(tmp_path, os.path.join(self.directory, f"{prefix}-{stamp}.npy"))
+        return stamp
+
+    def _append(self, keys: np.ndarray, embeddings: np.ndarray) -> None:
+        self._chunks.append(_Chunk(self.directory, self._write_chunk(keys, embeddings)))
+        if len(self._chunks) > self.max_chunks:
+            self.merge()
+
+    def merge(self) -> None:
+        """Merges all chunks except the largest into one, keeping lookups and directory listings short."""
+        if len(self._chunks) < 3:
+            return
+        largest = max(self._chunks, key=len)
+        small = [chunk for chunk in self._chunks if chunk is not largest]
+        stamp = self._write_chunk(np.concatenate([np.asarray(chunk.keys) for chunk in small]),
+                                  np.concatenate([np.asarray(chunk.embeddings) for chunk in small]))
+        for chunk in small:
+            for prefix in ("keys", "emb"):
+                try:
+                    os.remove(os.path.join(self.directory, f"{prefix}-{chunk.stamp}.npy"))
+                except FileNotFoundError:
+                    pass
+        self._chunks = [largest, _Chunk(self.directory, stamp)]
+
+    def encode(self, texts: Sequence[str], encode_fn: Callable[[List[str]], np.ndarray],
+               report: bool = False) -> np.ndarray:
+        """
+        Embeddings of ``texts``, encoding only those not cached yet.
+
+        Args:
+            texts (Sequence[str]): Texts to embed, as the encoder receives them before adding the
+                namespace's instruction.
+            encode_fn (Callable): Encodes a list of texts into a ``(len, dim)`` array or tensor; called
+                at most once, with the distinct uncached texts in first-seen order.
+            report (bool): Prints the hit rate of this call.
+
+        Returns:
+            np.ndarray: ``(len(texts), dim)`` embeddings in ``texts`` order.
+        """
+        texts = list(texts)
+        self._refresh()
+        keys = text_digests(texts)
+        chunk_of, row_of = self._find(keys)
+
+        missing = np.flatnonzero(chunk_of < 0)
+        if len(missing):
+            unique_keys, first = np.unique(keys[missing], axis=0, return_index=True)
+            order = np.argsort(first)  # encode in first-seen order
+            new_embeddings = _to_numpy(encode_fn([texts[missing[i]] for i in first[order]])).astype(self.dtype)
+            if len(new_embeddings) != len(order):
+                raise ValueError(f"encode_fn returned {len(new_embeddings)} embeddings for {len(order)} texts")
+            self._append(unique_keys[order], new_embeddings)
+            chunk_of, row_of = self._find(keys)
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if report and texts:
+            print(f"Embedding cache ({self.meta['model']}): {len(texts) - len(missing)}/{len(texts)} hits "
+                  f"({(len(texts) - len(missing)) / len(texts):.1%}), encoded {len(missing)}")
+
+        if not texts:
+            dim = self._chunks[0].embeddings.shape[1] if self._chunks else 0
+            return np.empty((0, dim), dtype=self.dtype)
+        if len(self._chunks) == 1 or np.all(chunk_of == chunk_of[0]):
+            chunk = self._chunks[chunk_of[0]]
+            if len(texts) == len(chunk) and np.array_equal(row_of, np.arange(len(chunk))):
+                return chunk.embeddings  # e.g. a whole corpus encoded in one go: stay memory-mapped
+        out = np.empty((len(texts), self._chunks[chunk_of[0]].embeddings.shape[1]), dtype=self.dtype)
+        for index in np.unique(chunk_of):
+            positions = np.flatnonzero(chunk_of == index)
+            rows = row_of[positions]
+            order = np.argsort(rows)  # ascending reads from the memory map
+            out[positions[order]] = self._chunks[index].embeddings[rows[order]]
+        return out
@@ -0,0 +1,190 @@
+"""
+Cross-query batching for pointwise (query, passage) rerankers.
+
+Pointwise cross-encoders score every context independently, so nothing forces a batch to
+contain a single query's contexts. ``PairScheduler`` flattens the (query, passage) pairs of all
+documents passed to ``rank()``, sorts them by token length so that each batch pads to a similar
+length, packs them into batches bounded by ``batch_size`` pairs and, optionally, by a padded
+token budget, and finally scatters the scores back into each document's ``reorder_contexts``.
+
+A reranker only has to provide two callables:
+
+* ``encode(queries, texts)`` – tokenizes the pairs once (without padding) and returns
+  ``(features, lengths)``, where ``lengths[i]`` is the token length of pair ``i``.
+* ``score_batch(features, indices)`` – pads and scores the pairs at ``indices`` and returns
+  one float per pair.
+
+Example:
+    ```python
+    scheduler = PairScheduler(batch_size=32, max_batch_tokens=8192)
+    scheduler.rank(documents, encode, score_batch)
+    ```
+"""
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from rankify.dataset.dataset import Document
+
+
+def plan_batches(lengths: Sequence[int], batch_size: int,
+                 max_batch_tokens: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Groups pair indices into length-sorted batches.
+
+    Pairs are sorted longest first, so every batch pads to the length of its first pair and
+    an out-of-memory batch, if any, shows up on the first step instead of the last.
+
+    Args:
+        lengths (Sequence[int]): Token length of every pair.
+        batch_size (int): Maximum number of pairs per batch.
+        max_batch_tokens (int, optional): Maximum padded size (``pairs * longest pair``) of a batch.
+            A single pair longer than the budget still gets a batch of its own.
+
+    Returns:
+        List[np.ndarray]: Indices into ``lengths``, one array per batch.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if len(lengths) == 0:
+        return []
+    batch_size = max(1, int(batch_size))
+    order = np.argsort(-lengths, kind="stable")
+
+    if not max_batch_tokens:
+        return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+    batches = []
+    start = 0
+    while start < len(order):
+        longest = max(1, int(lengths[order[start]]))
+        size = min(batch_size, max(1, int(max_batch_tokens) // longest), len(order) - start)
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def flatten_pairs(documents: List[Document]) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    Flattens the contexts of ``documents`` into parallel query / passage lists.
+
+    Returns:
+        tuple: ``(queries, texts, offsets)`` where the pairs of document ``i`` are
+        ``offsets[i]:offsets[i + 1]``.
+    """
+    queries, texts = [], []
+    offsets = np.zeros(len(documents) + 1, dtype=np.int64)
+    for i, document in enumerate(documents):
+        contexts = document.contexts or []
+        queries.extend([document.question.question] * len(contexts))
+        texts.extend(context.text for context in contexts)
+        offsets[i + 1] = offsets[i] + len(contexts)
+    return queries, texts, offsets
+
+
+def scatter_scores(documents: List[Document], scores: np.ndarray, offsets: np.ndarray) -> None:
+    """
+    Records the flat ``scores`` as each document's reorder view, sorted by descending score
+    (ties keep the retrieval order).
+    """
+    for i, document in enumerate(documents):
+        document.rerank_by_scores(scores[offsets[i]:offsets[i + 1]])
+
+
+class PairScheduler:
+    """
+    Scores (query, passage) pairs across documents in length-sorted, token-budgeted batches.
+
+    Attributes:
+        batch_size (int): Maximum number of pairs per forward pass.
+        max_batch_tokens (int, optional): Maximum padded tokens per forward pass.
+        max_pairs_in_flight (int): Documents are processed in windows of roughly this many
+            pairs, which bounds the memory used by the pre-tokenized features.
+        show_progress (bool): Show a tqdm bar over the batches.
+    """
+
+    def __init__(self, batch_size: int = 32, max_batch_tokens: Optional[int] = None,
+                 max_pairs_in_flight: int = 8192, show_progress: bool = True):
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_pairs_in_flight = max_pairs_in_flight
+        self.show_progress = show_progress
+
+    def _windows(self, documents: List[Document]):
+        window, n_pairs = [], 0
+        for document in documents:
+            window.append(document)
+            n_pairs += len(document.contexts or [])
+            if n_pairs >= self.max_pairs_in_flight:
+                yield window
+                window, n_pairs = [], 0
+        if window:
+            yield window
+
+    def score(self, queries: List[str], texts: List[str], encode: Callable, score_batch: Callable,
+              progress: Optional[tqdm] = None) -> np.ndarray:
+        """
+        Scores flat lists of pairs.
+
+        Args:
+            queries (List[str]): Query of every pair.
+            texts (List[str]): Passage text of every pair.
+            encode (Callable): ``encode(queries, texts) -> (features, lengths)``.
+            score_batch (Callable): ``score_batch(features, indices) -> scores``.
+            progress (tqdm, optional): Progress bar advanced by the number of scored pairs.
+
+        Returns:
+            np.ndarray: One float64 score per pair, in input order.
+        """
+        scores = np.zeros(len(texts), dtype=np.float64)
+        if not texts:
+            return scores
+        features, lengths = encode(queries, texts)
+        for indices in plan_batches(lengths, self.batch_size, self.max_batch_tokens):
+            batch_scores = np.asarray(score_batch(features, indices), dtype=np.float64).reshape(-1)
+            scores[indices] = batch_scores
+            if progress is not None:
+                progress.update(len(indices))
+        return scores
+
+    def rank(self, documents: List[Document], encode: Callable, score_batch: Callable,
+             desc: str = "Reranking Documents") -> List[Document]:
+        """
+        Scores every context of ``documents`` and sets their ``reorder_contexts``.
+
+        Args:
+            documents (List[Document]): Documents to rerank.
+            encode (Callable): ``encode(queries, texts) -> (features, lengths)``.
+            score_batch (Callable): ``score_batch(features, indices) -> scores``.
+            desc (str): Progress bar label.
+
+        Returns:
+            List[Document]: The same documents with updated ``reorder_contexts``.
+        """
+        total = sum(len(document.contexts or []) for document in documents)
+        with tqdm(total=total, desc=desc, unit="pair", disable=not self.show_progress) as progress:
+            for window in self._windows(documents):
+                queries, texts, offsets = flatten_pairs(window)
+                scores = self.score(queries, texts, encode, score_batch, progress=progress)
+                scatter_scores(window, scores, offsets)
+        return documents
+
+
+def hf_encode(tokenizer, inputs, text_pair=None, truncation=True, **kwargs):
+    """
+    Tokenizes inputs with a HuggingFace tokenizer without padding and returns
+    ``(encoding, lengths)`` for use with ``PairScheduler``.
+    """
+    encoding = tokenizer(inputs, text_pair, padding=False, truncation=truncation, **kwargs)
+    lengths = [len(ids) for ids in encoding["input_ids"]]
+    return encoding, lengths
+
+
+def hf_collate(tokenizer, encoding, indices, device=None):
+    """
+    Pads the pre-tokenized pairs at ``indices`` into a batch of tensors on ``device``.
+    """
+    features = {key: [encoding[key][i] for i in indices] for key in encoding.keys()}
+    batch = tokenizer.pad(features, padding="longest", return_tensors="pt")
+    return batch.to(device) if device is not None else batch
@@ -0,0 +1,433 @@
+"""
+Memory-mapped passage store shared by retrievers and datasets.
+
+A passages TSV (``id<TAB>text<TAB>title``) or JSONL corpus is converted once into a small
+directory next to the source file (or under ``$RERANKING_CACHE_DIR/passage_stores`` when the
+source directory is read-only)::
+
+    psgs_w100.tsv.store/
+        meta.json        # format version, record count, id mode, source size / mtime
+        blob.bin         # UTF-8 bytes of id, text and title for every record, back to back
+        offsets.npy      # int64 array of 3 * n + 1 byte offsets into blob.bin
+        id_lookup.npy    # integer ids: row for every id value (-1 = missing)
+        id_hashes.npy    # string ids: sorted 64-bit id hashes ...
+        id_rows.npy      # ... and the matching rows
+
+All files are opened with ``mmap``, so opening a store is constant time, lookups only touch the
+pages of the requested passages, and worker processes share those pages through the OS page
+cache instead of each holding tens of GB of Python dicts.
+
+The store behaves like a read-only ``{id: {"text": ..., "title": ...}}`` mapping, so it can be
+used wherever the retrievers previously used an in-RAM passages dict.
+
+Example:
+    ```python
+    from rankify.utils.passage_store import PassageStore
+
+    store = PassageStore.open_or_build("./cache/psgs_w100.tsv")
+    store.get("1")           # {'text': 'Aaron Aaron ( or ; ...', 'title': 'Aaron'}
+    store.get_many([1, 2])   # list of passages, None for unknown ids
+    ```
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+STORE_VERSION = 1
+STORE_SUFFIX = ".store"
+
+# Integer ids are looked up through a dense array when it stays reasonably compact
+_MAX_ID_LOOKUP_RATIO = 4
+
+
+def _hash_id(doc_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _unquote(field: str) -> str:
+    # csv-style quoting as used in psgs_w100.tsv: "text with ""quotes"""
+    if len(field) >= 2 and field[0] == '"' and field[-1] == '"':
+        return field[1:-1].replace('""', '"')
+    return field
+
+
+def _canonical_int(doc_id: str) -> Optional[int]:
+    if doc_id.isdigit() and (doc_id == "0" or not doc_id.startswith("0")):
+        return int(doc_id)
+    return None
+
+
+def iter_tsv_records(path: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yields ``(id, text, title)`` from a passages TSV file.
+
+    A header line starting with ``id`` is detected and used to locate the ``text`` and
+    ``title`` columns; without a header the column order ``id, text, title`` is assumed.
+    Lines with fewer than two columns are skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline()
+        columns = first.rstrip("\n").split("\t")
+        text_col, title_col = 1, 2
+        if columns and columns[0].strip().lower() == "id":
+            names = [c.strip().lower() for c in columns]
+            for name in ("text", "contents"):
+                if name in names:
+                    text_col = names.index(name)
+                    break
+            if "title" in names:
+                title_col = names.index("title")
+            lines = f
+        else:
+            lines = _prepend(first, f)
+
+        for line in lines:
+            parts = line.rstrip("\n").rstrip("\r").split("\t")
+            if len(parts) < 2:
+                continue
+            text = _unquote(parts[text_col]) if text_col < len(parts) else ""
+            title = _unquote(parts[title_col]) if title_col < len(parts) else ""
+            yield parts[0], text, title
+
+
+def iter_jsonl_records(path: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yields ``(id, text, title)`` from a JSONL corpus.
+
+    Accepts ``id`` / ``docid`` / ``_id`` for the identifier and ``contents`` / ``text`` for the
+    passage body. A missing title falls back to the first 100 characters of the text.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            yield _json_record(json.loads(line))
+
+
+def iter_json_records(path: str) -> Iterator[Tuple[str, str, str]]:
+    """Yields ``(id, text, title)`` from a JSON list of documents or an ``{id: document}`` object."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        for doc_id, doc in data.items():
+            if isinstance(doc, dict):
+                yield _json_record({**doc, "id": doc_id})
+            else:
+                yield _json_record({"id": doc_id, "contents": str(doc)})
+    else:
+        for doc in data:
+            yield _json_record(doc)
+
+
+def _json_record(doc: Dict) -> Tuple[str, str, str]:
+    doc_id = doc.get("docid") or doc.get("id") or doc.get("_id")
+    text = doc.get("contents") or doc.get("text") or ""
+    title = doc.get("title")
+    if title is None:
+        title = text[:100] if text else "No Title"
+    return str(doc_id), text, title
+
+
+def _prepend(first: str, lines: Iterable[str]) -> Iterator[str]:
+    yield first
+    yield from lines
+
+
+class PassageStore(Mapping):
+    """
+    Read-only, memory-mapped ``{id: {"text", "title"}}`` mapping over a passages file.
+
+    Keys are compared as strings (``store[12]`` and ``store["12"]`` are the same passage).
+    Stores built from integer ids also accept non-canonical integers such as ``"0012"``.
+    """
+
+    def __init__(self, store_dir: str):
+        """
+        Opens an existing store directory.
+
+        Args:
+            store_dir (str): Directory created by :meth:`build`.
+        """
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported passage store version in {store_dir}: {self.meta.get('version')}")
+
+        self._count = int(self.meta["count"])
+        self._offsets = np.load(os.path.join(store_dir, "offsets.npy"), mmap_mode="r")
+        self._blob_file = open(os.path.join(store_dir, "blob.bin"), "rb")
+        self._blob = (
+            mmap.mmap(self._blob_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.path.getsize(os.path.join(store_dir, "blob.bin")) > 0 else b""
+        )
+
+        self.id_mode = self.meta["id_mode"]
+        if self.id_mode == "int":
+            self._id_lookup = np.load(os.path.join(store_dir, "id_lookup.npy"), mmap_mode="r")
+        else:
+            self._id_hashes = np.load(os.path.join(store_dir, "id_hashes.npy"), mmap_mode="r")
+            self._id_rows = np.load(os.path.join(store_dir, "id_rows.npy"), mmap_mode="r")
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def default_store_dir(cls, source_path: str) -> str:
+        """
+        Returns the store directory used for ``source_path`` when none is given.
+
+        This is ``<source_path>.store``, unless the source directory is not writable and holds no
+        up-to-date store, in which case the store is kept under
+        ``$RERANKING_CACHE_DIR/passage_stores``.
+        """
+        store_dir = source_path + STORE_SUFFIX
+        source_dir = os.path.dirname(os.path.abspath(source_path))
+        if os.access(source_dir, os.W_OK) or cls._is_fresh(store_dir, source_path):
+            return store_dir
+        path_hash = hashlib.blake2b(os.path.abspath(source_path).encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(os.environ.get("RERANKING_CACHE_DIR", "./cache"), "passage_stores",
+                            f"{os.path.basename(source_path)}-{path_hash}{STORE_SUFFIX}")
+
+    @classmethod
+    def open_or_build(cls, source_path: str, store_dir: Optional[str] = None, fmt: Optional[str] = None) -> "PassageStore":
+        """
+        Opens the store for ``source_path``, building it first if it is missing or stale.
+
+        Args:
+            source_path (str): Passages file (``.tsv``, ``.jsonl`` or ``.json``).
+            store_dir (str, optional): Where to keep the store. Defaults to ``<source_path>.store``
+                (see :meth:`default_store_dir`).
+            fmt (str, optional): Force the source format (``"tsv"``, ``"jsonl"``, ``"json"``).
+
+        Returns:
+            PassageStore: The opened store.
+        """
+        store_dir = store_dir or cls.default_store_dir(source_path)
+        if not cls._is_fresh(store_dir, source_path):
+            cls.build(source_path, store_dir, fmt=fmt)
+        return cls(store_dir)
+
+    @classmethod
+    def build(cls, source_path: str, store_dir: Optional[str] = None, fmt: Optional[str] = None) -> str:
+        """
+        Converts a passages file into a store directory.
+
+        Args:
+            source_path (str): Passages file (``.tsv``, ``.jsonl`` or ``.json``).
+            store_dir (str, optional): Output directory. Defaults to :meth:`default_store_dir`.
+            fmt (str, optional): Force the source format.
+
+        Returns:
+            str: The store directory.
+        """
+        store_dir = store_dir or cls.default_store_dir(source_path)
+        fmt = (fmt or os.path.splitext(source_path)[1].lstrip(".")).lower()
+        readers = {"tsv": iter_tsv_records, "jsonl": iter_jsonl_records, "json": iter_json_records}
+        if fmt not in readers:
+            raise ValueError(f"Unsupported passages format '{fmt}'. Use tsv, jsonl or json.")
+
+        print(f"Building passage store for {source_path}...")
+        stat = os.stat(source_path)
+        source_info = {
+            "source": os.path.abspath(source_path),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+        }
+        return cls.build_from_records(readers[fmt](source_path), store_dir, source_info)
+
+    @classmethod
+    def build_from_records(cls, records: Iterable[Tuple[str, str, str]], store_dir: str,
+                           source_info: Optional[Dict] = None) -> str:
+        """
+        Writes a store from an iterable of ``(id, text, title)`` tuples.
+
+        The store is written to a temporary directory and renamed into place, so concurrent
+        builders never expose a half-written store.
+
+        Args:
+            records (Iterable[Tuple[str, str, str]]): Passages to store, in order.
+            store_dir (str): Output directory.
+            source_info (dict, optional): Extra fields written to ``meta.json``.
+
+        Returns:
+            str: The store directory.
+        """
+        tmp_dir = f"{store_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        offsets = array("q", [0])
+        hashes = array("Q")
+        int_ids = array("q")
+        all_int = True
+        position = 0
+
+        with open(os.path.join(tmp_dir, "blob.bin"), "wb", buffering=1 << 20) as blob:
+            for doc_id, text, title in tqdm(records, desc="Writing passage store", unit="psg"):
+                doc_id = str(doc_id)
+                for field in (doc_id, text or "", title or ""):
+                    data = field.encode("utf-8")
+                    blob.write(data)
+                    position += len(data)
+                    offsets.append(position)
+                hashes.append(_hash_id(doc_id))
+                if all_int:
+                    value = _canonical_int(doc_id)
+                    if value is None:
+                        all_int = False
+                    else:
+                        int_ids.append(value)
+
+        count = len(hashes)
+        np.save(os.path.join(tmp_dir, "offsets.npy"), np.frombuffer(offsets, dtype=np.int64))
+
+        rows = np.arange(count, dtype=np.int64)
+        int_values = np.frombuffer(int_ids, dtype=np.int64) if all_int and count else None
+        if int_values is not None and int_values.max() < _MAX_ID_LOOKUP_RATIO * count + 1024:
+            id_mode = "int"
+            lookup = np.full(int(int_values.max()) + 1, -1, dtype=np.int64)
+            lookup[int_values] = rows  # duplicates: the last row wins, as with a dict
+            np.save(os.path.join(tmp_dir, "id_lookup.npy"), lookup)
+        else:
+            id_mode = "hash"
+            hash_values = np.frombuffer(hashes, dtype=np.uint64)
+            order = np.lexsort((rows, hash_values))
+            np.save(os.path.join(tmp_dir, "id_hashes.npy"), hash_values[order])
+            np.save(os.path.join(tmp_dir, "id_rows.npy"), rows[order])
+
+        meta = {"version": STORE_VERSION, "count": count, "id_mode": id_mode, **(source_info or {})}
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        shutil.rmtree(store_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, store_dir)
+        except OSError:
+            # Another process finished first; keep its store
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        print(f"Passage store with {count} passages written to {store_dir}")
+        return store_dir
+
+    @staticmethod
+    def _is_fresh(store_dir: str, source_path: str) -> bool:
+        meta_path = os.path.join(store_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get("version") != STORE_VERSION:
+            return False
+        if not os.path.exists(source_path):
+            return True  # source removed after building: the store is all we have
+        stat = os.stat(source_path)
+        return meta.get("source_size") == stat.st_size and meta.get("source_mtime_ns") == stat.st_mtime_ns
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _field(self, index: int) -> str:
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def _record(self, row: int) -> Dict[str, str]:
+        return {"text": self._field(3 * row + 1), "title": self._field(3 * row + 2)}
+
+    def _row(self, key) -> int:
+        key = str(key)
+        if self.id_mode == "int":
+            try:
+                value = int(key)
+            except ValueError:
+                return -1
+            if value < 0 or value >= len(self._id_lookup):
+                return -1
+            return int(self._id_lookup[value])
+        return self._hash_row(key, _hash_id(key))
+
+    def _hash_row(self, key: str, key_hash: int) -> int:
+        pos = int(np.searchsorted(self._id_hashes, np.uint64(key_hash), side="right")) - 1
+        # Walk back over equal hashes (duplicates or collisions); the last matching row wins
+        while pos >= 0 and int(self._id_hashes[pos]) == key_hash:
+            row = int(self._id_rows[pos])
+            if self._field(3 * row) == key:
+                return row
+            pos -= 1
+        return -1
+
+    def _rows(self, keys: List) -> np.ndarray:
+        if self.id_mode != "int":
+            return np.array([self._row(k) for k in keys], dtype=np.int64)
+        values = np.full(len(keys), -1, dtype=np.int64)
+        for i, key in enumerate(keys):
+            try:
+                values[i] = int(str(key))
+            except (ValueError, OverflowError):
+                pass  # not an integer id, or too large for int64: a miss either way
+        valid = (values >= 0) & (values < len(self._id_lookup))
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        rows[valid] = self._id_lookup[values[valid]]
+        return rows
+
+    def get(self, key, default=None) -> Optional[Dict[str, str]]:
+        """
+        Returns ``{"text", "title"}`` for ``key``, or ``default`` if the id is unknown.
+        """
+        row = self._row(key)
+        return self._record(row) if row >= 0 else default
+
+    def get_many(self, keys: Iterable) -> List[Optional[Dict[str, str]]]:
+        """
+        Looks up several ids at once.
+
+        Args:
+            keys (Iterable): Passage ids (strings or integers).
+
+        Returns:
+            List[Optional[dict]]: One ``{"text", "title"}`` dict per key, ``None`` for unknown ids.
+        """
+        rows = self._rows(list(keys))
+        return [self._record(int(row)) if row >= 0 else None for row in rows]
+
+    def __getitem__(self, key) -> Dict[str, str]:
+        row = self._row(key)
+        if row < 0:
+            raise KeyError(key)
+        return self._record(row)
+
+    def __contains__(self, key) -> bool:
+        return self._row(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for row in range(self._count):
+            yield self._field(3 * row)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __reduce__(self):
+        # Worker processes reopen the mmap instead of pickling passage text
+        return (self.__class__, (self.store_dir,))
+
+    def close(self) -> None:
+        """Releases the memory map and file handle."""
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._blob_file.close()
+
+    def __repr__(self) -> str:
+        return f"PassageStore(store_dir='{self.store_dir}', passages={self._count}, id_mode='{self.id_mode}')"
@@ -54,7 +54,8 @@ class IndexUpdater:
         self.has_checkpoint = False
         if checkpoint:
             self.has_checkpoint = True
-            self.checkpoint = Checkpoint(checkpoint, config)
+            # Accept an already loaded Checkpoint (e.g. searcher.checkpoint) to avoid loading the model twice
+            self.checkpoint = checkpoint if isinstance(checkpoint, Checkpoint) else Checkpoint(checkpoint, config)
             self.encoder = CollectionEncoder(config, self.checkpoint)
 
         self._load_disk_ivf()
@@ -119,23 +120,22 @@ class IndexUpdater:
         )
 
         # Build partitions for each pid and update IndexUpdater's current ivf
-        start = 0
-        ivf = self.curr_ivf.tolist()
-        ivf_lengths = self.curr_ivf_lengths.tolist()
-        for doclen in doclens:
-            end = start + doclen
-            codes = compressed_embs.codes[start:end]
-            partitions, _ = self._build_passage_partitions(codes)
-            ivf, ivf_lengths = self._add_pid_to_ivf(partitions, curr_pid, ivf, ivf_lengths)
-
-            start = end
-            curr_pid += 1
-        
-        assert start == sum(doclens)
+        # All (partition, pid) pairs of the new passages are merged into the ivf at once: a stable sort
+        # by partition appends the new pids, in pid order, to the end of each partition's list
+        pids = torch.arange(curr_pid, curr_pid + len(doclens)).repeat_interleave(torch.tensor(doclens))
+        assert pids.size(0) == compressed_embs.codes.size(0)
+        pairs = torch.unique(torch.stack((compressed_embs.codes.long(), pids)), dim=1)
+        new_partitions, new_pids = pairs[0], pairs[1]
+
+        num_partitions = self.curr_ivf_lengths.size(0)
+        partitions = torch.arange(num_partitions).repeat_interleave(self.curr_ivf_lengths.long())
+        order = torch.sort(torch.cat((partitions, new_partitions)), stable=True).indices
+        ivf = torch.cat((self.curr_ivf.long(), new_pids))[order]
+        ivf_lengths = self.curr_ivf_lengths + torch.bincount(new_partitions, minlength=num_partitions)
 
         # Replace the current ivf with new_ivf
-        self.curr_ivf = torch.tensor(ivf, dtype=self.curr_ivf.dtype)
-        self.curr_ivf_lengths = torch.tensor(ivf_lengths, dtype=self.curr_ivf_lengths.dtype)
+        self.curr_ivf = ivf.to(self.curr_ivf.dtype)
+        self.curr_ivf_lengths = ivf_lengths.to(self.curr_ivf_lengths.dtype)
 
         # Update new ivf in searcher
         new_ivf_tensor = StridedTensor(
@@ -182,16 +182,11 @@ class IndexUpdater:
 
         print_message("#> Persisting index changes to disk")
 
-        # Propagate all removed passages to disk
-        self._load_metadata()
-        for pid in self.removed_pids:
-            self._remove_passage_from_disk(pid)
-
         # Propagate all added passages to disk
         # Rationale: keep record of all added passages in IndexUpdater.searcher,
         # divide passages into chunks and create / write chunks here
 
-        self._load_metadata()  # Reload after removal
+        self._load_metadata()
 
         # Calculate avg number of passages per chunk
         curr_num_chunks = self.metadata["num_chunks"]
@@ -199,7 +194,7 @@ class IndexUpdater:
         if curr_num_chunks == 1:
             avg_chunksize = DEFAULT_CHUNKSIZE
         else:
-            avg_chunksize = last_chunk_metadata["passage_offset"] / (
+            avg_chunksize = last_chunk_metadata["passage_offset"] // (
                 curr_num_chunks - 1
             )
         print_message(f"#> Current average chunksize is: {avg_chunksize}.")
@@ -221,7 +216,7 @@ class IndexUpdater:
         )
 
         # First populate the last chunk
-        if last_chunk_capacity > 0:
+        if last_chunk_capacity > 0 and pid_start < pid_last:
             pid_end = min(pid_last, pid_start + last_chunk_capacity)
             emb_end = (
                 emb_start
@@ -256,13 +251,15 @@ class IndexUpdater:
         # Update metadata
         print_message("#> Updating metadata for added passages...")
         self.metadata["num_chunks"] = curr_num_chunks
-        self.metadata["num_embeddings"] += torch.sum(
-            self.searcher.ranker.doclens
-        ).item()
+        self.metadata["num_embeddings"] += emb_last - self.first_new_emb
         metadata_path = os.path.join(self.index_path, "metadata.json")
         with open(metadata_path, "w") as output_metadata:
             ujson.dump(self.metadata, output_metadata)
 
+        # Propagate all removed passages to disk, after the added ones: passages added and removed
+        # since the last call are then removed from the chunk they were just written to
+        self._remove_passages_from_disk(self.removed_pids)
+
         # Save current IVF to disk
         optimized_ivf_path = os.path.join(self.index_path, "ivf.pid.pt")
         torch.save((self.curr_ivf, self.curr_ivf_lengths), optimized_ivf_path)
@@ -288,6 +285,9 @@ class IndexUpdater:
             )
             ivf, ivf_lengths = optimize_ivf(ivf, ivf_lengths, self.index_path)
 
+        # optimize_ivf pads the ivf for strided lookups; StridedTensor adds the padding itself
+        ivf = ivf[: ivf_lengths.sum().item()]
+
         self.curr_ivf = ivf
         self.curr_ivf_lengths = ivf_lengths
 
@@ -347,27 +347,16 @@ class IndexUpdater:
         pids = set(pids)
 
         # Construct mask of where pids to be removed appear in ivf
-        mask = torch.isin(self.curr_ivf, torch.tensor(list(pids)))
-        indices = mask.nonzero()
-
-        # Calculate end-indices of each centroid section in ivf
-        section_end_indices = []
-        c = 0
-        for length in self.curr_ivf_lengths.tolist():
-            c += length
-            section_end_indices.append(c)
+        mask = torch.isin(self.curr_ivf, torch.tensor(list(pids), dtype=self.curr_ivf.dtype))
 
         # Record the number of pids removed from each centroid section
-        removed_len = [0 for _ in range(len(section_end_indices))]
-        j = 0
-        for ind in indices:
-            while ind >= section_end_indices[j]:
-                j += 1
-            removed_len[j] += 1
+        num_partitions = self.curr_ivf_lengths.size(0)
+        partitions = torch.arange(num_partitions).repeat_interleave(self.curr_ivf_lengths.long())
+        removed_len = torch.bincount(partitions[mask], minlength=num_partitions)
 
         # Update changes
         new_ivf = torch.masked_select(self.curr_ivf, ~mask)
-        new_ivf_lengths = self.curr_ivf_lengths - torch.tensor(removed_len)
+        new_ivf_lengths = self.curr_ivf_lengths - removed_len.to(self.curr_ivf_lengths.dtype)
 
         new_ivf_tensor = StridedTensor(new_ivf, new_ivf_lengths, use_gpu=False)
         assert new_ivf_tensor != self.searcher.ranker.ivf
@@ -376,50 +365,6 @@ class IndexUpdater:
         self.curr_ivf = new_ivf
         self.curr_ivf_lengths = new_ivf_lengths
 
-    def _build_passage_partitions(self, codes):
-        # Helper function for IndexUpdater.add()
-        # Return a list of ordered, unique centroid ids from codes of a passage
-        codes = codes.sort()
-        ivf, values = codes.indices, codes.values
-        partitions, ivf_lengths = values.unique_consecutive(return_counts=True)
-        return partitions, ivf_lengths
-
-    def _add_pid_to_ivf(self, partitions, pid, old_ivf, old_ivf_lengths):
-        """
-        Helper function for IndexUpdater.add()
-
-        Input:
-            partitions: list(int), centroid ids of the passage
-            pid: int, passage id
-        Output: None
-
-        Adds the pid of new passage into the ivf.
-        """
-        new_ivf = []
-        new_ivf_lengths = []
-
-        partitions_runner = 0
-        ivf_runner = 0
-        for i in range(len(old_ivf_lengths)):
-            # First copy existing partition pids to new ivf
-            new_ivf.extend(old_ivf[ivf_runner : ivf_runner + old_ivf_lengths[i]])
-            new_ivf_lengths.append(old_ivf_lengths[i])
-            ivf_runner += old_ivf_lengths[i]
-
-            # Add pid if partition_index i is in the passage's partitions
-            if (
-                partitions_runner < len(partitions)
-                and i == partitions[partitions_runner]
-            ):
-                new_ivf.append(pid)
-                new_ivf_lengths[-1] += 1
-                partitions_runner += 1
-
-        assert ivf_runner == len(old_ivf)
-        assert sum(new_ivf_lengths) == len(new_ivf)
-
-        return new_ivf, new_ivf_lengths
-
     def _write_to_last_chunk(self, pid_start, pid_end, emb_start, emb_end):
         # Helper function for IndexUpdater.persist_to_disk()
 
@@ -475,10 +420,12 @@ class IndexUpdater:
             ujson.dump(curr_doclens, output_doclens)
 
         # Create metadata json file for new chunk
+        # (emb_start counts the embeddings of removed passages still held in memory; the disk offset does not)
+        previous_metadata = self._load_chunk_metadata(chunk_idx - 1)
         chunk_metadata = {
             "passage_offset": pid_start,
             "num_passages": pid_end - pid_start,
-            "embedding_offset": emb_start,
+            "embedding_offset": previous_metadata["embedding_offset"] + previous_metadata["num_embeddings"],
             "num_embeddings": emb_end - emb_start,
         }
         chunk_metadata_path = os.path.join(
@@ -487,57 +434,73 @@ class IndexUpdater:
         with open(chunk_metadata_path, "w+") as output_chunk_metadata:
             ujson.dump(chunk_metadata, output_chunk_metadata)
 
-    def _remove_passage_from_disk(self, pid):
+    def _remove_passages_from_disk(self, pids):
         # Helper function for IndexUpdater.persist_to_disk()
+        # Each affected chunk is loaded and rewritten once, whatever the number of pids removed from it
+
+        chunk_offsets = [
+            self._load_chunk_metadata(idx)["passage_offset"]
+            for idx in range(self.metadata["num_chunks"])
+        ]
+        pids_by_chunk = {}
+        for pid in set(pids):
+            chunk_idx = int(np.searchsorted(chunk_offsets, pid, side="right")) - 1
+            pids_by_chunk.setdefault(chunk_idx, []).append(pid)
+
+        removed_by_chunk = {}
+        for chunk_idx, chunk_pids in sorted(pids_by_chunk.items()):
+            print_message(f"#> Removing {len(chunk_pids)} passages from chunk {chunk_idx}...")
+
+            chunk_metadata = self._load_chunk_metadata(chunk_idx)
+            doclens = self._load_chunk_doclens(chunk_idx)
+            positions = torch.tensor(chunk_pids) - chunk_metadata["passage_offset"]
+            assert positions.max().item() < chunk_metadata["num_passages"], "Passage ID out of range"
+
+            # Remove embeddings from codes and residuals
+            keep = torch.ones(doclens.sum().item(), dtype=torch.bool)
+            removed = torch.zeros(len(doclens), dtype=torch.bool)
+            removed[positions] = True
+            keep[removed.repeat_interleave(doclens)] = False
+
+            codes, residuals = (
+                self._load_chunk_codes(chunk_idx),
+                self._load_chunk_residuals(chunk_idx),
+            )
+            torch.save(codes[keep], os.path.join(self.index_path, f"{chunk_idx}.codes.pt"))
+            torch.save(residuals[keep], os.path.join(self.index_path, f"{chunk_idx}.residuals.pt"))
+
+            # Change doclen for passages to 0
+            doclen_to_remove = doclens[positions].sum().item()
+            doclens[positions] = 0
+            doclens_path = os.path.join(self.index_path, f"doclens.{chunk_idx}.json")
+            with open(doclens_path, "w") as output_doclens:
+                ujson.dump(doclens.tolist(), output_doclens)
+
+            # Modify chunk_metadata['num_embeddings'] for chunk_idx
+            chunk_metadata["num_embeddings"] -= doclen_to_remove
+            chunk_metadata_path = os.path.join(
+                self.index_path, f"{chunk_idx}.metadata.json"
+            )
+            with open(chunk_metadata_path, "w") as output_chunk_metadata:
+                ujson.dump(chunk_metadata, output_chunk_metadata)
+            removed_by_chunk[chunk_idx] = doclen_to_remove
 
-        chunk_idx = self._get_chunk_idx(pid)
-
-        chunk_metadata = self._load_chunk_metadata(chunk_idx)
-        i = pid - chunk_metadata["passage_offset"]
-        doclens = self._load_chunk_doclens(chunk_idx)
-        codes, residuals = (
-            self._load_chunk_codes(chunk_idx),
-            self._load_chunk_residuals(chunk_idx),
-        )
-
-        # Remove embeddings from codes and residuals
-        start = sum(doclens[:i])
-        end = start + doclens[i]
-        codes = torch.cat((codes[:start], codes[end:]))
-        residuals = torch.cat((residuals[:start], residuals[end:]))
-
-        codes_path = os.path.join(self.index_path, f"{chunk_idx}.codes.pt")
-        residuals_path = os.path.join(self.index_path, f"{chunk_idx}.residuals.pt")
-
-        torch.save(codes, codes_path)
-        torch.save(residuals, residuals_path)
-
-        # Change doclen for passage to 0
-        doclens = doclens.tolist()
-        doclen_to_remove = doclens[i]
-        doclens[i] = 0
-        doclens_path = os.path.join(self.index_path, f"doclens.{chunk_idx}.json")
-        with open(doclens_path, "w") as output_doclens:
-            ujson.dump(doclens, output_doclens)
-
-        # Modify chunk_metadata['num_embeddings'] for chunk_idx
-        chunk_metadata["num_embeddings"] -= doclen_to_remove
-        chunk_metadata_path = os.path.join(
-            self.index_path, f"{chunk_idx}.metadata.json"
-        )
-        with open(chunk_metadata_path, "w") as output_chunk_metadata:
-            ujson.dump(chunk_metadata, output_chunk_metadata)
+        if not removed_by_chunk:
+            return
 
         # Modify chunk_metadata['embedding_offset'] for all later chunks (minus num_embs_removed)
-        for idx in range(chunk_idx + 1, self.metadata["num_chunks"]):
-            metadata = self._load_chunk_metadata(idx)
-            metadata["embedding_offset"] -= doclen_to_remove
-            metadata_path = os.path.join(self.index_path, f"{idx}.metadata.json")
-            with open(metadata_path, "w") as output_chunk_metadata:
-                ujson.dump(metadata, output_chunk_metadata)
+        num_removed = 0
+        for idx in range(min(removed_by_chunk), self.metadata["num_chunks"]):
+            if num_removed:
+                metadata = self._load_chunk_metadata(idx)
+                metadata["embedding_offset"] -= num_removed
+                metadata_path = os.path.join(self.index_path, f"{idx}.metadata.json")
+                with open(metadata_path, "w") as output_chunk_metadata:
+                    ujson.dump(metadata, output_chunk_metadata)
+            num_removed += removed_by_chunk.get(idx, 0)
 
         # Modify num_embeddings in overall metadata (minus num_embs_removed)
-        self.metadata["num_embeddings"] -= doclen_to_remove
+        self.metadata["num_embeddings"] -= num_removed
         metadata_path = os.path.join(self.index_path, "metadata.json")
         with open(metadata_path, "w") as output_metadata:
             ujson.dump(self.metadata, output_metadata)
@@ -40,18 +40,9 @@ class ResidualEmbeddings:
             residuals_path = os.path.join(index_path, f'0.residuals.pt')
             codes_path = os.path.join(index_path, f'0.codes.pt')
 
-            codes_size = get_codes_size(index_path, 0)
-            storage = torch.IntStorage.from_file(filename=codes_path, shared=True, size=codes_size + 80)
-            # Trim the header, which is 320 bytes, or 80x 32-byte ints
-            codes = torch.IntTensor(storage)[80:]
-
-            residuals_size, codes_size, packed_dim = get_residuals_size(index_path, 0)
-            storage = torch.ByteStorage.from_file(filename=residuals_path, shared=True, size=residuals_size + 320)
-            ret = torch.ByteTensor(storage)
-            # Trim to 320-byte header
-            ret = ret[320:]
-            ret = torch.reshape(ret, (codes_size, packed_dim))
-            residuals = ret
+            # torch.save writes zip archives; torch.load maps their tensor storages in place
+            codes = torch.load(codes_path, map_location='cpu', mmap=True)
+            residuals = torch.load(residuals_path, map_location='cpu', mmap=True)
         else:
             print_message("#> Loading codes and residuals...")
 
@@ -9,8 +9,9 @@ class CandidateGeneration:
     def __init__(self, use_gpu=True):
         self.use_gpu = use_gpu
 
-    def get_cells(self, Q, ncells):
-        scores = (self.codec.centroids @ Q.T)
+    def get_cells(self, Q, ncells, scores=None):
+        if scores is None:
+            scores = (self.codec.centroids @ Q.T)
         if ncells == 1:
             cells = scores.argmax(dim=0, keepdim=True).permute(1, 0)
         else:
@@ -28,8 +29,8 @@ class CandidateGeneration:
             eids = eids.cuda()
         return eids, scores
 
-    def generate_candidate_pids(self, Q, ncells):
-        cells, scores = self.get_cells(Q, ncells)
+    def generate_candidate_pids(self, Q, ncells, scores=None):
+        cells, scores = self.get_cells(Q, ncells, scores)
 
         pids, cell_lengths = self.ivf.lookup(cells)
         if self.use_gpu:
@@ -42,7 +43,20 @@ class CandidateGeneration:
             E = E.cuda()
         return (Q.unsqueeze(0) @ E.unsqueeze(2)).squeeze(-1).T
 
-    def generate_candidates(self, config, Q):
+    def centroid_scores_batch(self, config, Q):
+        """
+            Centroid scores of a batch of queries Q = (num_queries, *, dim) with one matrix product.
+            Returns (num_queries, num_centroids, query_maxlen); entry i is the `centroid_scores`
+            that `generate_candidates` computes for query i alone.
+        """
+        Q = Q[:, :config.query_maxlen]
+        if self.use_gpu:
+            Q = Q.cuda().half()
+        num_queries, query_len, dim = Q.shape
+        scores = Q.reshape(-1, dim) @ self.codec.centroids.T  # (num_queries * query_len, num_centroids)
+        return scores.view(num_queries, query_len, -1).transpose(1, 2).contiguous()
+
+    def generate_candidates(self, config, Q, centroid_scores=None):
         ncells = config.ncells
 
         assert isinstance(self.ivf, StridedTensor)
@@ -52,7 +66,7 @@ class CandidateGeneration:
             Q = Q.cuda().half()
         assert Q.dim() == 2
 
-        pids, centroid_scores = self.generate_candidate_pids(Q, ncells)
+        pids, centroid_scores = self.generate_candidate_pids(Q, ncells, centroid_scores)
 
         sorter = pids.sort()
         pids = sorter.values
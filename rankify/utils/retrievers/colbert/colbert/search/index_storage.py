@@ -15,8 +15,33 @@ from math import ceil
 
 import os
 import pathlib
+import time
 from torch.utils.cpp_extension import load
 
+
+class StageTimer:
+    """
+        Accumulates wall time per search stage into `timings` (dict of seconds); `lap(name)` charges
+        the time since the previous lap to `name`. A no-op when `timings` is None.
+    """
+
+    def __init__(self, timings=None, use_gpu=False):
+        self.timings = timings
+        self.use_gpu = use_gpu
+        self.last = self._now() if timings is not None else None
+
+    def _now(self):
+        if self.use_gpu:
+            torch.cuda.synchronize()
+        return time.perf_counter()
+
+    def lap(self, name):
+        if self.timings is None:
+            return
+        now = self._now()
+        self.timings[name] = self.timings.get(name, 0.0) + now - self.last
+        self.last = now
+
 class IndexScorer(IndexLoader, CandidateGeneration):
     def __init__(self, index_path, use_gpu=True, load_index_with_mmap=False):
         super().__init__(
@@ -74,9 +99,9 @@ class IndexScorer(IndexLoader, CandidateGeneration):
     def lookup_pids(self, passage_ids, out_device='cuda', return_mask=False):
         return self.embeddings_strided.lookup_pids(passage_ids, out_device)
 
-    def retrieve(self, config, Q):
+    def retrieve(self, config, Q, centroid_scores=None):
         Q = Q[:, :config.query_maxlen]   # NOTE: Candidate generation uses only the query tokens
-        pids, centroid_scores = self.generate_candidates(config, Q)
+        pids, centroid_scores = self.generate_candidates(config, Q, centroid_scores)
 
         return pids, centroid_scores
 
@@ -84,10 +109,16 @@ class IndexScorer(IndexLoader, CandidateGeneration):
         all_pids = torch.unique(self.emb2pid[embedding_ids.long()].cuda(), sorted=False)
         return all_pids
 
-    def rank(self, config, Q, filter_fn=None, pids=None):
+    def rank(self, config, Q, filter_fn=None, pids=None, centroid_scores=None, timings=None):
+        """
+            Rank the passages for one query. `centroid_scores` may be precomputed for the query
+            (see `centroid_scores_batch`); `timings` (dict) accumulates seconds per search stage.
+        """
         with torch.inference_mode():
+            timer = StageTimer(timings, self.use_gpu)
             if pids is None:
-                pids, centroid_scores = self.retrieve(config, Q)
+                pids, centroid_scores = self.retrieve(config, Q, centroid_scores)
+                timer.lap("candidate_generation")
             else:
                 pids = torch.tensor(pids, dtype=torch.int32, device=Q.device)
                 centroid_scores = None
@@ -101,14 +132,15 @@ class IndexScorer(IndexLoader, CandidateGeneration):
                 if len(pids) == 0:
                     return [], []
 
-            scores, pids = self.score_pids(config, Q, pids, centroid_scores)
+            scores, pids = self.score_pids(config, Q, pids, centroid_scores, timer)
 
             scores_sorter = scores.sort(descending=True)
             pids, scores = pids[scores_sorter.indices].tolist(), scores_sorter.values.tolist()
+            timer.lap("scoring")
 
             return pids, scores
 
-    def score_pids(self, config, Q, pids, centroid_scores):
+    def score_pids(self, config, Q, pids, centroid_scores, timer=None):
         """
             Always supply a flat list or tensor for `pids`.
 
@@ -119,6 +151,7 @@ class IndexScorer(IndexLoader, CandidateGeneration):
 
         # TODO: Remove batching?
         batch_size = 2 ** 20
+        timer = timer or StageTimer()
 
         if centroid_scores is not None:
             if self.use_gpu:
@@ -164,6 +197,7 @@ class IndexScorer(IndexLoader, CandidateGeneration):
                         pids, centroid_scores, self.embeddings.codes, self.doclens,
                         self.offsets, idx, config.ndocs
                     )
+            timer.lap("centroid_filtering")
 
         # Rank final list of docs using full approximate embeddings (including residuals)
         if self.use_gpu:
@@ -184,6 +218,7 @@ class IndexScorer(IndexLoader, CandidateGeneration):
                 )
             D_packed = torch.nn.functional.normalize(D_packed.to(torch.float32), p=2, dim=-1)
             D_mask = self.doclens[pids.long()]
+        timer.lap("decompression")
 
         if Q.size(0) == 1:
             return colbert_score_packed(Q, D_packed, D_mask, config), pids
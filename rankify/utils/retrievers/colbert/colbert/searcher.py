@@ -68,32 +68,53 @@ class Searcher:
         Q = self.encode(text, full_length_search=full_length_search)
         return self.dense_search(Q, k, filter_fn=filter_fn, pids=pids)
 
-    def search_all(self, queries: TextQueries, k=10, filter_fn=None, full_length_search=False, qid_to_pids=None):
+    def search_all(self, queries: TextQueries, k=10, filter_fn=None, full_length_search=False, qid_to_pids=None,
+                   timings=None):
+        """
+            Search a batch of queries: one batched encoding pass, centroid scores for several queries per
+            matrix product, then per-query candidate filtering, decompression and scoring.
+            `timings` (dict) accumulates seconds per stage: encode, candidate_generation,
+            centroid_filtering, decompression, scoring.
+        """
         queries = Queries.cast(queries)
         queries_ = list(queries.values())
 
+        start = time.perf_counter()
         Q = self.encode(queries_, full_length_search=full_length_search)
+        if timings is not None:
+            timings["encode"] = timings.get("encode", 0.0) + time.perf_counter() - start
 
-        return self._search_all_Q(queries, Q, k, filter_fn=filter_fn, qid_to_pids=qid_to_pids)
+        return self._search_all_Q(queries, Q, k, filter_fn=filter_fn, qid_to_pids=qid_to_pids, timings=timings)
 
-    def _search_all_Q(self, queries, Q, k, filter_fn=None, qid_to_pids=None):
+    def _search_all_Q(self, queries, Q, k, filter_fn=None, qid_to_pids=None, timings=None):
         qids = list(queries.keys())
 
         if qid_to_pids is None:
             qid_to_pids = {qid: None for qid in qids}
 
-        all_scored_pids = [
-            list(
-                zip(
-                    *self.dense_search(
-                        Q[query_idx:query_idx+1],
-                        k, filter_fn=filter_fn,
-                        pids=qid_to_pids[qid]
-                    )
+        self.configure_for_k(k)
+        # Bound the (batch, num_centroids, query_maxlen) centroid scores to ~256MB of float32
+        num_centroids = self.ranker.codec.centroids.size(0)
+        bsize = max(1, 2 ** 26 // (num_centroids * self.config.query_maxlen))
+
+        all_scored_pids = []
+        for offset in tqdm(range(0, len(qids), bsize), disable=self.verbose < 2):
+            Q_batch = Q[offset:offset+bsize]
+            centroid_scores = None
+            if any(qid_to_pids[qid] is None for qid in qids[offset:offset+bsize]):
+                start = time.perf_counter()
+                with torch.inference_mode():
+                    centroid_scores = self.ranker.centroid_scores_batch(self.config, Q_batch)
+                if timings is not None:
+                    timings["candidate_generation"] = (timings.get("candidate_generation", 0.0)
+                                                       + time.perf_counter() - start)
+            for query_idx, qid in enumerate(qids[offset:offset+bsize]):
+                pids, scores = self.ranker.rank(
+                    self.config, Q_batch[query_idx:query_idx+1], filter_fn=filter_fn, pids=qid_to_pids[qid],
+                    centroid_scores=None if centroid_scores is None else centroid_scores[query_idx],
+                    timings=timings,
                 )
-            )
-            for query_idx, qid in tqdm(enumerate(qids))
-        ]
+                all_scored_pids.append(list(zip(pids[:k], range(1, k+1), scores[:k])))
 
         data = {qid: val for qid, val in zip(queries.keys(), all_scored_pids)}
 
@@ -105,7 +126,8 @@ class Searcher:
 
         return Ranking(data=data, provenance=provenance)
 
-    def dense_search(self, Q: torch.Tensor, k=10, filter_fn=None, pids=None):
+    def configure_for_k(self, k):
+        """Fill in the PLAID search settings (ncells, centroid_score_threshold, ndocs) left unset for depth k."""
         if k <= 10:
             if self.config.ncells is None:
                 self.configure(ncells=1)
@@ -128,6 +150,9 @@ class Searcher:
             if self.config.ndocs is None:
                 self.configure(ndocs=max(k * 4, 4096))
 
+    def dense_search(self, Q: torch.Tensor, k=10, filter_fn=None, pids=None):
+        self.configure_for_k(k)
+
         pids, scores = self.ranker.rank(self.config, Q, filter_fn=filter_fn, pids=pids)
 
         return pids[:k], list(range(1, k+1)), scores[:k]
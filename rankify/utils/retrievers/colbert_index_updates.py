@@ -0,0 +1,285 @@
+"""
+Incremental updates of custom ColBERT (PLAID) indexes built by ``ColBERTIndexer``.
+
+A custom index keeps, next to the PLAID files, three files keyed by ColBERT's passage ids (pids):
+
+    collection.tsv     # pid<TAB>text<TAB>title, line i holds pid i (line 0 is the header)
+    passages.tsv       # original id<TAB>text<TAB>title, read by ColBERTRetriever
+    id_mapping.json    # original_to_sequential / sequential_to_original
+
+The vendored ``IndexUpdater`` adds passages to and removes passages from a loaded ``Searcher`` and
+persists the change to the PLAID files. New passages get the next pids and are compressed with the
+index's existing centroids; removed passages are dropped from the IVF, so they are never candidates
+again, and their pids stay reserved (zero-length) until :func:`compact_index` renumbers the index.
+:class:`ColBERTIndexEditor` wraps an ``IndexUpdater`` and keeps the three files above in step with
+the pids. Adding a passage whose id is already indexed replaces it.
+
+The centroids are not retrained, so after large shifts in the corpus a full rebuild gives better
+candidate generation than any number of updates.
+
+Example:
+    ```python
+    editor = ColBERTIndexEditor(searcher)
+    editor.remove(["doc17"])
+    editor.add([("doc42", "Paris is the capital of France.", "Paris")])
+    editor.persist()
+    compact_index(searcher.index)  # after a reload, or before the next Searcher is created
+    ```
+"""
+
+import csv
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import torch
+import ujson
+
+from rankify.utils.retrievers.colbert.colbert.index_updater import IndexUpdater
+
+
+def clean_tsv_field(field: str) -> str:
+    """Clean field for TSV format by removing problematic characters."""
+    if not field:
+        return ""
+
+    # Replace tabs, newlines, and carriage returns with spaces
+    field = field.replace('\t', ' ').replace('\n', ' ').replace('\r', ' ')
+
+    # Remove multiple spaces
+    field = ' '.join(field.split())
+
+    # Truncate if too long (prevent memory issues)
+    if len(field) > 10000:
+        field = field[:10000] + "..."
+
+    return field
+
+
+def passage_record(doc: Dict, default_id: str) -> Tuple[str, str, str]:
+    """``(original_id, text, title)`` of a corpus document as ``ColBERTIndexer`` indexes it; ``text`` may be empty."""
+    original_id = doc.get("id", default_id)
+    text = doc.get("contents", doc.get("text", doc.get("passage", ""))).strip()
+    title = doc.get("title", "").strip()
+    return original_id, clean_tsv_field(text), clean_tsv_field(title)
+
+
+def load_id_mappings(index_path: str) -> Dict[str, Dict]:
+    """The index's id mappings, with integer keys for ``sequential_to_original``."""
+    with open(os.path.join(index_path, "id_mapping.json"), "r", encoding="utf-8") as f:
+        mappings = json.load(f)
+    return {
+        "sequential_to_original": {int(k): v for k, v in mappings.get("sequential_to_original", {}).items()},
+        "original_to_sequential": mappings.get("original_to_sequential", {}),
+    }
+
+
+def _save_id_mappings(index_path: str, id_mappings: Dict[str, Dict]):
+    path = os.path.join(index_path, "id_mapping.json")
+    with open(path, "r", encoding="utf-8") as f:
+        mappings = json.load(f)  # keeps encoder_name, index_type, ...
+    mappings["original_to_sequential"] = id_mappings["original_to_sequential"]
+    mappings["sequential_to_original"] = {str(k): v for k, v in sorted(id_mappings["sequential_to_original"].items())}
+    mappings["total_documents"] = len(id_mappings["original_to_sequential"])
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(mappings, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+class ColBERTIndexEditor:
+    """
+    Live adds and removals on a ``Searcher`` over a custom ColBERT index.
+
+    Changes are visible to ``searcher`` immediately and written to disk by :meth:`persist`.
+
+    Attributes:
+        searcher: The ColBERT ``Searcher`` being updated (loaded without memory mapping).
+        id_mappings (dict): ``sequential_to_original`` / ``original_to_sequential``, updated in place.
+        passages (dict): ``{original_id: {"text", "title"}}`` of the passages added through this editor.
+        timings (dict): Seconds spent in ``add``, ``remove`` and ``persist``.
+    """
+
+    def __init__(self, searcher, id_mappings: Optional[Dict[str, Dict]] = None):
+        if searcher.ranker.load_index_with_mmap:
+            raise ValueError("A memory-mapped ColBERT index cannot be updated; load it with load_index_with_mmap=False.")
+        self.searcher = searcher
+        self.index_path = searcher.index
+        self.id_mappings = id_mappings if id_mappings is not None else load_id_mappings(self.index_path)
+        self.updater = IndexUpdater(searcher.config, searcher, searcher.checkpoint)
+        self.passages = {}
+        self.timings = {}
+        self._added = []           # (pid, original_id, text, title) not yet persisted
+        self._removed_ids = set()  # original ids removed since the last persist
+
+    @property
+    def has_pending_changes(self) -> bool:
+        return bool(self._added or self._removed_ids)
+
+    def _time(self, stage: str, start: float):
+        self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def add(self, records: Iterable[Tuple[str, str, str]]) -> List[int]:
+        """
+        Encodes and adds ``(original_id, text, title)`` records; returns their pids.
+
+        Records whose id is already indexed replace the indexed passage; of repeated ids in
+        ``records`` the last one is kept.
+        """
+        start = time.perf_counter()
+        records = list({str(record[0]): record for record in records}.values())
+        if not records:
+            return []
+        self.remove([original_id for original_id, _, _ in records
+                     if str(original_id) in self.id_mappings["original_to_sequential"]])
+
+        # Passages are encoded as ColBERT's collection loader presents them: "title | text"
+        texts = [f"{title} | {text}" for _, text, title in records]
+        assert len(self.searcher.ranker.doclens) == len(self.searcher.collection), "collection out of sync with index"
+        pids = self.updater.add(texts)
+        self.searcher.collection.data.extend(texts)
+
+        for pid, (original_id, text, title) in zip(pids, records):
+            self.id_mappings["original_to_sequential"][str(original_id)] = pid
+            self.id_mappings["sequential_to_original"][pid] = original_id
+            self.passages[str(original_id)] = {"text": text, "title": title}
+            self._added.append((pid, original_id, text, title))
+        self._time("add", start)
+        return pids
+
+    def remove(self, original_ids: Iterable[str]) -> List[str]:
+        """Removes passages by original id; returns the ids that were indexed (unknown ids are skipped)."""
+        start = time.perf_counter()
+        original_to_sequential = self.id_mappings["original_to_sequential"]
+        original_ids = list(dict.fromkeys(str(original_id) for original_id in original_ids))
+        found = [original_id for original_id in original_ids if original_id in original_to_sequential]
+        if len(found) < len(original_ids):
+            print(f"Warning: {len(original_ids) - len(found)} passage ids to remove are not in the index")
+        if not found:
+            return []
+
+        self.updater.remove([original_to_sequential[original_id] for original_id in found])
+        for original_id in found:
+            pid = original_to_sequential.pop(original_id)
+            del self.id_mappings["sequential_to_original"][pid]
+            self.passages.pop(original_id, None)
+            self._removed_ids.add(original_id)
+        self._time("remove", start)
+        return found
+
+    def persist(self):
+        """Writes the pending changes to the PLAID files, collection.tsv, passages.tsv and id_mapping.json."""
+        if not self.has_pending_changes:
+            return
+        start = time.perf_counter()
+        self.updater.persist_to_disk()
+
+        # collection.tsv: line i must stay pid i, so rows of removed passages stay until compaction
+        with open(os.path.join(self.index_path, "collection.tsv"), "a", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter='\t')
+            for pid, _, text, title in self._added:
+                writer.writerow([pid, text, title])
+
+        passages_path = os.path.join(self.index_path, "passages.tsv")
+        alive = self.id_mappings["original_to_sequential"]
+        new_rows = [[original_id, text, title] for pid, original_id, text, title in self._added
+                    if alive.get(str(original_id)) == pid]
+        if self._removed_ids:
+            with open(passages_path, "r", encoding="utf-8", newline="") as infile, \
+                 open(passages_path + ".tmp", "w", encoding="utf-8", newline="") as outfile:
+                writer = csv.writer(outfile, delimiter='\t')
+                for line_idx, row in enumerate(csv.reader(infile, delimiter='\t')):
+                    if line_idx == 0 or row[0] not in self._removed_ids:
+                        writer.writerow(row)
+                writer.writerows(new_rows)
+            os.replace(passages_path + ".tmp", passages_path)
+        else:
+            with open(passages_path, "a", encoding="utf-8", newline="") as f:
+                csv.writer(f, delimiter='\t').writerows(new_rows)
+
+        _save_id_mappings(self.index_path, self.id_mappings)
+
+        title_map_path = os.path.join(self.index_path, "title_map.json")
+        if os.path.exists(title_map_path):
+            with open(title_map_path, "r", encoding="utf-8") as f:
+                title_map = json.load(f)
+            for original_id in self._removed_ids:
+                title_map.pop(original_id, None)
+            for original_id, text, title in new_rows:
+                title_map[str(original_id)] = (title or text or "No Title")[:100]
+            with open(title_map_path, "w", encoding="utf-8") as f:
+                json.dump(title_map, f, ensure_ascii=False, indent=2)
+
+        print(f"Persisted {len(self._added)} added and {len(self._removed_ids)} removed passages "
+              f"to {self.index_path}")
+        self._added = []
+        self._removed_ids = set()
+        self._time("persist", start)
+
+
+def compact_index(index_path: str) -> Dict[str, int]:
+    """
+    Drops the pids of removed passages from a persisted custom index and renumbers the rest.
+
+    Codes and residuals are not rewritten (removed passages' embeddings are already deleted by the
+    updater); the IVF, doclens, chunk metadata, collection.tsv and id_mapping.json are. Searchers
+    loaded before compaction must be reloaded. Returns the number of passages kept and dropped.
+    """
+    with open(os.path.join(index_path, "metadata.json")) as f:
+        metadata = ujson.load(f)
+    id_mappings = load_id_mappings(index_path)
+
+    doclens = []
+    for chunk_idx in range(metadata["num_chunks"]):
+        with open(os.path.join(index_path, f"doclens.{chunk_idx}.json")) as f:
+            doclens.append(torch.tensor(ujson.load(f), dtype=torch.long))
+    num_pids = sum(len(chunk_doclens) for chunk_doclens in doclens)
+
+    keep = torch.zeros(num_pids, dtype=torch.bool)
+    keep[0] = True  # the collection's header line, indexed as pid 0
+    keep[list(id_mappings["sequential_to_original"])] = True
+    num_removed = num_pids - int(keep.sum())
+    if num_removed == 0:
+        return {"passages": num_pids - 1, "removed": 0}
+    if torch.cat(doclens)[~keep].any():
+        raise ValueError(f"Index {index_path} has unmapped passages with embeddings; persist pending updates first.")
+    old_to_new = torch.cumsum(keep, dim=0) - 1
+
+    ivf, ivf_lengths = torch.load(os.path.join(index_path, "ivf.pid.pt"), map_location="cpu")
+    assert keep[ivf.long()].all(), "IVF references removed passages"
+    torch.save((old_to_new[ivf.long()].to(ivf.dtype), ivf_lengths), os.path.join(index_path, "ivf.pid.pt"))
+
+    passage_offset = 0
+    for chunk_idx, chunk_doclens in enumerate(doclens):
+        chunk_keep = keep[passage_offset:passage_offset + len(chunk_doclens)]
+        with open(os.path.join(index_path, f"doclens.{chunk_idx}.json"), "w") as f:
+            ujson.dump(chunk_doclens[chunk_keep].tolist(), f)
+        with open(os.path.join(index_path, f"{chunk_idx}.metadata.json")) as f:
+            chunk_metadata = ujson.load(f)
+        chunk_metadata["passage_offset"] = int(keep[:passage_offset].sum())
+        chunk_metadata["num_passages"] = int(chunk_keep.sum())
+        with open(os.path.join(index_path, f"{chunk_idx}.metadata.json"), "w") as f:
+            ujson.dump(chunk_metadata, f, indent=4)
+        passage_offset += len(chunk_doclens)
+
+    metadata["avg_doclen"] = metadata["num_embeddings"] / int(keep.sum())
+    with open(os.path.join(index_path, "metadata.json"), "w") as f:
+        ujson.dump(metadata, f, indent=4)
+
+    collection_path = os.path.join(index_path, "collection.tsv")
+    with open(collection_path, "r", encoding="utf-8", newline="") as infile, \
+         open(collection_path + ".tmp", "w", encoding="utf-8", newline="") as outfile:
+        writer = csv.writer(outfile, delimiter='\t')
+        for pid, row in enumerate(csv.reader(infile, delimiter='\t')):
+            if keep[pid]:
+                writer.writerow(row if pid == 0 else [int(old_to_new[pid])] + row[1:])
+    os.replace(collection_path + ".tmp", collection_path)
+
+    renumbered = {int(old_to_new[pid]): original_id
+                  for pid, original_id in id_mappings["sequential_to_original"].items()}
+    _save_id_mappings(index_path, {
+        "sequential_to_original": renumbered,
+        "original_to_sequential": {str(original_id): pid for pid, original_id in renumbered.items()},
+    })
+    print(f"Compacted {index_path}: {num_removed} removed passages dropped, {int(keep.sum()) - 1} kept")
+    return {"passages": int(keep.sum()) - 1, "removed": num_removed}
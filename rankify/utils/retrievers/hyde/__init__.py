@@ -1,2 +1,3 @@
 from .generator import OpenAIGenerator, CohereGenerator
 from .promptor import Promptor
+from .embedding import average_by_group, hyde_query_vectors
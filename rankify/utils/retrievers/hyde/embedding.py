@@ -0,0 +1,56 @@
+"""
+Batched HyDE query vectors.
+
+A HyDE query vector is the mean embedding of the prompt and the hypothetical documents generated
+for it. Rather than one encoder call per string, all strings of a batch of questions are embedded
+together, in length order so that each padded batch holds strings of similar length, and the
+per-question means are taken with one ``np.add.reduceat``.
+"""
+
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+
+def average_by_group(embeddings: np.ndarray, counts: Sequence[int]) -> np.ndarray:
+    """
+    Means of consecutive row groups: rows ``0:counts[0]`` form the first group, and so on.
+
+    Args:
+        embeddings (np.ndarray): ``(sum(counts), dim)`` array.
+        counts (Sequence[int]): Number of rows in each group; every group must be non-empty.
+
+    Returns:
+        np.ndarray: ``(len(counts), dim)`` array of group means.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    if len(counts) and counts.min() < 1:
+        raise ValueError("Every group needs at least one embedding")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return np.add.reduceat(embeddings, starts, axis=0) / counts[:, None].astype(embeddings.dtype)
+
+
+def hyde_query_vectors(embed: Callable[[List[str]], np.ndarray], prompts: Sequence[str],
+                       hypotheses: Sequence[Sequence[str]]) -> np.ndarray:
+    """
+    Embeds every prompt with its hypothetical documents and averages them per question.
+
+    Args:
+        embed (Callable[[List[str]], np.ndarray]): Batch encoder, e.g. ``ContrieverRetriever._embed_queries``.
+        prompts (Sequence[str]): One prompt per question.
+        hypotheses (Sequence[Sequence[str]]): Generated documents for each question.
+
+    Returns:
+        np.ndarray: ``(len(prompts), dim)`` query vectors.
+    """
+    texts, counts = [], []
+    for prompt, documents in zip(prompts, hypotheses):
+        texts.append(prompt)
+        texts.extend(documents)
+        counts.append(1 + len(documents))
+    # Sort by length so that padding stays small, then put the embeddings back in place
+    order = np.argsort([len(text) for text in texts], kind="stable")
+    embedded = embed([texts[i] for i in order])
+    embeddings = np.empty_like(embedded)
+    embeddings[order] = embedded
+    return average_by_group(embeddings, counts)
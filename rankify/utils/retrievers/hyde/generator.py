@@ -1,6 +1,16 @@
+import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import openai
-import cohere
+
+from rankify.utils.api.async_client import get_api_client
+
+try:
+    import cohere
+    COHERE_AVAILABLE = True
+except ImportError:
+    COHERE_AVAILABLE = False
 
 class Generator:
     def __init__(self, model_name, api_key):
@@ -10,6 +20,17 @@ class Generator:
     def generate(self):
         return ""
 
+    def generate_batch(self, prompts, max_workers=8):
+        """
+        Calls ``generate`` for every prompt with up to ``max_workers`` requests in flight and
+        returns the results in prompt order. Generation is I/O bound (API calls), so threads
+        overlap the request latencies.
+        """
+        if max_workers <= 1 or len(prompts) <= 1:
+            return [self.generate(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as executor:
+            return list(executor.map(self.generate, prompts))
+
 
 class OpenAIGenerator(Generator):
     def __init__(self, model_name, api_key, base_url=None, n=8, max_tokens=512, temperature=0.7, top_p=1, frequency_penalty=0.0, presence_penalty=0.0, stop=['\n\n\n'], wait_till_success=False):
@@ -56,13 +77,26 @@ class OpenAIGenerator(Generator):
             base_url=self.base_url,
             api_key=self.api_key,
         )
-        self.client
+        # Requests go through the provider's shared client, which rate limits and retries them
+        self.async_client = openai.AsyncOpenAI(base_url=self.base_url, api_key=self.api_key, max_retries=0)
+        self.api = get_api_client(str(self.async_client.base_url))
 
     def generate(self, prompt):
+        return self.api.run(self._generate(prompt))
+
+    def generate_batch(self, prompts, max_workers=8):
+        """
+        Requests all prompts concurrently through the provider's shared client; its
+        ``max_concurrency`` bounds the requests in flight, so ``max_workers`` is not used.
+        """
+        return self.api.map(self._generate, prompts)
+
+    async def _generate(self, prompt):
         get_results = False
         while not get_results:
             try:
-                result = self.client.chat.completions.create(
+                result = await self.api.call(
+                    self.async_client.chat.completions.create,
                     messages=[{"role":"user", "content": prompt}],
                     model=self.model_name,
                     max_completion_tokens=self.max_tokens,
@@ -77,7 +111,7 @@ class OpenAIGenerator(Generator):
                 get_results = True
             except Exception as e:
                 if self.wait_till_success:
-                    time.sleep(1)
+                    await asyncio.sleep(1)
                 else:
                     raise e
         return self.parse_response(result)
@@ -86,6 +120,8 @@ class OpenAIGenerator(Generator):
 class CohereGenerator(Generator):
     def __init__(self, model_name, api_key, n=8, max_tokens=512, temperature=0.7, p=1, frequency_penalty=0.0, presence_penalty=0.0, stop=['\n\n\n'], wait_till_success=False):
         super().__init__(model_name, api_key)
+        if not COHERE_AVAILABLE:
+            raise ImportError("CohereGenerator requires the cohere package: pip install cohere")
         self.cohere = cohere.Cohere(self.api_key)
         self.n = n
         self.max_tokens = max_tokens
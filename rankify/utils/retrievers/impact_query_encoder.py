@@ -0,0 +1,121 @@
+"""
+Batched query encoding for the learned sparse (impact) retrievers, SPLADE and uniCOIL.
+
+Pyserini's ``SpladeQueryEncoder`` / ``UniCoilQueryEncoder`` encode one query per forward pass, and
+``LuceneImpactSearcher.search`` / ``batch_search`` call ``query_encoder.encode(query)`` for every
+query. :class:`BatchedImpactQueryEncoder` wraps such an encoder and is handed to the searcher in
+its place: :meth:`~BatchedImpactQueryEncoder.prefetch` encodes a whole batch of queries in padded,
+length-bucketed forward passes, and the searcher's ``encode`` calls are then served from memory, so
+the searcher's own conversion of the term weights and its multi-threaded ``batch_search`` are used
+unchanged.
+
+Example:
+    ```python
+    encoder = BatchedImpactQueryEncoder(SpladeQueryEncoder("naver/splade-cocondenser-ensembledistil"))
+    searcher = LuceneImpactSearcher.from_prebuilt_index("msmarco-v1-passage.splade-pp-ed", encoder)
+    encoder.prefetch(queries)
+    hits = searcher.batch_search(queries, qids, k=100, threads=16)
+    ```
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+
+
+class BatchedImpactQueryEncoder:
+    """
+    Batched, caching front of a pyserini SPLADE or uniCOIL query encoder.
+
+    Attributes:
+        encoder: The wrapped pyserini query encoder.
+        batch_size (int): Queries per forward pass.
+        max_length (int): Query truncation length, as in the wrapped encoder (SPLADE 256, uniCOIL 128).
+        cache_size (int): Encoded queries kept across batches, least recently used evicted first
+            (0: only the current batch).
+    """
+
+    def __init__(self, encoder, batch_size: int = 32, max_length: Optional[int] = None, cache_size: int = 100_000):
+        self.encoder = encoder
+        # SpladeQueryEncoder maps vocabulary ids back to tokens; UniCoilQueryEncoder does not
+        self.is_splade = hasattr(encoder, "reverse_voc")
+        self.batch_size = batch_size
+        self.max_length = max_length or (256 if self.is_splade else 128)
+        self.cache_size = cache_size
+        self._pending: Dict[str, Dict[str, float]] = {}
+        self._cache: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+    def __getattr__(self, name):
+        # Anything else the searcher asks of its encoder (tokenizer, device, ...)
+        if name == "encoder":
+            raise AttributeError(name)
+        return getattr(self.encoder, name)
+
+    def encode(self, text: str, **kwargs) -> Dict[str, float]:
+        """Term weights of one query, as the wrapped encoder's ``encode`` returns them."""
+        weights = self._pending.get(text)
+        if weights is None:
+            weights = self._cache.get(text)
+            if weights is not None:
+                self._cache.move_to_end(text)
+        if weights is None:
+            weights = self.encode_batch([text])[0]
+        return weights
+
+    def prefetch(self, texts: List[str]) -> None:
+        """Encodes ``texts`` in batches so the searcher's following ``encode`` calls are lookups."""
+        self._pending = dict(zip(texts, self.encode_batch(texts)))
+
+    @torch.no_grad()
+    def encode_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Term weights of every text, encoding each distinct uncached text once.
+
+        Texts are sorted by token length and padded per batch, so a batch holds queries of similar
+        length and little compute goes to padding.
+        """
+        # Cache hits are taken (and marked recently used) before new entries can evict them
+        cached: Dict[str, Dict[str, float]] = {}
+        for text in texts:
+            if text in self._cache and text not in cached:
+                cached[text] = self._cache[text]
+                self._cache.move_to_end(text)
+        todo = list(dict.fromkeys(t for t in texts if t not in cached and t not in self._pending))
+        encoded: Dict[str, Dict[str, float]] = {}
+        if todo:
+            tokenizer = self.encoder.tokenizer
+            input_ids = tokenizer(todo, max_length=self.max_length, truncation=True,
+                                  add_special_tokens=True)["input_ids"]
+            order = np.argsort([len(ids) for ids in input_ids], kind="stable")
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                padded = tokenizer.pad({"input_ids": [input_ids[i] for i in batch]}, return_tensors="pt")
+                for i, weights in zip(batch, self._encode_padded(padded["input_ids"], padded["attention_mask"])):
+                    encoded[todo[i]] = weights
+            if self.cache_size:
+                self._cache.update(encoded)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        results = []
+        for text in texts:
+            weights = encoded.get(text)
+            if weights is None:
+                weights = self._pending.get(text)
+            results.append(weights if weights is not None else cached[text])
+        return results
+
+    def _encode_padded(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> List[Dict[str, float]]:
+        # Same computation as the wrapped encoder's encode(), with padding masked out; its own
+        # helpers turn the outputs into term weights so the format matches exactly
+        encoder = self.encoder
+        input_ids = input_ids.to(encoder.device)
+        attention_mask = attention_mask.to(encoder.device)
+        if self.is_splade:
+            logits = encoder.model(input_ids=input_ids, attention_mask=attention_mask)["logits"]
+            aggregated, _ = torch.max(torch.log(1 + torch.relu(logits)) * attention_mask.unsqueeze(-1), dim=1)
+            raw_weights = encoder._output_to_weight_dicts(aggregated.float().cpu().numpy())
+            return encoder._get_encoded_query_token_wight_dicts(raw_weights)
+        weights = encoder.model(input_ids, attention_mask=attention_mask).float().cpu().numpy()
+        return encoder._output_to_weight_dicts(input_ids.cpu().numpy(), weights)
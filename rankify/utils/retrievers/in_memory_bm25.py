@@ -0,0 +1,209 @@
+"""
+In-memory BM25 for small, per-query collections (e.g. chunked web pages).
+
+``OnlineRetriever`` used to write every question's chunks to disk, build a Lucene index in a
+``python -m pyserini.index.lucene`` subprocess and open a ``LuceneSearcher`` to rank ~50 chunks.
+This module scores the chunks directly and reproduces Pyserini's defaults:
+
+* analysis as in Anserini's ``DefaultEnglishAnalyzer``: standard tokenization, lower-casing,
+  possessive removal, Lucene's English stop words and the Porter stemmer,
+* Lucene's ``BM25Similarity`` with ``k1=0.9, b=0.4``, including the lossy one-byte encoding of
+  document lengths in the norms,
+* query terms weighted by their count in the query (Pyserini's bag-of-words query generator),
+* ties ranked in collection order.
+
+Tokenization approximates Lucene's UAX#29 ``StandardTokenizer`` with a regular expression (runs
+of letters / digits joined by inner apostrophes and periods); rankings on ordinary English text
+match the Lucene path.
+
+Several collections can be scored in one call: every (question, collection) pair keeps its own
+statistics, and all pairs are scored with one sparse matrix product.
+
+Example:
+    ```python
+    from rankify.utils.retrievers.in_memory_bm25 import InMemoryBM25
+
+    bm25 = InMemoryBM25()
+    hits = bm25.search("what is the capital of france", ["Paris is the capital of France.", "Berlin ..."], k=5)
+    # [(0, 0.53)] -- (passage index, score); passages sharing no term with the query are dropped
+    ```
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from rankify.utils.retrievers.porter_stemmer import PorterStemmer
+
+# org.apache.lucene.analysis.en.EnglishAnalyzer.ENGLISH_STOP_WORDS_SET
+LUCENE_ENGLISH_STOP_WORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into", "is", "it",
+    "no", "not", "of", "on", "or", "such", "that", "the", "their", "then", "there", "these", "they",
+    "this", "to", "was", "will", "with",
+])
+
+_TOKEN_PATTERN = re.compile(r"\w+(?:['’.]\w+)*")
+_MAX_TOKEN_LENGTH = 255
+
+
+def _int4_to_long(i: int) -> int:
+    bits = i & 0x07
+    shift = (i >> 3) - 1
+    return bits if shift == -1 else (bits | 0x08) << shift
+
+
+def _long_to_int4(i: int) -> int:
+    num_bits = i.bit_length()
+    if num_bits < 4:
+        return i
+    shift = num_bits - 4
+    return ((i >> shift) & 0x07) | ((shift + 1) << 3)
+
+
+# org.apache.lucene.util.SmallFloat.intToByte4 / byte4ToInt
+_NUM_FREE_VALUES = 255 - _long_to_int4(2 ** 31 - 1)
+_LENGTH_TABLE = np.array(
+    [i if i < _NUM_FREE_VALUES else _NUM_FREE_VALUES + _int4_to_long(i - _NUM_FREE_VALUES) for i in range(256)],
+    dtype=np.float64,
+)
+
+
+def lucene_norm_length(lengths: np.ndarray) -> np.ndarray:
+    """
+    Returns document lengths as Lucene's BM25 sees them after encoding them into one-byte norms.
+    """
+    encoded = [n if n < _NUM_FREE_VALUES else _NUM_FREE_VALUES + _long_to_int4(n - _NUM_FREE_VALUES)
+               for n in np.asarray(lengths, dtype=np.int64).tolist()]
+    return _LENGTH_TABLE[np.asarray(encoded, dtype=np.int64)]
+
+
+class EnglishAnalyzer:
+    """
+    Tokenizes text like Anserini's ``DefaultEnglishAnalyzer`` (Porter stemming, stop words removed).
+    """
+
+    def __init__(self, stopwords: Optional[frozenset] = LUCENE_ENGLISH_STOP_WORDS, stem: bool = True):
+        self.stopwords = stopwords or frozenset()
+        self.stemmer = PorterStemmer() if stem else None
+
+    def analyze(self, text: str) -> List[str]:
+        terms = []
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            if len(token) > _MAX_TOKEN_LENGTH:
+                continue
+            if token.endswith(("'s", "’s")):
+                token = token[:-2]
+            if not token or token in self.stopwords:
+                continue
+            terms.append(self.stemmer.stem(token) if self.stemmer else token)
+        return terms
+
+
+class InMemoryBM25:
+    """
+    BM25 over small in-memory collections, scored like Pyserini's ``LuceneSearcher``.
+
+    Attributes:
+        k1 (float): Term frequency saturation (Pyserini default 0.9).
+        b (float): Length normalization (Pyserini default 0.4).
+        analyzer (EnglishAnalyzer): Tokenizer used for both passages and queries.
+    """
+
+    def __init__(self, k1: float = 0.9, b: float = 0.4, analyzer: Optional[EnglishAnalyzer] = None):
+        self.k1 = k1
+        self.b = b
+        self.analyzer = analyzer or EnglishAnalyzer()
+
+    def search_batch(self, queries: Sequence[str], collections: Sequence[Sequence[str]],
+                     k: int = 10) -> List[List[Tuple[int, float]]]:
+        """
+        Ranks each query against its own collection.
+
+        Args:
+            queries (Sequence[str]): One query per collection.
+            collections (Sequence[Sequence[str]]): Passages to rank for each query.
+            k (int): Number of hits to return per query.
+
+        Returns:
+            List[List[Tuple[int, float]]]: For every query, ``(passage index, score)`` pairs, best first.
+                Passages without any query term are not returned, as with Lucene.
+        """
+        if len(queries) != len(collections):
+            raise ValueError(f"Expected one collection per query, got {len(collections)} for {len(queries)} queries")
+
+        vocabulary = {}
+        rows, cols, tfs, doc_group = [], [], [], []
+        lengths = []
+        row = 0
+        for group, passages in enumerate(collections):
+            for passage in passages:
+                terms = self.analyzer.analyze(passage)
+                counts = {}
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                for term, tf in counts.items():
+                    rows.append(row)
+                    cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                    tfs.append(tf)
+                lengths.append(len(terms))
+                doc_group.append(group)
+                row += 1
+
+        query_rows, query_cols, query_counts = [], [], []
+        for group, query in enumerate(queries):
+            counts = {}
+            for term in self.analyzer.analyze(query):
+                if term in vocabulary:
+                    counts[vocabulary[term]] = counts.get(vocabulary[term], 0) + 1
+            query_rows.extend([group] * len(counts))
+            query_cols.extend(counts.keys())
+            query_counts.extend(counts.values())
+
+        n_groups, n_terms = len(queries), max(len(vocabulary), 1)
+        results: List[List[Tuple[int, float]]] = [[] for _ in range(n_groups)]
+        if row == 0 or not query_cols:
+            return results
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        tfs = np.asarray(tfs, dtype=np.float64)
+        doc_group = np.asarray(doc_group, dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+
+        # Per-collection statistics: documents with at least one term, total terms, document frequencies
+        indexed = lengths > 0
+        doc_count = np.bincount(doc_group, weights=indexed, minlength=n_groups)
+        total_terms = np.bincount(doc_group, weights=lengths, minlength=n_groups)
+        avgdl = total_terms / np.maximum(doc_count, 1)
+        entry_group = doc_group[rows]
+        df = sparse.csr_matrix((np.ones(len(rows)), (entry_group, cols)), shape=(n_groups, n_terms))
+        entry_df = np.asarray(df[entry_group, cols]).ravel()
+        idf = np.log1p((doc_count[entry_group] - entry_df + 0.5) / (entry_df + 0.5))
+
+        norm = self.k1 * ((1 - self.b) + self.b * lucene_norm_length(lengths) / np.maximum(avgdl[doc_group], 1e-12))
+        weights = idf * tfs / (tfs + norm[rows])
+        passage_terms = sparse.csr_matrix((weights, (rows, cols)), shape=(row, n_terms))
+
+        query_matrix = sparse.csr_matrix(
+            (np.asarray(query_counts, dtype=np.float64), (query_rows, query_cols)), shape=(n_groups, n_terms))
+        # Each passage is only scored against its own query: row-wise product with the query of its group
+        scores = np.asarray(passage_terms.multiply(query_matrix[doc_group]).sum(axis=1)).ravel()
+        # Every matching term adds a positive weight, so unmatched passages are exactly the zeros
+        matched = scores > 0
+        scores = scores.astype(np.float32)
+
+        starts = np.searchsorted(doc_group, np.arange(n_groups + 1))
+        for group in range(n_groups):
+            start, end = starts[group], starts[group + 1]
+            candidates = np.flatnonzero(matched[start:end])
+            order = candidates[np.argsort(-scores[start:end][candidates], kind="stable")][:k]
+            results[group] = [(int(i), float(scores[start + i])) for i in order]
+        return results
+
+    def search(self, query: str, passages: Sequence[str], k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Ranks ``passages`` for a single ``query``; see ``search_batch``.
+        """
+        return self.search_batch([query], [passages], k)[0]
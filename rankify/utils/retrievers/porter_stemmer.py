@@ -0,0 +1,224 @@
+"""
+Porter stemmer matching Lucene's ``PorterStemFilter``.
+
+A direct port of Martin Porter's reference implementation as shipped in Lucene
+(``org.apache.lucene.analysis.en.PorterStemmer``), including its two departures from the
+published algorithm (``-bli -> -ble`` and ``-logi -> -log``) and the rule that words of one or
+two letters are left alone. Used by the in-memory BM25 scorer so that its terms match the ones
+in Pyserini / Anserini Lucene indexes.
+
+Example:
+    ```python
+    from rankify.utils.retrievers.porter_stemmer import PorterStemmer
+
+    stemmer = PorterStemmer()
+    stemmer.stem("generalizations")  # 'gener'
+    ```
+"""
+
+from functools import lru_cache
+
+
+class PorterStemmer:
+    """
+    Stateless Porter stemmer. ``stem`` is cached, since web text repeats words heavily.
+    """
+
+    def stem(self, word: str) -> str:
+        return _stem(word)
+
+
+class _Word:
+    __slots__ = ("b", "k", "j")
+
+    def __init__(self, word: str):
+        self.b = list(word)
+        self.k = len(word) - 1
+        self.j = 0
+
+    def cons(self, i: int) -> bool:
+        ch = self.b[i]
+        if ch in "aeiou":
+            return False
+        if ch == "y":
+            return i == 0 or not self.cons(i - 1)
+        return True
+
+    def m(self) -> int:
+        # Number of consonant-vowel sequences in b[0..j]
+        n = 0
+        i = 0
+        j = self.j
+        while True:
+            if i > j:
+                return n
+            if not self.cons(i):
+                break
+            i += 1
+        i += 1
+        while True:
+            while True:
+                if i > j:
+                    return n
+                if self.cons(i):
+                    break
+                i += 1
+            i += 1
+            n += 1
+            while True:
+                if i > j:
+                    return n
+                if not self.cons(i):
+                    break
+                i += 1
+            i += 1
+
+    def vowel_in_stem(self) -> bool:
+        return any(not self.cons(i) for i in range(self.j + 1))
+
+    def double_c(self, j: int) -> bool:
+        return j >= 1 and self.b[j] == self.b[j - 1] and self.cons(j)
+
+    def cvc(self, i: int) -> bool:
+        if i < 2 or not self.cons(i) or self.cons(i - 1) or not self.cons(i - 2):
+            return False
+        return self.b[i] not in "wxy"
+
+    def ends(self, s: str) -> bool:
+        length = len(s)
+        if length > self.k + 1 or "".join(self.b[self.k - length + 1:self.k + 1]) != s:
+            return False
+        self.j = self.k - length
+        return True
+
+    def setto(self, s: str) -> None:
+        self.b[self.j + 1:] = list(s)
+        self.k = self.j + len(s)
+
+    def r(self, s: str) -> None:
+        if self.m() > 0:
+            self.setto(s)
+
+    def step1(self) -> None:
+        b = self.b
+        if b[self.k] == "s":
+            if self.ends("sses"):
+                self.k -= 2
+            elif self.ends("ies"):
+                self.setto("i")
+            elif b[self.k - 1] != "s":
+                self.k -= 1
+            del b[self.k + 1:]
+        if self.ends("eed"):
+            if self.m() > 0:
+                self.k -= 1
+        elif (self.ends("ed") or self.ends("ing")) and self.vowel_in_stem():
+            self.k = self.j
+            del b[self.k + 1:]
+            if self.ends("at"):
+                self.setto("ate")
+            elif self.ends("bl"):
+                self.setto("ble")
+            elif self.ends("iz"):
+                self.setto("ize")
+            elif self.double_c(self.k):
+                self.k -= 1
+                if b[self.k] in "lsz":
+                    self.k += 1
+            elif self.m() == 1 and self.cvc(self.k):
+                self.setto("e")
+        del b[self.k + 1:]
+
+    def step2(self) -> None:
+        if self.ends("y") and self.vowel_in_stem():
+            self.b[self.k] = "i"
+
+    def _replace_first(self, rules) -> None:
+        for suffix, replacement in rules:
+            if self.ends(suffix):
+                self.r(replacement)
+                break
+        del self.b[self.k + 1:]
+
+    def step3(self) -> None:
+        if self.k == 0:
+            return
+        self._replace_first(_STEP3_RULES.get(self.b[self.k - 1], ()))
+
+    def step4(self) -> None:
+        self._replace_first(_STEP4_RULES.get(self.b[self.k], ()))
+
+    def step5(self) -> None:
+        if self.k == 0:
+            return
+        suffixes = _STEP5_SUFFIXES.get(self.b[self.k - 1])
+        if suffixes is None:
+            return
+        for suffix in suffixes:
+            if self.ends(suffix):
+                if suffix == "ion" and not (self.j >= 0 and self.b[self.j] in "st"):
+                    continue
+                break
+        else:
+            return
+        if self.m() > 1:
+            self.k = self.j
+            del self.b[self.k + 1:]
+
+    def step6(self) -> None:
+        self.j = self.k
+        if self.b[self.k] == "e":
+            a = self.m()
+            if a > 1 or (a == 1 and not self.cvc(self.k - 1)):
+                self.k -= 1
+        if self.b[self.k] == "l" and self.double_c(self.k) and self.m() > 1:
+            self.k -= 1
+        del self.b[self.k + 1:]
+
+
+_STEP3_RULES = {
+    "a": (("ational", "ate"), ("tional", "tion")),
+    "c": (("enci", "ence"), ("anci", "ance")),
+    "e": (("izer", "ize"),),
+    "l": (("bli", "ble"), ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous")),
+    "o": (("ization", "ize"), ("ation", "ate"), ("ator", "ate")),
+    "s": (("alism", "al"), ("iveness", "ive"), ("fulness", "ful"), ("ousness", "ous")),
+    "t": (("aliti", "al"), ("iviti", "ive"), ("biliti", "ble")),
+    "g": (("logi", "log"),),
+}
+
+_STEP4_RULES = {
+    "e": (("icate", "ic"), ("ative", ""), ("alize", "al")),
+    "i": (("iciti", "ic"),),
+    "l": (("ical", "ic"), ("ful", "")),
+    "s": (("ness", ""),),
+}
+
+_STEP5_SUFFIXES = {
+    "a": ("al",),
+    "c": ("ance", "ence"),
+    "e": ("er",),
+    "i": ("ic",),
+    "l": ("able", "ible"),
+    "n": ("ant", "ement", "ment", "ent"),
+    "o": ("ion", "ou"),
+    "s": ("ism",),
+    "t": ("ate", "iti"),
+    "u": ("ous",),
+    "v": ("ive",),
+    "z": ("ize",),
+}
+
+
+@lru_cache(maxsize=1 << 16)
+def _stem(word: str) -> str:
+    if len(word) <= 2:
+        return word
+    w = _Word(word)
+    w.step1()
+    w.step2()
+    w.step3()
+    w.step4()
+    w.step5()
+    w.step6()
+    return "".join(w.b[:w.k + 1])
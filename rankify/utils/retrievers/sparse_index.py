@@ -0,0 +1,291 @@
+"""
+Native learned-sparse (SPLADE) index: NumPy/SciPy posting lists, no JVM.
+
+``SpladeV2Retriever`` searches Pyserini's ``LuceneImpactSearcher``, which needs a Java runtime
+and a prebuilt Lucene impact index. ``SparseIndex`` keeps the SPLADE document vectors of a
+custom corpus as an inverted index, saved as ``.npy`` files and opened memory-mapped:
+
+* ``postings``: a ``(vocab, docs)`` CSR matrix (the CSC layout of the document vectors), one
+  posting list of (document, weight) per term, sorted by document. Exhaustive search scores a
+  batch of queries with one sparse matrix product ``queries @ postings``.
+* ``block_max``: documents are grouped into blocks of ``block_size`` consecutive rows, and
+  ``block_max[t, b]`` is the largest weight of term ``t`` in block ``b``, stored with the offset
+  of the block's first posting in ``t``'s list. ``queries @ block_max`` bounds the score of every
+  document of a block, so block-max search scores blocks from the highest bound down, reading
+  only their slices of the query terms' posting lists, and stops once no remaining block can
+  beat the current k-th score (block-max pruning, Mallia et al., SIGIR 2024). With ``alpha=1``
+  the result is the exact top-k; ``alpha < 1`` stops earlier and trades recall for latency.
+
+Documents are encoded with the SPLADE models of ``splade/models/transformer_rep.py``
+(``encode_sparse``); scores are plain dot products of float weights, without the integer
+quantization of the Lucene impact indexes.
+
+Example:
+    ```python
+    from rankify.utils.retrievers.sparse_index import SparseIndex, encode_sparse, load_splade
+
+    model = load_splade("naver/splade-cocondenser-ensembledistil")
+    index = SparseIndex.build(encode_sparse(model, passages), doc_ids)
+    index.save("splade-index")
+    index = SparseIndex.load("splade-index")  # memory-mapped
+    hits = index.search(encode_sparse(model, queries, is_q=True), k=10)
+    # [[("doc-id", 23.1), ...], ...] -- one list of (doc id, score) per query
+    ```
+"""
+
+import json
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from scipy import sparse
+
+_MATRICES = {
+    "postings": ("postings_indptr", "postings_indices", "postings_data"),
+    "block_max": ("block_max_indptr", "block_max_indices", "block_max_data"),
+}
+
+
+def load_splade(model_name: str, model_name_q: Optional[str] = None, device: str = "cpu",
+                agg: str = "max", fp16: bool = False):
+    """``splade.models.transformer_rep.Splade`` in eval mode on ``device``."""
+    from rankify.utils.retrievers.splade.models.transformer_rep import Splade
+
+    model = Splade(model_name, model_type_or_dir_q=model_name_q, agg=agg, fp16=fp16)
+    return model.to(device).eval()
+
+
+@torch.no_grad()
+def encode_sparse(model, texts: Sequence[str], is_q: bool = False, tokenizer=None, batch_size: int = 32,
+                  max_length: int = 256) -> sparse.csr_matrix:
+    """
+    Encode texts with a SPLADE model (``model.encode(tokens, is_q)``) into a ``(len(texts), vocab)``
+    CSR matrix. Texts are batched by length to keep padding short; rows follow the input order.
+    """
+    if tokenizer is None:
+        tokenizer = (model.transformer_rep_q if is_q and model.transformer_rep_q is not None
+                     else model.transformer_rep).tokenizer
+    device = next(model.parameters()).device
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    rows, cols, values = [], [], []
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        tokens = tokenizer([texts[i] for i in batch], max_length=max_length, padding="longest",
+                           truncation=True, return_tensors="pt").to(device)
+        weights = model.encode(dict(tokens), is_q).float()
+        row, col = torch.nonzero(weights, as_tuple=True)
+        rows.append(np.asarray(batch, dtype=np.int64)[row.cpu().numpy()])
+        cols.append(col.cpu().numpy())
+        values.append(weights[row, col].cpu().numpy())
+    vocab_size = model.output_dim if hasattr(model, "output_dim") else len(tokenizer)
+    if not rows:
+        return sparse.csr_matrix((0, vocab_size), dtype=np.float32)
+    return sparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(len(texts), vocab_size), dtype=np.float32)
+
+
+def _block_max(postings: sparse.csr_matrix, n_docs: int, block_size: int):
+    """
+    ``(vocab, n_blocks)`` CSR matrix of the largest weight of every term in every block of documents,
+    and the offset in ``postings`` of the first posting of every stored (term, block) pair.
+    """
+    vocab_size = postings.shape[0]
+    n_blocks = -(-n_docs // block_size)
+    blocks = postings.indices.astype(np.int64) // block_size
+    new_group = np.ones(len(blocks), dtype=bool)
+    new_group[1:] = blocks[1:] != blocks[:-1]
+    new_group[postings.indptr[:-1][np.diff(postings.indptr) > 0]] = True
+    starts = np.flatnonzero(new_group)
+    if len(starts) == 0:
+        return sparse.csr_matrix((vocab_size, n_blocks), dtype=np.float32), starts
+    terms = np.repeat(np.arange(vocab_size), np.diff(postings.indptr))[starts]
+    indptr = np.zeros(vocab_size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(terms, minlength=vocab_size), out=indptr[1:])
+    maxima = np.maximum.reduceat(postings.data, starts).astype(np.float32)
+    return sparse.csr_matrix((maxima, blocks[starts], indptr), shape=(vocab_size, n_blocks)), starts
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of ``arange(start, end)`` over the given ranges."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+def _top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The ``k`` highest ``scores`` (descending, ties in row order) with their ``rows``."""
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        scores, rows = scores[keep], rows[keep]
+    order = np.lexsort((rows, -scores))
+    return scores[order], rows[order]
+
+
+class SparseIndex:
+    """
+    Inverted index with block-max metadata over sparse document vectors.
+
+    Args:
+        postings (csr_matrix): ``(vocab, docs)`` posting lists.
+        block_max (csr_matrix): ``(vocab, ceil(docs / block_size))`` per-block term maxima.
+        block_offsets (np.ndarray): Offset in ``postings`` of the first posting of every entry of ``block_max``.
+        doc_ids (List[str]): Id of every document row.
+        block_size (int): Documents per block.
+
+    Use ``SparseIndex.build`` to create an index and ``save`` / ``load`` to persist it.
+    """
+
+    def __init__(self, postings: sparse.csr_matrix, block_max: sparse.csr_matrix, block_offsets: np.ndarray,
+                 doc_ids: List[str], block_size: int):
+        self.postings = postings
+        self.block_max = block_max
+        self.block_offsets = block_offsets
+        self.doc_ids = list(doc_ids)
+        self.block_size = block_size
+
+    @classmethod
+    def build(cls, doc_vectors, doc_ids: Sequence[str], block_size: int = 64) -> "SparseIndex":
+        """
+        Build the index from a ``(docs, vocab)`` sparse matrix of document vectors.
+
+        Rows are kept in the given order, so documents that share terms should be adjacent (e.g. in
+        corpus order, or sorted by a clustering of the vectors) for block-max search to prune well.
+        """
+        forward = sparse.csr_matrix(doc_vectors, dtype=np.float32)
+        if forward.shape[0] != len(doc_ids):
+            raise ValueError(f"{forward.shape[0]} document vectors for {len(doc_ids)} doc ids")
+        forward.eliminate_zeros()
+        postings = forward.T.tocsr()
+        postings.sort_indices()
+        block_max, block_offsets = _block_max(postings, forward.shape[0], block_size)
+        return cls(postings, block_max, block_offsets, [str(i) for i in doc_ids], block_size)
+
+    @property
+    def num_docs(self) -> int:
+        return self.postings.shape[1]
+
+    def save(self, directory: str) -> None:
+        """Write the arrays as ``.npy`` files plus ``doc_ids.json`` and ``meta.json`` to ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        for attribute, names in _MATRICES.items():
+            matrix = getattr(self, attribute)
+            for name, array in zip(names, (matrix.indptr, matrix.indices, matrix.data)):
+                np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+        np.save(os.path.join(directory, "block_offsets.npy"), np.ascontiguousarray(self.block_offsets))
+        with open(os.path.join(directory, "doc_ids.json"), "w") as f:
+            json.dump(self.doc_ids, f)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"num_docs": self.num_docs, "vocab_size": self.postings.shape[0],
+                       "block_size": self.block_size}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "SparseIndex":
+        """Open an index written by ``save``; with ``mmap`` the arrays stay on disk and are paged in on use."""
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, "doc_ids.json")) as f:
+            doc_ids = json.load(f)
+        n_docs, vocab_size, block_size = meta["num_docs"], meta["vocab_size"], meta["block_size"]
+        mmap_mode = "r" if mmap else None
+        shapes = {"postings": (vocab_size, n_docs), "block_max": (vocab_size, -(-n_docs // block_size))}
+        matrices = {}
+        for attribute, names in _MATRICES.items():
+            indptr, indices, data = (np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                                     for name in names)
+            matrices[attribute] = sparse.csr_matrix((data, indices, indptr), shape=shapes[attribute], copy=False)
+        block_offsets = np.load(os.path.join(directory, "block_offsets.npy"), mmap_mode=mmap_mode)
+        return cls(matrices["postings"], matrices["block_max"], block_offsets, doc_ids, block_size)
+
+    def search(self, query_vectors, k: int = 10, pruning: bool = True, alpha: float = 1.0,
+               query_batch_size: int = 256, blocks_per_step: int = 8) -> List[List[Tuple[str, float]]]:
+        """
+        Top-``k`` documents for every row of a ``(queries, vocab)`` sparse matrix.
+
+        Args:
+            query_vectors: Query vectors, e.g. from ``encode_sparse(..., is_q=True)``.
+            k (int): Documents per query.
+            pruning (bool): Block-max search; ``False`` scores every posting with a sparse matrix product.
+            alpha (float): Block-max search stops when ``alpha`` times the best remaining block bound is
+                no higher than the k-th score; ``1.0`` is exact.
+            query_batch_size (int): Queries scored together.
+            blocks_per_step (int): Blocks scored before the first stopping check of block-max search;
+                every further step scores twice as many.
+
+        Returns:
+            List[List[Tuple[str, float]]]: ``(doc id, score)`` pairs by descending score; documents
+            sharing no term with the query are not returned.
+        """
+        queries = sparse.csr_matrix(query_vectors, dtype=np.float32)
+        results = []
+        for start in range(0, queries.shape[0], query_batch_size):
+            batch = queries[start:start + query_batch_size]
+            if pruning:
+                hits = self._search_block_max(batch, k, alpha, blocks_per_step)
+            else:
+                hits = self._search_exhaustive(batch, k)
+            results.extend([[(self.doc_ids[row], float(score)) for score, row in zip(scores, rows)]
+                            for scores, rows in hits])
+        return results
+
+    def _search_exhaustive(self, queries: sparse.csr_matrix, k: int):
+        scores = (queries @ self.postings).tocsr()
+        hits = []
+        for i in range(queries.shape[0]):
+            begin, end = scores.indptr[i], scores.indptr[i + 1]
+            row_scores, rows = scores.data[begin:end], scores.indices[begin:end]
+            positive = row_scores > 0
+            hits.append(_top_k(row_scores[positive], rows[positive], k))
+        return hits
+
+    def _search_block_max(self, queries: sparse.csr_matrix, k: int, alpha: float, blocks_per_step: int):
+        bounds = (queries @ self.block_max).toarray()  # (queries, n_blocks)
+        hits = []
+        for i in range(queries.shape[0]):
+            terms = queries.indices[queries.indptr[i]:queries.indptr[i + 1]]
+            weights = queries.data[queries.indptr[i]:queries.indptr[i + 1]]
+            # (term, block) entries of the query terms, with their posting ranges
+            first, last = self.block_max.indptr[terms], self.block_max.indptr[terms + 1]
+            entries = _ranges(first, last)
+            entry_blocks = np.asarray(self.block_max.indices[entries])
+            entry_starts = np.asarray(self.block_offsets[entries], dtype=np.int64)
+            entry_ends = np.empty_like(entry_starts)
+            entry_ends[:-1] = entry_starts[1:]
+            row_ends = np.cumsum(last - first)
+            nonempty = last > first
+            entry_ends[row_ends[nonempty] - 1] = self.postings.indptr[terms[nonempty] + 1]
+            entry_weights = np.repeat(weights, last - first)
+
+            block_bounds = bounds[i]
+            candidates = np.flatnonzero(block_bounds > 0)
+            candidates = candidates[np.argsort(-block_bounds[candidates], kind="stable")]
+            top_scores, top_rows = np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+            step, position = blocks_per_step, 0
+            while position < len(candidates):
+                blocks = candidates[position:position + step]
+                if len(top_scores) == k:
+                    blocks = blocks[alpha * block_bounds[blocks] > top_scores[-1]]
+                    if len(blocks) == 0:
+                        break
+                position += step
+                step *= 2
+                # accumulate the selected blocks' postings into a dense (len(blocks) * block_size) buffer
+                slot = np.full(len(block_bounds), -1, dtype=np.int64)
+                slot[blocks] = np.arange(len(blocks))
+                keep = slot[entry_blocks] >= 0
+                postings = _ranges(entry_starts[keep], entry_ends[keep])
+                counts = entry_ends[keep] - entry_starts[keep]
+                rows = np.asarray(self.postings.indices[postings])
+                weights = np.asarray(self.postings.data[postings]) * np.repeat(entry_weights[keep], counts)
+                local = slot[rows // self.block_size] * self.block_size + rows % self.block_size
+                scores = np.bincount(local, weights=weights, minlength=len(blocks) * self.block_size)
+                local = np.flatnonzero(scores)
+                rows = blocks[local // self.block_size] * self.block_size + local % self.block_size
+                scores = scores[local].astype(np.float32)
+                top_scores, top_rows = _top_k(np.concatenate([top_scores, scores]),
+                                              np.concatenate([top_rows, rows]), k)
+            hits.append((top_scores, top_rows))
+        return hits
@@ -0,0 +1,95 @@
+"""
+Tests for the batched answer matching stage, against DPR's reference has_answer.
+"""
+
+import unicodedata
+import unittest
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.metrics.retriever_metrics import RetrieverMetrics
+from rankify.utils.answer_matching import AnswerMatcher, annotate_answers
+from rankify.utils.retrievers.colbert.utility.utils.dpr import SimpleTokenizer
+
+
+def reference_has_answers(text, answers, tokenizer=SimpleTokenizer()):
+    """ pyserini.eval.evaluate_dpr_retrieval.has_answers"""
+    text = tokenizer.tokenize(unicodedata.normalize("NFD", text)).words(uncased=True)
+    for answer in answers:
+        answer = tokenizer.tokenize(unicodedata.normalize("NFD", answer)).words(uncased=True)
+        for i in range(0, len(text) - len(answer) + 1):
+            if answer == text[i: i + len(answer)]:
+                return True
+    return False
+
+
+TEXTS = [
+    "The capital of France is Paris.",
+    "Parisian cafés are famous; so is the Eiffel Tower (1889).",
+    "U.S. President Barack Obama was born in Honolulu, Hawaii.",
+    "Ελληνικά: η Αθήνα είναι η πρωτεύουσα της ΕΛΛΑΔΟΣ",
+    "Zoë Saldaña starred in Avatar — released 2009",
+    "",
+    "  multiple   spaces\tand\nnewlines  ",
+]
+ANSWERS = [
+    ["Paris"], ["paris."], ["Eiffel Tower"], ["1889"], ["U.S."], ["Barack Obama", "Honolulu"],
+    ["Ελλάδος"], ["ελλαδοσ"], ["Zoe Saldana"], ["zoë saldaña"], ["2009"], [""], ["spaces and newlines"],
+    ["tower eiffel"], ["cafés"], [],
+]
+
+
+def make_document(answers, texts):
+    return Document(question=Question("q"), answers=Answer(answers),
+                    contexts=[Context(id=str(i), text=text, score=0.0) for i, text in enumerate(texts)])
+
+
+class TestAnswerMatching(unittest.TestCase):
+
+    def test_matches_reference_implementation(self):
+        matcher = AnswerMatcher()
+        for answers in ANSWERS:
+            for text in TEXTS:
+                self.assertEqual(matcher.has_answers(text, answers), reference_has_answers(text, answers),
+                                 (text, answers))
+
+    def test_annotate_documents(self):
+        documents = [make_document(answers, TEXTS) for answers in ANSWERS]
+        AnswerMatcher().annotate(documents)
+        for document, answers in zip(documents, ANSWERS):
+            expected = [reference_has_answers(text, answers) if answers else None for text in TEXTS]
+            self.assertEqual([c.has_answer for c in document.contexts], expected)
+
+    def test_passages_are_tokenized_once(self):
+        matcher = AnswerMatcher()
+        documents = [make_document(["Paris"], TEXTS) for _ in range(3)]
+        matcher.annotate(documents)
+        self.assertEqual(len(matcher._tokens), len(set(TEXTS)))
+
+    def test_existing_flags_are_kept(self):
+        document = make_document(["Paris"], TEXTS[:2])
+        document.contexts[0].has_answer = False
+        annotate_answers([document])
+        self.assertEqual([c.has_answer for c in document.contexts], [False, False])
+        annotate_answers([document], overwrite=True)
+        self.assertEqual([c.has_answer for c in document.contexts], [True, False])
+
+    def test_materialized_reorder_contexts_are_annotated(self):
+        document = make_document(["Paris"], TEXTS[:2])
+        document.rerank_by_scores([0.1, 0.9])
+        reordered = document.reorder_contexts
+        annotate_answers([document])
+        self.assertEqual([c.has_answer for c in reordered], [False, True])
+
+    def test_metrics_match_answers_lazily(self):
+        documents = [make_document(["Paris"], TEXTS[1:3] + TEXTS[:1]), make_document(["Tokyo"], TEXTS)]
+        self.assertEqual(RetrieverMetrics(documents).topk_many(ks=(1, 3)), {"top_1": 0.0, "top_3": 50.0})
+
+    def test_parallel_tokenization(self):
+        texts = [f"passage {i} about Paris" if i % 7 == 0 else f"passage {i}" for i in range(400)]
+        documents = [make_document(["Paris"], texts)]
+        AnswerMatcher(num_workers=2, min_parallel=100).annotate(documents)
+        self.assertEqual([c.has_answer for c in documents[0].contexts], [i % 7 == 0 for i in range(400)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+"""
+Tests for the shared async API client layer, against a local mock API server.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+import unittest.mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.models.apiranker import APIRanker
+from rankify.utils.api.async_client import TokenBucket, configure_provider, get_api_client
+
+try:
+    from rankify.generator.models.openai_model import OpenAIModel
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import openai
+    from rankify.retrievers import api_embedding_retriever
+    from rankify.retrievers.api_embedding_retriever import APIEmbeddingRetriever
+    EMBEDDING_RETRIEVER_AVAILABLE = api_embedding_retriever.OPENAI_AVAILABLE
+except ImportError:
+    EMBEDDING_RETRIEVER_AVAILABLE = False
+
+
+class MockAPI(ThreadingHTTPServer):
+    """ Rerank and chat endpoints with a fixed latency; the first ``fail_first`` requests get ``fail_status``"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, fail_first=0, fail_status=429):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.lock = threading.Lock()
+        self.requests = self.active = self.peak = 0
+        self.started = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            number = server.requests
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            server.started.append(time.monotonic())
+        try:
+            time.sleep(server.latency)
+            if number <= server.fail_first:
+                self._send(server.fail_status, {"error": "try again"}, [("Retry-After", "0")])
+            elif self.path.endswith("/rerank"):
+                # Longer documents are more relevant
+                results = [{"index": i, "document": {"text": text}, "relevance_score": float(len(text))}
+                           for i, text in enumerate(body["documents"])]
+                self._send(200, {"results": sorted(results, key=lambda r: -r["relevance_score"])})
+            elif self.path.endswith("/embeddings"):
+                self._send(200, {
+                    "object": "list", "model": body["model"],
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                    "data": [{"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0]}
+                             for i, text in enumerate(body["input"])],
+                })
+            elif self.path.endswith("/chat/completions"):
+                answer = body["messages"][-1]["content"].upper()
+                self._send(200, {
+                    "id": "1", "object": "chat.completion", "created": 0, "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": answer}}],
+                })
+            else:
+                self._send(404, {"error": "not found"})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_backlog_leaves_at_the_rate(self):
+        async def acquire_all():
+            bucket = TokenBucket(rate=50, burst=1)
+            start = time.monotonic()
+            await asyncio.gather(*(bucket.acquire() for _ in range(11)))
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(acquire_all()), 0.19)
+
+
+class TestAPIClient(unittest.TestCase):
+    def setUp(self):
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.close()
+
+    def start(self, **kwargs):
+        self.server = MockAPI(**kwargs)
+        return self.server
+
+    def post(self, client, url, index):
+        async def send():
+            response = await client.request("POST", url, json={"documents": [str(index)]})
+            return response.json()["results"][0]["document"]["text"]
+        return send()
+
+    def test_map_bounds_concurrency_and_keeps_order(self):
+        server = self.start(latency=0.05)
+        client = get_api_client(server.url, max_concurrency=3)
+        results = client.map(lambda i: self.post(client, server.url + "/rerank", i), range(12))
+        self.assertEqual(results, [str(i) for i in range(12)])
+        self.assertEqual(server.peak, 3)
+
+    def test_rate_limit_spaces_requests(self):
+        server = self.start()
+        client = get_api_client(server.url, requests_per_second=40, burst=1, max_concurrency=8)
+        client.map(lambda i: self.post(client, server.url + "/rerank", i), range(9))
+        self.assertGreaterEqual(server.started[-1] - server.started[0], 0.15)
+
+    def test_transient_failures_are_retried(self):
+        server = self.start(fail_first=2, fail_status=429)
+        client = get_api_client(server.url, backoff_base=0.01)
+        self.assertEqual(client.run(self.post(client, server.url + "/rerank", 7)), "7")
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(client.retries, 2)
+
+    def test_client_errors_are_not_retried(self):
+        server = self.start(fail_first=1, fail_status=400)
+        client = get_api_client(server.url, backoff_base=0.01)
+        with self.assertRaises(httpx.HTTPStatusError):
+            client.run(self.post(client, server.url + "/rerank", 1))
+        self.assertEqual(server.requests, 1)
+
+    def test_retries_run_out(self):
+        server = self.start(fail_first=10, fail_status=503)
+        client = get_api_client(server.url, backoff_base=0.01, max_retries=2)
+        with self.assertRaises(httpx.HTTPStatusError):
+            client.run(self.post(client, server.url + "/rerank", 1))
+        self.assertEqual(server.requests, 3)
+
+    def test_provider_registry(self):
+        client = get_api_client("https://api.example.com/v1/rerank")
+        self.assertIs(get_api_client("https://API.example.com/v2/embed"), client)
+        configure_provider("api.example.com", max_concurrency=2)
+        self.assertEqual(client.limits.max_concurrency, 2)
+        self.assertIsNot(get_api_client("other.example.com"), client)
+
+    def test_api_ranker_reranks_documents_concurrently(self):
+        server = self.start(latency=0.05, fail_first=1)
+        documents = [Document(question=Question(f"query {i}"), answers=Answer([]),
+                              contexts=[Context(id=str(j), title="", text="x" * (j + 1), score=0.0)
+                                        for j in range(4)])
+                     for i in range(8)]
+        get_api_client(server.url, backoff_base=0.01)
+        ranker = APIRanker(method="apiranker", model_name="mock", api_key="key",
+                           endpoint=server.url + "/rerank", max_concurrency=8)
+        ranker.rank(documents)
+        for document in documents:
+            self.assertEqual([c.id for c in document.reorder_contexts], ["3", "2", "1", "0"])
+        self.assertEqual(server.requests, 9)
+        self.assertGreater(server.peak, 1)
+
+    @unittest.skipUnless(OPENAI_AVAILABLE, "openai is not installed")
+    def test_openai_model_batch(self):
+        server = self.start(latency=0.02, fail_first=1)
+        get_api_client(server.url, backoff_base=0.01, max_concurrency=4)
+        model = OpenAIModel("mock-model", ["key"], None, base_url=server.url + "/v1")
+        prompts = [f"prompt {i}" for i in range(6)]
+        self.assertEqual(model.generate_batch(prompts), [p.upper() for p in prompts])
+        self.assertEqual(model.generate("paris"), "PARIS")
+        self.assertEqual(server.peak, 4)
+
+    @unittest.skipUnless(EMBEDDING_RETRIEVER_AVAILABLE, "openai or the retriever dependencies are not installed")
+    def test_openai_embeddings_reuse_one_client_over_the_shared_pool(self):
+        server = self.start(fail_first=1)
+        api = get_api_client(server.url, backoff_base=0.01)
+        retriever = APIEmbeddingRetriever.__new__(APIEmbeddingRetriever)
+        retriever.api_key, retriever.model_name, retriever.embed_batch_size = "key", "mock", 2
+        retriever._api, retriever._openai_client, retriever._openai_http = api, None, None
+
+        created, real_async_openai = [], openai.AsyncOpenAI
+        def async_openai(**kwargs):
+            created.append(kwargs)
+            return real_async_openai(base_url=server.url + "/v1", **kwargs)
+
+        with unittest.mock.patch.object(api_embedding_retriever._openai_module, "AsyncOpenAI", async_openai):
+            first = retriever._embed_openai(["a", "bb", "ccc", "dddd", "e"])
+            second = retriever._embed_openai(["ff"])
+        self.assertEqual(first.tolist(), [[1, 1], [2, 1], [3, 1], [4, 1], [1, 1]])
+        self.assertEqual(second.tolist(), [[2, 1]])
+        self.assertEqual(server.requests, 5)
+        self.assertEqual(len(created), 1)
+        self.assertIs(created[0]["http_client"], retriever._openai_http)
+        self.assertIs(api.run(self._http(api)), retriever._openai_http)
+
+    @staticmethod
+    async def _http(api):
+        return api.http
+
+
+if __name__ == "__main__":
+    unittest.main()
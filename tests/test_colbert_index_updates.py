@@ -0,0 +1,368 @@
+"""
+Tests for incremental updates of custom ColBERT indexes: the vendored ``IndexUpdater``'s IVF edits
+on synthetic tensors, ``ColBERTIndexEditor`` add / remove / persist on a tiny CPU index built with a
+random checkpoint, and compaction on a hand-written index directory (the PLAID codes and residuals
+are not touched by compaction, so none are written there).
+"""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import torch
+
+from rankify.utils.retrievers.colbert.colbert import Indexer, Searcher
+from rankify.utils.retrievers.colbert.colbert import index_updater
+from rankify.utils.retrievers.colbert.colbert.index_updater import IndexUpdater
+from rankify.utils.retrievers.colbert.colbert.infra import ColBERTConfig, Run, RunConfig
+from rankify.utils.retrievers.colbert_index_updates import (
+    ColBERTIndexEditor,
+    compact_index,
+    load_id_mappings,
+    passage_record,
+)
+from tests.test_colbert_search import build_checkpoint, topical_texts
+
+try:
+    from rankify.retrievers.colbert_retriever import ColBERTRetriever
+    RETRIEVER_AVAILABLE = True
+except ImportError:
+    RETRIEVER_AVAILABLE = False
+
+# pid: 0 header, 1 "a" (removed), 2 "b", 3 "c" (removed), 4 "d", 5 "e"; chunks hold pids 0-2 and 3-5
+DOCLENS = [[3, 0, 2], [0, 4, 1]]
+IVF = {0: [0, 2], 1: [4], 2: [0, 4, 5], 3: [2, 5]}
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def build_updated_index(directory, doclens=DOCLENS):
+    write_json(os.path.join(directory, "metadata.json"),
+               {"num_chunks": 2, "num_partitions": 4, "num_embeddings": 10, "avg_doclen": 10 / 6})
+    for chunk_idx, chunk_doclens in enumerate(doclens):
+        write_json(os.path.join(directory, f"doclens.{chunk_idx}.json"), chunk_doclens)
+        write_json(os.path.join(directory, f"{chunk_idx}.metadata.json"),
+                   {"passage_offset": 3 * chunk_idx, "num_passages": 3,
+                    "embedding_offset": 5 * chunk_idx, "num_embeddings": sum(chunk_doclens)})
+    ivf = torch.tensor([pid for pids in IVF.values() for pid in pids], dtype=torch.int32)
+    torch.save((ivf, torch.tensor([len(pids) for pids in IVF.values()])), os.path.join(directory, "ivf.pid.pt"))
+    with open(os.path.join(directory, "collection.tsv"), "w", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(["id", "text", "title"])
+        for pid, name in enumerate("abcde", start=1):
+            writer.writerow([pid, f"text {name}", f"title {name}"])
+    write_json(os.path.join(directory, "id_mapping.json"), {
+        "original_to_sequential": {"b": 2, "d": 4, "e": 5},
+        "sequential_to_original": {"2": "b", "4": "d", "5": "e"},
+        "total_documents": 3, "encoder_name": "colbert-ir/colbertv2.0", "index_type": "wiki",
+    })
+
+
+class TestCompactIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_json(self, name):
+        with open(os.path.join(self.index, name)) as f:
+            return json.load(f)
+
+    def test_removed_passages_are_dropped_and_the_rest_renumbered(self):
+        build_updated_index(self.index)
+        self.assertEqual(compact_index(self.index), {"passages": 3, "removed": 2})
+
+        mappings = load_id_mappings(self.index)
+        self.assertEqual(mappings["sequential_to_original"], {1: "b", 2: "d", 3: "e"})
+        self.assertEqual(mappings["original_to_sequential"], {"b": 1, "d": 2, "e": 3})
+        self.assertEqual(self.read_json("id_mapping.json")["encoder_name"], "colbert-ir/colbertv2.0")
+
+        ivf, lengths = torch.load(os.path.join(self.index, "ivf.pid.pt"))
+        self.assertEqual(ivf.tolist(), [0, 1, 2, 0, 2, 3, 1, 3])
+        self.assertEqual(lengths.tolist(), [2, 1, 3, 2])
+
+        self.assertEqual(self.read_json("doclens.0.json"), [3, 2])
+        self.assertEqual(self.read_json("doclens.1.json"), [4, 1])
+        chunks = [self.read_json(f"{chunk_idx}.metadata.json") for chunk_idx in range(2)]
+        self.assertEqual([(c["passage_offset"], c["num_passages"]) for c in chunks], [(0, 2), (2, 2)])
+        self.assertAlmostEqual(self.read_json("metadata.json")["avg_doclen"], 10 / 4)
+
+        with open(os.path.join(self.index, "collection.tsv"), newline="") as f:
+            rows = list(csv.reader(f, delimiter="\t"))
+        self.assertEqual(rows, [["id", "text", "title"], ["1", "text b", "title b"],
+                                ["2", "text d", "title d"], ["3", "text e", "title e"]])
+
+    def test_compacted_index_is_left_alone(self):
+        build_updated_index(self.index)
+        compact_index(self.index)
+        with open(os.path.join(self.index, "collection.tsv")) as f:
+            collection = f.read()
+        self.assertEqual(compact_index(self.index), {"passages": 3, "removed": 0})
+        with open(os.path.join(self.index, "collection.tsv")) as f:
+            self.assertEqual(f.read(), collection)
+
+    def test_unpersisted_removals_are_refused(self):
+        build_updated_index(self.index, doclens=[[3, 1, 2], [0, 4, 1]])  # pid 1 still has an embedding
+        with self.assertRaises(ValueError):
+            compact_index(self.index)
+
+
+def synthetic_updater(ivf):
+    """An ``IndexUpdater`` over ``{partition: [pid, ...]}`` with a stub searcher (no index on disk)."""
+    updater = IndexUpdater.__new__(IndexUpdater)
+    updater.curr_ivf = torch.tensor([pid for pids in ivf.values() for pid in pids], dtype=torch.int32)
+    updater.curr_ivf_lengths = torch.tensor([len(pids) for pids in ivf.values()])
+    updater.searcher = SimpleNamespace(ranker=SimpleNamespace(
+        ivf=None, doclens=torch.tensor([1, 2, 1, 1, 2, 1]), set_embeddings_strided=lambda: None,
+        embeddings=SimpleNamespace(codes=torch.zeros(8 + 512, dtype=torch.int32),
+                                   residuals=torch.zeros(8 + 512, 4, dtype=torch.uint8)),
+    ))
+    return updater
+
+
+def ivf_partitions(updater):
+    return [pids.tolist() for pids in torch.split(updater.curr_ivf, updater.curr_ivf_lengths.tolist())]
+
+
+class TestIndexUpdaterIvf(unittest.TestCase):
+
+    def test_remove_pids_from_ivf(self):
+        updater = synthetic_updater(IVF)
+        updater._remove_pid_from_ivf([2, 5, 42])
+        self.assertEqual(ivf_partitions(updater), [[0], [4], [0, 4], []])
+        self.assertEqual(updater.curr_ivf.dtype, torch.int32)
+        lookup, lengths = updater.searcher.ranker.ivf.lookup(torch.tensor([2, 3]))
+        self.assertEqual((lookup.tolist(), lengths.tolist()), ([0, 4], [2, 0]))
+
+    def test_added_pids_are_appended_to_their_partitions(self):
+        updater = synthetic_updater(IVF)
+        # pid 6 has codes [3, 1, 3] (one entry per partition), pid 7 [0], pid 8 [1, 2]
+        codes = torch.tensor([3, 1, 3, 0, 1, 2], dtype=torch.int32)
+        embeddings = SimpleNamespace(codes=codes, residuals=torch.ones(6, 4, dtype=torch.uint8))
+        updater.update_searcher(embeddings, [3, 1, 2], curr_pid=6)
+
+        expected = {partition: list(pids) for partition, pids in IVF.items()}
+        for pid, pid_codes in ((6, [3, 1]), (7, [0]), (8, [1, 2])):
+            for code in pid_codes:
+                expected[code].append(pid)
+        self.assertEqual(ivf_partitions(updater), list(expected.values()))
+        self.assertEqual(updater.curr_ivf.dtype, torch.int32)
+
+        ranker = updater.searcher.ranker
+        self.assertEqual(ranker.doclens.tolist(), [1, 2, 1, 1, 2, 1, 3, 1, 2])
+        self.assertEqual(ranker.embeddings.codes[8:14].tolist(), codes.tolist())
+        self.assertEqual(ranker.embeddings.codes.size(0), 14 + 512)
+        self.assertTrue(ranker.embeddings.residuals[8:14].eq(1).all())
+
+
+def build_custom_index(directory, checkpoint, docs):
+    """The files ``ColBERTIndexer.build_index`` writes for ``docs`` = ``[(original_id, text, title)]``."""
+    collection_path = os.path.join(directory, "collection.tsv")
+    with open(collection_path, "w", newline="") as collection, \
+         open(os.path.join(directory, "passages.tsv"), "w", newline="") as passages:
+        collection_writer, passages_writer = csv.writer(collection, delimiter="\t"), csv.writer(passages, delimiter="\t")
+        collection_writer.writerow(["id", "text", "title"])
+        passages_writer.writerow(["id", "text", "title"])
+        for pid, (original_id, text, title) in enumerate(docs, start=1):
+            collection_writer.writerow([pid, text, title])
+            passages_writer.writerow([original_id, text, title])
+    write_json(os.path.join(directory, "id_mapping.json"), {
+        "original_to_sequential": {original_id: pid for pid, (original_id, _, _) in enumerate(docs, start=1)},
+        "sequential_to_original": {str(pid): original_id for pid, (original_id, _, _) in enumerate(docs, start=1)},
+        "total_documents": len(docs), "encoder_name": checkpoint, "index_type": "test",
+    })
+    write_json(os.path.join(directory, "title_map.json"), {original_id: title for original_id, _, title in docs})
+
+    with Run().context(RunConfig(nranks=1, root=directory, avoid_fork_if_possible=True)):
+        config = ColBERTConfig(index_path=directory, checkpoint=checkpoint, collection=collection_path,
+                               doc_maxlen=40, nbits=2, kmeans_niters=2)
+        Indexer(checkpoint=checkpoint, config=config, verbose=0).index(name="index", collection=collection_path,
+                                                                      overwrite=True)
+
+
+def load_searcher(directory, **kwargs):
+    with Run().context(RunConfig(nranks=1, root=directory, avoid_fork_if_possible=True)):
+        config = ColBERTConfig(collection=os.path.join(directory, "collection.tsv"), **kwargs)
+        return Searcher(index=directory, config=config, verbose=0)
+
+
+class TestColBERTIndexEditor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.checkpoint = build_checkpoint(cls.tmp.name)
+        cls.docs = [(f"doc{i}", text, f"title {i}") for i, text in enumerate(topical_texts(60, 30, seed=0))]
+        cls.pristine = os.path.join(cls.tmp.name, "pristine")
+        os.makedirs(cls.pristine)
+        build_custom_index(cls.pristine, cls.checkpoint, cls.docs)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.index = tempfile.mkdtemp(dir=self.tmp.name)
+        shutil.rmtree(self.index)
+        shutil.copytree(self.pristine, self.index)
+        self.searcher = load_searcher(self.index)
+        self.editor = ColBERTIndexEditor(self.searcher)
+        self.queries = [" ".join(text.split()[:6]) for text in topical_texts(15, 30, seed=1)]
+
+    def read_tsv(self, name):
+        with open(os.path.join(self.index, name), newline="") as f:
+            return list(csv.reader(f, delimiter="\t"))
+
+    def read_json(self, name):
+        with open(os.path.join(self.index, name)) as f:
+            return json.load(f)
+
+    def rankings(self, searcher, queries=None):
+        return [list(zip(*searcher.search(query, k=10)[::2])) for query in queries or self.queries]
+
+    def assert_same_rankings(self, first, second):
+        for first_ranking, second_ranking in zip(first, second):
+            self.assertEqual([pid for pid, _ in first_ranking], [pid for pid, _ in second_ranking])
+            for (_, first_score), (_, second_score) in zip(first_ranking, second_ranking):
+                self.assertAlmostEqual(first_score, second_score, places=4)
+
+    def assert_consistent_on_disk(self):
+        """Chunk metadata, doclens, codes and the IVF on disk agree with each other."""
+        metadata = self.read_json("metadata.json")
+        embedding_offset = passage_offset = 0
+        for chunk_idx in range(metadata["num_chunks"]):
+            chunk = self.read_json(f"{chunk_idx}.metadata.json")
+            doclens = self.read_json(f"doclens.{chunk_idx}.json")
+            codes = torch.load(os.path.join(self.index, f"{chunk_idx}.codes.pt"))
+            self.assertEqual((chunk["passage_offset"], chunk["embedding_offset"]), (passage_offset, embedding_offset))
+            self.assertEqual((chunk["num_passages"], chunk["num_embeddings"]), (len(doclens), sum(doclens)))
+            self.assertEqual(codes.size(0), sum(doclens))
+            passage_offset += len(doclens)
+            embedding_offset += sum(doclens)
+        self.assertEqual(metadata["num_embeddings"], embedding_offset)
+
+        ivf, ivf_lengths = torch.load(os.path.join(self.index, "ivf.pid.pt"))
+        self.assertEqual(ivf.size(0), int(ivf_lengths.sum()))  # not padded
+        alive = set(self.editor.id_mappings["sequential_to_original"]) | {0}
+        self.assertTrue(set(ivf.tolist()) <= alive)
+        self.assertEqual(len(self.read_tsv("collection.tsv")), passage_offset)
+
+    def test_remove_hides_passages_immediately(self):
+        query = " ".join(self.docs[7][1].split()[:10])
+        self.assertIn(8, self.searcher.search(query, k=10)[0])
+        self.assertEqual(self.editor.remove(["doc7", "missing"]), ["doc7"])
+        self.assertNotIn(8, self.searcher.search(query, k=10)[0])
+        self.assertNotIn("doc7", self.editor.id_mappings["original_to_sequential"])
+        self.assertNotIn(8, self.editor.id_mappings["sequential_to_original"])
+
+    def test_add_replaces_indexed_ids(self):
+        new_text = " ".join(self.docs[40][1].split()[::-1])
+        pids = self.editor.add([("doc3", new_text, "new title"), ("new", self.docs[50][1], "added"),
+                                ("new", self.docs[51][1], "added twice")])
+        self.assertEqual(pids, [61, 62])
+        mappings = self.editor.id_mappings
+        self.assertEqual((mappings["original_to_sequential"]["doc3"], mappings["original_to_sequential"]["new"]), (61, 62))
+        self.assertEqual((mappings["sequential_to_original"][61], mappings["sequential_to_original"][62]), ("doc3", "new"))
+        self.assertNotIn(4, mappings["sequential_to_original"])
+        self.assertEqual(self.editor.passages["new"], {"text": self.docs[51][1], "title": "added twice"})
+        self.assertEqual(len(self.searcher.collection), 63)
+
+        ranking = self.searcher.search(" ".join(self.docs[51][1].split()[:10]), k=10)[0]
+        self.assertIn(62, ranking)
+        self.assertNotIn(4, self.searcher.search(" ".join(self.docs[3][1].split()[:10]), k=10)[0])
+
+    def test_persist_round_trip(self):
+        self.editor.remove(["doc7", "doc20"])
+        self.editor.add([("doc3", self.docs[40][1], "new title"), ("new", self.docs[50][1], "added")])
+        self.editor.remove(["new"])  # added and removed before the same persist
+        live = self.rankings(self.searcher)
+        self.editor.persist()
+        self.assertFalse(self.editor.has_pending_changes)
+
+        self.assert_consistent_on_disk()
+        self.assert_same_rankings(self.rankings(load_searcher(self.index)), live)
+
+        self.assertEqual(load_id_mappings(self.index), self.editor.id_mappings)
+        self.assertEqual(self.read_json("id_mapping.json")["total_documents"], 58)
+        passages = {row[0]: row[1:] for row in self.read_tsv("passages.tsv")[1:]}
+        self.assertEqual(len(passages), 58)
+        self.assertNotIn("doc7", passages)
+        self.assertNotIn("new", passages)
+        self.assertEqual(passages["doc3"], [self.docs[40][1], "new title"])
+        collection = self.read_tsv("collection.tsv")
+        self.assertEqual(collection[61], ["61", self.docs[40][1], "new title"])
+        title_map = self.read_json("title_map.json")
+        self.assertEqual(title_map["doc3"], "new title")
+        self.assertNotIn("doc20", title_map)
+        self.assertNotIn("new", title_map)
+
+        # The updater keeps working after a persist
+        self.editor.add([("later", self.docs[52][1], "later")])
+        self.editor.remove(["doc30"])
+        live = self.rankings(self.searcher)
+        self.editor.persist()
+        self.assert_consistent_on_disk()
+        self.assert_same_rankings(self.rankings(load_searcher(self.index)), live)
+
+    def test_persist_into_new_chunks(self):
+        # Embeddings of passages removed by an earlier persist are still in memory but not on disk
+        self.editor.remove(["doc10"])
+        self.editor.persist()
+        with mock.patch.object(index_updater, "DEFAULT_CHUNKSIZE", 64):
+            # 61 pids fill the single chunk up to 64; the rest of the additions start chunk 1
+            self.editor.add([(f"new{i}", text, f"new {i}") for i, (_, text, _) in enumerate(self.docs[:8])])
+            self.editor.remove(["doc2", "new6"])  # from chunk 0 and from the chunk being written
+            live = self.rankings(self.searcher)
+            self.editor.persist()
+
+        self.assertEqual(self.read_json("metadata.json")["num_chunks"], 2)
+        self.assertEqual(self.read_json("1.metadata.json")["passage_offset"], 64)
+        self.assert_consistent_on_disk()
+        self.assert_same_rankings(self.rankings(load_searcher(self.index)), live)
+
+        # Compaction renumbers the pids but keeps the rankings
+        compact_index(self.index)
+        mappings = load_id_mappings(self.index)
+        compacted = [[(mappings["sequential_to_original"][pid], score) for pid, score in ranking]
+                     for ranking in self.rankings(load_searcher(self.index))]
+        renamed = [[(self.editor.id_mappings["sequential_to_original"][pid], score) for pid, score in ranking]
+                   for ranking in live]
+        self.assert_same_rankings(compacted, renamed)
+
+    def test_memory_mapped_index_is_refused(self):
+        with self.assertRaises(ValueError):
+            ColBERTIndexEditor(load_searcher(self.index, load_index_with_mmap=True))
+
+    @unittest.skipUnless(RETRIEVER_AVAILABLE, "retriever dependencies are not installed")
+    def test_retriever_reloads_memory_mapped_index_for_updates(self):
+        retriever = ColBERTRetriever(index_folder=self.index, n_docs=5, load_index_with_mmap=True)
+        self.assertTrue(retriever.searcher.ranker.load_index_with_mmap)
+        retriever.remove_passages(["doc7"])
+        self.assertFalse(retriever.searcher.ranker.load_index_with_mmap)
+        retriever.add_passages([{"id": "new", "contents": self.docs[50][1], "title": "added"}])
+        self.assertEqual(retriever.id_mappings["original_to_sequential"]["new"], 61)
+        self.assertFalse(retriever.compact_index()["removed"] == 0)
+        self.assertFalse(retriever.searcher.ranker.load_index_with_mmap)
+
+
+class TestPassageRecord(unittest.TestCase):
+
+    def test_fields_are_cleaned_like_the_indexer(self):
+        self.assertEqual(passage_record({"id": "d1", "contents": " a\tb\n  c ", "title": "T\r"}, "doc_0"),
+                         ("d1", "a b c", "T"))
+        self.assertEqual(passage_record({"text": "body"}, "doc_7"), ("doc_7", "body", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Tests for batched ColBERT search: the batched query-centroid scores against the per-query product,
+``Searcher.search_all`` against ``Searcher.search`` on a tiny CPU index built with a random
+checkpoint, the memory-mapped codes/residuals loader, and the per-query fallback of
+``ColBERTRetriever.retrieve``.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import torch
+from transformers import BertConfig, BertTokenizerFast
+
+from rankify.dataset.dataset import Answer, Document, Question
+from rankify.utils.retrievers.colbert.colbert import Indexer, Searcher
+from rankify.utils.retrievers.colbert.colbert.indexing.codecs.residual_embeddings import ResidualEmbeddings
+from rankify.utils.retrievers.colbert.colbert.infra import ColBERTConfig, Run, RunConfig
+from rankify.utils.retrievers.colbert.colbert.modeling.hf_colbert import class_factory
+from rankify.utils.retrievers.colbert.colbert.search.candidate_generation import CandidateGeneration
+
+try:
+    from rankify.retrievers.colbert_retriever import ColBERTRetriever
+    RETRIEVER_AVAILABLE = True
+except ImportError:
+    RETRIEVER_AVAILABLE = False
+
+WORDS = [f"w{i}" for i in range(500)]
+
+
+def build_checkpoint(directory):
+    """Random ColBERT checkpoint (BERT encoder and projection layer) over ``WORDS``."""
+    checkpoint = os.path.join(directory, "checkpoint")
+    os.makedirs(checkpoint)
+    with open(os.path.join(checkpoint, "vocab.txt"), "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "[unused0]", "[unused1]"] + WORDS))
+    tokenizer = BertTokenizerFast(os.path.join(checkpoint, "vocab.txt"))
+    tokenizer.save_pretrained(checkpoint)
+    config = BertConfig(vocab_size=len(tokenizer), hidden_size=64, num_hidden_layers=1,
+                        num_attention_heads=1, intermediate_size=128)
+    config.save_pretrained(checkpoint)
+    torch.manual_seed(0)
+    class_factory(checkpoint)(config, ColBERTConfig()).save_pretrained(checkpoint)
+    return checkpoint
+
+
+def topical_texts(count, length, seed):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        topic = rng.randrange(10)
+        texts.append(" ".join(rng.choice(WORDS[topic * 50:(topic + 1) * 50]) for _ in range(length)))
+    return texts
+
+
+class TestCentroidScoresBatch(unittest.TestCase):
+
+    def test_matches_per_query_scores(self):
+        generator = torch.Generator().manual_seed(0)
+        centroids = torch.randn(64, 16, generator=generator)
+        Q = torch.randn(5, 12, 16, generator=generator)
+        candidates = CandidateGeneration(use_gpu=False)
+        candidates.codec = SimpleNamespace(centroids=centroids)
+
+        scores = candidates.centroid_scores_batch(SimpleNamespace(query_maxlen=10), Q)
+        self.assertEqual(tuple(scores.shape), (5, 64, 10))
+        for i in range(len(Q)):
+            torch.testing.assert_close(scores[i], centroids @ Q[i, :10].T)
+            cells, _ = candidates.get_cells(Q[i, :10], ncells=2, scores=scores[i])
+            expected, _ = candidates.get_cells(Q[i, :10], ncells=2)
+            self.assertEqual(sorted(cells.tolist()), sorted(expected.tolist()))
+
+
+class TestBatchedSearch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.collection = topical_texts(300, 30, seed=0)
+        checkpoint = build_checkpoint(cls.tmp.name)
+        with Run().context(cls.run_config()):
+            config = ColBERTConfig(checkpoint=checkpoint, doc_maxlen=40, nbits=2, kmeans_niters=2)
+            indexer = Indexer(checkpoint=checkpoint, config=config, verbose=0)
+            cls.index = indexer.index(name="index", collection=cls.collection, overwrite=True)
+        cls.queries = {i: " ".join(text.split()[:5]) for i, text in enumerate(topical_texts(20, 30, seed=1))}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    @classmethod
+    def run_config(cls):
+        return RunConfig(nranks=1, root=cls.tmp.name, avoid_fork_if_possible=True)
+
+    def searcher(self, **kwargs):
+        with Run().context(self.run_config()):
+            return Searcher(index=self.index, collection=self.collection, config=ColBERTConfig(**kwargs), verbose=0)
+
+    def assert_same_rankings(self, searcher, k=10):
+        ranking = searcher.search_all(self.queries, k=k).data
+        self.assertEqual(sorted(ranking), sorted(self.queries))
+        for qid, query in self.queries.items():
+            pids, ranks, scores = searcher.search(query, k=k)
+            self.assertEqual([pid for pid, _, _ in ranking[qid]], pids)
+            self.assertEqual([rank for _, rank, _ in ranking[qid]], ranks)
+            for (_, _, batched), single in zip(ranking[qid], scores):
+                self.assertAlmostEqual(batched, single, places=4)
+
+    def test_search_all_matches_search(self):
+        self.assert_same_rankings(self.searcher())
+
+    def test_search_all_matches_search_with_several_cells(self):
+        self.assert_same_rankings(self.searcher(ncells=4, centroid_score_threshold=0.3, ndocs=256), k=20)
+
+    def test_mmap_loader_matches_regular_loader(self):
+        chunk = ResidualEmbeddings.load(self.index, 0)
+        num_embeddings = chunk.codes.size(0)
+        loaded = ResidualEmbeddings.load_chunks(self.index, [0], num_embeddings)
+        mapped = ResidualEmbeddings.load_chunks(self.index, [0], num_embeddings, load_index_with_mmap=True)
+        torch.testing.assert_close(mapped.codes, chunk.codes)
+        torch.testing.assert_close(mapped.residuals, chunk.residuals)
+        torch.testing.assert_close(loaded.codes[:num_embeddings], mapped.codes)
+        torch.testing.assert_close(loaded.residuals[:num_embeddings], mapped.residuals)
+
+    def test_mmap_search_matches_regular_search(self):
+        regular = self.searcher().search_all(self.queries, k=10).data
+        mapped = self.searcher(load_index_with_mmap=True).search_all(self.queries, k=10).data
+        self.assertEqual({qid: [pid for pid, _, _ in r] for qid, r in regular.items()},
+                         {qid: [pid for pid, _, _ in r] for qid, r in mapped.items()})
+
+
+class FailingSearcher:
+    """``search_all`` always fails; ``search`` fails only for ``bad`` and ranks ``[1, 2]`` otherwise."""
+
+    def __init__(self, bad):
+        self.bad = bad
+        self.searched = []
+
+    def search_all(self, queries, k, timings=None):
+        raise RuntimeError("batch failed")
+
+    def search(self, query, k):
+        self.searched.append(query)
+        if query == self.bad:
+            raise RuntimeError("query failed")
+        return [1, 2], [1, 2], [2.0, 1.0]
+
+
+@unittest.skipUnless(RETRIEVER_AVAILABLE, "retriever dependencies are not installed")
+class TestRetrieveFallback(unittest.TestCase):
+
+    def test_only_the_failing_query_loses_its_contexts(self):
+        retriever = ColBERTRetriever.__new__(ColBERTRetriever)
+        retriever.searcher = FailingSearcher(bad="q1?")
+        retriever.n_docs, retriever.query_chunk_size = 2, 1024
+        retriever.is_custom_index, retriever.index_type, retriever.id_mappings = False, "wiki", None
+        retriever._index_editor = None
+        retriever.passages = {str(pid): {"title": f"title {pid}", "text": f"text {pid}"} for pid in (1, 2)}
+
+        documents = [Document(question=Question(f"q{i}"), answers=Answer([]), contexts=[]) for i in range(3)]
+        retriever.retrieve(documents)
+
+        self.assertEqual(retriever.searcher.searched, ["q0?", "q1?", "q2?"])
+        self.assertEqual([[c.id for c in d.contexts] for d in documents], [["1", "2"], [], ["1", "2"]])
+        self.assertEqual([c.score for c in documents[0].contexts], [2.0, 1.0])
+
+
+@unittest.skipUnless(RETRIEVER_AVAILABLE, "retriever dependencies are not installed")
+class TestSearchSettings(unittest.TestCase):
+
+    def settings(self, **kwargs):
+        with mock.patch.multiple(ColBERTRetriever, _setup_paths=mock.DEFAULT, _load_id_mappings=mock.DEFAULT,
+                                 _initialize_searcher=mock.DEFAULT, _load_passages=mock.DEFAULT):
+            return ColBERTRetriever(**kwargs).search_settings
+
+    def test_presets_keep_four_candidates_per_passage(self):
+        self.assertEqual(self.settings(preset="fast", n_docs=10)["ndocs"], 256)
+        self.assertEqual(self.settings(preset="fast", n_docs=1000)["ndocs"], 4000)
+        self.assertEqual(self.settings(preset="balanced", n_docs=1000)["ndocs"], 4000)
+        self.assertEqual(self.settings(preset="accurate", n_docs=100)["ndocs"], 4096)
+
+    def test_explicit_settings_override_the_preset(self):
+        settings = self.settings(preset="fast", n_docs=1000, ndocs=512, ncells=2)
+        self.assertEqual((settings["ndocs"], settings["ncells"]), (512, 2))
+        self.assertEqual(self.settings(n_docs=1000), {})
+
+    def test_unknown_preset(self):
+        with self.assertRaises(ValueError):
+            self.settings(preset="fastest")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the columnar ``DocumentBatch`` and the slotted dataset classes.
+"""
+
+import copy
+import pickle
+import unittest
+
+from rankify.dataset.dataset import Context
+from rankify.dataset.document_batch import DocumentBatch
+from rankify.metrics.metrics import Metrics
+
+
+def _records():
+    return [
+        {
+            "question": "What is the capital of France",
+            "answers": ["Paris"],
+            "query_id": 7,
+            "ctxs": [
+                {"id": 11, "title": "Berlin", "text": "Berlin is in Germany.", "score": 3.0, "has_answer": False},
+                {"id": 12, "title": "Paris", "text": "Paris is the capital of France.", "score": 2.0, "has_answer": True},
+                {"id": 13, "title": None, "text": "Madrid is in Spain.", "score": None},
+            ],
+        },
+        {"question": "Who wrote Hamlet?", "answers": ["Shakespeare"], "ctxs": []},
+    ]
+
+
+class TestSlottedContext(unittest.TestCase):
+    def test_no_instance_dict(self):
+        context = Context(id="a", text="x", score=1.0)
+        self.assertFalse(hasattr(context, "__dict__"))
+        restored = pickle.loads(pickle.dumps(context))
+        self.assertEqual((restored.id, restored.text, restored.score), ("a", "x", 1.0))
+
+
+class TestDocumentBatch(unittest.TestCase):
+    def test_attribute_api(self):
+        batch = DocumentBatch.from_dicts(_records())
+        self.assertEqual(len(batch), 2)
+        document = batch[0]
+        self.assertEqual(document.question.question, "What is the capital of France?")
+        self.assertEqual(document.id, "7")
+        self.assertEqual([c.id for c in document.contexts], [11, 12, 13])
+        self.assertEqual(document.contexts[1].text, "Paris is the capital of France.")
+        self.assertIsNone(document.contexts[2].title)
+        self.assertIsNone(document.contexts[2].score)
+        self.assertIsNone(document.contexts[2].has_answer)
+        self.assertEqual(batch[-1].contexts, [])
+        self.assertIs(batch[0], document)
+
+    def test_writes_go_to_columns(self):
+        batch = DocumentBatch.from_dicts(_records())
+        context = batch[0].contexts[2]
+        context.score = 0.5
+        context.has_answer = True
+        context.text = "Madrid is the capital of Spain."
+        self.assertEqual(batch.scores[2], 0.5)
+        self.assertEqual(batch.has_answer[2], 1)
+        self.assertEqual(batch[0].contexts[2].text, "Madrid is the capital of Spain.")
+
+    def test_copies_are_detached(self):
+        batch = DocumentBatch.from_dicts(_records())
+        context = batch[0].contexts[0]
+        for clone in (copy.copy(context), copy.deepcopy(context), pickle.loads(pickle.dumps(context))):
+            self.assertIs(type(clone), Context)
+            clone.score = 99.0
+        self.assertEqual(context.score, 3.0)
+
+    def test_rerank_and_metrics(self):
+        batch = DocumentBatch.from_dicts(_records(), n_docs=2)
+        document = batch[0]
+        document.rerank_by_scores([0.1, 0.9])
+        self.assertEqual([c.id for c in document.reorder_contexts], [12, 11])
+        self.assertEqual(list(batch.scores), [3.0, 2.0])
+        self.assertEqual(Metrics(batch.documents[:1]).top_k_accuracy(1, use_reordered=True), 100.0)
+
+    def test_round_trip_documents(self):
+        batch = DocumentBatch.from_dicts(_records())
+        documents = batch.to_documents()
+        self.assertIs(type(documents[0].contexts[0]), Context)
+        again = DocumentBatch.from_documents(documents)
+        self.assertEqual(again.texts.buffer, batch.texts.buffer)
+        self.assertEqual(list(again.offsets), [0, 3, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Unit tests for the copy-free reorder view on ``Document``.
+"""
+
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+from rankify.dataset.dataset import Answer, Context, Dataset, Document, Question
+from rankify.metrics.metrics import Metrics
+
+
+def _document():
+    contexts = [
+        Context(id="a", text="Berlin is in Germany.", title="Berlin", score=3.0, has_answer=False),
+        Context(id="b", text="Paris is the capital of France.", title="Paris", score=2.0, has_answer=True),
+        Context(id="c", text="Madrid is in Spain.", title="Madrid", score=1.0, has_answer=False),
+    ]
+    return Document(Question("What is the capital of France?"), Answer(["Paris"]), contexts, id=1)
+
+
+class TestReorderView(unittest.TestCase):
+    def test_rerank_by_scores_is_lazy_and_shares_text(self):
+        document = _document()
+        document.rerank_by_scores([0.1, 0.9, 0.1])
+
+        self.assertEqual(document.reorder_indices.tolist(), [1, 0, 2])
+        self.assertEqual(document.ranked_scores(), [0.9, 0.1, 0.1])
+
+        reordered = document.reorder_contexts
+        self.assertEqual([c.id for c in reordered], ["b", "a", "c"])
+        self.assertEqual([c.score for c in reordered], [0.9, 0.1, 0.1])
+        # Materialized contexts are new objects, but the passage strings are shared
+        self.assertIsNot(reordered[0], document.contexts[1])
+        self.assertIs(reordered[0].text, document.contexts[1].text)
+        # Retrieval scores are untouched
+        self.assertEqual([c.score for c in document.contexts], [3.0, 2.0, 1.0])
+        # In-place edits of the materialized list are kept
+        reordered.pop()
+        self.assertEqual(len(document.reorder_contexts), 2)
+
+    def test_order_only_keeps_retrieval_scores(self):
+        document = _document()
+        document.set_reorder([2, 0])
+        self.assertEqual([c.score for c in document.reorder_contexts], [1.0, 3.0])
+
+    def test_assigning_a_list_replaces_the_view(self):
+        document = _document()
+        document.rerank_by_scores([1.0, 2.0, 3.0])
+        document.reorder_contexts = [document.contexts[0]]
+        self.assertIsNone(document.reorder_indices)
+        self.assertEqual([c.id for c in document.ranked_contexts()], ["a"])
+
+    def test_score_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            _document().rerank_by_scores([1.0])
+
+    def test_metrics_and_save_read_the_view(self):
+        document = _document()
+        document.rerank_by_scores([0.1, 0.9, 0.2])
+        metrics = Metrics([document])
+        self.assertEqual(metrics.top_k_accuracy(1, use_reordered=True), 100.0)
+        self.assertEqual(metrics.top_k_accuracy(1, use_reordered=False), 0.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.json")
+            Dataset.save_documents([document], path, save_reranked=True)
+            with open(path) as f:
+                saved = json.load(f)[0]
+        self.assertEqual([c["id"] for c in saved["reranked_ctxs"]], ["b", "c", "a"])
+        self.assertEqual([c["score"] for c in saved["reranked_ctxs"]], [0.9, 0.2, 0.1])
+        # Saving did not need to materialize the reranked contexts
+        self.assertIsNotNone(document.reorder_indices)
+
+    def test_pickle_round_trip(self):
+        document = _document()
+        document.rerank_by_scores([0.1, 0.9, 0.2])
+        restored = pickle.loads(pickle.dumps(document))
+        self.assertEqual([c.id for c in restored.reorder_contexts], ["b", "c", "a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit tests for the persistent, content-addressed embedding cache.
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from rankify.utils.embedding_cache import EmbeddingCache, encode_with_cache, texts_fingerprint
+
+
+class CountingEncoder:
+    """ Deterministic fake encoder recording the texts it was asked to encode"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return self.expected(texts)
+
+    @staticmethod
+    def expected(texts):
+        return np.array([[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cache(self, **kwargs):
+        kwargs.setdefault("model", "toy-encoder")
+        return EmbeddingCache(self.tmp.name, **kwargs)
+
+    def test_only_new_texts_are_encoded(self):
+        cache, encoder = self._cache(), CountingEncoder()
+        first = cache.encode(["a", "bb", "a", "ccc"], encoder)
+        second = cache.encode(["ccc", "dddd", "bb", "dddd"], encoder)
+
+        self.assertEqual(encoder.calls, [["a", "bb", "ccc"], ["dddd"]])
+        np.testing.assert_array_equal(first, encoder.expected(["a", "bb", "a", "ccc"]))
+        np.testing.assert_array_equal(second, encoder.expected(["ccc", "dddd", "bb", "dddd"]))
+        self.assertEqual((cache.hits, cache.misses), (2, 6))
+        self.assertEqual(cache.stats()["size"], 4)
+
+    def test_persists_across_instances(self):
+        texts = [f"passage {i}" for i in range(50)]
+        self._cache().encode(texts, CountingEncoder())
+
+        encoder = CountingEncoder()
+        reopened = self._cache()
+        embeddings = reopened.encode(texts[::-1], encoder)
+        self.assertEqual(encoder.calls, [])
+        self.assertEqual(reopened.hit_rate, 1.0)
+        np.testing.assert_array_equal(embeddings, encoder.expected(texts[::-1]))
+
+    def test_namespaces_are_separate(self):
+        self._cache(instruction="query: ").encode(["x"], CountingEncoder())
+
+        encoder = CountingEncoder()
+        self._cache(instruction="passage: ").encode(["x"], encoder)
+        self._cache(instruction="query: ", max_length=128).encode(["x"], encoder)
+        self._cache(model="other-encoder", instruction="query: ").encode(["x"], encoder)
+        self.assertEqual(len(encoder.calls), 3)
+
+    def test_whole_corpus_stays_memory_mapped(self):
+        cache, texts = self._cache(), [f"doc {i}" for i in range(20)]
+        cache.encode(texts, CountingEncoder())
+        embeddings = self._cache().encode(texts, CountingEncoder())
+        self.assertIsInstance(embeddings, np.memmap)
+
+    def test_chunks_are_merged(self):
+        cache, encoder = self._cache(max_chunks=3), CountingEncoder()
+        for i in range(10):
+            cache.encode([f"text {i}", f"other {i}"], encoder)
+        keys = [name for name in os.listdir(cache.directory) if name.startswith("keys-")]
+        self.assertLessEqual(len(keys), 3)
+
+        texts = [f"text {i}" for i in range(10)] + [f"other {i}" for i in range(10)]
+        embeddings = self._cache().encode(texts, encoder)
+        self.assertEqual(len(encoder.calls), 10)
+        np.testing.assert_array_equal(embeddings, encoder.expected(texts))
+
+    def test_disabled_cache_encodes_everything(self):
+        encoder = CountingEncoder()
+        embeddings = encode_with_cache(None, ["a", "a"], encoder)
+        self.assertEqual(encoder.calls, [["a", "a"]])
+        self.assertEqual(embeddings.shape, (2, 3))
+
+    def test_encoder_output_size_is_checked(self):
+        with self.assertRaises(ValueError):
+            self._cache().encode(["a", "b"], lambda texts: np.zeros((1, 3), dtype=np.float32))
+
+    def test_texts_fingerprint(self):
+        self.assertEqual(texts_fingerprint(["a", "b"]), texts_fingerprint(["a", "b"]))
+        self.assertNotEqual(texts_fingerprint(["a", "b"]), texts_fingerprint(["b", "a"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
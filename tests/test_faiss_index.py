@@ -0,0 +1,132 @@
+"""
+Unit tests for the FAISS index factory in ``rankify.retrievers.faiss_index``.
+"""
+
+import os
+import tempfile
+import unittest
+from contextlib import nullcontext
+
+import numpy as np
+
+from rankify.retrievers.faiss_index import (
+    FAISS_AVAILABLE,
+    build_faiss_index,
+    index_cache_path,
+    load_or_build_faiss_index,
+    resolve_index_spec,
+    set_search_params,
+)
+
+if FAISS_AVAILABLE:
+    import faiss
+
+
+def random_embeddings(n=2000, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+class TestIndexSpec(unittest.TestCase):
+
+    def test_aliases(self):
+        self.assertEqual(resolve_index_spec(None), "Flat")
+        self.assertEqual(resolve_index_spec(" hnsw "), "HNSW32")
+        self.assertEqual(resolve_index_spec("OPQ+IVF"), "OPQ64,IVF65536,SQ8")
+        self.assertEqual(resolve_index_spec("IVF16,Flat"), "IVF16,Flat")
+
+    def test_cache_names(self):
+        self.assertEqual(index_cache_path("idx", "flat"), os.path.join("idx", "faiss_index.bin"))
+        self.assertEqual(index_cache_path("idx", "hnsw"), os.path.join("idx", "faiss_index.HNSW32.bin"))
+        self.assertEqual(index_cache_path("idx", "IVF16,PQ8", base_name="bge.bin"),
+                         os.path.join("idx", "bge.IVF16_PQ8.bin"))
+
+    def test_train_size_is_part_of_the_cache_name(self):
+        default = index_cache_path("idx", "IVF16,Flat")
+        small = index_cache_path("idx", "IVF16,Flat", train_size=500)
+        large = index_cache_path("idx", "IVF16,Flat", train_size=1000)
+        self.assertEqual(len({default, small, large}), 3)
+        self.assertEqual(small, os.path.join("idx", "faiss_index.IVF16_Flat.train500.bin"))
+        # Flat indexes are not trained, so the historical name is kept
+        self.assertEqual(index_cache_path("idx", "Flat", train_size=500), os.path.join("idx", "faiss_index.bin"))
+
+
+@unittest.skipUnless(FAISS_AVAILABLE, "faiss is not installed")
+class TestBuildFaissIndex(unittest.TestCase):
+
+    def test_flat_matches_brute_force(self):
+        embeddings = random_embeddings()
+        queries = random_embeddings(5, seed=1)
+        index = build_faiss_index(embeddings, "Flat", chunk_size=300)
+        self.assertEqual(index.ntotal, len(embeddings))
+        _, ids = index.search(queries, 10)
+        expected = np.argsort(-(queries @ embeddings.T), axis=1)[:, :10]
+        np.testing.assert_array_equal(ids, expected)
+
+    def test_normalize_gives_cosine_scores(self):
+        embeddings = random_embeddings(200)
+        index = build_faiss_index(embeddings, "Flat", normalize=True)
+        queries = embeddings[:3] * 5.0 / np.linalg.norm(embeddings[:3], axis=1, keepdims=True)
+        scores, ids = index.search(queries, 1)
+        np.testing.assert_array_equal(ids[:, 0], [0, 1, 2])
+        np.testing.assert_allclose(scores[:, 0], 5.0, rtol=1e-5)
+
+    def test_ivf_is_trained(self):
+        index = build_faiss_index(random_embeddings(), "IVF16,Flat", train_size=800)
+        self.assertTrue(index.is_trained)
+        self.assertEqual(index.ntotal, 2000)
+
+    def test_too_few_training_vectors(self):
+        with self.assertRaises(ValueError):
+            build_faiss_index(random_embeddings(100), "IVF256,Flat")
+
+    def test_set_search_params(self):
+        ivf = set_search_params(build_faiss_index(random_embeddings(), "IVF16,Flat"), nprobe=7, ef_search=99)
+        self.assertEqual(faiss.extract_index_ivf(ivf).nprobe, 7)
+        hnsw = set_search_params(build_faiss_index(random_embeddings(500), "HNSW16"), nprobe=7, ef_search=99)
+        self.assertEqual(faiss.downcast_index(hnsw).hnsw.efSearch, 99)
+        # Knobs that do not apply to the index type are ignored
+        set_search_params(build_faiss_index(random_embeddings(100), "Flat"), nprobe=7, ef_search=99)
+
+
+@unittest.skipUnless(FAISS_AVAILABLE, "faiss is not installed")
+class TestLoadOrBuildFaissIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.embeddings = random_embeddings()
+        self.opened = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_embeddings(self):
+        self.opened += 1
+        return nullcontext(self.embeddings)
+
+    def load(self, **kwargs):
+        return load_or_build_faiss_index(self.tmp.name, self.open_embeddings, **kwargs)
+
+    def test_built_once_then_reloaded(self):
+        built = self.load(index_spec="IVF16,Flat", nprobe=4)
+        self.assertTrue(os.path.exists(index_cache_path(self.tmp.name, "IVF16,Flat")))
+        reloaded = self.load(index_spec="IVF16,Flat", nprobe=4)
+        self.assertEqual(self.opened, 1)
+        self.assertEqual(faiss.extract_index_ivf(reloaded).nprobe, 4)
+        queries = random_embeddings(5, seed=1)
+        np.testing.assert_array_equal(built.search(queries, 10)[1], reloaded.search(queries, 10)[1])
+
+    def test_mmap_reload(self):
+        self.load(index_spec="flat")
+        index = self.load(index_spec="flat", mmap=True)
+        self.assertEqual(self.opened, 1)
+        self.assertEqual(index.ntotal, len(self.embeddings))
+
+    def test_changing_train_size_rebuilds(self):
+        self.load(index_spec="IVF16,Flat", train_size=500)
+        self.load(index_spec="IVF16,Flat", train_size=1000)
+        self.load(index_spec="IVF16,Flat", train_size=500)
+        self.assertEqual(self.opened, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
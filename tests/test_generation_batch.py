@@ -0,0 +1,105 @@
+"""
+Tests for batched generation: HuggingFaceModel.generate_batch and the RAG methods built on it.
+"""
+
+import threading
+import time
+import unittest
+
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.generator.models.base_rag_model import BaseRAGModel
+from rankify.generator.models.huggingface_model import HuggingFaceModel
+from rankify.generator.prompt_generator import PromptGenerator
+from rankify.generator.rag_methods.basic_rag import BasicRAG
+from rankify.generator.rag_methods.zero_shot import ZeroShotRAG
+
+WORDS = ["<eos>", "<unk>", "paris", "is", "the", "capital", "of", "france", ".", "berlin", "germany", "what"]
+
+
+def tiny_model(seed=0):
+    tokenizer = Tokenizer(models.WordLevel({word: i for i, word in enumerate(WORDS)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token="<eos>", unk_token="<unk>")
+    torch.manual_seed(seed)
+    model = GPT2LMHeadModel(GPT2Config(vocab_size=len(WORDS), n_layer=2, n_embd=32, n_head=2, n_positions=64)).eval()
+    return HuggingFaceModel("tiny", tokenizer, model, None)
+
+
+class TestHuggingFaceBatch(unittest.TestCase):
+    PROMPTS = ["what is the capital of france", "paris", "the capital of germany is berlin . what is",
+               "berlin is the capital", "france"]
+
+    def test_batches_match_one_prompt_at_a_time(self):
+        hf = tiny_model()
+        options = dict(do_sample=False, max_new_tokens=6, suppress_tokens=[0, 1])
+        expected = [hf.generate(prompt, **options) for prompt in self.PROMPTS]
+        self.assertEqual(hf.generate_batch(self.PROMPTS, batch_size=2, **options), expected)
+        self.assertEqual(hf.generate_batch(self.PROMPTS, batch_size=8, **options), expected)
+        self.assertIsNone(hf.tokenizer.pad_token)
+        self.assertEqual(hf.tokenizer.padding_side, "right")
+
+    def test_batches_are_length_sorted(self):
+        hf = tiny_model()
+        calls = []
+        generate = hf.model.generate
+
+        def recording_generate(**kwargs):
+            calls.append(kwargs["input_ids"].shape)
+            return generate(**kwargs)
+
+        hf.model.generate = recording_generate
+        hf.generate_batch(self.PROMPTS, batch_size=2, do_sample=False, max_new_tokens=2)
+        self.assertEqual([shape[0] for shape in calls], [2, 2, 1])
+        self.assertEqual([shape[1] for shape in calls], [9, 4, 1])  # longest first, little padding
+
+    def test_multiple_return_sequences_are_grouped_per_prompt(self):
+        hf = tiny_model()
+        answers = hf.generate_batch(self.PROMPTS[:3], num_return_sequences=2, do_sample=True, max_new_tokens=3)
+        self.assertEqual([len(group) for group in answers], [2, 2, 2])
+
+
+class _RecordingModel(BaseRAGModel):
+    def __init__(self, latency=0.0):
+        self.prompt_generator = PromptGenerator(method="basic-rag", model_type="stub")
+        self.batches = []
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+
+    def generate(self, prompt, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        return prompt.split()[-1]
+
+    def generate_batch(self, prompts, **kwargs):
+        self.batches.append(list(prompts))
+        return super().generate_batch(prompts, **kwargs)
+
+
+class TestRagMethodsBatch(unittest.TestCase):
+    def documents(self):
+        return [Document(question=Question(f"question {i}"), answers=Answer([]),
+                         contexts=[Context(id="1", title="t", text=f"context {i}", score=1.0)]) for i in range(4)]
+
+    def test_prompts_are_generated_in_one_batch(self):
+        for method, uses_contexts in ((BasicRAG, True), (ZeroShotRAG, False)):
+            model = _RecordingModel()
+            answers = method(model).answer_questions(self.documents())
+            self.assertEqual(len(model.batches), 1)
+            prompts = model.batches[0]
+            self.assertEqual(len(prompts), 4)
+            self.assertIn("question 2", prompts[2])
+            self.assertEqual("context 2" in prompts[2], uses_contexts)
+            self.assertEqual(answers, [prompt.split()[-1] for prompt in prompts])
+
+
+if __name__ == "__main__":
+    unittest.main()
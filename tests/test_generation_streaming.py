@@ -0,0 +1,142 @@
+"""
+Tests for streamed generation: HuggingFaceModel.generate_stream and the /rag Server-Sent Events.
+"""
+
+import json
+import time
+import unittest
+
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+from rankify.dataset.dataset import Context
+from rankify.generator.models.base_rag_model import BaseRAGModel
+from rankify.generator.models.huggingface_model import HuggingFaceModel
+from rankify.generator.prompt_generator import PromptGenerator
+from rankify.generator.rag_methods.basic_rag import BasicRAG
+from rankify.server.server import RankifyServer
+
+try:
+    from fastapi.testclient import TestClient
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+
+WORDS = ["<eos>", "<unk>", "paris", "is", "the", "capital", "of", "france", ".", "berlin", "germany", "what"]
+
+
+def tiny_tokenizer():
+    tokenizer = Tokenizer(models.WordLevel({word: i for i, word in enumerate(WORDS)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token="<eos>", unk_token="<unk>")
+
+
+class ScriptedModel:
+    """ Emits fixed tokens one at a time, honouring the stopping criteria like ``model.generate``"""
+
+    device = "cpu"
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.steps = 0
+
+    def generate(self, input_ids, streamer=None, stopping_criteria=None, **kwargs):
+        streamer.put(input_ids)
+        for token in self.tokens:
+            time.sleep(0.005)
+            input_ids = torch.cat([input_ids, torch.tensor([[token]])], dim=1)
+            self.steps += 1
+            streamer.put(torch.tensor([token]))
+            if stopping_criteria(input_ids, None).all():
+                break
+        streamer.end()
+
+
+class TestHuggingFaceStreaming(unittest.TestCase):
+    def test_stream_matches_generate(self):
+        torch.manual_seed(0)
+        model = GPT2LMHeadModel(GPT2Config(vocab_size=len(WORDS), n_layer=1, n_embd=32, n_head=2,
+                                           n_positions=64)).eval()
+        hf = HuggingFaceModel("tiny", tiny_tokenizer(), model, None)
+        options = dict(do_sample=False, max_new_tokens=8, suppress_tokens=[0, 1])
+        chunks = list(hf.generate_stream("what is the capital of france", **options))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), hf.generate("what is the capital of france", **options))
+
+    def test_stream_stops_generation_at_first_period(self):
+        tokenizer = tiny_tokenizer()
+        script = tokenizer("paris is the capital . berlin is the capital of germany")["input_ids"] * 4
+        model = ScriptedModel(script)
+        hf = HuggingFaceModel("scripted", tokenizer, model, None, stop_at_period=True)
+        self.assertEqual("".join(hf.generate_stream("what is the capital of france")), "paris is the capital .")
+        self.assertLess(model.steps, len(script))
+
+
+class _StreamingModel(BaseRAGModel):
+    def __init__(self):
+        self.prompt_generator = PromptGenerator(method="basic-rag", model_type="stub")
+        self.prompts = []
+
+    def generate(self, prompt, **kwargs):
+        return "".join(self.generate_stream(prompt))
+
+    def generate_stream(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        for chunk in ("Paris", " is", " the", " capital"):
+            yield chunk
+
+
+class _Stub:
+    def retrieve(self, documents):
+        for document in documents:
+            document.contexts = [Context(id=str(i), title="t", text=f"passage {i}", score=1.0) for i in range(5)]
+        return documents
+
+    def rank(self, documents):
+        return documents
+
+
+class _StubGenerator:
+    def __init__(self, model):
+        self.rag_method = BasicRAG(model)
+
+    def generate_stream(self, document, custom_prompt=None, **kwargs):
+        return self.rag_method.answer_question_stream(document, custom_prompt, **kwargs)
+
+
+class _StubServer(RankifyServer):
+    def _initialize_components(self):
+        self._retriever = self._reranker = _Stub()
+        self._generator = _StubGenerator(self.model)
+
+
+@unittest.skipUnless(FASTAPI_AVAILABLE, "fastapi is not installed")
+class TestRagEventStream(unittest.TestCase):
+    def test_contexts_then_tokens_then_timings(self):
+        server = _StubServer(generator="basic-rag")
+        server.model = _StreamingModel()
+        with TestClient(server.create_app()) as client:
+            response = client.post("/rag", json={"query": "capital of france", "n_contexts": 2, "stream": True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            event, data = block.split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+
+        self.assertEqual([name for name, _ in events], ["contexts", "token", "token", "token", "token", "done"])
+        self.assertEqual([c["id"] for c in events[0][1]["contexts"]], ["0", "1"])
+        self.assertEqual("".join(data["text"] for _, data in events[1:5]), "Paris is the capital")
+        done = events[-1][1]
+        self.assertEqual(done["answer"], "Paris is the capital")
+        self.assertEqual(done["tokens"], 4)
+        self.assertLessEqual(done["ttft_ms"], done["latency_ms"])
+        self.assertGreater(done["tokens_per_sec"], 0)
+        self.assertIn("passage 1", server.model.prompts[0])
+        self.assertNotIn("passage 2", server.model.prompts[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
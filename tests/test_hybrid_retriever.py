@@ -0,0 +1,153 @@
+"""
+Tests for HybridRetriever with stub sub-retrievers: batched RRF / weighted / interleave fusion against
+the original per-query implementations, deduplication, and the threaded sub-retriever path.
+"""
+
+import random
+import threading
+import unittest
+from collections import defaultdict
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.retrievers.hybrid_retriever import HybridRetriever
+
+
+class StubRetriever:
+    """Returns a fixed ranking per question and records the threads it ran on."""
+
+    def __init__(self, rankings, error=None, barrier=None):
+        self.rankings = rankings
+        self.error = error
+        self.barrier = barrier
+        self.threads = []
+
+    def retrieve(self, documents):
+        self.threads.append(threading.get_ident())
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        for document in documents:
+            document.contexts = [Context(id=doc_id, title=f"title {doc_id}", text=f"text {doc_id}", score=score)
+                                 for doc_id, score in self.rankings[document.question.question]]
+        return documents
+
+
+def random_rankings(questions, seed, pool=30, depth=12, scored=True):
+    rng = random.Random(seed)
+    return {
+        question: [(f"d{doc}", rng.uniform(-5, 20) if scored else None)
+                   for doc in rng.sample(range(pool), rng.randint(0, depth))]
+        for question in questions
+    }
+
+
+def hybrid(retrievers, **kwargs):
+    retriever = HybridRetriever(dense=[f"dense{i}" for i in range(len(retrievers) - 1)], **kwargs)
+    retriever._sparse_retriever, retriever._dense_retrievers = retrievers[0], retrievers[1:]
+    retriever._initialized = True
+    return retriever
+
+
+def documents(questions):
+    return [Document(question=Question(question), answers=Answer([]), id=i) for i, question in enumerate(questions)]
+
+
+def reference_fusion(per_retriever, fusion, weights, rrf_k, n_docs):
+    """The per-query fusion HybridRetriever used before batching, on ``[(id, score), ...]`` rankings."""
+    if fusion == "interleave":
+        seen, fused = set(), []
+        for rank in range(max(len(ranking) for ranking in per_retriever)):
+            for ranking in per_retriever:
+                if rank < len(ranking) and ranking[rank][0] not in seen:
+                    seen.add(ranking[rank][0])
+                    fused.append((ranking[rank][0], ranking[rank][1]))
+        return fused[:n_docs]
+
+    totals = defaultdict(float)
+    for r, ranking in enumerate(per_retriever):
+        scores = [score if score is not None else 1.0 / (j + 1) for j, (_, score) in enumerate(ranking)]
+        for j, (doc_id, _) in enumerate(ranking):
+            if fusion == "rrf":
+                totals[doc_id] += 1.0 / (rrf_k + j + 1)
+            else:
+                score_range = (max(scores) - min(scores)) or 1.0
+                totals[doc_id] += weights[r] * (scores[j] - min(scores)) / score_range
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n_docs]
+
+
+class TestHybridFusion(unittest.TestCase):
+
+    questions = [f"question {i}?" for i in range(25)]
+
+    def check_parity(self, fusion, scored=True, **kwargs):
+        rankings = [random_rankings(self.questions, seed, scored=scored) for seed in range(3)]
+        retriever = hybrid([StubRetriever(r) for r in rankings], fusion=fusion, n_docs=10, **kwargs)
+        fused = retriever.retrieve(documents(self.questions))
+
+        self.assertEqual([doc.question.question for doc in fused], self.questions)
+        for document in fused:
+            question = document.question.question
+            expected = reference_fusion([r[question] for r in rankings], fusion, retriever.weights,
+                                        retriever.rrf_k, retriever.n_docs)
+            self.assertEqual([c.id for c in document.contexts], [doc_id for doc_id, _ in expected])
+            for context, (_, score) in zip(document.contexts, expected):
+                if score is None:
+                    self.assertIsNone(context.score)
+                else:
+                    self.assertAlmostEqual(context.score, score)
+            self.assertEqual(len({c.id for c in document.contexts}), len(document.contexts))
+
+    def test_rrf_matches_per_query_fusion(self):
+        self.check_parity("rrf", rrf_k=10)
+
+    def test_weighted_matches_per_query_fusion(self):
+        self.check_parity("weighted", weights=[0.2, 0.5, 0.3])
+
+    def test_weighted_without_scores_uses_inverse_rank(self):
+        self.check_parity("weighted", scored=False)
+
+    def test_interleave_matches_per_query_fusion(self):
+        self.check_parity("interleave")
+
+    def test_duplicates_are_merged(self):
+        sparse = StubRetriever({"q?": [("a", 3.0), ("b", 2.0)]})
+        dense = StubRetriever({"q?": [("b", 0.9), ("a", 0.8), ("c", 0.1)]})
+        fused = hybrid([sparse, dense], fusion="rrf", rrf_k=0).retrieve(documents(["q?"]))[0]
+        self.assertEqual([(c.id, c.score) for c in fused.contexts], [("a", 1.5), ("b", 1.5), ("c", 1 / 3)])
+        self.assertEqual(fused.contexts[0].title, "title a")
+
+    def test_unknown_fusion(self):
+        with self.assertRaises(ValueError):
+            hybrid([StubRetriever({"q?": []})] * 2, fusion="max").retrieve(documents(["q?"]))
+
+
+class TestHybridExecution(unittest.TestCase):
+
+    def test_sub_retrievers_run_concurrently(self):
+        barrier = threading.Barrier(3)  # deadlocks (and times out) unless all three run at once
+        retrievers = [StubRetriever({"q?": [(f"d{i}", 1.0)]}, barrier=barrier) for i in range(3)]
+        fused = hybrid(retrievers).retrieve(documents(["q?"]))
+        self.assertEqual(sorted(c.id for c in fused[0].contexts), ["d0", "d1", "d2"])
+        self.assertEqual(len({r.threads[0] for r in retrievers}), 3)
+
+    def test_sequential_with_one_worker(self):
+        retrievers = [StubRetriever({"q?": [(f"d{i}", 1.0)]}) for i in range(3)]
+        hybrid(retrievers, max_workers=1).retrieve(documents(["q?"]))
+        self.assertEqual({r.threads[0] for r in retrievers}, {threading.get_ident()})
+
+    def test_caller_documents_are_not_modified(self):
+        originals = documents(["q?"])
+        hybrid([StubRetriever({"q?": [("a", 1.0)]})] * 2).retrieve(originals)
+        self.assertFalse(originals[0].contexts)
+
+    def test_failing_retriever_raises(self):
+        for max_workers in (None, 1):
+            retrievers = [StubRetriever({"q?": [("a", 1.0)]}), StubRetriever({}, error=RuntimeError("index offline")),
+                          StubRetriever({"q?": [("b", 1.0)]})]
+            with self.assertRaisesRegex(RuntimeError, "index offline"):
+                hybrid(retrievers, max_workers=max_workers).retrieve(documents(["q?"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
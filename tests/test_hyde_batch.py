@@ -0,0 +1,69 @@
+"""
+Tests for batched HyDE: concurrent hypothesis generation and grouped query embeddings.
+"""
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+try:
+    from rankify.utils.retrievers.hyde import average_by_group, hyde_query_vectors
+    from rankify.utils.retrievers.hyde.generator import Generator
+    HYDE_AVAILABLE = True
+except ImportError:
+    HYDE_AVAILABLE = False
+
+
+@unittest.skipUnless(HYDE_AVAILABLE, "openai is not installed")
+class TestHydeBatch(unittest.TestCase):
+    def test_average_by_group(self):
+        embeddings = np.arange(12, dtype=np.float32).reshape(6, 2)
+        means = average_by_group(embeddings, [1, 3, 2])
+        expected = np.stack([embeddings[0], embeddings[1:4].mean(0), embeddings[4:6].mean(0)])
+        np.testing.assert_allclose(means, expected)
+        with self.assertRaises(ValueError):
+            average_by_group(embeddings, [6, 0])
+
+    def test_query_vectors_match_per_question_means(self):
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            return np.array([[len(text), text.count("a")] for text in texts], dtype=np.float32)
+
+        prompts = ["a long prompt about paris", "short"]
+        hypotheses = [["a", "aaa bbb"], ["a much longer hypothetical passage"]]
+        vectors = hyde_query_vectors(embed, prompts, hypotheses)
+
+        self.assertEqual(len(calls), 1)  # one batched encoder call
+        self.assertEqual([len(text) for text in calls[0]], sorted(len(text) for text in calls[0]))
+        for vector, prompt, documents in zip(vectors, prompts, hypotheses):
+            np.testing.assert_allclose(vector, embed([prompt] + documents).mean(0))
+
+    def test_generate_batch_keeps_order_and_overlaps_calls(self):
+        class SlowGenerator(Generator):
+            def __init__(self):
+                super().__init__("stub", None)
+                self.lock = threading.Lock()
+                self.active = self.peak = 0
+
+            def generate(self, prompt):
+                with self.lock:
+                    self.active += 1
+                    self.peak = max(self.peak, self.active)
+                time.sleep(0.05)
+                with self.lock:
+                    self.active -= 1
+                return [prompt.upper()]
+
+        generator = SlowGenerator()
+        prompts = [f"q{i}" for i in range(8)]
+        self.assertEqual(generator.generate_batch(prompts, max_workers=4), [[p.upper()] for p in prompts])
+        self.assertEqual(generator.peak, 4)
+        self.assertEqual(generator.generate_batch(prompts[:2], max_workers=1), [["Q0"], ["Q1"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
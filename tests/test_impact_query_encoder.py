@@ -0,0 +1,180 @@
+"""
+Tests for batched SPLADE / uniCOIL query encoding, against the per-query encoding of pyserini's
+query encoders (reproduced below on a tiny random BERT, so no checkpoint or pyserini is needed).
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertForMaskedLM, BertModel, BertTokenizer
+
+from rankify.utils.retrievers.impact_query_encoder import BatchedImpactQueryEncoder
+
+WORDS = ["what", "is", "the", "capital", "of", "france", "paris", "who", "wrote", "hamlet", "shakespeare",
+         "how", "tall", "everest", "mount", "river", "longest", "world", "in"]
+QUERIES = ["what is the capital of france", "who wrote hamlet", "paris",
+           "how tall is mount everest", "longest river in the world", "who wrote hamlet",
+           "what is the longest river in the world and who wrote hamlet in paris"]
+
+
+def build_tokenizer(directory):
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS
+    path = os.path.join(directory, "vocab.txt")
+    with open(path, "w") as f:
+        f.write("\n".join(vocab))
+    return BertTokenizer(path)
+
+
+def bert_config(tokenizer):
+    return BertConfig(vocab_size=len(tokenizer.vocab), hidden_size=32, num_hidden_layers=2,
+                      num_attention_heads=2, intermediate_size=64)
+
+
+class SpladeQueryEncoder:
+    """ pyserini.encode.SpladeQueryEncoder"""
+
+    def __init__(self, tokenizer):
+        torch.manual_seed(0)
+        self.device = "cpu"
+        self.model = BertForMaskedLM(bert_config(tokenizer)).eval()
+        self.tokenizer = tokenizer
+        self.reverse_voc = {v: k for k, v in self.tokenizer.vocab.items()}
+        self.weight_range = 5
+        self.quant_range = 256
+
+    @torch.no_grad()
+    def encode(self, text, max_length=256, **kwargs):
+        inputs = self.tokenizer([text], max_length=max_length, padding="longest", truncation=True,
+                                add_special_tokens=True, return_tensors="pt").to(self.device)
+        input_ids = inputs["input_ids"]
+        input_attention = inputs["attention_mask"]
+        batch_logits = self.model(input_ids)["logits"]
+        batch_aggregated_logits, _ = torch.max(torch.log(1 + torch.relu(batch_logits))
+                                               * input_attention.unsqueeze(-1), dim=1)
+        batch_aggregated_logits = batch_aggregated_logits.cpu().detach().numpy()
+        raw_weights = self._output_to_weight_dicts(batch_aggregated_logits)
+        return self._get_encoded_query_token_wight_dicts(raw_weights)[0]
+
+    def _output_to_weight_dicts(self, batch_aggregated_logits):
+        to_return = []
+        for aggregated_logits in batch_aggregated_logits:
+            col = np.nonzero(aggregated_logits)[0]
+            weights = aggregated_logits[col]
+            to_return.append({self.reverse_voc[k]: float(v) for k, v in zip(list(col), list(weights))})
+        return to_return
+
+    def _get_encoded_query_token_wight_dicts(self, tok_weights):
+        return [{token: round(weight / self.weight_range * self.quant_range) for token, weight in d.items()}
+                for d in tok_weights]
+
+
+class UniCoilEncoder(torch.nn.Module):
+    """ pyserini.encode.UniCoilEncoder"""
+
+    def __init__(self, config):
+        super().__init__()
+        self.bert = BertModel(config)
+        self.tok_proj = torch.nn.Linear(config.hidden_size, 1)
+
+    def forward(self, input_ids, attention_mask=None):
+        if attention_mask is None:
+            attention_mask = input_ids != self.bert.config.pad_token_id
+        sequence_output = self.bert(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+        return torch.relu(self.tok_proj(sequence_output))
+
+
+class UniCoilQueryEncoder:
+    """ pyserini.encode.UniCoilQueryEncoder"""
+
+    def __init__(self, tokenizer):
+        torch.manual_seed(0)
+        self.device = "cpu"
+        self.model = UniCoilEncoder(bert_config(tokenizer)).eval()
+        self.tokenizer = tokenizer
+
+    @torch.no_grad()
+    def encode(self, text, **kwargs):
+        input_ids = self.tokenizer([text], max_length=128, padding="longest", truncation=True,
+                                   add_special_tokens=True, return_tensors="pt").to(self.device)["input_ids"]
+        batch_weights = self.model(input_ids).cpu().detach().numpy()
+        return self._output_to_weight_dicts(input_ids.cpu().numpy(), batch_weights)[0]
+
+    def _output_to_weight_dicts(self, batch_token_ids, batch_weights):
+        to_return = []
+        for i in range(len(batch_token_ids)):
+            weights = batch_weights[i].flatten()
+            tokens = self.tokenizer.convert_ids_to_tokens(batch_token_ids[i])
+            tok_weights = {}
+            for j in range(len(tokens)):
+                tok, weight = str(tokens[j]), float(weights[j])
+                if tok == "[CLS]":
+                    continue
+                if tok == "[PAD]":
+                    break
+                if tok not in tok_weights or weight > tok_weights[tok]:
+                    tok_weights[tok] = weight
+            to_return.append(tok_weights)
+        return to_return
+
+
+class TestBatchedImpactQueryEncoder(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as directory:
+            cls.tokenizer = build_tokenizer(directory)
+
+    def test_splade_batches_match_single_queries(self):
+        encoder = SpladeQueryEncoder(self.tokenizer)
+        batched = BatchedImpactQueryEncoder(encoder, batch_size=3).encode_batch(QUERIES)
+        for query, weights in zip(QUERIES, batched):
+            expected = encoder.encode(query)
+            self.assertEqual(weights.keys(), expected.keys())
+            for token in expected:
+                self.assertLessEqual(abs(weights[token] - expected[token]), 1)  # quantized; rounding ties
+
+    def test_unicoil_batches_match_single_queries(self):
+        encoder = UniCoilQueryEncoder(self.tokenizer)
+        batched = BatchedImpactQueryEncoder(encoder, batch_size=3).encode_batch(QUERIES)
+        for query, weights in zip(QUERIES, batched):
+            expected = encoder.encode(query)
+            self.assertEqual(weights.keys(), expected.keys())
+            for token in expected:
+                self.assertAlmostEqual(weights[token], expected[token], places=5)
+
+    def test_prefetched_queries_are_not_encoded_again(self):
+        encoder = UniCoilQueryEncoder(self.tokenizer)
+        batched = BatchedImpactQueryEncoder(encoder, batch_size=4, cache_size=0)
+        batched.prefetch(QUERIES)
+        calls = []
+        original = batched._encode_padded
+        batched._encode_padded = lambda *args: calls.append(1) or original(*args)
+        for query in QUERIES:
+            batched.encode(query)
+        self.assertEqual(calls, [])
+        batched.encode("paris france")
+        self.assertEqual(len(calls), 1)
+        self.assertIs(batched.tokenizer, encoder.tokenizer)
+
+    def test_cache_is_bounded(self):
+        batched = BatchedImpactQueryEncoder(UniCoilQueryEncoder(self.tokenizer), cache_size=2)
+        batched.encode_batch(QUERIES)
+        self.assertEqual(len(batched._cache), 2)
+
+    def test_cache_evicts_least_recently_used(self):
+        batched = BatchedImpactQueryEncoder(UniCoilQueryEncoder(self.tokenizer), cache_size=2)
+        batched.encode_batch(["paris", "france"])
+        batched.encode("paris")  # hit: "france" is now the least recently used
+        batched.encode_batch(["hamlet"])
+        self.assertEqual(list(batched._cache), ["paris", "hamlet"])
+        # Hits in a batch survive the eviction caused by the same batch's new queries
+        results = batched.encode_batch(["paris", "who", "wrote"])
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], batched.encode_batch(["paris"])[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
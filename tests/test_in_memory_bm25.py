@@ -0,0 +1,59 @@
+"""
+Unit tests for the in-memory BM25 scorer used by OnlineRetriever.
+"""
+
+import math
+import unittest
+
+from rankify.utils.retrievers.in_memory_bm25 import EnglishAnalyzer, InMemoryBM25, lucene_norm_length
+from rankify.utils.retrievers.porter_stemmer import PorterStemmer
+
+
+class TestAnalyzer(unittest.TestCase):
+    def test_porter_reference_words(self):
+        stemmer = PorterStemmer()
+        expected = {
+            "caresses": "caress", "ponies": "poni", "agreed": "agre", "hopping": "hop", "filing": "file",
+            "relational": "relat", "conformabli": "conform", "generalizations": "gener", "oscillators": "oscil",
+            "archaeology": "archaeolog", "is": "is",
+        }
+        self.assertEqual({word: stemmer.stem(word) for word in expected}, expected)
+
+    def test_lucene_style_analysis(self):
+        terms = EnglishAnalyzer().analyze("The President's speeches, e.g. about 3.14 running-dogs!")
+        self.assertEqual(terms, ["presid", "speech", "e.g", "about", "3.14", "run", "dog"])
+
+
+class TestInMemoryBM25(unittest.TestCase):
+    def test_lucene_norms(self):
+        # Lengths below 24 are exact; longer ones are rounded down by the one-byte encoding
+        self.assertEqual(lucene_norm_length([0, 23, 100, 1000]).tolist(), [0.0, 23.0, 96.0, 984.0])
+
+    def test_scores_match_bm25_formula(self):
+        passages = ["paris is the capital of france", "berlin capital", "lyon is a city in france france"]
+        hits = InMemoryBM25().search("capital of france", passages, k=10)
+
+        def expected(tf, df, dl, avgdl, n=3):
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            return idf * tf / (tf + 0.9 * (0.6 + 0.4 * dl / avgdl))
+
+        # Stop words are not indexed: lengths are 3, 2 and 4 terms
+        avgdl = (3 + 2 + 4) / 3
+        scores = dict(hits)
+        self.assertAlmostEqual(scores[0], expected(1, 2, 3, avgdl) + expected(1, 2, 3, avgdl), places=5)
+        self.assertAlmostEqual(scores[1], expected(1, 2, 2, avgdl), places=5)
+        self.assertAlmostEqual(scores[2], expected(2, 2, 4, avgdl), places=5)
+        self.assertEqual([i for i, _ in hits], [0, 2, 1])
+
+    def test_batch_keeps_collections_separate(self):
+        bm25 = InMemoryBM25()
+        queries = ["green tea", "neural networks", "nothing matches"]
+        collections = [["green tea is healthy", "coffee"], ["networks of neural cells", "tea"], ["abc"]]
+        batched = bm25.search_batch(queries, collections, k=5)
+        self.assertEqual(batched, [bm25.search(q, c, k=5) for q, c in zip(queries, collections)])
+        self.assertEqual([i for i, _ in batched[1]], [0])
+        self.assertEqual(batched[2], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
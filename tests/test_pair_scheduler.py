@@ -0,0 +1,83 @@
+"""
+Unit tests for the cross-query pair scheduler used by pointwise rerankers.
+"""
+
+import unittest
+
+import numpy as np
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.utils.pair_scheduler import PairScheduler, plan_batches
+
+
+def _document(question, texts):
+    contexts = [Context(id=str(i), text=text, score=0.0) for i, text in enumerate(texts)]
+    return Document(question=Question(question), answers=Answer([]), contexts=contexts)
+
+
+class TestPlanBatches(unittest.TestCase):
+    def test_every_pair_scheduled_once(self):
+        lengths = [5, 40, 12, 7, 40, 3, 21]
+        batches = plan_batches(lengths, batch_size=3)
+        flat = np.concatenate(batches)
+        self.assertEqual(sorted(flat.tolist()), list(range(len(lengths))))
+        self.assertTrue(all(len(batch) <= 3 for batch in batches))
+        # Longest pairs first
+        self.assertEqual(sorted(lengths[i] for i in batches[0]), [21, 40, 40])
+
+    def test_token_budget(self):
+        lengths = [100, 100, 10, 10, 10, 10, 500]
+        batches = plan_batches(lengths, batch_size=8, max_batch_tokens=200)
+        for batch in batches:
+            padded = len(batch) * max(lengths[i] for i in batch)
+            self.assertTrue(padded <= 200 or len(batch) == 1)
+        self.assertEqual(batches[0].tolist(), [6])
+
+    def test_empty(self):
+        self.assertEqual(plan_batches([], batch_size=4), [])
+
+
+class TestPairScheduler(unittest.TestCase):
+    def test_scores_scattered_across_documents(self):
+        documents = [
+            _document("q1", ["bb", "a", "cccc"]),
+            _document("q2", []),
+            _document("q3", ["ddd", "ee"]),
+        ]
+        seen_batches = []
+
+        def encode(queries, texts):
+            return list(zip(queries, texts)), [len(text) for text in texts]
+
+        def score_batch(pairs, indices):
+            seen_batches.append(len(indices))
+            return [len(pairs[i][1]) for i in indices]
+
+        scheduler = PairScheduler(batch_size=2, show_progress=False)
+        scheduler.rank(documents, encode, score_batch)
+
+        # Five pairs from different queries share batches of two
+        self.assertEqual(seen_batches, [2, 2, 1])
+        self.assertEqual([c.text for c in documents[0].reorder_contexts], ["cccc", "bb", "a"])
+        self.assertEqual([c.score for c in documents[0].reorder_contexts], [4.0, 2.0, 1.0])
+        self.assertEqual(documents[1].reorder_contexts, [])
+        self.assertEqual([c.text for c in documents[2].reorder_contexts], ["ddd", "ee"])
+        # Original contexts are left untouched
+        self.assertEqual([c.score for c in documents[0].contexts], [0.0, 0.0, 0.0])
+
+    def test_windows_bound_pairs_in_flight(self):
+        documents = [_document(f"q{i}", ["x"] * 3) for i in range(5)]
+        encoded_sizes = []
+
+        def encode(queries, texts):
+            encoded_sizes.append(len(texts))
+            return None, [1] * len(texts)
+
+        scheduler = PairScheduler(batch_size=4, max_pairs_in_flight=6, show_progress=False)
+        scheduler.rank(documents, encode, lambda _, indices: np.ones(len(indices)))
+        self.assertEqual(encoded_sizes, [6, 6, 3])
+        self.assertTrue(all(len(d.reorder_contexts) == 3 for d in documents))
+
+
+if __name__ == "__main__":
+    unittest.main()
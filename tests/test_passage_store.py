@@ -0,0 +1,100 @@
+"""
+Unit tests for the memory-mapped passage store.
+"""
+
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from rankify.utils.passage_store import PassageStore
+
+
+class TestPassageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_tsv_integer_ids(self):
+        path = self._write(
+            "psgs.tsv",
+            'id\ttext\ttitle\n1\t"Aaron ""the"" priest"\tAaron\n2\tsecond\tTwo\n7\tseventh\tSeven\n',
+        )
+        store = PassageStore.open_or_build(path)
+
+        self.assertEqual(store.id_mode, "int")
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store["1"], {"text": 'Aaron "the" priest', "title": "Aaron"})
+        self.assertEqual(store.get(7), {"text": "seventh", "title": "Seven"})
+        self.assertIn(2, store)
+        self.assertNotIn("3", store)
+        self.assertIsNone(store.get("999"))
+        self.assertEqual(
+            store.get_many(["2", 3, "x"]),
+            [{"text": "second", "title": "Two"}, None, None],
+        )
+
+    def test_jsonl_string_ids_last_duplicate_wins(self):
+        path = self._write(
+            "corpus.jsonl",
+            '{"id": "docA", "contents": "alpha"}\n'
+            '{"id": "docB", "text": "beta", "title": "B"}\n'
+            '{"id": "docA", "contents": "alpha again", "title": "A"}\n',
+        )
+        store = PassageStore.open_or_build(path)
+
+        self.assertEqual(store.id_mode, "hash")
+        self.assertEqual(store["docA"], {"text": "alpha again", "title": "A"})
+        self.assertEqual(store.get_many(["docB", "docC"]), [{"text": "beta", "title": "B"}, None])
+
+    def test_reopen_and_pickle(self):
+        path = self._write("psgs.tsv", "1\tone\tOne\n")
+        PassageStore.open_or_build(path)
+        store = PassageStore.open_or_build(path)
+        clone = pickle.loads(pickle.dumps(store))
+        self.assertEqual(clone["1"], {"text": "one", "title": "One"})
+
+    def test_rebuilds_when_source_changes(self):
+        path = self._write("psgs.tsv", "1\tone\tOne\n")
+        PassageStore.open_or_build(path)
+        self._write("psgs.tsv", "1\tuno\tOne\n2\tdos\tTwo\n")
+        store = PassageStore.open_or_build(path)
+        self.assertEqual(store["1"]["text"], "uno")
+        self.assertEqual(len(store), 2)
+
+    def test_ids_beyond_int64_are_misses(self):
+        store = PassageStore.open_or_build(self._write("psgs.tsv", "1\tone\tOne\n"))
+        self.assertEqual(store.id_mode, "int")
+        self.assertIsNone(store.get(2 ** 70))
+        self.assertNotIn(str(2 ** 64), store)
+        self.assertEqual(store.get_many([2 ** 70, "1"]), [None, {"text": "one", "title": "One"}])
+
+    def test_read_only_source_directory_uses_the_cache_dir(self):
+        path = self._write("psgs.tsv", "1\tone\tOne\n")
+        cache_dir = os.path.join(self.tmp.name, "cache")
+        with mock.patch.dict(os.environ, {"RERANKING_CACHE_DIR": cache_dir}), \
+             mock.patch("rankify.utils.passage_store.os.access", return_value=False):
+            store = PassageStore.open_or_build(path)
+            self.assertTrue(store.store_dir.startswith(os.path.join(cache_dir, "passage_stores")))
+            self.assertFalse(os.path.exists(path + ".store"))
+            self.assertEqual(store["1"], {"text": "one", "title": "One"})
+            self.assertEqual(PassageStore.open_or_build(path).store_dir, store.store_dir)
+
+        # An up-to-date store next to the source is still used
+        PassageStore.build(path, path + ".store")
+        with mock.patch("rankify.utils.passage_store.os.access", return_value=False):
+            self.assertEqual(PassageStore.open_or_build(path).store_dir, path + ".store")
+
+
+if __name__ == "__main__":
+    unittest.main()
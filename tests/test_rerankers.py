@@ -655,5 +655,46 @@ class TestDeARReranker(unittest.TestCase):
         self.assertIs(METHOD_MAP["dear_reranker"], DeARReranker)
 
 
+class TestSentenceTransformerRerankerRank(unittest.TestCase):
+    """``rank`` through the reorder view, with a stub encoder instead of a Sentence Transformer."""
+
+    @staticmethod
+    def _build_reranker():
+        try:
+            from rankify.models.sentence_transformer_reranker import SentenceTransformerReranker
+        except ImportError as exc:
+            raise unittest.SkipTest(f"Optional dependency not installed: {exc}")
+
+        # The query and every text embed to a 2-d vector; "relevant" texts point the query's way
+        def _encode(texts, **kwargs):
+            return torch.tensor([[1.0, 0.0] if "query" in text else
+                                 [float(text.count("relevant")), 1.0] for text in texts])
+
+        reranker = SentenceTransformerReranker.__new__(SentenceTransformerReranker)
+        reranker.model = MagicMock()
+        reranker.model.encode.side_effect = _encode
+        reranker.query_prefix = "query: "
+        reranker.document_prefix = "passage: "
+        reranker.normalize_embeddings = True
+        return reranker
+
+    def test_rank_reorders_contexts_by_similarity(self):
+        reranker = self._build_reranker()
+        contexts = [
+            Context(text="unrelated", id=1, score=3.0),
+            Context(text="relevant relevant relevant", id=2, score=2.0),
+            Context(text="relevant", id=3, score=1.0),
+        ]
+        doc = Document(question=Question("q"), answers=Answer([]), contexts=contexts)
+
+        reranker.rank([doc])
+
+        self.assertEqual([c.id for c in doc.reorder_contexts], [2, 3, 1])
+        self.assertEqual([c.score for c in doc.contexts], [3.0, 2.0, 1.0])
+        scores = [c.score for c in doc.reorder_contexts]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertAlmostEqual(scores[0], 3 / math.sqrt(10), places=5)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the binary columnar results store.
+"""
+
+import os
+import tempfile
+import unittest
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.dataset.results_store import load_results, save_results
+from rankify.metrics.metrics import Metrics
+
+
+def _documents():
+    documents = []
+    for q in range(3):
+        contexts = [
+            Context(id=f"d{q}-{i}", title=f"title {i}", text=f"text {q} {i}", score=float(10 - i), has_answer=(i == 2))
+            for i in range(4)
+        ]
+        documents.append(Document(Question(f"question {q}"), Answer([f"answer {q}"]), contexts, id=q))
+    documents[0].rerank_by_scores([0.1, 0.2, 0.9, 0.3])
+    documents[1].set_reorder([3, 1])
+    return documents
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.results")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        documents = _documents()
+        save_results(documents, self.path, save_text=True)
+        batch = load_results(self.path)
+
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch[1].question.question, "question 1?")
+        self.assertEqual(batch[1].answers.answers, ["answer 1"])
+        self.assertEqual(batch[2].id, "2")
+        self.assertEqual([c.text for c in batch[0].contexts], [c.text for c in documents[0].contexts])
+        self.assertEqual([c.id for c in batch[0].reorder_contexts], ["d0-2", "d0-3", "d0-1", "d0-0"])
+        self.assertEqual(batch[1].ranked_scores(), [7.0, 9.0])
+        self.assertIsNone(batch[2].reorder_indices)
+
+    def test_trec_and_metrics_match_documents(self):
+        documents = _documents()
+        save_results(documents, self.path)
+        batch = load_results(self.path)
+        self.assertIsNone(batch[0].contexts[0].text)
+        for use_reordered in (False, True):
+            expected = Metrics(documents).generate_trec_format(use_reordered)
+            self.assertEqual(batch.to_trec(use_reordered=use_reordered), expected)
+            self.assertEqual(Metrics(batch.documents).top_k_accuracy(1, use_reordered),
+                             Metrics(documents).top_k_accuracy(1, use_reordered))
+
+    def test_updates_do_not_touch_files(self):
+        save_results(_documents(), self.path)
+        batch = load_results(self.path)
+        batch[2].contexts[0].score = -1.0
+        batch[2].rerank_by_scores([0.0, 0.0, 0.0, 1.0])
+        self.assertTrue(batch.to_trec(use_reordered=True).splitlines()[-4].startswith("2 Q0 d2-3 1 1.0"))
+        self.assertEqual(load_results(self.path)[2].contexts[0].score, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
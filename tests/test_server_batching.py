@@ -0,0 +1,203 @@
+"""
+Tests for the server's micro-batching scheduler and its use by the /retrieve and /rerank endpoints.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from rankify.dataset.dataset import Context
+from rankify.server.batching import MicroBatcher
+from rankify.server.server import RankifyServer
+
+try:
+    from fastapi.testclient import TestClient
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_concurrent_submits_are_coalesced(self):
+        sizes = []
+
+        def double(items):
+            sizes.append(len(items))
+            time.sleep(0.01)
+            return [item * 2 for item in items]
+
+        async def run():
+            batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=20)
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+            await batcher.close()
+            return results, batcher
+
+        results, batcher = asyncio.run(run())
+        self.assertEqual(results, [i * 2 for i in range(20)])
+        self.assertEqual(sum(sizes), 20)
+        self.assertLessEqual(max(sizes), 8)
+        self.assertLess(len(sizes), 20)
+        self.assertEqual(batcher.batches, len(sizes))
+        self.assertAlmostEqual(batcher.mean_batch_size, 20 / len(sizes))
+
+    def test_batches_do_not_overlap_by_default(self):
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fn(items):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return items
+
+        async def run():
+            batcher = MicroBatcher(fn, max_batch_size=2, max_wait_ms=0)
+            results = await batcher.submit_many(list(range(10)))
+            await batcher.close()
+            return results
+
+        self.assertEqual(asyncio.run(run()), list(range(10)))
+        self.assertEqual(state["peak"], 1)
+
+    def test_errors_reach_every_caller_of_the_batch(self):
+        def fn(items):
+            if "bad" in items:
+                raise ValueError("model failed")
+            return items
+
+        async def run():
+            batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=20)
+            outcomes = await asyncio.gather(batcher.submit("bad"), batcher.submit("ok"), return_exceptions=True)
+            after = await batcher.submit("ok")  # the batcher keeps serving after a failed batch
+            await batcher.close()
+            return outcomes, after
+
+        outcomes, after = asyncio.run(run())
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+        self.assertEqual(after, "ok")
+
+    def test_wrong_result_count_is_an_error(self):
+        async def run():
+            batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=2, max_wait_ms=0)
+            try:
+                await batcher.submit(1)
+            finally:
+                await batcher.close()
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            MicroBatcher(list, max_batch_size=0)
+        with self.assertRaises(ValueError):
+            MicroBatcher(list, max_concurrent_batches=0)
+
+
+class _StubRetriever:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def retrieve(self, documents):
+        self.batch_sizes.append(len(documents))
+        for document in documents:
+            document.contexts = [Context(id=str(i), title="", text=f"{document.question.question} {i}", score=1.0)
+                                 for i in range(3)]
+        return documents
+
+
+class _StubServer(RankifyServer):
+    def _initialize_components(self):
+        self._retriever = _StubRetriever()
+
+
+class _ExclusiveModel:
+    """Records whether two threads ever use it at the same time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.overlapped = False
+        self.calls = 0
+
+    def _use(self):
+        with self._lock:
+            self.active += 1
+            self.overlapped |= self.active > 1
+            self.calls += 1
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+
+    def retrieve(self, documents):
+        self._use()
+        for document in documents:
+            document.contexts = [Context(id=str(i), title="", text=f"passage {i}", score=1.0) for i in range(3)]
+        return documents
+
+    def rank(self, documents):
+        self._use()
+        return documents
+
+    def generate(self, documents):
+        self._use()
+        return ["answer"] * len(documents)
+
+
+class _ExclusiveServer(RankifyServer):
+    def _initialize_components(self):
+        self._retriever, self._reranker, self._generator = _ExclusiveModel(), _ExclusiveModel(), _ExclusiveModel()
+
+
+class TestServerModelLocks(unittest.TestCase):
+    def test_models_are_not_used_concurrently_by_different_batchers(self):
+        from rankify.dataset.dataset import Answer, Document, Question
+
+        def document(query):
+            return Document(question=Question(query), answers=Answer([]), contexts=[])
+
+        server = _ExclusiveServer(generator="basic-rag", max_batch_size=1, max_wait_ms=0)
+        server._load_components()
+
+        async def run():
+            server._create_batchers()
+            requests = []
+            for i in range(6):
+                requests.append(server._retrieve_batcher.submit(document(f"r{i}")))
+                requests.append(server._rerank_batcher.submit(document(f"k{i}")))
+                requests.append(server._rag_batcher.submit((document(f"g{i}"), 2)))
+            results = await asyncio.gather(*requests)
+            await server._close_batchers()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(results[2][1], "answer")
+        self.assertEqual(len(results[2][0].contexts), 2)
+        for model in (server._retriever, server._reranker, server._generator):
+            self.assertEqual(model.calls, 6 if model is server._generator else 12)
+            self.assertFalse(model.overlapped)
+
+
+@unittest.skipUnless(FASTAPI_AVAILABLE, "fastapi is not installed")
+class TestServerBatching(unittest.TestCase):
+    def test_batch_endpoint_goes_through_one_batched_call(self):
+        server = _StubServer(max_batch_size=16, max_wait_ms=50)
+        with TestClient(server.create_app()) as client:
+            response = client.post("/retrieve/batch", json=[f"q{i}" for i in range(5)], params={"n_docs": 2})
+            single = client.post("/retrieve", json={"query": "alone", "n_docs": 2})
+
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(single.status_code, 200, single.text)
+        self.assertEqual(server._retriever.batch_sizes, [5, 1])
+        results = response.json()["results"]
+        self.assertEqual([r["query"] for r in results], [f"q{i}" for i in range(5)])
+        self.assertEqual(results[3]["documents"][0]["text"], "q3? 0")
+        self.assertEqual(len(single.json()["documents"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for pre-fork serving: the shared per-worker load table and the forked worker supervisor.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+import unittest
+import urllib.request
+from unittest import mock
+
+from rankify.server.prefork import WorkerStats, serve_prefork
+from rankify.server.server import RankifyServer
+
+try:
+    from fastapi.testclient import TestClient
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+
+FORK_AVAILABLE = hasattr(os, "fork")
+
+
+class TestForkSafety(unittest.TestCase):
+    @unittest.skipUnless(FORK_AVAILABLE, "requires os.fork")
+    def test_refuses_to_fork_with_cuda_initialized(self):
+        import torch
+
+        with mock.patch.object(torch.cuda, "is_initialized", return_value=True), \
+                mock.patch("os.fork") as fork:
+            with self.assertRaisesRegex(RuntimeError, "CPU-only"):
+                serve_prefork(lambda: None, None, 2, WorkerStats(2))
+        fork.assert_not_called()
+
+
+class TestWorkerStats(unittest.TestCase):
+    @unittest.skipUnless(FORK_AVAILABLE, "requires os.fork")
+    def test_rows_written_by_forked_workers_are_visible_to_all(self):
+        stats = WorkerStats(3)
+        pids = []
+        for index in range(2):
+            pid = os.fork()
+            if pid == 0:
+                stats.attach(index)
+                for _ in range(index + 2):
+                    stats.request_started()
+                stats.request_finished(error=True)
+                os._exit(0)
+            pids.append(pid)
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+        rows = stats.snapshot()
+        self.assertEqual([row["worker"] for row in rows], [0, 1])  # row 2 was never attached
+        self.assertEqual([row["pid"] for row in rows], pids)
+        self.assertEqual([row["requests"] for row in rows], [2, 3])
+        self.assertEqual([row["in_flight"] for row in rows], [1, 2])
+        self.assertEqual([row["errors"] for row in rows], [1, 1])
+
+
+class _StubServer(RankifyServer):
+    def _initialize_components(self):
+        self._retriever = object()
+
+
+@unittest.skipUnless(FASTAPI_AVAILABLE, "fastapi is not installed")
+class TestHealthLoad(unittest.TestCase):
+    def test_health_reports_worker_load(self):
+        server = _StubServer()
+        with TestClient(server.create_app()) as client:
+            client.get("/health")
+            client.get("/missing")
+            health = client.get("/health").json()
+
+        self.assertEqual(health["worker"], 0)
+        row, = health["workers"]
+        self.assertEqual(row["pid"], os.getpid())
+        self.assertEqual(row["requests"], 3)
+        self.assertEqual(row["in_flight"], 1)  # the /health request being answered
+
+
+_PREFORK_SCRIPT = textwrap.dedent("""
+    import sys
+    from rankify.server.server import RankifyServer
+
+    class StubServer(RankifyServer):
+        def _initialize_components(self):
+            self._retriever = object()
+
+    StubServer().start(host="127.0.0.1", port=int(sys.argv[1]), workers=2)
+""")
+
+
+@unittest.skipUnless(FASTAPI_AVAILABLE and FORK_AVAILABLE, "requires fastapi and os.fork")
+class TestPrefork(unittest.TestCase):
+    def test_forked_workers_serve_and_stop_on_sigterm(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        process = subprocess.Popen([sys.executable, "-c", _PREFORK_SCRIPT, str(port)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            health = None
+            deadline = time.time() + 60
+            while time.time() < deadline:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=5) as response:
+                        health = json.load(response)
+                    if len(health["workers"]) == 2:
+                        break
+                except OSError:
+                    pass
+                time.sleep(0.2)
+            self.assertIsNotNone(health, "server did not start")
+            pids = [row["pid"] for row in health["workers"]]
+            self.assertEqual(len(set(pids)), 2)
+            self.assertNotIn(process.pid, pids)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            self.assertEqual(process.wait(timeout=30), 0)
+        for pid in pids:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for the native SPLADE index: exhaustive and block-max search against brute-force dot products,
+memory-mapped save/load, and corpus encoding with a SPLADE model (a tiny random BERT stands in for
+the ``transformer_rep.Splade`` checkpoints).
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+from scipy import sparse
+from transformers import BertConfig, BertForMaskedLM, BertTokenizer
+
+from rankify.utils.retrievers.sparse_index import SparseIndex, encode_sparse
+
+WORDS = ["what", "is", "the", "capital", "of", "france", "paris", "who", "wrote", "hamlet", "shakespeare"]
+
+
+def random_vectors(n, vocab_size, terms, seed):
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(np.arange(n), terms)
+    cols = rng.integers(0, vocab_size, size=n * terms)
+    return sparse.csr_matrix((rng.random(n * terms).astype(np.float32), (rows, cols)), shape=(n, vocab_size))
+
+
+def brute_force(queries, documents, k):
+    scores = (queries @ documents.T).toarray()
+    return [[(str(j), scores[i, j]) for j in np.lexsort((np.arange(len(row)), -row))[:k] if row[j] > 0]
+            for i, row in enumerate(scores)]
+
+
+class Splade(torch.nn.Module):
+    """ transformer_rep.Splade (agg="max") on a tiny random BERT"""
+
+    def __init__(self, tokenizer):
+        super().__init__()
+        torch.manual_seed(0)
+        self.transformer = BertForMaskedLM(BertConfig(vocab_size=len(tokenizer.vocab), hidden_size=32,
+                                                      num_hidden_layers=2, num_attention_heads=2,
+                                                      intermediate_size=64)).eval()
+        self.transformer_rep = type("TransformerRep", (), {"tokenizer": tokenizer})()
+        self.transformer_rep_q = None
+        self.output_dim = len(tokenizer.vocab)
+
+    def encode(self, tokens, is_q):
+        out = self.transformer(**tokens)["logits"]
+        values, _ = torch.max(torch.log(1 + torch.relu(out)) * tokens["attention_mask"].unsqueeze(-1), dim=1)
+        return values
+
+
+class TestSparseIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.documents = random_vectors(1000, 500, 20, seed=0)
+        cls.queries = random_vectors(30, 500, 5, seed=1)
+        cls.index = SparseIndex.build(cls.documents, [str(i) for i in range(1000)], block_size=16)
+
+    def assertHitsEqual(self, hits, expected):
+        self.assertEqual([[d for d, _ in h] for h in hits], [[d for d, _ in e] for e in expected])
+        for h, e in zip(hits, expected):
+            np.testing.assert_allclose([s for _, s in h], [s for _, s in e], rtol=1e-5)
+
+    def test_exhaustive_search_matches_brute_force(self):
+        expected = brute_force(self.queries, self.documents, 10)
+        self.assertHitsEqual(self.index.search(self.queries, k=10, pruning=False, query_batch_size=7), expected)
+
+    def test_block_max_search_is_exact(self):
+        expected = brute_force(self.queries, self.documents, 10)
+        for blocks_per_step in (1, 4, 100):
+            hits = self.index.search(self.queries, k=10, blocks_per_step=blocks_per_step)
+            self.assertHitsEqual(hits, expected)
+
+    def test_approximate_block_max_search(self):
+        expected = brute_force(self.queries, self.documents, 10)
+        hits = self.index.search(self.queries, k=10, alpha=0.5)
+        for h, e in zip(hits, expected):
+            self.assertEqual(len(h), len(e))
+            self.assertLessEqual(h[0][1], e[0][1] + 1e-5)
+
+    def test_save_and_load_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.index.save(directory)
+            index = SparseIndex.load(directory)
+            self.assertIsInstance(index.block_offsets, np.memmap)
+            self.assertHitsEqual(index.search(self.queries, k=5), self.index.search(self.queries, k=5))
+            del index
+
+    def test_doc_ids_must_match_vectors(self):
+        with self.assertRaises(ValueError):
+            SparseIndex.build(self.documents, ["a", "b"])
+
+    def test_encode_sparse_matches_single_texts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "vocab.txt")
+            with open(path, "w") as f:
+                f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS))
+            tokenizer = BertTokenizer(path)
+        model = Splade(tokenizer)
+        texts = ["who wrote hamlet", "paris", "what is the capital of france", "shakespeare wrote hamlet"]
+        vectors = encode_sparse(model, texts, batch_size=3)
+        self.assertEqual(vectors.shape, (4, len(tokenizer.vocab)))
+        for i, text in enumerate(texts):
+            expected = encode_sparse(model, [text]).toarray()[0]
+            np.testing.assert_allclose(vectors[i].toarray()[0], expected, atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
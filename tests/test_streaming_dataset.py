@@ -0,0 +1,160 @@
+"""
+Unit tests for the streaming dataset loader and its byte-offset side index.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import rankify.dataset.streaming as streaming
+from rankify.dataset.dataset import Dataset
+from rankify.dataset.streaming import StreamingDataset
+from rankify.metrics.metrics import Metrics
+from rankify.pipeline import Pipeline
+
+try:
+    from rankify.models.reranking import Reranking
+    RERANKING_AVAILABLE = True
+except ImportError:
+    RERANKING_AVAILABLE = False
+
+
+def _records(n=20):
+    return [
+        {
+            "question": f'question {i} with "quotes", \\ and {{brackets]',
+            "answers": ["x}"],
+            "query_id": i,
+            "ctxs": [{"id": j, "text": f"passage {j} ]\"", "title": "t", "score": float(j), "has_answer": j == 1}
+                     for j in range(5)],
+        }
+        for i in range(n)
+    ]
+
+
+class TestStreamingDataset(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp.name, "data.json")
+        self.jsonl_path = os.path.join(self.tmp.name, "data.jsonl")
+        with open(self.json_path, "w") as f:
+            json.dump(_records(), f, indent=2)
+        with open(self.jsonl_path, "w") as f:
+            f.write("\n".join(json.dumps(r) for r in _records()) + "\n\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_eager_loader(self):
+        # A tiny block size makes tokens straddle block boundaries
+        block_size, streaming._BLOCK_SIZE = streaming._BLOCK_SIZE, 31
+        try:
+            expected = Dataset.load_dataset(self.json_path, n_docs=3)
+            for path in (self.json_path, self.jsonl_path):
+                dataset = StreamingDataset(path, n_docs=3, chunk_size=6)
+                self.assertEqual(len(dataset), 20)
+                self.assertEqual([d.question.question for d in dataset], [d.question.question for d in expected])
+                self.assertEqual([c.id for c in dataset[7].contexts], [0, 1, 2])
+                self.assertEqual(dataset[-1].id, "19")
+                self.assertEqual([d.id for d in dataset[4:6]], ["4", "5"])
+                self.assertEqual([len(chunk) for chunk in dataset.iter_chunks()], [6, 6, 6, 2])
+        finally:
+            streaming._BLOCK_SIZE = block_size
+
+    def test_index_cached_and_invalidated(self):
+        StreamingDataset(self.jsonl_path)
+        self.assertTrue(os.path.exists(self.jsonl_path + streaming.INDEX_SUFFIX))
+        with open(self.jsonl_path, "a") as f:
+            f.write(json.dumps(_records(1)[0]) + "\n")
+        self.assertEqual(len(StreamingDataset(self.jsonl_path)), 21)
+
+    def test_chunked_rerank_and_append(self):
+        output = os.path.join(self.tmp.name, "out", "reranked.jsonl")
+        for chunk in StreamingDataset(self.json_path).iter_chunks(8):
+            for document in chunk:
+                document.rerank_by_scores([0.0, 1.0, 0.5, 0.2, 0.1])
+            Dataset.append_documents(chunk, output, save_reranked=True)
+        reranked = StreamingDataset(output)
+        self.assertEqual(len(reranked), 20)
+        with open(output) as f:
+            first = json.loads(f.readline())
+        self.assertEqual([c["id"] for c in first["reranked_ctxs"]][:2], [1, 2])
+        self.assertEqual(first["query_id"], "0")
+
+
+class _ReverseRanker:
+    """Stands in for a reranker: reverses the retrieval order."""
+
+    def rank(self, documents):
+        for document in documents:
+            document.rerank_by_scores(range(len(document.contexts)))
+        return documents
+
+
+def _answer_records(n=23):
+    # has_answer is left unset so the metrics match answers themselves
+    return [
+        {
+            "question": f"question {i}",
+            "answers": [f"answer{i}"],
+            "query_id": i,
+            "ctxs": [{"id": f"{i}-{j}", "text": f"passage answer{i}" if j == i % 4 else f"passage {j}",
+                      "title": "t", "score": float(10 - j)} for j in range(6)],
+        }
+        for i in range(n)
+    ]
+
+
+@unittest.skipUnless(RERANKING_AVAILABLE, "reranker dependencies are not installed")
+class TestStreamingRankAndMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data.jsonl")
+        with open(self.path, "w") as f:
+            f.write("\n".join(json.dumps(r) for r in _answer_records()) + "\n")
+        self.reranking = Reranking.__new__(Reranking)
+        self.reranking.ranker = _ReverseRanker()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rank_and_metrics_match_in_memory(self):
+        in_memory = self.reranking.rank(list(StreamingDataset(self.path, n_docs=5)))
+        output = os.path.join(self.tmp.name, "reranked.jsonl")
+        reranked = self.reranking.rank(StreamingDataset(self.path, n_docs=5, chunk_size=4), output_path=output)
+
+        self.assertIsInstance(reranked, StreamingDataset)
+        self.assertEqual(len(reranked), 23)
+        self.assertEqual([c.id for c in reranked[3].reorder_contexts], ["3-4", "3-3", "3-2", "3-1", "3-0"])
+        self.assertEqual(reranked[3].reorder_contexts[0].text, "passage 4")
+
+        for use_reordered in (False, True):
+            expected = Metrics(in_memory).calculate_retrieval_metrics(ks=[1, 2, 5], use_reordered=use_reordered)
+            self.assertEqual(Metrics(reranked).calculate_retrieval_metrics(ks=[1, 2, 5], use_reordered=use_reordered),
+                             expected)
+            self.assertEqual(Metrics(reranked).top_k_accuracy(1, use_reordered), expected["top_1"])
+            self.assertEqual(Metrics(reranked).generate_trec_format(use_reordered),
+                             Metrics(in_memory).generate_trec_format(use_reordered))
+        self.assertNotEqual(Metrics(reranked).calculate_retrieval_metrics(ks=[1], use_reordered=True),
+                            Metrics(reranked).calculate_retrieval_metrics(ks=[1]))
+
+        predictions = [f"answer{i}" if i % 2 else "wrong" for i in range(23)]
+        self.assertEqual(Metrics(reranked).calculate_generation_metrics(predictions),
+                         Metrics(in_memory).calculate_generation_metrics(predictions))
+
+        # Ranking again overwrites the output instead of appending to it
+        self.reranking.rank(StreamingDataset(self.path, n_docs=5), output_path=output)
+        self.assertEqual(len(StreamingDataset(output)), 23)
+
+    def test_streaming_rank_needs_an_output_file(self):
+        with self.assertRaises(ValueError):
+            self.reranking.rank(StreamingDataset(self.path))
+
+    def test_pipeline_rejects_streaming_dataset(self):
+        with self.assertRaises(TypeError):
+            Pipeline(task="search")("question 0", StreamingDataset(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
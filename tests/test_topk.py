@@ -0,0 +1,60 @@
+"""
+Unit tests for the shared top-k helpers in ``rankify.retrievers.utils``.
+"""
+
+import unittest
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from rankify.retrievers.utils import dense_topk, topk_from_scores
+
+
+class TestTopkFromScores(unittest.TestCase):
+
+    def test_matches_full_sort(self):
+        rng = np.random.default_rng(0)
+        scores = rng.standard_normal((4, 50)).astype(np.float32)
+        top_scores, top_indices = topk_from_scores(scores, 7)
+        expected = np.argsort(-scores, axis=1, kind="stable")[:, :7]
+        np.testing.assert_array_equal(top_indices, expected)
+        np.testing.assert_allclose(top_scores, np.take_along_axis(scores, expected, axis=1))
+
+    def test_ties_keep_corpus_order(self):
+        top_scores, top_indices = topk_from_scores(np.array([1.0, 2.0, 2.0, 0.5, 2.0]), 3)
+        self.assertEqual(top_indices.tolist(), [1, 2, 4])
+        self.assertEqual(top_scores.tolist(), [2.0, 2.0, 2.0])
+
+    def test_k_larger_than_corpus(self):
+        top_scores, top_indices = topk_from_scores(np.array([0.1, 0.3, 0.2]), 10)
+        self.assertEqual(top_indices.tolist(), [1, 2, 0])
+
+
+class TestDenseTopk(unittest.TestCase):
+
+    def test_sharded_search_matches_full_matrix(self):
+        rng = np.random.default_rng(1)
+        queries = rng.standard_normal((5, 16)).astype(np.float32)
+        corpus = rng.standard_normal((103, 16)).astype(np.float32)
+
+        top_scores, top_indices = dense_topk(
+            queries, corpus, k=10, query_batch_size=2, corpus_chunk_size=7
+        )
+
+        full = (F.normalize(torch.from_numpy(queries), dim=1) @ F.normalize(torch.from_numpy(corpus), dim=1).T).numpy()
+        expected = np.argsort(-full, axis=1)[:, :10]
+        np.testing.assert_array_equal(top_indices, expected)
+        np.testing.assert_allclose(top_scores, np.take_along_axis(full, expected, axis=1), rtol=1e-5, atol=1e-6)
+
+    def test_k_larger_than_shard_and_corpus(self):
+        rng = np.random.default_rng(2)
+        queries = rng.standard_normal((2, 8)).astype(np.float32)
+        corpus = rng.standard_normal((12, 8)).astype(np.float32)
+        top_scores, top_indices = dense_topk(queries, corpus, k=50, corpus_chunk_size=5)
+        self.assertEqual(top_indices.shape, (2, 12))
+        self.assertTrue(np.all(np.diff(top_scores, axis=1) <= 1e-6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the in-process TREC evaluator.
+"""
+
+import math
+import os
+import random
+import tempfile
+import unittest
+
+from rankify.dataset.dataset import Answer, Context, Document, Question
+from rankify.metrics.metrics import Metrics
+from rankify.metrics.trec_eval import Qrels, TrecEvaluator
+
+try:
+    import pytrec_eval
+    PYTREC_EVAL_AVAILABLE = True
+except ImportError:
+    PYTREC_EVAL_AVAILABLE = False
+
+
+class TestTrecEvaluator(unittest.TestCase):
+    def test_hand_computed(self):
+        qrels = Qrels.from_dict({"q1": {"a": 2, "c": 1, "z": 1}, "q2": {"x": 1}})
+        # Ties are broken by descending document id, so "c" ranks above "b"
+        qids = ["q1", "q1", "q1"]
+        docids = ["a", "b", "c"]
+        scores = [3.0, 1.0, 1.0]
+        per_query = TrecEvaluator(qrels).evaluate_per_query(
+            qids, docids, scores, ndcg_cuts=[3], map_cuts=[3], mrr_cuts=[1], recall_cuts=[3], precision_cuts=[2])
+
+        q1 = per_query["q1"]
+        dcg = 2 + 1 / math.log2(3)
+        idcg = 2 + 1 / math.log2(3) + 1 / math.log2(4)
+        self.assertAlmostEqual(q1["ndcg@3"], dcg / idcg)
+        self.assertAlmostEqual(q1["map@3"], (1 + 1) / 3)
+        self.assertEqual(q1["mrr@1"], 1.0)
+        self.assertAlmostEqual(q1["recall@3"], 2 / 3)
+        self.assertEqual(q1["precision@2"], 1.0)
+        # Judged queries missing from the run count as zero
+        self.assertEqual(per_query["q2"]["ndcg@3"], 0.0)
+
+    @unittest.skipUnless(PYTREC_EVAL_AVAILABLE, "pytrec_eval is not installed")
+    def test_matches_trec_eval(self):
+        rng = random.Random(0)
+        qrels, run = {}, {}
+        for q in range(20):
+            qid = str(q)
+            qrels[qid] = {str(rng.randrange(500)): rng.choice([0, 1, 2, 3, -1]) for _ in range(60)}
+            run[qid] = {str(rng.randrange(500)): float(rng.randrange(20)) for _ in range(200)}
+        reference = pytrec_eval.RelevanceEvaluator(
+            qrels, {"ndcg_cut.10", "map_cut.100", "recall.100", "P.10"}).evaluate(run)
+        qids = [q for q in run for _ in run[q]]
+        docids = [d for q in run for d in run[q]]
+        scores = [s for q in run for s in run[q].values()]
+        ours = TrecEvaluator(Qrels.from_dict(qrels)).evaluate_per_query(
+            qids, docids, scores, ndcg_cuts=[10], map_cuts=[100], mrr_cuts=[], recall_cuts=[100], precision_cuts=[10])
+        for qid, expected in reference.items():
+            self.assertAlmostEqual(ours[qid]["ndcg@10"], expected["ndcg_cut_10"])
+            self.assertAlmostEqual(ours[qid]["map@100"], expected["map_cut_100"])
+            self.assertAlmostEqual(ours[qid]["recall@100"], expected["recall_100"])
+            self.assertAlmostEqual(ours[qid]["precision@10"], expected["P_10"])
+
+    def test_metrics_with_qrels_file(self):
+        contexts = [Context(id=str(i), score=float(10 - i), has_answer=False) for i in range(5)]
+        document = Document(Question("q"), Answer([]), contexts, id=7)
+        document.rerank_by_scores([0.0, 0.0, 0.0, 0.0, 1.0])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "qrels.txt")
+            with open(path, "w") as f:
+                f.write("7 0 4 1\n7 0 9 1\n")
+            metrics = Metrics([document])
+            retrieved = metrics.calculate_trec_metrics(mrr_cuts=[10], qrel=path)
+            reranked = metrics.calculate_trec_metrics(mrr_cuts=[10], qrel=path, use_reordered=True, per_query=True)
+        self.assertEqual(retrieved["mrr@10"], 0.2)
+        self.assertEqual(reranked["mrr@10"], 1.0)
+        self.assertEqual(reranked["per_query"]["7"]["map@100"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
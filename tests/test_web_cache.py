@@ -0,0 +1,102 @@
+"""
+Tests for the persistent web search / scraped page cache.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from rankify.tools.websearch.cache import PAGE, SERP, WebCache, normalize_query
+
+try:
+    from rankify.tools.websearch.serp.SerperApiClient import SerperApiClient
+    SERPER_AVAILABLE = True
+except ImportError:
+    SERPER_AVAILABLE = False
+
+
+class TestWebCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "web.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_and_counters(self):
+        cache = WebCache(self.path)
+        self.assertIsNone(cache.get_serp("Capital of France", "us", 10))
+        cache.put_serp("Capital of France", "us", 10, {"organic": [{"link": "https://a"}]})
+        # Normalized query, same location and result count: same entry
+        self.assertEqual(cache.get_serp("  capital   of FRANCE ", "US", 10), {"organic": [{"link": "https://a"}]})
+        self.assertIsNone(cache.get_serp("capital of france", "us", 5))
+        cache.put_page("https://a", "no_extraction", {"content": "Paris"})
+        self.assertEqual(cache.get_page("https://a", "no_extraction"), {"content": "Paris"})
+        self.assertIsNone(cache.get_page("https://a", "cosine"))
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], {SERP: 1, PAGE: 1})
+        self.assertEqual(stats["misses"], {SERP: 2, PAGE: 1})
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(normalize_query(" A  b\tC "), "a b c")
+
+    def test_persists_across_instances(self):
+        WebCache(self.path).put_page("https://a", "no_extraction", {"content": "Paris"})
+        self.assertEqual(WebCache(self.path).get_page("https://a", "no_extraction"), {"content": "Paris"})
+
+    def test_ttl_expiry(self):
+        cache = WebCache(self.path, serp_ttl=60, page_ttl=None)
+        cache.put_serp("q", "us", 10, {"organic": []})
+        cache.put_page("https://a", "no_extraction", {"content": "x"})
+        with mock.patch("rankify.tools.websearch.cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(cache.get_serp("q", "us", 10))
+            self.assertEqual(cache.get_page("https://a", "no_extraction"), {"content": "x"})
+        self.assertEqual(len(cache), 1)
+
+    def test_offline_replay_ignores_ttl(self):
+        WebCache(self.path).put_serp("q", "us", 10, {"organic": []})
+        replay = WebCache(self.path, offline=True)
+        with mock.patch("rankify.tools.websearch.cache.time.time", return_value=time.time() + 30 * 24 * 3600):
+            self.assertEqual(replay.get_serp("q", "us", 10), {"organic": []})
+        self.assertEqual(replay.stats()["hits"], {SERP: 1})
+        self.assertEqual(len(replay), 1)
+
+    def test_lru_eviction(self):
+        cache = WebCache(self.path, max_bytes=2500)
+        for i in range(3):
+            cache.put_page(f"https://{i}", "no_extraction", {"content": str(i) * 1000})
+            time.sleep(0.01)
+        self.assertIsNone(cache.get_page("https://0", "no_extraction"))
+        # Reading page 1 makes page 2 the least recently used one
+        self.assertIsNotNone(cache.get_page("https://1", "no_extraction"))
+        time.sleep(0.01)
+        cache.put_page("https://3", "no_extraction", {"content": "3" * 1000})
+        self.assertIsNotNone(cache.get_page("https://1", "no_extraction"))
+        self.assertIsNone(cache.get_page("https://2", "no_extraction"))
+        self.assertLessEqual(cache.stats()["bytes"], 2500)
+
+    @unittest.skipUnless(SERPER_AVAILABLE, "web search dependencies are not installed")
+    def test_serper_client_uses_cache_and_replays_offline(self):
+        cache = WebCache(self.path)
+        client = SerperApiClient(api_key="key", cache=cache)
+        response = mock.Mock()
+        response.json.return_value = {"organic": [{"title": "Paris", "link": "https://a", "snippet": "s"}]}
+        with mock.patch("rankify.tools.websearch.serp.SerperApiClient.requests.post",
+                        return_value=response) as post:
+            first = client.search_web("capital of france")
+            second = client.search_web("Capital of France")
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(first.data, second.data)
+
+        offline = SerperApiClient(cache=WebCache(self.path, offline=True))
+        with mock.patch("rankify.tools.websearch.serp.SerperApiClient.requests.post") as post:
+            self.assertEqual(offline.search_web("capital of france").data["organic"][0]["link"], "https://a")
+            missing = offline.search_web("capital of germany")
+        post.assert_not_called()
+        self.assertFalse(missing.is_success)
+
+
+if __name__ == "__main__":
+    unittest.main()
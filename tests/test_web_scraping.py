@@ -0,0 +1,143 @@
+"""
+Tests for the concurrent web scraping pipeline (shared crawler pool, streaming search context)
+against a local HTTP fixture server.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from crawl4ai import BrowserConfig
+    from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
+
+    from rankify.tools.websearch.cache import WebCache
+    from rankify.tools.websearch.content_scraping.crawler import CrawlerPool, WebScraper
+    from rankify.tools.websearch.context.build_search_context import build_search_context, stream_search_context
+    from rankify.tools.websearch.models.SerpResults import SerpResult
+    CRAWL4AI_AVAILABLE = True
+except ImportError:
+    CRAWL4AI_AVAILABLE = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        page = self.path.strip("/")
+        # Later pages answer faster, so completion order differs from request order
+        time.sleep(0.05 if page == "slow" else 0.01)
+        body = "".join(f"<p>Page {page} paragraph {i} explains why Paris is the capital of France today.</p>"
+                       for i in range(10))
+        data = f"<html><body><article>{body}</article></body></html>".encode("utf-8")
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipUnless(CRAWL4AI_AVAILABLE, "crawl4ai is not installed")
+class TestWebScrapingPipeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.max_in_flight = 0
+
+    def pool(self, max_concurrency):
+        return CrawlerPool(BrowserConfig(verbose=False), max_concurrency=max_concurrency,
+                           crawler_strategy=AsyncHTTPCrawlerStrategy(max_connections=8))
+
+    def test_stream_yields_every_page_within_concurrency_bound(self):
+        urls = [f"{self.base}/slow"] + [f"{self.base}/{i}" for i in range(7)]
+
+        async def run():
+            async with self.pool(max_concurrency=3) as pool:
+                scraper = WebScraper(crawler_pool=pool, filter_content=False)
+                return [(position, results) async for position, results in scraper.scrape_stream(urls)]
+
+        streamed = asyncio.run(run())
+        self.assertEqual(sorted(position for position, _ in streamed), list(range(len(urls))))
+        self.assertNotEqual(streamed[0][0], 0)  # the slow page does not hold back the others
+        for position, results in streamed:
+            result = results["no_extraction"]
+            self.assertTrue(result.success, result.error)
+            expected = "slow" if position == 0 else str(position - 1)
+            self.assertIn(f"Page {expected} paragraph", result.content)
+        self.assertLessEqual(_Handler.max_in_flight, 3)
+        self.assertGreater(_Handler.max_in_flight, 1)
+
+    def test_search_context_keeps_serp_order(self):
+        organic = [{"link": f"{self.base}/slow", "title": "slow"}] + [
+            {"link": f"{self.base}/{i}", "title": str(i)} for i in range(3)]
+
+        async def run():
+            async with self.pool(max_concurrency=4) as pool:
+                scraper = WebScraper(crawler_pool=pool, filter_content=False)
+                streamed = [position async for position, _ in
+                            stream_search_context(SerpResult(data={"organic": [dict(o) for o in organic]}), scraper)]
+                built = await build_search_context(SerpResult(data={"organic": organic}), scraper)
+                return streamed, built
+
+        streamed, built = asyncio.run(run())
+        self.assertEqual(sorted(streamed), [0, 1, 2, 3])
+        self.assertEqual([source["title"] for source in built], ["slow", "0", "1", "2"])
+        self.assertTrue(all(source["fit_markdown"] for source in built))
+
+    def test_cached_pages_are_not_fetched_again(self):
+        urls = [f"{self.base}/{i}" for i in range(3)]
+
+        async def run(cache):
+            async with self.pool(max_concurrency=4) as pool:
+                scraper = WebScraper(crawler_pool=pool, filter_content=False, cache=cache)
+                return await scraper.scrape_many(urls)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "web.sqlite")
+            fetched = asyncio.run(run(WebCache(path)))
+            requests = _Handler.requests
+            replay_cache = WebCache(path, offline=True)
+            replayed = asyncio.run(run(replay_cache))
+            missing = asyncio.run(WebScraper(filter_content=False, cache=replay_cache).scrape(f"{self.base}/new"))
+
+        self.assertEqual(_Handler.requests, requests)
+        for url in urls:
+            self.assertEqual(replayed[url]["no_extraction"].content, fetched[url]["no_extraction"].content)
+        self.assertEqual(replay_cache.stats()["hits"], {"page": 3})
+        self.assertFalse(missing["no_extraction"].success)
+
+    def test_failed_search_gives_no_sources(self):
+        async def run():
+            return [item async for item in stream_search_context(SerpResult(error="quota exceeded"))]
+
+        self.assertEqual(asyncio.run(run()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()